@@ -3,6 +3,8 @@ from collections import defaultdict
 from ..sollumz_properties import SollumzGame, import_export_current_game as current_game, set_import_export_current_game
 from mathutils import Vector
 from xml.etree import ElementTree as ET
+import numpy as np
+from numpy.typing import NDArray
 from .element import (
     AttributeProperty,
     ElementTree,
@@ -379,10 +381,50 @@ class Polygon(ElementTree, AbstractClass):
         self.material_index = AttributeProperty("m", 0)
 
 
+class PolyTriangleArray:
+    """Block of triangles stored in arrays instead of a ``PolyTriangle`` per triangle, used when exporting large meshes.
+    Written as regular ``Triangle`` polygons."""
+
+    def __init__(self, material_inds: NDArray[np.uint32], vert_inds: NDArray[np.uint32]):
+        self.material_inds = material_inds
+        # (N, 3) array
+        self.vert_inds = vert_inds
+
+    def __len__(self) -> int:
+        return len(self.material_inds)
+
+    def append_to_xml(self, element: ET.Element):
+        for mat_ind, (v1, v2, v3) in zip(self.material_inds.tolist(), self.vert_inds.tolist()):
+            ET.SubElement(element, PolyTriangle.tag_name, {
+                "m": str(mat_ind),
+                "v1": str(v1), "v2": str(v2), "v3": str(v3),
+                "f1": "0", "f2": "0", "f3": "0",
+            })
+
+    def to_rdr_lines(self) -> list[str]:
+        return [
+            f"Tri {mat_ind} {v1} {v2} {v3}"
+            for mat_ind, (v1, v2, v3) in zip(self.material_inds.tolist(), self.vert_inds.tolist())
+        ]
+
+
 class Polygons(ListProperty):
     list_type = Polygon
     tag_name = "Polygons"
 
+    def to_xml(self):
+        if not self.value:
+            return None
+
+        element = ET.Element(self.tag_name)
+        for poly in self.value:
+            if isinstance(poly, PolyTriangleArray):
+                poly.append_to_xml(element)
+            else:
+                element.append(poly.to_xml())
+
+        return element
+
     @staticmethod
     def from_xml(element: ET.Element):
         new = Polygons()
@@ -483,12 +525,19 @@ class PolygonListProperty(ElementProperty):
     
     def to_xml(self):
         element = ET.Element(self.tag_name)
-        element.text = "\n"
 
         if len(self.value) == 0:
             return None
 
+        lines = []
         for poly in self.value:
-            element.text += (poly + "\n")
+            if isinstance(poly, PolyTriangleArray):
+                lines.extend(poly.to_rdr_lines())
+            elif isinstance(poly, list):
+                lines.append(" ".join(str(item) for item in poly))
+            else:
+                lines.append(poly)
+
+        element.text = "\n" + "".join(line + "\n" for line in lines)
 
         return element
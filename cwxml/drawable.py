@@ -1,5 +1,6 @@
 import io
 import os
+from contextlib import contextmanager
 from ..sollumz_properties import SollumzGame, import_export_current_game as current_game, set_import_export_current_game
 from mathutils import Matrix
 import numpy as np
@@ -745,10 +746,27 @@ class VertexBuffer(ElementTree):
     def __init__(self):
         super().__init__()
         self.flags = ValueProperty("Flags", 0)
-        self.data: Optional[NDArray] = None
+        self._data: Optional[NDArray] = None
+        self._data_str: Optional[str] = None
 
         self.layout = VertexLayoutList()
 
+    @property
+    def data(self) -> Optional[NDArray]:
+        """Vertex data array. Decoded from the XML text on first access, so buffers that are never used (i.e. LODs
+        skipped on import) are never parsed."""
+        if self._data_str is not None:
+            data_str = self._data_str
+            self._data_str = None
+            self._load_data_from_str(data_str)
+
+        return self._data
+
+    @data.setter
+    def data(self, value: Optional[NDArray]):
+        self._data_str = None
+        self._data = value
+
     @classmethod
     def from_xml(cls, element: ET.Element):
         new = super().from_xml(element)
@@ -762,7 +780,7 @@ class VertexBuffer(ElementTree):
         if data_elem is None or not data_elem.text:
             return new
 
-        new._load_data_from_str(data_elem.text)
+        new._data_str = data_elem.text
 
         return new
 
@@ -846,7 +864,23 @@ class IndexBuffer(ElementTree):
 
     def __init__(self):
         super().__init__()
-        self.data: Optional[NDArray] = None
+        self._data: Optional[NDArray] = None
+        self._data_str: Optional[str] = None
+
+    @property
+    def data(self) -> Optional[NDArray]:
+        """Index data array. Decoded from the XML text on first access."""
+        if self._data_str is not None:
+            data_str = self._data_str
+            self._data_str = None
+            self._data = np.fromstring(data_str, sep=" ", dtype=np.uint32)
+
+        return self._data
+
+    @data.setter
+    def data(self, value: Optional[NDArray]):
+        self._data_str = None
+        self._data = value
 
     @classmethod
     def from_xml(cls, element: ET.Element):
@@ -857,7 +891,7 @@ class IndexBuffer(ElementTree):
         if data_elem is None or not data_elem.text:
             return new
 
-        new.data = np.fromstring(data_elem.text, sep=" ", dtype=np.uint32)
+        new._data_str = data_elem.text
         return new
 
     def to_xml(self):
@@ -962,6 +996,19 @@ class LodList(ElementTree):
 class Drawable(ElementTree, AbstractClass):
     tag_name = None
 
+    _skip_bounds = False
+
+    @staticmethod
+    @contextmanager
+    def skip_bounds(skip: bool = True):
+        """Skip parsing the embedded bounds of drawables read inside this context."""
+        try:
+            prev = Drawable._skip_bounds
+            Drawable._skip_bounds = skip
+            yield
+        finally:
+            Drawable._skip_bounds = prev
+
     @property
     def is_empty(self) -> bool:
         return len(self.all_models) == 0
@@ -1027,6 +1074,9 @@ class Drawable(ElementTree, AbstractClass):
     @classmethod
     def from_xml(cls, element: ET.Element):
         new = super().from_xml(element)
+        if Drawable._skip_bounds:
+            return new
+
         if current_game() == SollumzGame.GTA:
             bounds_elem = element.find("Bounds")
             if bounds_elem is not None:
@@ -128,10 +128,27 @@ class VerticesProperty(ElementProperty):
     value_types = (list)
 
     global VERT_ATTR_DTYPES
+    _value_str = None
+    _dtype = None
+
     def __init__(self, tag_name: str = "Vertices", value=None):
         super().__init__(tag_name, value or [])
 
-    
+    @property
+    def value(self):
+        # Vertex text is decoded on first access, so geometry of skipped LODs is never parsed
+        if self._value_str is not None:
+            value_str = self._value_str
+            self._value_str = None
+            self._value = np.loadtxt(io.StringIO(value_str), dtype=self._dtype)
+
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value_str = None
+        self._value = value
+
     def _load_data_from_str(self, _str: str):
         struct_dtype = np.dtype(self._create_dtype())
         a = np.loadtxt(io.StringIO(_str), dtype=struct_dtype)
@@ -161,8 +178,9 @@ class VerticesProperty(ElementProperty):
     def from_xml(cls, element: ET.Element):
         new = cls()
         if element.text.strip():
-            a = new._load_data_from_str(element.text)
-            new.value = a
+            # The dtype depends on the semantic layout of the current geometry, so it has to be built now
+            new._dtype = np.dtype(new._create_dtype())
+            new._value_str = element.text
         return new
 
     def to_xml(self):
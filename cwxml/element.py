@@ -184,6 +184,11 @@ class ElementTree(Element):
             # Key doesn't exist, return None
             return None
 
+    def __setstate__(self, state: dict):
+        # Required by pickle and copy. `__getattribute__` returns None for missing attributes, so without this they
+        # would find `None` as `__setstate__` instead of falling back to updating `__dict__`.
+        self.__dict__.update(state)
+
     def __setattr__(self, name: str, value) -> None:
         # Get the full object
         obj = self.__getattribute__(name, False)
@@ -1,5 +1,8 @@
 import xml.etree.ElementTree as ET
 import os
+import copy
+import hashlib
+import pickle
 from abc import ABC, abstractmethod
 from ..cwxml.drawable_RDR import VERT_ATTR_DTYPES
 from ..sollumz_properties import SollumzGame
@@ -449,6 +452,8 @@ class ShaderManager:
     _rdr_shaders_by_hash: dict[int, ShaderDef] = {}
     _rdr_shaders_by_base_name_and_rb: dict[(str, int), ShaderDef] = {}
 
+    _tables: dict[SollumzGame, "ShaderDefTable"] = {}
+
     rdr_standard_2lyr = ["standard_2lyr", "standard_2lyr_ground", "standard_2lyr_pxm", "standard_2lyr_pxm_ground", "standard_2lyr_tnt", 
             "campfire_standard_2lyr"]
 
@@ -478,94 +483,71 @@ class ShaderManager:
 
     @staticmethod
     def load_shaders():
-        tree = ET.parse(ShaderManager.shaderxml)
-        rdrtree = ET.parse(ShaderManager.rdr_shaderxml)
-
-        for node in tree.getroot():
-            base_name = node.find("Name").text
-            for filename_elem in node.findall("./FileName//*"):
-                filename = filename_elem.text
-
-                if filename is None:
-                    continue
-
-                filename_hash = jenkhash.Generate(filename)
-                render_bucket = int(filename_elem.attrib["bucket"])
-
-                shader = ShaderDef.from_xml(node, SollumzGame.GTA)
-                shader.base_name = base_name
-                shader.preset_name = filename
-                shader.render_bucket = render_bucket
-
-                assert filename not in ShaderManager._shaders, f"Shader definition '{filename}' already registered"
-                ShaderManager._shaders[filename] = shader
-                ShaderManager._shaders_by_hash[filename_hash] = shader
-                ShaderManager._shaders_by_base_name_and_rb[(base_name, render_bucket)] = shader
-
-        for node in rdrtree.getroot():
-            base_name = node.find("Name").text
-
-            buffer_size = node.find("BufferSizes").text
-            if buffer_size != None:
-                buffer_size = tuple(int(x) for x in node.find("BufferSizes").text.split(" "))
-
-            render_bucket = node.find("DrawBucket").text.split(" ")
-            render_bucket = sorted([int(x, 16)  for x in render_bucket])
-            # Register a ShaderDef per render bucket, similar to how .sps files worked in GTA5
-            for rb in render_bucket:
-                preset_name = base_name
-                rb_flag = (rb & 0x80) != 0
-                rb &= 0x7F
-                if len(render_bucket) > 1:
-                    # If we have more than one render bucket, add a suffix to differentiate them
-                    # TODO: might want to match these names to the .sps found in the game files.
-                    #       Currently by just adding a suffix, they are close but not always the same.
-                    if rb == 0:
-                        suffix = ""
-                    elif rb == 1:
-                        suffix = "_alpha"
-                    elif rb == 2:
-                        suffix = "_decal"
-                    elif rb == 3:
-                        suffix = "_cutout"
-                    elif rb == 4:
-                        suffix = "_nosplash"
-                    elif rb == 5:
-                        suffix = "_nowater"
-                    else:
-                        assert "Unsupported render bucket for suffix"
-
-                    preset_name += suffix
-
-                preset_name_hash = jenkhash.Generate(preset_name)
-
-                shader = ShaderDef.from_xml(node, SollumzGame.RDR)
-                shader.base_name = base_name
-                shader.preset_name = preset_name
-                shader.render_bucket = rb
-                shader.render_bucket_flag = rb_flag
-                shader.buffer_size = buffer_size
-
-                assert preset_name not in ShaderManager._rdr_shaders, f"Shader definition '{preset_name}' already registered"
-                ShaderManager._rdr_shaders[preset_name] = shader
-                ShaderManager._rdr_shaders_by_hash[preset_name_hash] = shader
-                ShaderManager._rdr_shaders_by_base_name_and_rb[(base_name, rb)] = shader
+        """Load the shader definitions of all games. Normally not needed, the tables are loaded lazily on first use."""
+        for game in (SollumzGame.GTA, SollumzGame.RDR):
+            ShaderManager._ensure_loaded(game)
+
+    @staticmethod
+    def preset_names(game: SollumzGame = SollumzGame.GTA) -> list[str]:
+        """Get the preset names of all shaders of ``game``, in definition order.
+
+        Served from the shader cache index when it is up-to-date, so the definitions themselves are not unpickled
+        until a shader is looked up.
+        """
+        table = ShaderManager._tables[game]
+        table.read_cache()
+        if table.preset_names is None:
+            ShaderManager._ensure_loaded(game)
+        return table.preset_names
 
+    @staticmethod
+    def _ensure_loaded(game: SollumzGame):
+        table = ShaderManager._tables[game]
+        if table.loaded:
+            return
+
+        table.read_cache()
+
+        shaders = None
+        if table.defs_data is not None:
+            try:
+                shaders = pickle.loads(table.defs_data)
+            except Exception:
+                shaders = None
+
+        if shaders is None:
+            shaders = table.build_from_xml()
+            table.write_cache(shaders)
+
+        table.defs_data = None
+        table.preset_names = [s.preset_name for s in shaders]
+        for shader in shaders:
+            preset_name = shader.preset_name
+            assert preset_name not in table.by_preset_name, f"Shader definition '{preset_name}' already registered"
+            table.by_preset_name[preset_name] = shader
+            table.by_hash[jenkhash.Generate(preset_name)] = shader
+            table.by_base_name_and_rb[(shader.base_name, shader.render_bucket)] = shader
+
+        table.loaded = True
 
     @staticmethod
     def find_shader(filename: str, game: SollumzGame = SollumzGame.GTA) -> Optional[ShaderDef]:
         shader = None
         if game == SollumzGame.GTA:
+            ShaderManager._ensure_loaded(SollumzGame.GTA)
             shader = ShaderManager._shaders.get(filename, None)
         elif game == SollumzGame.RDR:
+            ShaderManager._ensure_loaded(SollumzGame.RDR)
             shader = ShaderManager._rdr_shaders.get(filename, None)
         if shader is None and filename.startswith("hash_"):
+            ShaderManager._ensure_loaded(SollumzGame.GTA)
             filename_hash = int(filename[5:], 16)
             shader = ShaderManager._shaders_by_hash.get(filename_hash, None)
         return shader
 
     @staticmethod
     def find_shader_preset_name(base_name: str, render_bucket: int, game: SollumzGame = SollumzGame.GTA) -> Optional[str]:
+        ShaderManager._ensure_loaded(game)
         if game == SollumzGame.GTA:
             by_base_name_and_rb = ShaderManager._shaders_by_base_name_and_rb
             by_preset_name = ShaderManager._shaders
@@ -580,4 +562,161 @@ class ShaderManager:
         return shader.preset_name if shader is not None else None
 
 
-ShaderManager.load_shaders()
+def build_gta_shader_defs(root: ET.Element) -> list[ShaderDef]:
+    """Build a ``ShaderDef`` per .sps file found in ``Shaders.xml``. Each node is parsed once and the presets are
+    shallow copies of it, sharing the parameter definitions."""
+    shaders = []
+    for node in root:
+        base_name = node.find("Name").text
+        base_shader = None
+        for filename_elem in node.findall("./FileName//*"):
+            filename = filename_elem.text
+
+            if filename is None:
+                continue
+
+            if base_shader is None:
+                base_shader = ShaderDef.from_xml(node, SollumzGame.GTA)
+                base_shader.base_name = base_name
+
+            shader = copy.copy(base_shader)
+            shader.preset_name = filename
+            shader.render_bucket = int(filename_elem.attrib["bucket"])
+            shaders.append(shader)
+
+    return shaders
+
+
+def build_rdr_shader_defs(root: ET.Element) -> list[ShaderDef]:
+    """Build a ``ShaderDef`` per render bucket of each shader found in ``ModRDRShaders.xml``. Each node is parsed
+    once and the presets are shallow copies of it, sharing the parameter definitions."""
+    shaders = []
+    for node in root:
+        base_name = node.find("Name").text
+
+        buffer_size = node.find("BufferSizes").text
+        if buffer_size is not None:
+            buffer_size = tuple(int(x) for x in node.find("BufferSizes").text.split(" "))
+
+        render_bucket = node.find("DrawBucket").text.split(" ")
+        render_bucket = sorted([int(x, 16) for x in render_bucket])
+
+        base_shader = ShaderDef.from_xml(node, SollumzGame.RDR)
+        base_shader.base_name = base_name
+        base_shader.buffer_size = buffer_size
+
+        # Register a ShaderDef per render bucket, similar to how .sps files worked in GTA5
+        for rb in render_bucket:
+            preset_name = base_name
+            rb_flag = (rb & 0x80) != 0
+            rb &= 0x7F
+            if len(render_bucket) > 1:
+                # If we have more than one render bucket, add a suffix to differentiate them
+                # TODO: might want to match these names to the .sps found in the game files.
+                #       Currently by just adding a suffix, they are close but not always the same.
+                if rb == 0:
+                    suffix = ""
+                elif rb == 1:
+                    suffix = "_alpha"
+                elif rb == 2:
+                    suffix = "_decal"
+                elif rb == 3:
+                    suffix = "_cutout"
+                elif rb == 4:
+                    suffix = "_nosplash"
+                elif rb == 5:
+                    suffix = "_nowater"
+                else:
+                    assert "Unsupported render bucket for suffix"
+
+                preset_name += suffix
+
+            shader = copy.copy(base_shader)
+            shader.preset_name = preset_name
+            shader.render_bucket = rb
+            shader.render_bucket_flag = rb_flag
+            shaders.append(shader)
+
+    return shaders
+
+
+class ShaderDefTable:
+    """Shader definitions of a single game, backed by a pickled cache of the parsed XML.
+
+    The cache file stores an index with the preset names and the pickled ``ShaderDef`` list. It is invalidated when
+    the XML contents change (by hash) or when ``CACHE_VERSION`` is bumped.
+    """
+
+    # Bump whenever ShaderDef or the build functions change in a way that makes previously cached definitions invalid
+    CACHE_VERSION = 1
+
+    def __init__(self, xml_path: str, build_fn, by_preset_name: dict, by_hash: dict, by_base_name_and_rb: dict):
+        self.xml_path = xml_path
+        self.build_fn = build_fn
+        self.by_preset_name = by_preset_name
+        self.by_hash = by_hash
+        self.by_base_name_and_rb = by_base_name_and_rb
+        self.preset_names: Optional[list[str]] = None
+        self.defs_data: Optional[bytes] = None
+        self.cache_read = False
+        self.loaded = False
+
+    @property
+    def cache_path(self) -> str:
+        xml_dir, xml_name = os.path.split(self.xml_path)
+        return os.path.join(xml_dir, "__pycache__", f"{xml_name}.cache")
+
+    def xml_hash(self) -> str:
+        with open(self.xml_path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    def read_cache(self):
+        """Read the cache index. Leaves ``defs_data`` as ``None`` if there is no valid cache."""
+        if self.cache_read:
+            return
+
+        self.cache_read = True
+        try:
+            with open(self.cache_path, "rb") as f:
+                version, xml_hash, preset_names, defs_data = pickle.load(f)
+        except Exception:
+            return
+
+        if version != ShaderDefTable.CACHE_VERSION or xml_hash != self.xml_hash():
+            return
+
+        self.preset_names = preset_names
+        self.defs_data = defs_data
+
+    def write_cache(self, shaders: list[ShaderDef]):
+        """Write the cache file. Failures are ignored, e.g. if the add-on is installed in a read-only location."""
+        cache_path = self.cache_path
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            defs_data = pickle.dumps(shaders, protocol=pickle.HIGHEST_PROTOCOL)
+            contents = (ShaderDefTable.CACHE_VERSION, self.xml_hash(), [s.preset_name for s in shaders], defs_data)
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(contents, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def build_from_xml(self) -> list[ShaderDef]:
+        tree = ET.parse(self.xml_path)
+        return self.build_fn(tree.getroot())
+
+
+ShaderManager._tables = {
+    SollumzGame.GTA: ShaderDefTable(
+        ShaderManager.shaderxml, build_gta_shader_defs,
+        ShaderManager._shaders, ShaderManager._shaders_by_hash, ShaderManager._shaders_by_base_name_and_rb
+    ),
+    SollumzGame.RDR: ShaderDefTable(
+        ShaderManager.rdr_shaderxml, build_rdr_shader_defs,
+        ShaderManager._rdr_shaders, ShaderManager._rdr_shaders_by_hash, ShaderManager._rdr_shaders_by_base_name_and_rb
+    ),
+}
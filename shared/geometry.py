@@ -1,11 +1,13 @@
 """
 Various functions related to geometry math.
 """
+import hashlib
+import warnings
 import numpy as np
 from numpy.typing import NDArray
 from mathutils import Vector
 from typing import NamedTuple
-from collections.abc import Sequence
+from collections import OrderedDict
 
 
 class Centroid(NamedTuple):
@@ -152,26 +154,131 @@ def get_mass_properties_of_box(box_min: Vector, box_max: Vector) -> MassProperti
 
 
 def get_centroid_of_mesh(mesh_vertices) -> Centroid:
-    from . import miniball
+    mesh_vertices = np.asarray(mesh_vertices, dtype=np.float64).reshape((-1, 3))
+    if len(mesh_vertices) == 0:
+        return Centroid(Vector((0.0, 0.0, 0.0)), 0.0)
 
-    # miniball may throw errors if there are duplicated vertices, so remove them first
-    mesh_vertices = np.unique(mesh_vertices, axis=0)
-
-    try:
-        C, r2 = miniball.get_bounding_ball(mesh_vertices)
-    except np.linalg.LinAlgError:
-        # Fallback to sphere enclosing the bounding box
-        bb_min = np.min(mesh_vertices, axis=0)
-        bb_max = np.max(mesh_vertices, axis=0)
-        C = (bb_max + bb_min) * 0.5
-        r2 = np.linalg.norm(C - bb_min) ** 2
+    C, r2 = get_bounding_sphere(mesh_vertices)
 
     centroid = Vector(C)
     radius_around_centroid = np.sqrt(r2)
     return Centroid(centroid, radius_around_centroid)
 
 
-def get_mass_properties_of_mesh(mesh_vertices, mesh_faces):
+# Directions used to pick the initial extreme points, from the EPOS-26 heuristic (Larsson, "Fast and Tight Fitting
+# Bounding Spheres", 2008). Both ends of each direction are used
+_EXTREME_POINTS_DIRECTIONS = np.array([
+    [1, 0, 0], [0, 1, 0], [0, 0, 1],
+    [1, 1, 1], [1, 1, -1], [1, -1, 1], [1, -1, -1],
+    [1, 1, 0], [1, -1, 0], [1, 0, 1], [1, 0, -1], [0, 1, 1], [0, 1, -1],
+], dtype=np.float64)
+_BOUNDING_SPHERE_EPSILON = 1e-7
+
+
+def get_bounding_sphere(points: NDArray[np.float64]) -> tuple[NDArray[np.float64], float]:
+    """Calculate the smallest sphere enclosing the (N, 3) ``points``, N > 0. Returns its center and squared radius.
+
+    The exact sphere is found with Welzl's algorithm on a small support set, starting with the extreme points along a
+    fixed set of directions. The point farthest outside the sphere is added to the set until all points are enclosed.
+    The result is deterministic and duplicated or degenerate (coplanar, collinear) points are supported.
+    """
+    points = np.asarray(points, dtype=np.float64)
+
+    # Work relative to the bounding box center to keep precision with points far from the origin
+    offset = (points.min(axis=0) + points.max(axis=0)) * 0.5
+    points = points - offset
+
+    projections = points @ _EXTREME_POINTS_DIRECTIONS.T
+    support = np.unique(np.concatenate((projections.argmin(axis=0), projections.argmax(axis=0))))
+    support = list(support)
+
+    # Each iteration adds a point not in the support set, so this always terminates
+    while True:
+        center, r2 = _get_bounding_sphere_exact(points[support])
+        dist2 = np.square(points - center).sum(axis=1)
+        farthest = int(np.argmax(dist2))
+        if dist2[farthest] <= r2 * (1.0 + _BOUNDING_SPHERE_EPSILON) or farthest in support:
+            # Make sure every point is inside, rounding errors in the exact solver can leave some just outside
+            r2 = max(r2, float(dist2[farthest]))
+            break
+
+        support.append(farthest)
+
+    return center + offset, r2
+
+
+def _get_bounding_sphere_exact(points: NDArray[np.float64]) -> tuple[NDArray[np.float64], float]:
+    """Welzl's move-to-front algorithm, for small sets of points. The recursion depth is at most 4 and the result only
+    depends on the order of ``points``."""
+    order = list(range(len(points)))
+
+    def _move_to_front(end: int, boundary: list[int]) -> tuple[NDArray[np.float64], float]:
+        center, r2 = _get_circumsphere(points[boundary])
+        if len(boundary) == 4:
+            return center, r2
+
+        for i in range(end):
+            idx = order[i]
+            if r2 < 0.0 or np.square(points[idx] - center).sum() > r2 * (1.0 + _BOUNDING_SPHERE_EPSILON):
+                center, r2 = _move_to_front(i, boundary + [idx])
+                order.insert(0, order.pop(i))
+
+        return center, r2
+
+    return _move_to_front(len(order), [])
+
+
+def _get_circumsphere(points: NDArray[np.float64]) -> tuple[NDArray[np.float64], float]:
+    """Smallest sphere passing through up to 4 points. Returns a negative squared radius for an empty set."""
+    if len(points) == 0:
+        return np.zeros(3), -1.0
+
+    origin = points[0]
+    edges = points[1:] - origin
+    if len(edges) == 0:
+        return origin.copy(), 0.0
+
+    # The center is origin + edges.T @ coeffs, with |center - p|^2 equal for all points. Least squares handles
+    # duplicated and collinear/coplanar points, which make the system singular
+    coeffs = np.linalg.lstsq(2.0 * (edges @ edges.T), np.square(edges).sum(axis=1), rcond=None)[0]
+    center_offset = edges.T @ coeffs
+    return origin + center_offset, float(np.square(center_offset).sum())
+
+
+_MASS_PROPERTIES_CACHE_MAX_SIZE = 256
+_mass_properties_cache: OrderedDict[bytes, tuple[float, tuple, tuple]] = OrderedDict()
+
+
+def get_mass_properties_of_mesh(mesh_vertices, mesh_faces) -> MassProperties:
+    """Calculate volume, center of gravity and inertia of a triangle mesh. Results are cached by mesh contents, so the
+    same collision mesh used in multiple places (e.g. damaged and undamaged fragment bounds) is only computed once.
+    """
+    mesh_vertices = np.ascontiguousarray(mesh_vertices, dtype=np.float64)
+    mesh_faces = np.ascontiguousarray(mesh_faces, dtype=np.int64)
+
+    key = _mesh_fingerprint(mesh_vertices, mesh_faces)
+    cached = _mass_properties_cache.get(key, None)
+    if cached is None:
+        cached = _compute_mass_properties_of_mesh(mesh_vertices, mesh_faces)
+        _mass_properties_cache[key] = cached
+        if len(_mass_properties_cache) > _MASS_PROPERTIES_CACHE_MAX_SIZE:
+            _mass_properties_cache.popitem(last=False)
+    else:
+        _mass_properties_cache.move_to_end(key)
+
+    volume, cg, inertia = cached
+    return MassProperties(volume, Vector(cg), Vector(inertia))
+
+
+def _mesh_fingerprint(mesh_vertices: NDArray[np.float64], mesh_faces: NDArray[np.int64]) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.array(mesh_vertices.shape + mesh_faces.shape, dtype=np.int64).tobytes())
+    h.update(mesh_vertices.tobytes())
+    h.update(mesh_faces.tobytes())
+    return h.digest()
+
+
+def _compute_mass_properties_of_mesh(mesh_vertices, mesh_faces) -> tuple[float, tuple, tuple]:
     triangles = mesh_vertices[mesh_faces]
 
     v0 = triangles[:, 0, :]
@@ -193,86 +300,35 @@ def get_mass_properties_of_mesh(mesh_vertices, mesh_faces):
         tri_cgs *= tri_areas[:, np.newaxis]
         cg = tri_cgs.sum(axis=0) / tri_areas.sum()
 
-    cg = Vector(cg)
-
-    ixx = 0.0
-    iyy = 0.0
-    izz = 0.0
-    for tri_idx, (v0, v1, v2) in enumerate(triangles):
-        # Based on https://github.com/bulletphysics/bullet3/blob/e9c461b0ace140d5c73972760781d94b7b5eee53/src/BulletCollision/CollisionShapes/btConvexTriangleMeshShape.cpp#L236
-        # TODO: vectorize with numpy
-        a = Vector(v0) - cg
-        b = Vector(v1) - cg
-        c = Vector(v2) - cg
-
-        i = [0.0, 0.0, 0.0]
-        vol_neg = -tri_tetrahedron_volumes[tri_idx]
-        for j in range(3):
-            i[j] = vol_neg * (
-                0.1 * (a[j] * a[j] + b[j] * b[j] + c[j] * c[j]) +
-                0.05 * (a[j] * b[j] + a[j] * b[j] + a[j] * c[j] + a[j] * c[j] + b[j] * c[j] + b[j] * c[j])
-            )
-
-        i00 = -i[0]
-        i11 = -i[1]
-        i22 = -i[2]
-
-        ixx += i11 + i22
-        iyy += i22 + i00
-        izz += i00 + i11
-
-    ixx /= volume
-    iyy /= volume
-    izz /= volume
+    # Based on https://github.com/bulletphysics/bullet3/blob/e9c461b0ace140d5c73972760781d94b7b5eee53/src/BulletCollision/CollisionShapes/btConvexTriangleMeshShape.cpp#L236
+    a = v0 - cg
+    b = v1 - cg
+    c = v2 - cg
 
-    inertia = Vector((ixx, iyy, izz))
-    return MassProperties(volume, cg, inertia)
+    # Diagonal of the inertia tensor of each tetrahedron (cg, v0, v1, v2) around the cg, before swapping axes
+    i = 0.1 * (a * a + b * b + c * c) + 0.1 * (a * b + a * c + b * c)
+    i = (i * tri_tetrahedron_volumes[:, np.newaxis]).sum(axis=0)
+
+    ixx = (i[1] + i[2]) / volume
+    iyy = (i[2] + i[0]) / volume
+    izz = (i[0] + i[1]) / volume
+
+    return volume, tuple(cg), (ixx, iyy, izz)
 
 
 def is_mesh_solid(mesh_vertices, mesh_faces) -> bool:
     """Gets whether the mesh is a closed oriented manifold."""
+    mesh_faces = np.asarray(mesh_faces, dtype=np.int64)
+    if len(mesh_faces) == 0:
+        return True
 
-    # TODO: this can be optimized, we're doing a lot of unnecesary work for easier debugging
-
-    def _get_edge_to_neighbour_faces_map():
-        """Returns an array indexed by edge indices, with a list of faces connected to each edge."""
-        from collections import defaultdict
-        edge_to_neighbour_faces = defaultdict(list)
-        for face_index, (v0, v1, v2) in enumerate(mesh_faces):
-            e0 = (v0, v1)
-            e1 = (v1, v2)
-            e2 = (v2, v0)
-            for edge in (e0, e1, e2):
-                edge_reversed = (edge[1], edge[0])
-                if edge_reversed in edge_to_neighbour_faces:
-                    edge_to_neighbour_faces[edge_reversed].append(face_index)
-                else:
-                    edge_to_neighbour_faces[edge].append(face_index)
-
-        return edge_to_neighbour_faces
-
-    def _classify_edges_by_manifold():
-        edge_to_neighbour_faces = _get_edge_to_neighbour_faces_map()
-
-        # Boundary edges: Edges that are connected to only one face.
-        # Manifold edges: Edges that are connected to exactly two faces.
-        # Non-manifold edges: Edges that are connected to more than two faces, or no faces at all.
-        boundary_edges = []
-        manifold_edges = []
-        non_manifold_edges = []
-        for edge, neighbour_faces in edge_to_neighbour_faces.items():
-            num_faces = len(neighbour_faces)
-            if num_faces == 1:
-                boundary_edges.append(edge)
-            elif num_faces == 2:
-                manifold_edges.append(edge)
-            else:
-                non_manifold_edges.append(edge)
-
-        return boundary_edges, manifold_edges, non_manifold_edges
-
-    boundary_edges, manifold_edges, non_manifold_edges = _classify_edges_by_manifold()
-    return len(boundary_edges) == 0 and len(non_manifold_edges) == 0
+    # Every edge must be connected to exactly two faces. Boundary edges are connected to only one face, and
+    # non-manifold edges to more than two faces
+    edge_starts = mesh_faces.ravel()
+    edge_ends = mesh_faces[:, [1, 2, 0]].ravel()
+    edge_keys = np.minimum(edge_starts, edge_ends) * (mesh_faces.max() + 1) + np.maximum(edge_starts, edge_ends)
+    _, num_edge_faces = np.unique(edge_keys, return_counts=True)
+    return bool(np.all(num_edge_faces == 2))
 
 
 def transform_inertia(inertia: Vector, mass: float, translation: Vector) -> Vector:
@@ -321,10 +377,11 @@ def shrink_mesh(mesh_vertices, mesh_faces):
     margin = min(margin, *half_size)
 
     neighbors = _compute_neighbors(mesh_vertices, mesh_faces)
+    shrink_directions = _compute_shrink_directions(mesh_vertices, mesh_faces, neighbors)
 
     shrunk_vertices = None
     while margin > 0.000001:
-        shrunk_vertices = _try_shrink_mesh(mesh_vertices, mesh_faces, neighbors, margin)
+        shrunk_vertices = _try_shrink_mesh(mesh_vertices, mesh_faces, shrink_directions, margin)
         if shrunk_vertices is not None:
             break
 
@@ -335,214 +392,361 @@ def shrink_mesh(mesh_vertices, mesh_faces):
     return shrunk_vertices, margin
 
 
-def _try_shrink_mesh(mesh_vertices, mesh_faces, neighbors, margin: float):
-    shrunk_vertices = _shrink_polys(mesh_vertices, mesh_faces, neighbors, margin)
-
-    num_polys = len(mesh_faces)
-    num_verts = len(mesh_vertices)
-
-    # Make sure that no polygons collide with each other
-    for vert_idx in range(num_verts):
-        vertex = mesh_vertices[vert_idx]
-        shrunk_vertex = shrunk_vertices[vert_idx]
-
-        segment_pos = Vector(shrunk_vertex)
-        segment_dir = Vector(vertex - shrunk_vertex)
-        segment_length = segment_dir.length
-        segment_dir /= segment_length
-
-        max_distance = segment_length
-
-        def _intersect_test(v1, v2, v3):
-            from mathutils import geometry
-            intersect_pos = geometry.intersect_ray_tri(v1, v2, v3, segment_dir, segment_pos)
-            if intersect_pos is None:
-                return False
+def _try_shrink_mesh(mesh_vertices, mesh_faces, shrink_directions, margin: float):
+    shrunk_vertices = _shrink_polys(mesh_vertices, shrink_directions, margin)
+
+    vertices = np.asarray(mesh_vertices, dtype=np.float64)
+    shrunk = shrunk_vertices.astype(np.float64)
+    faces = np.asarray(mesh_faces, dtype=np.int64)
+
+    # Make sure that no polygons collide with each other. The segment between each shrunk vertex and its original
+    # position cannot cross any of the original or shrunk polygons
+    segment_dirs = vertices - shrunk
+    segment_lengths = np.linalg.norm(segment_dirs, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        segment_dirs /= segment_lengths[:, np.newaxis]
+
+    tris = vertices[faces]
+    shrunk_tris = shrunk[faces]
+    pairs = iter_overlapping_aabb_pairs(
+        np.minimum(vertices, shrunk),
+        np.maximum(vertices, shrunk),
+        np.minimum(tris.min(axis=1), shrunk_tris.min(axis=1)),
+        np.maximum(tris.max(axis=1), shrunk_tris.max(axis=1)),
+    )
+    for vert_inds, poly_inds in pairs:
+        # Intersection test is done against other polygons, so we must exclude polygons that share current vertex
+        other = ~(faces[poly_inds] == vert_inds[:, np.newaxis]).any(axis=1)
+        vert_inds = vert_inds[other]
+        poly_inds = poly_inds[other]
+
+        segment_pos = shrunk[vert_inds]
+        segment_dir = segment_dirs[vert_inds]
+        segment_length = segment_lengths[vert_inds]
+        if _segments_intersect_tris(segment_pos, segment_dir, segment_length, tris[poly_inds]).any():
+            return None
+
+        if _segments_intersect_tris(segment_pos, segment_dir, segment_length, shrunk_tris[poly_inds]).any():
+            return None
 
-            distance = (intersect_pos - segment_pos).length
-            return distance <= max_distance
-
-        for poly_idx in range(num_polys):
-            poly_verts = mesh_faces[poly_idx]
-
-            # Intersection test is done against other polygons, so we must exclude polygons that share current vertex
-            if (poly_verts == vert_idx).any():
-                continue
-
-            v1, v2, v3 = [Vector(mesh_vertices[vi]) for vi in poly_verts]
-            if _intersect_test(v1, v2, v3):
-                return None
+    return shrunk_vertices
 
-            vs1, vs2, vs3 = [Vector(shrunk_vertices[vi]) for vi in poly_verts]
-            if _intersect_test(vs1, vs2, vs3):
-                return None
 
-    return shrunk_vertices
+def _shrink_polys(mesh_vertices, shrink_directions, margin):
+    return (mesh_vertices - shrink_directions * margin).astype(mesh_vertices.dtype)
 
 
-def _shrink_polys(mesh_vertices, mesh_faces, neighbors, margin):
-    # TODO: copied from rageAm's C++ code, very unoptimized Python code, vectorize with Numpy somehow
-    from mathutils import geometry
-
-    output_vertices = np.empty_like(mesh_vertices)
-    processed_verts = set()
-    num_polys = len(mesh_faces)
-    poly_normals = [geometry.normal([mesh_vertices[vi] for vi in poly_verts]) for poly_verts in mesh_faces]
-    neighbor_normals = []
-    for poly_idx in range(num_polys):
-        poly_verts = mesh_faces[poly_idx]
-        normal = poly_normals[poly_idx]
-        for poly_vert_idx, vert_idx in enumerate(poly_verts):
-            if vert_idx in processed_verts:
-                continue
-            processed_verts.add(vert_idx)
-
-            vertex = mesh_vertices[vert_idx]
-
-            neighbor_normals.clear()
-
-            # Compute average normal from all surrounding polygons (that share at least one vertex)
-            # and all them in normal list for further weighted normal computation
-            average_normal = Vector(normal)
-            prev_neighbor_poly_idx = poly_idx
-
-            # Find starting neighbor index
-            neighbor_poly_idx = neighbors[poly_idx][(poly_vert_idx + 2) % 3]
-            if neighbor_poly_idx == NO_NEIGHBOR:
-                neighbor_poly_idx = neighbors[poly_idx][poly_vert_idx]
-
-            # Search for neighbors and accumulate normal...
-            while neighbor_poly_idx != NO_NEIGHBOR:
-                neighbor_normal = poly_normals[neighbor_poly_idx]
-                average_normal += neighbor_normal
-                neighbor_normals.append(neighbor_normal)
-
-                # Lookup for new neighbor
-                new_neighbor_poly_idx = NO_NEIGHBOR
-                for j in range(3):
-                    next_idx = (j + 1) % 3
-                    if mesh_faces[neighbor_poly_idx][next_idx] == vert_idx:
-                        new_neighbor_poly_idx = neighbors[neighbor_poly_idx][j]
-                        if new_neighbor_poly_idx == prev_neighbor_poly_idx:
-                            new_neighbor_poly_idx = neighbors[neighbor_poly_idx][next_idx]
-                        prev_neighbor_poly_idx = neighbor_poly_idx
-                        neighbor_poly_idx = new_neighbor_poly_idx
-                        break
-                else:
-                    break
-
-                # Check if we've closed circle and iterated through all neighbors
-                if new_neighbor_poly_idx == poly_idx:
-                    break
-
-            # After adding bunch of normals together we have to re-normalize it
-            average_normal.normalize()
-
-            if len(neighbor_normals) == 0:
-                output_vertices[vert_idx] = vertex - normal * margin
-            elif len(neighbor_normals) == 1:
-                cross = normal.cross(neighbor_normals[0])
-                cross_mag2 = cross.length_squared
-
-                # Very small angle between two normals, just shrink using base normal
-                if cross_mag2 < 0.1:
-                    output_vertices[vert_idx] = vertex - normal * margin
-                    continue
-
-                # Insert new normal in weighted set
-                neighbor_normals.append(cross.normalized())
-
-            if len(neighbor_normals) < 2:
-                continue
-
-            # Default shrink by average normal
-            shrunk = vertex - average_normal * margin
-
-            # Traverse all normal & compute weighted normals
-            normals = [normal]
-            normals.extend(neighbor_normals)
-            for i in range(len(neighbor_normals) - 1):
-                for j in range(len(neighbor_normals) - i - 1):
-                    for k in range(len(neighbor_normals) - j - i - 1):
-                        normal1 = normals[i]
-                        normal2 = normals[i + j + 1]
-                        normal3 = normals[i + j + k + 2]
-
-                        cross23 = normal2.cross(normal3)
-                        dot = normal1.dot(cross23)
-
-                        # Check out neighbors whose normals direction is too similar (small angle between neighbor normals & polygon normal)
-                        if abs(dot) > 0.25:
-                            # More neighbors normals are aligned with polygon normal, less weight will be applied
-                            # Normals with higher angle (closer to 0.25) will contribute more to weighted normal
-
-                            # Compute new weighted normal
-                            cross31 = normal3.cross(normal1)
-                            cross12 = normal1.cross(normal2)
-                            new_normal = (cross23 + cross31 + cross12) / dot
-                            new_shrunk = vertex - new_normal * margin
-
-                            # Pick shrunk vertex that's more distant from original vertex
-                            if Vector(new_shrunk - vertex).length_squared > Vector(shrunk - vertex).length_squared:
-                                shrunk = new_shrunk
-
-            # Insert final shrunk vertex in out buffer
-            output_vertices[vert_idx] = shrunk
-
-    return output_vertices
+def _compute_shrink_directions(mesh_vertices, mesh_faces, neighbors) -> NDArray[np.float64]:
+    """Compute the direction each vertex is moved in when shrinking the mesh, such that
+    ``shrunk_vertex = vertex - direction * margin``. The length of the direction is 1 or more, depending on how sharp the
+    surface is around the vertex.
+    """
+    # Port of rageAm's C++ code. The polygon fans around all vertices are walked at the same time, one neighbor polygon
+    # per step
+    vertices = np.asarray(mesh_vertices, dtype=np.float64)
+    faces = np.asarray(mesh_faces, dtype=np.int64)
+
+    tris = vertices[faces]
+    poly_normals = np.cross(tris[:, 0] - tris[:, 1], tris[:, 1] - tris[:, 2])
+    _normalize_rows(poly_normals)
+
+    # Walk starts at the first polygon that uses the vertex
+    corner_verts = faces.ravel()
+    fan_verts, first_corners = np.unique(corner_verts, return_index=True)
+    start_polys = first_corners // 3
+    start_slots = first_corners % 3
+    num_fans = len(fan_verts)
+
+    # Bail out if the walk does not reach the start polygon or a border, only happens with degenerate topology
+    max_steps = np.bincount(corner_verts)[fan_verts] * 2
+
+    # Find starting neighbor index
+    neighbor_polys = neighbors[start_polys, (start_slots + 2) % 3]
+    no_neighbor = neighbor_polys == NO_NEIGHBOR
+    neighbor_polys[no_neighbor] = neighbors[start_polys[no_neighbor], start_slots[no_neighbor]]
+    prev_neighbor_polys = start_polys.copy()
+
+    # Search for neighbors...
+    steps = []
+    active = np.flatnonzero(neighbor_polys != NO_NEIGHBOR)
+    while len(active) > 0:
+        polys = neighbor_polys[active]
+        steps.append((active, polys))
+
+        # Lookup for new neighbor, through the edge that ends at the vertex or, if we just came from there, through the
+        # edge that starts at the vertex
+        is_next_vert = faces[polys][:, [1, 2, 0]] == fan_verts[active, np.newaxis]
+        found = is_next_vert.any(axis=1)
+        j = is_next_vert.argmax(axis=1)
+        new_neighbor_polys = neighbors[polys, j]
+        came_from = new_neighbor_polys == prev_neighbor_polys[active]
+        new_neighbor_polys[came_from] = neighbors[polys[came_from], (j[came_from] + 1) % 3]
+
+        prev_neighbor_polys[active] = polys
+        neighbor_polys[active] = new_neighbor_polys
+
+        # Check if we've closed circle and iterated through all neighbors
+        keep = (
+            found &
+            (new_neighbor_polys != NO_NEIGHBOR) &
+            (new_neighbor_polys != start_polys[active]) &
+            (len(steps) < max_steps[active])
+        )
+        active = active[keep]
+
+    # Neighbor polygons of each fan, in the order they were found
+    fan_polys = np.full((num_fans, max(len(steps), 1)), NO_NEIGHBOR, dtype=np.int64)
+    for step_idx, (fan_inds, polys) in enumerate(steps):
+        fan_polys[fan_inds, step_idx] = polys
+    num_neighbors = (fan_polys != NO_NEIGHBOR).sum(axis=1)
+
+    normals = poly_normals[start_polys]
+    directions = np.zeros_like(vertices)
+    directions[fan_verts] = normals
+
+    # With a single neighbor, insert the normal of the edge between both polygons in the weighted set. Very small angle
+    # between two normals, just shrink using base normal
+    fans = np.flatnonzero(num_neighbors == 1)
+    neighbor_normals = poly_normals[fan_polys[fans, 0]]
+    cross = np.cross(normals[fans], neighbor_normals)
+    sharp = np.einsum("ij,ij->i", cross, cross) >= 0.1
+    fans = fans[sharp]
+    if len(fans) > 0:
+        _normalize_rows(cross)
+        fan_normals = np.stack((normals[fans], neighbor_normals[sharp], cross[sharp]), axis=1)
+        average_normals = fan_normals[:, 0] + fan_normals[:, 1]
+        _normalize_rows(average_normals)
+        directions[fan_verts[fans]] = _compute_weighted_shrink_directions(fan_normals, average_normals)
+
+    for n in np.unique(num_neighbors[num_neighbors >= 2]):
+        fans = np.flatnonzero(num_neighbors == n)
+        fan_normals = np.concatenate((normals[fans, np.newaxis], poly_normals[fan_polys[fans, :n]]), axis=1)
+        average_normals = fan_normals.sum(axis=1)
+        _normalize_rows(average_normals)
+        directions[fan_verts[fans]] = _compute_weighted_shrink_directions(fan_normals, average_normals)
+
+    return directions
+
+
+def _compute_weighted_shrink_directions(normals: NDArray, average_normals: NDArray) -> NDArray:
+    """Pick the shrink direction of each vertex from the normals of its surrounding polygons, given as a (N, M, 3)
+    array. Defaults to the average normal unless a weighted normal of any three polygons moves the vertex further.
+    """
+    num_normals = normals.shape[1]
+    directions = average_normals.copy()
+    directions_lengths2 = np.einsum("ij,ij->i", directions, directions)
+
+    # Limit the memory used by vertices with lots of neighbors
+    max_num_pairs = (num_normals - 1) * (num_normals - 2) // 2
+    chunk_size = max(1, (1 << 18) // max_num_pairs)
+    for chunk_start in range(0, len(normals), chunk_size):
+        chunk = slice(chunk_start, chunk_start + chunk_size)
+        chunk_normals = normals[chunk]
+        chunk_directions = directions[chunk]
+        chunk_lengths2 = directions_lengths2[chunk]
+        rows = np.arange(len(chunk_normals))
+
+        # Traverse all normal triplets (i, j, k) with i < j < k, in the same order as rageAm so the first one wins on ties
+        for i in range(num_normals - 2):
+            j, k = np.triu_indices(num_normals - i - 1, 1)
+            normal1 = chunk_normals[:, i, np.newaxis]
+            normal2 = chunk_normals[:, j + i + 1]
+            normal3 = chunk_normals[:, k + i + 1]
+
+            cross23 = np.cross(normal2, normal3)
+            dot = np.einsum("ik,ijk->ij", normal1[:, 0], cross23)
+
+            # Check out neighbors whose normals direction is too similar (small angle between neighbor normals & polygon
+            # normal). Normals with higher angle will contribute more to weighted normal
+            valid = np.abs(dot) > 0.25
+            with np.errstate(divide="ignore", invalid="ignore"):
+                # Same as (cross23 + cross31 + cross12) / dot
+                new_normals = np.cross(normal2 - normal1, normal3 - normal1) / dot[..., np.newaxis]
+            lengths2 = np.where(valid, np.einsum("ijk,ijk->ij", new_normals, new_normals), -np.inf)
+
+            # Pick normal that moves the vertex further from the original vertex
+            best = lengths2.argmax(axis=1)
+            best_lengths2 = lengths2[rows, best]
+            further = best_lengths2 > chunk_lengths2
+            chunk_directions[further] = new_normals[rows[further], best[further]]
+            chunk_lengths2[further] = best_lengths2[further]
+
+    return directions
 
 
 def _compute_neighbors(mesh_vertices, mesh_faces):
+    """Find the neighbor polygon across each edge. Edge ``i`` of a polygon goes from its vertex ``i`` to its vertex
+    ``i + 1``. If multiple polygons share an edge, neighbors are picked the same way as rageAm.
+    """
+    faces = np.asarray(mesh_faces, dtype=np.int64)
+    num_verts = len(mesh_vertices)
+    num_polys = len(faces)
+
     # Each triangle has up to 3 neighbors, so same shape as the mesh_faces array
-    neighbors = np.full_like(mesh_faces, NO_NEIGHBOR, dtype=int)
+    neighbors = np.full((num_polys, 3), NO_NEIGHBOR, dtype=np.int64)
+    if num_polys == 0:
+        return neighbors
+
+    edge_starts = faces.ravel()
+    edge_ends = faces[:, [1, 2, 0]].ravel()
+    edge_polys = np.repeat(np.arange(num_polys), 3)
+
+    # Neighbors share the edge in the opposite direction. Sort edges by (edge, polygon) to find, for each edge, the
+    # first polygon after its own one with the opposite edge
+    edge_keys, edge_ids = np.unique(edge_starts * num_verts + edge_ends, return_inverse=True)
+    edge_ids = edge_ids.ravel()
+    sorted_edges = np.argsort(edge_ids * num_polys + edge_polys, kind="stable")
+    sorted_keys = (edge_ids * num_polys + edge_polys)[sorted_edges]
+
+    opposite_keys = edge_ends * num_verts + edge_starts
+    opposite_ids = np.minimum(np.searchsorted(edge_keys, opposite_keys), len(edge_keys) - 1)
+    has_opposite = edge_keys[opposite_ids] == opposite_keys
+
+    found = np.searchsorted(sorted_keys, opposite_ids * num_polys + edge_polys, side="right")
+    has_opposite &= found < len(sorted_keys)
+    found = np.minimum(found, len(sorted_keys) - 1)
+    has_opposite &= sorted_keys[found] // num_polys == opposite_ids
+    lhs_edges = np.flatnonzero(has_opposite)
+    rhs_edges = sorted_edges[found[lhs_edges]]
+
+    # A polygon that does not find a neighbor after itself keeps the last polygon before itself that found it
+    first_found = np.full(num_polys * 3, NO_NEIGHBOR, dtype=np.int64)
+    first_found[lhs_edges] = edge_polys[rhs_edges]
+    last_found_by = np.full(num_polys * 3, NO_NEIGHBOR, dtype=np.int64)
+    np.maximum.at(last_found_by, rhs_edges, edge_polys[lhs_edges])
+
+    neighbors[:] = np.where(first_found != NO_NEIGHBOR, first_found, last_found_by).reshape((num_polys, 3))
+    return neighbors
 
-    num_polys = len(mesh_faces)
 
-    vertex_to_polys = [[] for _ in range(len(mesh_vertices))]
-    for i, poly_verts in enumerate(mesh_faces):
-        for vi in poly_verts:
-            vertex_to_polys[vi].append(i)
+def _normalize_rows(vectors: NDArray):
+    """Normalize each row of ``vectors`` in place. Zero vectors are left as is."""
+    lengths = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    np.divide(vectors, lengths, out=vectors, where=lengths != 0)
 
-    def _get_next_l(idx):
-        return (idx + 1) % 3
 
-    def _get_next_r(idx):
-        return 2 if idx == 0 else idx - 1
+def _segments_intersect_tris(
+    origins: NDArray, directions: NDArray, lengths: NDArray, tris: NDArray
+) -> NDArray[np.bool_]:
+    """Test each segment, starting at ``origins`` and going ``lengths`` units along the normalized ``directions``,
+    against the triangle of the same index in ``tris``. Same as ``mathutils.geometry.intersect_ray_tri`` but limited to
+    the segment length.
+    """
+    edge1 = tris[:, 1] - tris[:, 0]
+    edge2 = tris[:, 2] - tris[:, 0]
+    pvec = np.cross(directions, edge2)
+    det = np.einsum("ij,ij->i", edge1, pvec)
 
-    for lhs_poly_idx in range(num_polys):
-        lhs_poly_verts = mesh_faces[lhs_poly_idx]
-        for lhs_poly_vert_idx, lhs_vert_idx in enumerate(lhs_poly_verts):
-            lhs_vert_idx_next = lhs_poly_verts[_get_next_l(lhs_poly_vert_idx)]
+    # If determinant is near zero, ray lies in plane of triangle
+    hit = np.abs(det) >= 0.000001
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv_det = 1.0 / det
+        tvec = origins - tris[:, 0]
+        u = np.einsum("ij,ij->i", tvec, pvec) * inv_det
+        qvec = np.cross(tvec, edge1)
+        v = np.einsum("ij,ij->i", directions, qvec) * inv_det
+        t = np.einsum("ij,ij->i", edge2, qvec) * inv_det
 
-            adjacent_polys = vertex_to_polys[lhs_vert_idx]
-            for rhs_poly_idx in adjacent_polys:
-                if lhs_poly_idx == rhs_poly_idx:
-                    continue
+    hit &= (u >= 0.0) & (u <= 1.0) & (v >= 0.0) & (u + v <= 1.0) & (t >= 0.0) & (t <= lengths)
+    return hit
 
-                if rhs_poly_idx <= lhs_poly_idx:
-                    continue
 
-                found = False
-                rhs_poly_verts = mesh_faces[rhs_poly_idx]
-                for rhs_poly_vert_idx, rhs_vert_idx in enumerate(rhs_poly_verts):
-                    if lhs_vert_idx != rhs_vert_idx:
-                        continue
+_GRID_MAX_DIMS = 1 << 20
+_GRID_PAIRS_CHUNK_SIZE = 1 << 18
 
-                    rhs_poly_vert_idx_next = _get_next_r(rhs_poly_vert_idx)
-                    rhs_vert_idx_next = rhs_poly_verts[rhs_poly_vert_idx_next]
 
-                    if lhs_vert_idx_next != rhs_vert_idx_next:
-                        continue
+def iter_overlapping_aabb_pairs(a_min: NDArray, a_max: NDArray, b_min: NDArray, b_max: NDArray):
+    """Find the pairs of overlapping boxes between two sets of axis-aligned bounding boxes, using uniform grids. Yields
+    chunks of pairs as two arrays with the indices into the ``a`` and ``b`` boxes, each overlapping pair is yielded once.
+    """
+    if len(a_min) == 0 or len(b_min) == 0:
+        return
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        grid_min = np.fmin(np.nanmin(a_min, axis=0), np.nanmin(b_min, axis=0))
+        grid_max = np.fmax(np.nanmax(a_max, axis=0), np.nanmax(b_max, axis=0))
+    if not np.all(np.isfinite(grid_max - grid_min)):
+        return
+
+    # Boxes are grouped by size. Each combination of `a` and `b` size groups uses a grid with cells at least as large as
+    # its boxes. `a` boxes are placed only in the cell of their min corner, and `b` boxes in every cell that the min
+    # corner of an overlapping `a` box can be in
+    a_extents = np.nan_to_num((a_max - a_min).max(axis=1))
+    b_extents = np.nan_to_num((b_max - b_min).max(axis=1))
+    base_cell_size = max(np.median(a_extents), np.median(b_extents), 1e-6)
+    a_size_groups = np.ceil(np.log2(np.maximum(a_extents / base_cell_size, 1.0)))
+    b_size_groups = np.ceil(np.log2(np.maximum(b_extents / base_cell_size, 1.0)))
+    for a_size_group in np.unique(a_size_groups):
+        a_group = np.flatnonzero(a_size_groups == a_size_group)
+        for b_size_group in np.unique(b_size_groups):
+            b_group = np.flatnonzero(b_size_groups == b_size_group)
+            cell_size = base_cell_size * (2.0 ** max(a_size_group, b_size_group))
+            dims = np.minimum((grid_max - grid_min) // cell_size + 1, _GRID_MAX_DIMS).astype(np.int64)
+
+            a_lo, _ = _grid_cell_ranges(a_min[a_group], a_max[a_group], grid_min, cell_size, dims)
+            b_lo, b_hi = _grid_cell_ranges(b_min[b_group] - cell_size, b_max[b_group], grid_min, cell_size, dims)
+            b_inds, b_cells = _grid_cells(b_lo, b_hi, dims)
+            for a_inds, b_inds in _iter_grid_cell_pairs(_grid_linear_cells(a_lo, dims), b_group[b_inds], b_cells):
+                pair_a = a_group[a_inds]
+                pair_b = b_inds
+                overlap = np.all((a_min[pair_a] <= b_max[pair_b]) & (b_min[pair_b] <= a_max[pair_a]), axis=1)
+                yield pair_a[overlap], pair_b[overlap]
+
+
+def _iter_grid_cell_pairs(a_cells: NDArray, b_inds: NDArray, b_cells: NDArray):
+    """Pair each `a` cell entry with the `b` boxes in the same cell. Yields chunks of pairs as two arrays with the
+    indices into ``a_cells`` and the ``b`` boxes.
+    """
+    b_order = np.argsort(b_cells, kind="stable")
+    b_inds = b_inds[b_order]
+    b_cells = b_cells[b_order]
+
+    cell_starts = np.searchsorted(b_cells, a_cells, side="left")
+    cell_counts = np.searchsorted(b_cells, a_cells, side="right") - cell_starts
+
+    # Process the pairs in chunks to limit memory usage
+    num_pairs = np.cumsum(cell_counts)
+    chunk_bounds = np.searchsorted(num_pairs, np.arange(0, num_pairs[-1], _GRID_PAIRS_CHUNK_SIZE), side="right")
+    chunk_bounds = np.append(chunk_bounds, len(a_cells))
+    for start, end in zip(chunk_bounds[:-1], chunk_bounds[1:]):
+        counts = cell_counts[start:end]
+        total = counts.sum()
+        if total == 0:
+            continue
+
+        entries = np.repeat(np.arange(start, end), counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        yield entries, b_inds[cell_starts[entries] + offsets]
+
+
+def _grid_cell_ranges(box_min: NDArray, box_max: NDArray, grid_min: NDArray, cell_size: float, dims: NDArray):
+    with np.errstate(invalid="ignore"):
+        lo = np.clip(np.nan_to_num((box_min - grid_min) // cell_size), 0, dims - 1).astype(np.int64)
+        hi = np.clip(np.nan_to_num((box_max - grid_min) // cell_size), 0, dims - 1).astype(np.int64)
+    return lo, hi
+
+
+def _grid_cells(lo: NDArray, hi: NDArray, dims: NDArray):
+    """Get every grid cell covered by the cell ranges. Returns the box index and linear cell index of each covered
+    cell.
+    """
+    sizes = hi - lo + 1
+    counts = np.prod(sizes, axis=1)
+    inds = np.repeat(np.arange(len(lo)), counts)
+    local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
 
-                    neighbors[lhs_poly_idx][lhs_poly_vert_idx] = rhs_poly_idx
-                    neighbors[rhs_poly_idx][rhs_poly_vert_idx_next] = lhs_poly_idx
-                    found = True
-                    break
+    coords = np.empty((len(inds), 3), dtype=np.int64)
+    coords[:, 0] = lo[inds, 0] + local % sizes[inds, 0]
+    local //= sizes[inds, 0]
+    coords[:, 1] = lo[inds, 1] + local % sizes[inds, 1]
+    coords[:, 2] = lo[inds, 2] + local // sizes[inds, 1]
 
-                if found:
-                    break
+    return inds, _grid_linear_cells(coords, dims)
 
-    return neighbors
+
+def _grid_linear_cells(coords: NDArray, dims: NDArray) -> NDArray:
+    return (coords[:, 2] * dims[1] + coords[:, 1]) * dims[0] + coords[:, 0]
 
 
 def grow_sphere(center: Vector, radius: float, point: Vector, point_radius: float) -> float:
@@ -592,24 +796,3 @@ def tris_normals(tris_array: NDArray) -> NDArray:
     np.divide(normals, lengths, out=normals, where=lengths != 0)
 
     return normals
-
-
-def distance_signed_point_to_planes(point_3d: Sequence[float], planes_co: NDArray, planes_normals: NDArray) -> NDArray[np.float32]:
-    """Calculate the signed distances of a point to each plane represented by the `planes_co` and `planes_normals` arrays."""
-    point_3d = np.array(point_3d)
-
-    assert point_3d.ndim == 1 and point_3d.shape[0] == 3, \
-        f"Expected shape (3) for 'point_3d', got: {point_3d.shape}"
-    assert planes_co.ndim == 2 and planes_co.shape[1] == 3, \
-        f"Expected shape (N, 3) for 'planes_co', got: {planes_co.shape}"
-    assert planes_normals.ndim == 2 and planes_normals.shape[1] == 3, \
-        f"Expected shape (N, 3) for 'planes_normals', got: {planes_normals.shape}"
-    assert len(planes_co) == len(planes_normals), \
-        f"Expected same number of plane coordinates and normals, got: {len(planes_co)} and {len(planes_normals)}"
-
-    D = -np.sum(planes_normals * planes_co, axis=1)
-
-    # Assumes plane normals are already normalized
-    distances = np.sum(planes_normals * point_3d, axis=1) + D
-
-    return distances
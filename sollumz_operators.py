@@ -34,6 +34,7 @@ from .ytyp.ytypimport import import_ytyp
 from .tools.blenderhelper import add_child_of_bone_constraint, get_child_of_pose_bone, remove_number_suffix, create_blender_object, join_objects
 from .tools.ytyphelper import ytyp_from_objects
 from .ybn.properties import BoundFlags
+from .sollumz_validation import validate_export_objects
 
 from . import logger
 
@@ -198,11 +199,17 @@ class SOLLUMZ_OT_export_assets(bpy.types.Operator, TimedOperator):
         options={"HIDDEN", "SKIP_SAVE"}
     )
 
+    validate_only: bpy.props.BoolProperty(
+        name="Validate Only",
+        description="Check the objects for problems that would be found during export, without exporting them",
+        options={"HIDDEN", "SKIP_SAVE"}
+    )
+
     def draw(self, context):
         pass
 
     def invoke(self, context, event):
-        if self.direct_export:
+        if self.direct_export or self.validate_only:
             return self.execute(context)
         else:
             context.window_manager.fileselect_add(self)
@@ -210,12 +217,9 @@ class SOLLUMZ_OT_export_assets(bpy.types.Operator, TimedOperator):
 
     def execute_timed(self, context: bpy.types.Context):
         with logger.use_operator_logger(self) as op_log:
-            logger.info("Starting export...")
-            objs = self.collect_objects(context)
+            objs = collect_export_objects(context)
             export_settings = get_export_settings()
 
-            self.directory = bpy.path.abspath(self.directory)
-
             if not objs:
                 if export_settings.limit_to_selected:
                     logger.info("No Sollumz objects selected for export!")
@@ -223,6 +227,12 @@ class SOLLUMZ_OT_export_assets(bpy.types.Operator, TimedOperator):
                     logger.info("No Sollumz objects in the scene to export!")
                 return {"CANCELLED"}
 
+            if self.validate_only:
+                return validate_and_report(objs)
+
+            logger.info("Starting export...")
+            self.directory = bpy.path.abspath(self.directory)
+
             any_warnings_or_errors = False
             for obj in objs:
                 op_log.clear_log_counts()
@@ -277,34 +287,69 @@ class SOLLUMZ_OT_export_assets(bpy.types.Operator, TimedOperator):
                 bpy.ops.screen.info_log_show()
             return {"FINISHED"}
 
-    def collect_objects(self, context: bpy.types.Context) -> list[bpy.types.Object]:
-        export_settings = get_export_settings()
+    def get_filepath(self, obj: bpy.types.Object, extension: str):
+        name = remove_number_suffix(obj.name.lower())
+
+        return os.path.join(self.directory, name + extension)
+
+
+class SOLLUMZ_OT_validate_assets(bpy.types.Operator, TimedOperator):
+    """Check the objects that would be exported for problems, such as vertex limits, without exporting them"""
+    bl_idname = "sollumz.validate_assets"
+    bl_label = "Validate Export"
 
-        objs = context.scene.objects
+    def execute_timed(self, context: bpy.types.Context):
+        with logger.use_operator_logger(self):
+            objs = collect_export_objects(context)
+            if not objs:
+                logger.info("No Sollumz objects to validate!")
+                return {"CANCELLED"}
 
-        if export_settings.limit_to_selected:
-            objs = context.selected_objects
+            return validate_and_report(objs)
 
-        return self.get_only_parent_objs(objs)
 
-    def get_only_parent_objs(self, objs: list[bpy.types.Object]):
-        parent_objs = set()
-        objs = set(objs)
+def collect_export_objects(context: bpy.types.Context) -> list[bpy.types.Object]:
+    """Get the top-level Sollumz objects that would be exported with the current export settings."""
+    export_settings = get_export_settings()
 
-        for obj in objs:
-            parent_obj = find_sollumz_parent(obj)
+    objs = context.scene.objects
 
-            if parent_obj is None or parent_obj in parent_objs:
-                continue
+    if export_settings.limit_to_selected:
+        objs = context.selected_objects
 
-            parent_objs.add(parent_obj)
+    return get_only_parent_objs(objs)
 
-        return list(parent_objs)
 
-    def get_filepath(self, obj: bpy.types.Object, extension: str):
-        name = remove_number_suffix(obj.name.lower())
+def get_only_parent_objs(objs: list[bpy.types.Object]):
+    parent_objs = set()
+    objs = set(objs)
 
-        return os.path.join(self.directory, name + extension)
+    for obj in objs:
+        parent_obj = find_sollumz_parent(obj)
+
+        if parent_obj is None or parent_obj in parent_objs:
+            continue
+
+        parent_objs.add(parent_obj)
+
+    return list(parent_objs)
+
+
+def validate_and_report(objs: list[bpy.types.Object]) -> set[str]:
+    """Validate ``objs`` and log a summary line for each of them. Must be called with an operator logger in use."""
+    start = time.time()
+    report = validate_export_objects(sorted(objs, key=lambda o: o.name))
+
+    for line in report.summary_lines():
+        logger.info(line)
+
+    logger.info(
+        f"Validated {len(report.asset_names)} asset(s) in {round(time.time() - start, 3)} seconds: "
+        f"{report.num_errors} error(s), {report.num_warnings} warning(s)."
+    )
+    if report.issues:
+        bpy.ops.screen.info_log_show()
+    return {"FINISHED"}
 
 
 class SOLLUMZ_OT_paint_vertices(SOLLUMZ_OT_base, bpy.types.Operator):
@@ -26,7 +26,7 @@ import textwrap
 from typing import Any
 from configparser import ConfigParser
 from typing import Optional
-from .sollumz_properties import SollumzGame, items_from_enums, set_import_export_current_game
+from .sollumz_properties import SollumzGame, LODLevel, items_from_enums, set_import_export_current_game
 
 PREFS_FILE_NAME = "sollumz_rdr_prefs.ini"
 
@@ -127,6 +127,65 @@ class SollumzExportSettings(PropertyGroup):
         update=_save_preferences_on_update
     )
 
+    ybn_spatial_sort_polys: BoolProperty(
+        name="Sort Polygons Spatially",
+        description=(
+            "Sort bound polygons along a Morton curve and number the vertices in the order they are used, so polygons "
+            "close in space are also close in the exported file. Polygons and vertices are exported in a different order"
+        ),
+        default=False,
+        update=_save_preferences_on_update
+    )
+
+    ycd_deduplicate_animations: BoolProperty(
+        name="Share Duplicated Animations",
+        description=(
+            "Export animations that bake the same action on the same target only once, and point all the clips that "
+            "use them to the same animation"
+        ),
+        default=True,
+        update=_save_preferences_on_update
+    )
+
+    ycd_error_bounded_compression: BoolProperty(
+        name="Error-Bounded Compression",
+        description=(
+            "Encode each animation channel with the smallest encoding that stays within the max errors below, instead "
+            "of storing the exact values. The bytes saved are reported per clip"
+        ),
+        default=False,
+        update=_save_preferences_on_update
+    )
+
+    ycd_max_translation_error: FloatProperty(
+        name="Max Translation Error",
+        description="Maximum distance between the exported and the original position tracks",
+        subtype="DISTANCE",
+        default=0.0005,
+        min=0.0,
+        precision=5,
+        update=_save_preferences_on_update
+    )
+
+    ycd_max_rotation_error: FloatProperty(
+        name="Max Rotation Error",
+        description="Maximum angle between the exported and the original rotation tracks",
+        subtype="ANGLE",
+        default=0.000873,  # 0.05 degrees
+        min=0.0,
+        precision=3,
+        update=_save_preferences_on_update
+    )
+
+    ycd_max_value_error: FloatProperty(
+        name="Max Value Error",
+        description="Maximum error of any other track (scale, UV, camera properties...)",
+        default=0.0005,
+        min=0.0,
+        precision=5,
+        update=_save_preferences_on_update
+    )
+
     @property
     def export_hi(self) -> bool:
         return "sollumz_export_very_high" in self.export_lods
@@ -158,6 +217,99 @@ class SollumzImportSettings(PropertyGroup):
         update=_save_preferences_on_update
     )
 
+    import_lods: EnumProperty(
+        name="LODs",
+        description="LOD levels to import. Geometry of the other LOD levels is skipped without being read",
+        options={"ENUM_FLAG"},
+        default={LODLevel.VERYHIGH, LODLevel.HIGH, LODLevel.MEDIUM, LODLevel.LOW, LODLevel.VERYLOW},
+        items=(
+            (LODLevel.VERYHIGH, "Very High", "Import the Very High LODs from the _hi.yft"),
+            (LODLevel.HIGH, "High", "Import the High LODs"),
+            (LODLevel.MEDIUM, "Medium", "Import the Medium LODs"),
+            (LODLevel.LOW, "Low", "Import the Low LODs"),
+            (LODLevel.VERYLOW, "Very Low", "Import the Very Low LODs"),
+        ),
+        update=_save_preferences_on_update
+    )
+
+    import_embedded_bounds: BoolProperty(
+        name="Embedded Collisions",
+        description="Import the collisions embedded in drawables and fragments",
+        default=True,
+        update=_save_preferences_on_update
+    )
+
+    import_lights: BoolProperty(
+        name="Lights",
+        description="Import the lights of drawables and fragments",
+        default=True,
+        update=_save_preferences_on_update
+    )
+
+    import_damaged: BoolProperty(
+        name="Damaged Drawable",
+        description="Import the damaged drawable of fragments",
+        default=True,
+        update=_save_preferences_on_update
+    )
+
+    import_cloth: BoolProperty(
+        name="Cloth",
+        description="Import the environment cloth of fragments and the character cloth (.yld) of drawable dictionaries",
+        default=True,
+        update=_save_preferences_on_update
+    )
+
+    ydd_share_datablocks: BoolProperty(
+        name="Share Materials and Armatures",
+        description=(
+            "Create identical materials and skeletons only once and share them between all drawables in the "
+            "dictionary. Disable to create a separate copy for each drawable"
+        ),
+        default=True,
+        update=_save_preferences_on_update
+    )
+
+    ybn_force_unique_materials: BoolProperty(
+        name="Force Unique Materials",
+        description=(
+            "Create a separate collision material for each bound and geometry material. By default, collision "
+            "materials with the same type, properties and flags share a single material"
+        ),
+        default=False,
+        update=_save_preferences_on_update
+    )
+
+    ybn_merge_primitive_polys: BoolProperty(
+        name="Merge Primitive Polygons",
+        description=(
+            "Import the boxes, spheres, capsules and cylinders of each BVH as a single object per type instead of an "
+            "object per polygon. Much faster on bounds with many primitive polygons. The polygons are exported back "
+            "unchanged, only the object transform is applied to them, so edits to the merged mesh are ignored"
+        ),
+        default=False,
+        update=_save_preferences_on_update
+    )
+
+    ycd_reduce_keyframes: BoolProperty(
+        name="Reduce Keyframes",
+        description=(
+            "Only create the keyframes needed to stay within the max error of the imported animations, instead of a "
+            "keyframe per frame. The kept keyframes use linear interpolation"
+        ),
+        default=False,
+        update=_save_preferences_on_update
+    )
+
+    ycd_max_keyframe_error: FloatProperty(
+        name="Max Keyframe Error",
+        description="Maximum difference between the reduced F-curves and the imported values at any frame",
+        default=0.0001,
+        min=0.0,
+        precision=5,
+        update=_save_preferences_on_update
+    )
+
     ymap_skip_missing_entities: BoolProperty(
         name="Skip Missing Entities",
         description="If enabled, missing entities wont be created as an empty object",
@@ -663,10 +815,25 @@ class SollumzAddonPreferences(AddonPreferences):
         box.label(text="Import", icon="IMPORT")
         settings = self.import_settings
         box.prop(settings, "import_as_asset")
+        _section_header(box, text="Include")
+        box.prop(settings, "import_lods")
+        box.prop(settings, "import_embedded_bounds")
+        box.prop(settings, "import_lights")
+        box.prop(settings, "import_damaged")  # Fragment
+        box.prop(settings, "import_cloth")
         _section_header(box, text="Fragment")
         box.prop(settings, "split_by_group")
         _section_header(box, "Drawable Dictionary")
         box.prop(settings, "import_ext_skeleton")  # Drawable Dictionary
+        box.prop(settings, "ydd_share_datablocks")
+        _section_header(box, "Collisions")
+        box.prop(settings, "ybn_force_unique_materials")
+        box.prop(settings, "ybn_merge_primitive_polys")
+        _section_header(box, "Clip Dictionary")
+        box.prop(settings, "ycd_reduce_keyframes")
+        row = box.row()
+        row.active = settings.ycd_reduce_keyframes
+        row.prop(settings, "ycd_max_keyframe_error")
 
         _section_header(box, "YTYP")
         box.prop(settings, "ytyp_mlo_instance_entities")
@@ -695,9 +862,21 @@ class SollumzAddonPreferences(AddonPreferences):
         _section_header(box, "Fragment")
         box.column().prop(settings, "export_lods")
 
+        _section_header(box, "Collisions")
+        box.prop(settings, "ybn_spatial_sort_polys")
+
         _section_header(box, "Drawable Dictionary")
         box.prop(settings, "exclude_skeleton")
 
+        _section_header(box, "Clip Dictionary")
+        box.prop(settings, "ycd_deduplicate_animations")
+        box.prop(settings, "ycd_error_bounded_compression")
+        col = box.column()
+        col.active = settings.ycd_error_bounded_compression
+        col.prop(settings, "ycd_max_translation_error")
+        col.prop(settings, "ycd_max_rotation_error")
+        col.prop(settings, "ycd_max_value_error")
+
         _section_header(box, "YMAP")
         box.prop(settings, "ymap_exclude_entities")
         box.prop(settings, "ymap_box_occluders")
@@ -159,9 +159,21 @@ class SOLLUMZ_PT_import_asset(bpy.types.Panel, SollumzImportSettingsPanel):
         layout.prop(settings, "import_as_asset")
 
 
+class SOLLUMZ_PT_import_include(bpy.types.Panel, SollumzImportSettingsPanel):
+    bl_label = "Include"
+    bl_order = 1
+
+    def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzImportSettings):
+        layout.column().prop(settings, "import_lods")
+        layout.prop(settings, "import_embedded_bounds")
+        layout.prop(settings, "import_lights")
+        layout.prop(settings, "import_damaged")
+        layout.prop(settings, "import_cloth")
+
+
 class SOLLUMZ_PT_import_fragment(bpy.types.Panel, SollumzImportSettingsPanel):
     bl_label = "Fragment"
-    bl_order = 1
+    bl_order = 2
 
     def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzImportSettings):
         layout.prop(settings, "split_by_group")
@@ -169,15 +181,25 @@ class SOLLUMZ_PT_import_fragment(bpy.types.Panel, SollumzImportSettingsPanel):
 
 class SOLLUMZ_PT_import_ydd(bpy.types.Panel, SollumzImportSettingsPanel):
     bl_label = "Drawable Dictionary"
-    bl_order = 2
+    bl_order = 3
 
     def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzImportSettings):
         layout.prop(settings, "import_ext_skeleton")
+        layout.prop(settings, "ydd_share_datablocks")
+
+
+class SOLLUMZ_PT_import_ybn(bpy.types.Panel, SollumzImportSettingsPanel):
+    bl_label = "Collisions"
+    bl_order = 4
+
+    def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzImportSettings):
+        layout.prop(settings, "ybn_force_unique_materials")
+        layout.prop(settings, "ybn_merge_primitive_polys")
 
 
 class SOLLUMZ_PT_import_ymap(bpy.types.Panel, SollumzImportSettingsPanel):
     bl_label = "Ymap"
-    bl_order = 3
+    bl_order = 5
 
     def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzImportSettings):
         layout.prop(settings, "ymap_skip_missing_entities")
@@ -188,6 +210,17 @@ class SOLLUMZ_PT_import_ymap(bpy.types.Panel, SollumzImportSettingsPanel):
         layout.prop(settings, "ymap_car_generators")
 
 
+class SOLLUMZ_PT_import_ycd(bpy.types.Panel, SollumzImportSettingsPanel):
+    bl_label = "Clip Dictionary"
+    bl_order = 6
+
+    def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzImportSettings):
+        layout.prop(settings, "ycd_reduce_keyframes")
+        row = layout.row()
+        row.active = settings.ycd_reduce_keyframes
+        row.prop(settings, "ycd_max_keyframe_error")
+
+
 class SOLLUMZ_PT_export_include(bpy.types.Panel, SollumzExportSettingsPanel):
     bl_label = "Include"
     bl_order = 0
@@ -215,13 +248,12 @@ class SOLLUMZ_PT_export_fragment(bpy.types.Panel, SollumzExportSettingsPanel):
         layout.column().prop(settings, "export_lods")
 
 
-# Empty for now
-# class SOLLUMZ_PT_export_collision(bpy.types.Panel, SollumzExportSettingsPanel):
-#     bl_label = "Collisions"
-#     bl_order = 3
-#
-#     def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzExportSettings):
-#         pass
+class SOLLUMZ_PT_export_collision(bpy.types.Panel, SollumzExportSettingsPanel):
+    bl_label = "Collisions"
+    bl_order = 3
+
+    def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzExportSettings):
+        layout.prop(settings, "ybn_spatial_sort_polys")
 
 
 class SOLLUMZ_PT_export_ydd(bpy.types.Panel, SollumzExportSettingsPanel):
@@ -243,6 +275,20 @@ class SOLLUMZ_PT_export_ymap(bpy.types.Panel, SollumzExportSettingsPanel):
         layout.prop(settings, "ymap_car_generators")
 
 
+class SOLLUMZ_PT_export_ycd(bpy.types.Panel, SollumzExportSettingsPanel):
+    bl_label = "Clip Dictionary"
+    bl_order = 6
+
+    def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzExportSettings):
+        layout.prop(settings, "ycd_deduplicate_animations")
+        layout.prop(settings, "ycd_error_bounded_compression")
+        col = layout.column()
+        col.active = settings.ycd_error_bounded_compression
+        col.prop(settings, "ycd_max_translation_error")
+        col.prop(settings, "ycd_max_rotation_error")
+        col.prop(settings, "ycd_max_value_error")
+
+
 class SOLLUMZ_PT_GAME_PANEL(bpy.types.Panel):
     bl_label = "Game"
     bl_idname = "SOLLUMZ_PT_GAME_PANEL"
@@ -284,6 +330,8 @@ class SOLLUMZ_PT_TOOL_PANEL(bpy.types.Panel):
         else:
             row.operator("sollumz.export_assets")
 
+        layout.operator("sollumz.validate_assets", icon="CHECKMARK")
+
 
 class GeneralToolChildPanel:
     bl_space_type = "VIEW_3D"
@@ -0,0 +1,298 @@
+"""
+Pre-flight validation of Sollumz objects before exporting them.
+
+Runs the checks that the exporters do on their input, such as vertex limits, missing attributes or collision materials,
+on the same evaluated meshes but without creating any XML. Issues are logged with the same messages as during export
+and collected in a ``ValidationReport``.
+"""
+
+import bpy
+import numpy as np
+from typing import Iterable, NamedTuple, Optional
+from collections import defaultdict
+from .sollumz_properties import (
+    SollumType, SollumzGame, LODLevel, import_export_current_game as current_game, set_import_export_current_game
+)
+from .sollumz_preferences import get_export_settings
+from .cwxml.shader import ShaderManager
+from .lods import LODLevels, operates_on_lod_level
+from .tools.blenderhelper import get_evaluated_obj
+from .ydr.ydrexport import get_model_objs, validate_model_mesh, validate_mesh_attributes
+from .ydr.vertex_buffer_builder import try_get_bone_by_vgroup, try_get_bone_tag_by_vgroup
+from .ydr.cable import is_cable_mesh
+from .ydr.cloth_char import CLOTH_CHAR_MAX_VERTICES, CLOTH_CHAR_VERTEX_GROUP_NAME, cloth_char_find_mesh_objects
+from .ydr.cloth_env import CLOTH_ENV_MAX_VERTICES, cloth_env_find_mesh_objects
+from .ydd.yddexport import find_ydd_armature
+from .yft.yftexport import locate_fragment_objects
+from .ybn.ybnexport import validate_collision_materials, validate_bvh_collision_materials, validate_bound_vertex_count
+from .ybn.merged_polys import POLY_INDEX_ATTR, POLY_NUM_VERTICES, is_merged_poly_mesh
+from .ymap.ymapexport import validate_model_occluder
+from .logger import LoggerBase
+from . import logger
+
+
+class ValidationIssue(NamedTuple):
+    asset_name: str
+    level: str
+    """Log level, either "WARNING" or "ERROR"."""
+    message: str
+
+
+class ValidationReport(LoggerBase):
+    """Collects the warnings and errors logged while validating, grouped by the asset being validated."""
+
+    def __init__(self):
+        self.issues: list[ValidationIssue] = []
+        self.asset_names: list[str] = []
+
+    def do_log(self, msg: str, level: str):
+        if level in {"WARNING", "ERROR"}:
+            self.issues.append(ValidationIssue(self.asset_names[-1], level, msg))
+
+    @property
+    def num_errors(self) -> int:
+        return sum(1 for issue in self.issues if issue.level == "ERROR")
+
+    @property
+    def num_warnings(self) -> int:
+        return sum(1 for issue in self.issues if issue.level == "WARNING")
+
+    def issues_by_asset(self) -> dict[str, list[ValidationIssue]]:
+        issues = defaultdict(list)
+        for issue in self.issues:
+            issues[issue.asset_name].append(issue)
+        return issues
+
+    def summary_lines(self) -> list[str]:
+        """One line per validated asset with the number of issues found in it."""
+        issues = self.issues_by_asset()
+        lines = []
+        for asset_name in self.asset_names:
+            asset_issues = issues.get(asset_name, [])
+            num_errors = sum(1 for issue in asset_issues if issue.level == "ERROR")
+            num_warnings = len(asset_issues) - num_errors
+            status = "OK" if not asset_issues else f"{num_errors} error(s), {num_warnings} warning(s)"
+            lines.append(f"'{asset_name}': {status}")
+        return lines
+
+
+def validate_export_objects(objs: Iterable[bpy.types.Object]) -> ValidationReport:
+    """Validate the exportable Sollumz objects in ``objs``, which should be the top-level objects of each asset as
+    passed to the exporters. Issues are logged as they are found and returned in the report."""
+    report = ValidationReport()
+    with logger.use_logger(report):
+        for obj in objs:
+            validator = _VALIDATORS_BY_TYPE.get(obj.sollum_type, None)
+            if validator is None:
+                continue
+
+            report.asset_names.append(obj.name)
+            set_import_export_current_game(obj.sollum_game_type)
+            validator(obj)
+
+    return report
+
+
+def _validate_drawable(drawable_obj: bpy.types.Object, armature_obj: Optional[bpy.types.Object] = None):
+    if armature_obj is None and drawable_obj.type == "ARMATURE":
+        armature_obj = drawable_obj
+
+    for model_obj in get_model_objs(drawable_obj):
+        _validate_drawable_model(model_obj, armature_obj)
+
+
+def _validate_drawable_model(model_obj: bpy.types.Object, armature_obj: Optional[bpy.types.Object]):
+    lods: LODLevels = model_obj.sz_lods
+    for lod_level in LODLevel:
+        # Same LODs as create_model_xmls
+        if lod_level == LODLevel.VERYHIGH or lods.get_lod(lod_level).mesh is None:
+            continue
+
+        _validate_drawable_model_lod(model_obj, lod_level, armature_obj)
+
+
+@operates_on_lod_level
+def _validate_drawable_model_lod(
+    model_obj: bpy.types.Object, lod_level: LODLevel, armature_obj: Optional[bpy.types.Object]
+):
+    # Check the evaluated mesh, with modifiers applied, like create_model_xml does
+    obj_eval = get_evaluated_obj(model_obj)
+    mesh_eval = obj_eval.to_mesh()
+    try:
+        if not validate_model_mesh(mesh_eval) or is_cable_mesh(mesh_eval):
+            return
+
+        validate_mesh_attributes(mesh_eval)
+
+        # Also warns about vertex groups without a bone
+        if current_game() == SollumzGame.GTA:
+            bone_by_vgroup = try_get_bone_by_vgroup(model_obj, armature_obj)
+        else:
+            bone_by_vgroup = try_get_bone_tag_by_vgroup(model_obj, armature_obj)
+
+        if bone_by_vgroup is not None:
+            _validate_mesh_weights(mesh_eval, model_obj.vertex_groups.get(CLOTH_CHAR_VERTEX_GROUP_NAME, None))
+    finally:
+        obj_eval.to_mesh_clear()
+
+
+def _validate_mesh_weights(mesh: bpy.types.Mesh, cloth_vgroup: Optional[bpy.types.VertexGroup]):
+    """Check for vertices without weights and faces weighted to the character cloth using a non-cloth material."""
+    num_verts = len(mesh.vertices)
+    cloth_group_index = cloth_vgroup.index if cloth_vgroup is not None else -1
+
+    # Vertex group weights can't be read in bulk, this is the only per-vertex loop of the validation
+    is_ungrouped = np.zeros(num_verts, dtype=bool)
+    is_cloth = np.zeros(num_verts, dtype=bool)
+    for i, vert in enumerate(mesh.vertices):
+        groups = vert.groups
+        if len(groups) == 0:
+            is_ungrouped[i] = True
+        elif cloth_group_index != -1:
+            is_cloth[i] = any(g.group == cloth_group_index for g in groups)
+
+    ungrouped_verts = int(is_ungrouped.sum())
+    if ungrouped_verts != 0:
+        logger.warning(
+            f"Mesh '{mesh.name}' has {ungrouped_verts} vertices not weighted to any vertex group! "
+            "These vertices will be weighted to the root bone which may cause parts to float in-game. "
+            "In Edit Mode, you can use 'Select > Select All by Trait > Ungrouped vertices' to select "
+            "these vertices."
+        )
+
+    if current_game() != SollumzGame.GTA or not is_cloth.any() or len(mesh.polygons) == 0 or not mesh.materials:
+        return
+
+    # Export counts the faces of the triangulated mesh
+    if not mesh.loop_triangles:
+        mesh.calc_loop_triangles()
+    tri_verts = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", tri_verts)
+    tri_mat_indices = np.empty(len(mesh.loop_triangles), dtype=np.int32)
+    mesh.loop_triangles.foreach_get("material_index", tri_mat_indices)
+
+    mat_is_ped_cloth_mask = np.array([
+        m is not None and (shader := ShaderManager.find_shader(m.shader_properties.filename)) is not None and
+        shader.is_ped_cloth
+        for m in mesh.materials
+    ])
+    tri_is_cloth = is_cloth[tri_verts.reshape((-1, 3))].any(axis=1)
+    tri_mat_indices %= len(mat_is_ped_cloth_mask)
+    n = int(np.count_nonzero(tri_is_cloth & ~mat_is_ped_cloth_mask[tri_mat_indices]))
+    if n != 0:
+        logger.error(
+            f"Mesh '{mesh.name}' has {n} face(s) weighted to CLOTH vertex group but using non-cloth "
+            "material. These faces will not be skinned correctly in-game, a ped cloth material is required."
+        )
+
+
+def _validate_drawable_dictionary(ydd_obj: bpy.types.Object):
+    ydd_armature = find_ydd_armature(ydd_obj) if ydd_obj.type != "ARMATURE" else ydd_obj
+    for child in ydd_obj.children:
+        if child.sollum_type != SollumType.DRAWABLE:
+            continue
+
+        _validate_drawable(child, ydd_armature if child.type != "ARMATURE" else None)
+
+        # Character cloths are only exported with drawable dictionaries
+        if current_game() != SollumzGame.GTA:
+            continue
+
+        cloth_objs = cloth_char_find_mesh_objects(child, silent=True)
+        if cloth_objs:
+            cloth_obj = cloth_objs[0]
+            num_vertices = len(cloth_obj.data.vertices)
+            if num_vertices > CLOTH_CHAR_MAX_VERTICES:
+                logger.error(
+                    f"Drawable '{child.name}' has cloth with too many vertices! "
+                    f"The maximum is {CLOTH_CHAR_MAX_VERTICES} vertices but cloth mesh '{cloth_obj.name}' has "
+                    f"{num_vertices} vertices.\n"
+                    f"Cloth won't be exported!"
+                )
+
+
+def _validate_fragment(frag_obj: bpy.types.Object):
+    frag = locate_fragment_objects(frag_obj)
+    if frag is None:
+        return
+
+    _validate_drawable(frag.drawable, frag.fragment)
+    if frag.damaged_drawable is not None:
+        _validate_drawable(frag.damaged_drawable, frag.fragment)
+
+    for composite_obj in (frag.composite, frag.damaged_composite):
+        if composite_obj is not None:
+            _validate_bound_composite(composite_obj)
+
+    cloth_objs = cloth_env_find_mesh_objects(frag_obj, silent=True)
+    if cloth_objs:
+        cloth_obj = cloth_objs[0]
+        num_vertices = len(cloth_obj.data.vertices)
+        if num_vertices > CLOTH_ENV_MAX_VERTICES:
+            logger.error(
+                f"Fragment '{frag_obj.name}' has cloth with too many vertices! "
+                f"The maximum is {CLOTH_ENV_MAX_VERTICES} vertices but drawable model '{cloth_obj.name}' has "
+                f"{num_vertices} vertices.\n"
+                f"Cloth won't be exported!"
+            )
+
+
+def _validate_bound_composite(composite_obj: bpy.types.Object):
+    for child in composite_obj.children:
+        match child.sollum_type:
+            case SollumType.BOUND_GEOMETRY:
+                if child.type != "MESH" or not validate_collision_materials(child, verbose=True):
+                    continue
+
+                validate_bound_vertex_count(child, len(child.data.vertices))
+            case SollumType.BOUND_GEOMETRYBVH:
+                if not validate_bvh_collision_materials(child, verbose=True):
+                    continue
+
+                validate_bound_vertex_count(child, _estimate_bvh_num_vertices(child))
+            case _ if child.type == "MESH":
+                validate_collision_materials(child, verbose=True)
+
+
+def _estimate_bvh_num_vertices(bvh_obj: bpy.types.Object) -> int:
+    """Number of vertices the BVH will have before welding duplicated positions."""
+    num_vertices = 0
+    for child in bvh_obj.children_recursive:
+        if child.type != "MESH":
+            continue
+
+        mesh = child.data
+        if child.sollum_type == SollumType.BOUND_POLY_TRIANGLE:
+            num_vertices += len(mesh.vertices)
+        elif child.sollum_type not in POLY_NUM_VERTICES:
+            continue
+        elif is_merged_poly_mesh(mesh) and len(mesh.polygons) != 0:
+            poly_inds = np.empty(len(mesh.polygons), dtype=np.int32)
+            mesh.attributes[POLY_INDEX_ATTR].data.foreach_get("value", poly_inds)
+            num_vertices += (int(poly_inds.max()) + 1) * POLY_NUM_VERTICES[child.sollum_type]
+        else:
+            num_vertices += POLY_NUM_VERTICES[child.sollum_type]
+
+    return num_vertices
+
+
+def _validate_ymap(ymap_obj: bpy.types.Object):
+    if get_export_settings().ymap_model_occluders:
+        return
+
+    for child in ymap_obj.children:
+        if child.sollum_type != SollumType.YMAP_MODEL_OCCLUDER_GROUP:
+            continue
+
+        for model_obj in child.children:
+            if model_obj.sollum_type == SollumType.YMAP_MODEL_OCCLUDER:
+                validate_model_occluder(model_obj)
+
+
+_VALIDATORS_BY_TYPE = {
+    SollumType.DRAWABLE: _validate_drawable,
+    SollumType.DRAWABLE_DICTIONARY: _validate_drawable_dictionary,
+    SollumType.FRAGMENT: _validate_fragment,
+    SollumType.BOUND_COMPOSITE: _validate_bound_composite,
+    SollumType.YMAP: _validate_ymap,
+}
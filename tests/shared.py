@@ -1,5 +1,6 @@
 import os
 import itertools
+import bpy
 from typing import Optional
 from pathlib import Path
 
@@ -52,3 +53,13 @@ def asset_path(file_name: str) -> Path:
     path = SOLLUMZ_TEST_ASSETS_DIR.joinpath(file_name)
     assert path.exists()
     return path
+
+
+def new_fcurve(action: bpy.types.Action, data_path: str, index: int) -> bpy.types.FCurve:
+    if bpy.app.version >= (5, 0, 0):
+        from bpy_extras import anim_utils
+        slot = action.slots[0] if len(action.slots) > 0 else action.slots.new("OBJECT", "Slot")
+        channelbag = anim_utils.action_ensure_channelbag_for_slot(action, slot)
+        return channelbag.fcurves.new(data_path, index=index)
+    else:
+        return action.fcurves.new(data_path, index=index)
@@ -0,0 +1,105 @@
+import bpy
+import math
+import numpy as np
+from numpy.testing import assert_allclose
+from mathutils import Matrix, Quaternion, Vector
+from ..tools.animationhelper import (
+    transform_bone_location_space,
+    transform_bone_rotation_quaternion_space,
+    calculate_uv_clip_hash,
+    update_uv_clip_hashes,
+    refresh_uv_clip_hashes,
+    _uv_clip_hash_sources,
+)
+from ..tools import jenkhash
+from ..sollumz_properties import SollumType
+from .shared import new_fcurve
+
+
+def _new_fcurves(action: bpy.types.Action, data_path: str, values: np.ndarray) -> list[bpy.types.FCurve]:
+    fcurves = []
+    for i, component_values in enumerate(values.T):
+        fcurve = new_fcurve(action, data_path, i)
+        fcurve.keyframe_points.add(len(component_values))
+        co = np.stack((np.arange(len(component_values), dtype=np.float32), component_values), axis=1)
+        fcurve.keyframe_points.foreach_set("co", co.ravel())
+        fcurve.update()
+        fcurves.append(fcurve)
+    return fcurves
+
+
+def _fcurves_values(fcurves: list[bpy.types.FCurve]) -> np.ndarray:
+    return np.array([[kp.co[1] for kp in fcurve.keyframe_points] for fcurve in fcurves]).T
+
+
+def test_transform_bone_space_matches_mathutils():
+    rng = np.random.default_rng(0)
+    transform_mat = Matrix.Translation((1.0, 2.0, 3.0)) @ Matrix.Rotation(math.radians(70.0), 4, Vector((1, 2, 3)))
+
+    action = bpy.data.actions.new("test_transform_bone_space")
+    try:
+        locations = rng.normal(size=(20, 3)).astype(np.float32)
+        location_fcurves = _new_fcurves(action, 'pose.bones["a"].location', locations)
+        transform_bone_location_space(location_fcurves, None, None, transform_mat)
+
+        expected = [transform_mat @ Vector(location) for location in locations]
+        assert_allclose(_fcurves_values(location_fcurves), expected, atol=1e-5)
+
+        rotations = rng.normal(size=(20, 4))
+        rotations = (rotations / np.linalg.norm(rotations, axis=1, keepdims=True)).astype(np.float32)
+        rotation_fcurves = _new_fcurves(action, 'pose.bones["a"].rotation_quaternion', rotations)
+        transform_bone_rotation_quaternion_space(rotation_fcurves, None, None, transform_mat)
+
+        expected = []
+        for rotation in rotations:
+            quat = Quaternion(rotation)
+            quat.rotate(transform_mat)
+            if expected and expected[-1].dot(quat) < 0:
+                quat *= -1
+            expected.append(quat)
+        assert_allclose(_fcurves_values(rotation_fcurves), expected, atol=1e-5)
+    finally:
+        bpy.data.actions.remove(action)
+
+
+def test_refresh_uv_clip_hashes():
+    material = bpy.data.materials.new("test_uv_clip_material")
+    material_name = material.name
+    material.shader_properties.index = 2
+    mesh = bpy.data.meshes.new("test_uv_clip_mesh")
+    mesh.materials.append(material)
+
+    drawable_obj = bpy.data.objects.new("test_uv_clip_drawable", None)
+    drawable_obj.sollum_type = SollumType.DRAWABLE
+    model_obj = bpy.data.objects.new("test_uv_clip_model", mesh)
+    model_obj.sollum_type = SollumType.DRAWABLE_MODEL
+    model_obj.parent = drawable_obj
+
+    animation_obj = bpy.data.objects.new("test_uv_clip_animation", None)
+    animation_obj.sollum_type = SollumType.ANIMATION
+    animation_obj.animation_properties.target_id = material
+    clip_obj = bpy.data.objects.new("test_uv_clip", None)
+    clip_obj.sollum_type = SollumType.CLIP
+    clip_obj.clip_properties.animations.add().animation = animation_obj
+    try:
+        assert update_uv_clip_hashes([clip_obj]) == 1
+        assert clip_obj.clip_properties.hash == calculate_uv_clip_hash(jenkhash.Generate(drawable_obj.name), 2)
+
+        drawable_obj.name = "test_uv_clip_drawable_renamed"
+        material.shader_properties.index = 5
+        refresh_uv_clip_hashes()
+        expected_hash = calculate_uv_clip_hash(jenkhash.Generate(drawable_obj.name), 5)
+        assert clip_obj.clip_properties.hash == expected_hash
+        assert clip_obj in _uv_clip_hash_sources
+
+        # Clips whose target was removed stop being tracked and keep their last hash
+        bpy.data.materials.remove(material)
+        refresh_uv_clip_hashes()
+        assert clip_obj not in _uv_clip_hash_sources
+        assert clip_obj.clip_properties.hash == expected_hash
+    finally:
+        for obj in (clip_obj, animation_obj, model_obj, drawable_obj):
+            bpy.data.objects.remove(obj)
+        bpy.data.meshes.remove(mesh)
+        if material_name in bpy.data.materials:
+            bpy.data.materials.remove(bpy.data.materials[material_name])
@@ -0,0 +1,34 @@
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+from mathutils import Vector
+from ..cwxml.cloth import CharacterCloth
+from ..ydr.cloth_char import cloth_char_get_mesh_to_cloth_bindings
+
+
+def test_cloth_char_get_mesh_to_cloth_bindings():
+    # Vertical quad on the Y=1 plane
+    cloth_verts = np.array([(-0.5, 1.0, 0.0), (0.5, 1.0, 0.0), (0.5, 1.0, 1.0), (-0.5, 1.0, 1.0)])
+    cloth = CharacterCloth()
+    cloth.controller.vertices = [Vector(v) for v in cloth_verts]
+    cloth.controller.indices = [0, 1, 2, 0, 2, 3]
+
+    mesh_verts = np.array([
+        (0.1, 1.02, 0.3),  # facing outside
+        (-0.1, 0.98, 0.8),  # facing inside
+        (3.0, 1.0, 0.5),  # projects outside the cloth
+        (0.0, 2.0, 0.5),  # too far from the cloth
+    ], dtype=np.float32)
+    mesh_normals = np.array([(0.0, 1.0, 0.0), (0.0, -1.0, 0.0), (0.0, 1.0, 0.0), (0.0, 1.0, 0.0)], dtype=np.float32)
+
+    weights, inds, errors = cloth_char_get_mesh_to_cloth_bindings(cloth, mesh_verts, mesh_normals)
+
+    assert_array_equal(inds[:2, 2], [255, 255])
+    for i in range(2):
+        projected = weights[i, :3] @ cloth_verts[inds[i, [1, 0, 3]]]
+        assert_allclose(projected, (mesh_verts[i, 0], 1.0, mesh_verts[i, 2]), atol=1e-5)
+        assert_allclose(weights[i, 3], 0.02 * 10.0 + 0.5, atol=1e-5)
+
+    assert [(tuple(e.co), e.error_projection, e.error_distance) for e in errors] == [
+        ((3.0, 1.0, 0.5), True, False),
+        ((0.0, 2.0, 0.5), False, True),
+    ]
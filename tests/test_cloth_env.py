@@ -0,0 +1,29 @@
+import pytest
+from ..ydr.cloth_env import cloth_schedule_edge_buckets
+
+
+def _grid_edges(rows: int, cols: int) -> list[tuple[int, int]]:
+    edges = []
+    for i in range(rows - 1):
+        for j in range(cols - 1):
+            a = i * cols + j
+            edges += [(a, a + 1), (a + 1, a + cols + 1), (a + cols + 1, a), (a + cols + 1, a + cols), (a + cols, a)]
+    return list(dict.fromkeys(tuple(sorted(e)) for e in edges))
+
+
+@pytest.mark.parametrize("edges, expected_num_buckets", (
+    ([], 0),
+    ([(0, 1)], 1),
+    ([(0, i) for i in range(1, 20)], 19),
+    (_grid_edges(2, 13), 7),
+    (_grid_edges(10, 20), 68),
+))
+def test_cloth_schedule_edge_buckets(edges, expected_num_buckets):
+    buckets = cloth_schedule_edge_buckets(edges, 8)
+
+    assert len(buckets) == expected_num_buckets
+    assert sorted(e for bucket in buckets for e in bucket) == list(range(len(edges)))
+    for bucket in buckets:
+        assert len(bucket) <= 8
+        bucket_vertices = [v for e in bucket for v in edges[e]]
+        assert len(bucket_vertices) == len(set(bucket_vertices))
@@ -0,0 +1,43 @@
+import bpy
+import pytest
+import numpy as np
+from numpy.testing import assert_allclose
+from ..tools.fcurvehelper import bake_fcurves
+from .shared import new_fcurve
+
+
+@pytest.mark.parametrize("interpolation, handle_type", (
+    ("CONSTANT", "AUTO_CLAMPED"),
+    ("LINEAR", "AUTO_CLAMPED"),
+    ("BEZIER", "AUTO_CLAMPED"),
+    ("BEZIER", "AUTO"),
+    ("BEZIER", "VECTOR"),
+    ("BEZIER", "FREE"),
+    ("SINE", "AUTO_CLAMPED"),
+))
+def test_bake_fcurves_matches_evaluate(interpolation, handle_type):
+    rng = np.random.default_rng(0)
+    action = bpy.data.actions.new("test_bake_fcurves")
+    try:
+        fcurves = []
+        for i in range(4):
+            fcurve = new_fcurve(action, "location", i)
+            frame = 0.0
+            for _ in range(8):
+                keyframe = fcurve.keyframe_points.insert(frame, rng.normal())
+                keyframe.interpolation = interpolation
+                keyframe.handle_left_type = handle_type
+                keyframe.handle_right_type = handle_type
+                if handle_type == "FREE":
+                    keyframe.handle_left = (frame - rng.uniform(0.0, 8.0), keyframe.co[1] + rng.normal())
+                    keyframe.handle_right = (frame + rng.uniform(0.0, 8.0), keyframe.co[1] + rng.normal())
+                frame += rng.uniform(0.5, 5.0)
+            fcurve.update()
+            fcurves.append(fcurve)
+
+        frames = np.linspace(-2.0, 40.0, 500)
+        expected = [[fcurve.evaluate(frame) for frame in frames.astype(np.float32).tolist()] for fcurve in fcurves]
+
+        assert_allclose(bake_fcurves(fcurves, frames), expected, atol=1e-4)
+    finally:
+        bpy.data.actions.remove(action)
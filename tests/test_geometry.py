@@ -1,6 +1,9 @@
 import pytest
 import numpy as np
-from ..shared.geometry import shrink_mesh
+from mathutils import Vector
+from ..shared.geometry import (
+    shrink_mesh, get_mass_properties_of_mesh, get_mass_properties_of_box, is_mesh_solid, get_centroid_of_mesh
+)
 from .shared import SOLLUMZ_TEST_ASSETS_DIR
 
 def read_shrink_mesh_test_data(file_path):
@@ -41,3 +44,43 @@ def test_geometry_shrink_mesh(test_data_file_name):
                   f"   diff={output_vertex - expected_vertex}\n")
 
     assert n == 0, f"{n} / {len(output_vertices)}{s}"
+
+
+def test_geometry_mass_properties_of_mesh_box():
+    input_vertices = np.array([
+        [0.0, 0.0, 0.0], [2.0, 0.0, 0.0], [2.0, 1.0, 0.0], [0.0, 1.0, 0.0],
+        [0.0, 0.0, 1.0], [2.0, 0.0, 1.0], [2.0, 1.0, 1.0], [0.0, 1.0, 1.0],
+    ])
+    input_indices = np.array([
+        [0, 2, 1], [0, 3, 2], [4, 5, 6], [4, 6, 7],
+        [0, 1, 5], [0, 5, 4], [1, 2, 6], [1, 6, 5],
+        [2, 3, 7], [2, 7, 6], [3, 0, 4], [3, 4, 7],
+    ])
+
+    assert is_mesh_solid(input_vertices, input_indices)
+    assert not is_mesh_solid(input_vertices, input_indices[:-1])
+
+    volume, cg, inertia = get_mass_properties_of_mesh(input_vertices, input_indices)
+
+    assert volume == pytest.approx(2.0)
+    assert tuple(cg) == pytest.approx((1.0, 0.5, 0.5))
+    _, _, expected_box_inertia = get_mass_properties_of_box(Vector((0, 0, 0)), Vector((2, 1, 1)))
+    assert tuple(inertia) == pytest.approx(tuple(expected_box_inertia))
+
+
+@pytest.mark.parametrize("input_vertices, expected_centroid, expected_radius", (
+    # box corners, with duplicates
+    (np.array([[x, y, z] for x in (0.0, 2.0) for y in (0.0, 1.0) for z in (0.0, 2.0)] * 2), (1.0, 0.5, 1.0), 1.5),
+    # circle far from the origin, all points on the boundary
+    (np.array([[np.cos(a) * 3.0 + 1000.0, np.sin(a) * 3.0, 0.0] for a in np.linspace(0, 2 * np.pi, 64, endpoint=False)]),
+     (1000.0, 0.0, 0.0), 3.0),
+    # collinear
+    (np.array([[0.0, 0.0, z] for z in np.linspace(-1.0, 3.0, 10)]), (0.0, 0.0, 1.0), 2.0),
+    # single point
+    (np.array([[1.0, 2.0, 3.0]]), (1.0, 2.0, 3.0), 0.0),
+))
+def test_geometry_centroid_of_mesh(input_vertices, expected_centroid, expected_radius):
+    centroid, radius = get_centroid_of_mesh(input_vertices)
+
+    assert tuple(centroid) == pytest.approx(expected_centroid)
+    assert radius == pytest.approx(expected_radius)
@@ -0,0 +1,12 @@
+from ..tools.jenkhash import Generate, GenerateData, GenerateDataMany, name_to_hash, names_to_hashes
+
+
+def test_generate_many_matches_generate():
+    names = ["", "a", "Prop_Test", "hash_DEADBEEF", "a_much_longer_name_with_ünicode", "b", "Prop_Test"]
+
+    assert names_to_hashes(names) == [name_to_hash(name) for name in names]
+    assert names_to_hashes([]) == []
+    assert GenerateDataMany([b"abc", b""], seed=0x12345678).tolist() == [
+        GenerateData(b"abc", 0x12345678), GenerateData(b"", 0x12345678)
+    ]
+    assert Generate("Prop_Test") == GenerateData(b"prop_test")
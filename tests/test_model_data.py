@@ -0,0 +1,62 @@
+import numpy as np
+from ..cwxml.drawable import Bone
+from ..ydr.model_data import MeshData, get_group_face_inds, get_faces_subset
+
+
+def create_bones(parent_indices: list[int]) -> list[Bone]:
+    bones = []
+    for parent_index in parent_indices:
+        bone = Bone()
+        bone.parent_index = parent_index
+        bones.append(bone)
+    return bones
+
+
+def create_skinned_mesh_data(blend_inds: list[tuple], faces: list[tuple]) -> MeshData:
+    vert_dtype = np.dtype([("Position", np.float32, 3), ("BlendWeights", np.uint32, 4), ("BlendIndices", np.uint32, 4)])
+    vert_arr = np.zeros(len(blend_inds), dtype=vert_dtype)
+    vert_arr["BlendIndices"] = blend_inds
+    vert_arr["BlendWeights"] = np.where(vert_arr["BlendIndices"] != 0, 255, 0)
+    ind_arr = np.array(faces, dtype=np.uint32).flatten()
+    return MeshData(vert_arr, ind_arr, np.zeros(len(faces), dtype=np.uint32))
+
+
+def test_get_group_face_inds():
+    #  0
+    #  +- 1
+    #  |  +- 2
+    #  |  +- 3
+    #  +- 4
+    bones = create_bones([-1, 0, 1, 1, 0])
+    mesh_data = create_skinned_mesh_data(
+        blend_inds=[
+            (2, 0, 0, 0), (2, 0, 0, 0), (2, 0, 0, 0),
+            (3, 0, 0, 0), (3, 0, 0, 0),
+            (4, 0, 0, 0),
+            (0, 0, 0, 0),
+        ],
+        faces=[
+            (0, 1, 2),  # only bone 2, but bone 2 overlaps bone 3 in the next face
+            (0, 3, 4),  # bones 2 and 3, merged into their common parent 1
+            (3, 4, 3),  # only bone 3
+            (5, 5, 5),  # only bone 4, no overlaps
+            (6, 6, 6),  # unweighted
+        ]
+    )
+
+    group_face_inds = get_group_face_inds(mesh_data, bones)
+
+    assert list(group_face_inds.keys()) == [1, 4, 0]
+    assert group_face_inds[1].tolist() == [0, 1, 2]
+    assert group_face_inds[4].tolist() == [3]
+    assert group_face_inds[0].tolist() == [4]
+
+
+def test_get_faces_subset():
+    ind_arr = np.array([0, 1, 2, 0, 3, 4, 3, 4, 3], dtype=np.uint32)
+    vert_arr = np.arange(5, dtype=np.float32)
+
+    new_vert_arr, new_ind_arr = get_faces_subset(vert_arr, ind_arr, np.array([1, 2], dtype=np.uint32))
+
+    assert new_vert_arr.tolist() == [0, 3, 4]
+    assert new_ind_arr.tolist() == [0, 1, 2, 1, 2, 1]
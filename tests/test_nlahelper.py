@@ -0,0 +1,67 @@
+import bpy
+import numpy as np
+from numpy.testing import assert_allclose
+from ..tools.nlahelper import bake_nla
+from .shared import new_fcurve
+
+
+def _new_action(name: str, rng: np.random.Generator) -> bpy.types.Action:
+    action = bpy.data.actions.new(name)
+    for data_path, num_components in (("location", 3), ("rotation_quaternion", 4), ("scale", 3)):
+        for i in range(num_components):
+            fcurve = new_fcurve(action, data_path, i)
+            for frame in (0.0, 5.0, 10.0):
+                fcurve.keyframe_points.insert(frame, rng.uniform(0.5, 1.5))
+            fcurve.update()
+    return action
+
+
+def test_bake_nla_matches_blender():
+    rng = np.random.default_rng(0)
+    obj = bpy.data.objects.new("test_bake_nla", None)
+    obj.rotation_mode = "QUATERNION"
+    bpy.context.collection.objects.link(obj)
+    actions = [_new_action(f"test_bake_nla_{i}", rng) for i in range(3)]
+    try:
+        anim_data = obj.animation_data_create()
+
+        track = anim_data.nla_tracks.new()
+        strip = track.strips.new("replace", 2, actions[0])
+        strip.blend_in = 3.0
+        strip.extrapolation = "HOLD"
+
+        track = anim_data.nla_tracks.new()
+        strip = track.strips.new("combine", 4, actions[1])
+        strip.blend_type = "COMBINE"
+        strip.use_animated_influence = True
+        influence_fcurve = strip.fcurves.find("influence")
+        influence_fcurve.keyframe_points.insert(4.0, 0.2)
+        influence_fcurve.keyframe_points.insert(30.0, 0.9)
+        strip.scale = 1.5
+        strip.repeat = 2.0
+        strip.extrapolation = "NOTHING"
+
+        track = anim_data.nla_tracks.new()
+        strip = track.strips.new("add", 0, actions[2])
+        strip.blend_type = "ADD"
+        strip.blend_out = 4.0
+        strip.use_reverse = True
+        strip.extrapolation = "HOLD_FORWARD"
+
+        frames = np.arange(-2, 45, dtype=np.float64)
+        expected = {}
+        for frame in frames.astype(int).tolist():
+            bpy.context.scene.frame_set(frame)
+            for data_path in ("location", "rotation_quaternion", "scale"):
+                for i, value in enumerate(getattr(obj, data_path)):
+                    expected.setdefault((data_path, i), []).append(value)
+
+        baked_channels, = bake_nla([obj], frames)
+
+        assert baked_channels.keys() == expected.keys()
+        for key, values in expected.items():
+            assert_allclose(baked_channels[key], values, atol=1e-4, err_msg=str(key))
+    finally:
+        bpy.data.objects.remove(obj)
+        for action in actions:
+            bpy.data.actions.remove(action)
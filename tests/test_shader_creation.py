@@ -11,7 +11,7 @@ from .test_fixtures import (
 )
 from ..ydr.shader_materials import create_shader
 from ..ydr.operators.materials import MaterialConverter
-from ..ybn.collision_materials import create_collision_material_from_index
+from ..ybn.collision_materials import create_collision_material_from_index, CollisionMaterialPool
 from ..ynv.ynvimport import get_material as ynv_get_material
 from ..tools.ymaphelper import add_occluder_material
 from ..sollumz_properties import SollumType, SollumzGame
@@ -138,3 +138,19 @@ def test_ops_update_tint_shader_correctly_syncs_attribute_names(plane_object):
     assert tint_attr_name == tint_attr_node.attribute_name
 
     bpy.data.images.remove(new_img)
+
+
+def test_collision_material_pool():
+    pool = CollisionMaterialPool()
+    mat = create_collision_material_from_index(1, SollumzGame.GTA)
+    pool.add(("key",), mat)
+
+    assert pool.get(("key",)) == mat
+    assert pool.get(("other key",)) is None
+
+    mat.collision_properties.procedural_id = 10
+    assert pool.get(("key",)) is None
+
+    pool.add(("key",), mat)
+    bpy.data.materials.remove(mat)
+    assert pool.get(("key",)) is None
@@ -1,5 +1,7 @@
+import pickle
 import pytest
 from ..cwxml.shader import ShaderManager
+from ..sollumz_properties import SollumzGame
 
 
 @pytest.mark.parametrize("filename, expected", (
@@ -23,3 +25,27 @@ def test_find_shader(filename: str, expected: str):
 def test_find_shader_unknown_returns_none(filename: str):
     shader = ShaderManager.find_shader(filename)
     assert shader is None
+
+
+@pytest.mark.parametrize("game", (SollumzGame.GTA, SollumzGame.RDR))
+def test_preset_names_match_loaded_shaders(game: SollumzGame):
+    preset_names = ShaderManager.preset_names(game)
+    ShaderManager.load_shaders()
+    shaders = ShaderManager._shaders if game == SollumzGame.GTA else ShaderManager._rdr_shaders
+    assert preset_names == list(shaders.keys())
+
+
+@pytest.mark.parametrize("game", (SollumzGame.GTA, SollumzGame.RDR))
+def test_shader_defs_pickle_roundtrip(game: SollumzGame):
+    table = ShaderManager._tables[game]
+    shaders = table.build_from_xml()
+    loaded_shaders = pickle.loads(pickle.dumps(shaders, protocol=pickle.HIGHEST_PROTOCOL))
+
+    assert len(loaded_shaders) == len(shaders)
+    for shader, loaded_shader in zip(shaders, loaded_shaders):
+        assert loaded_shader.preset_name == shader.preset_name
+        assert loaded_shader.base_name == shader.base_name
+        assert loaded_shader.render_bucket == shader.render_bucket
+        assert loaded_shader.flags == shader.flags
+        assert loaded_shader.uv_maps == shader.uv_maps
+        assert list(loaded_shader.parameter_map.keys()) == list(shader.parameter_map.keys())
@@ -0,0 +1,55 @@
+import pytest
+import numpy as np
+from numpy.testing import assert_array_equal
+from ..tools.fragmenthelper import decode_shattermap, encode_shattermap
+
+
+def test_shattermap_decode():
+    values = decode_shattermap([
+        "##0A--",
+        "FFff01",
+    ])
+
+    assert_array_equal(values, np.array([
+        [0, 10, 255],
+        [255, 255, 1],
+    ], dtype=np.uint8))
+
+
+def test_shattermap_decode_repairs_zmodeler_rows():
+    values = decode_shattermap([
+        "0AFF----0B",
+        "0AFF--0B",
+    ])
+
+    assert_array_equal(values[0], values[1])
+
+
+@pytest.mark.parametrize("shattermap", (
+    ["0A0B", "0A"],
+    ["0A0B", "0AXY"],
+))
+def test_shattermap_decode_malformed(shattermap):
+    with pytest.raises(ValueError):
+        decode_shattermap(shattermap)
+
+
+def test_shattermap_encode():
+    rows = encode_shattermap(np.array([
+        [0, 10, 255, 255],
+        [255, 255, 255, 255],
+        [255, 255, 1, 255],
+    ], dtype=np.uint8))
+
+    assert rows == [
+        "##0AFFFF",
+        "FF------",
+        "FFFF01FF",
+    ]
+
+
+def test_shattermap_encode_decode_roundtrip():
+    values = np.random.default_rng(0).integers(0, 256, size=(32, 48), dtype=np.uint8)
+    values[5, 10:20] = 255
+
+    assert_array_equal(decode_shattermap(encode_shattermap(values)), values)
@@ -0,0 +1,38 @@
+import pytest
+from .shared import asset_path
+from ..logger import LoggerBase, use_logger
+from ..sollumz_validation import validate_export_objects
+from ..ydr.ydrimport import import_ydr
+from ..ydr.ydrexport import create_drawable_xml, get_model_objs
+
+
+class IssuesLogger(LoggerBase):
+    def __init__(self):
+        self.issues: list[tuple[str, str]] = []
+
+    def do_log(self, msg: str, level: str):
+        if level in {"WARNING", "ERROR"}:
+            self.issues.append((level, msg))
+
+
+@pytest.mark.parametrize("use_mask_modifier", (False, True))
+def test_validation_matches_export_warnings(use_mask_modifier: bool):
+    drawable_obj = import_ydr(str(asset_path("sollumz_cube.ydr.xml")))
+    assert drawable_obj is not None
+
+    if use_mask_modifier:
+        # Masking by an empty vertex group removes all the geometry, only the evaluated mesh is empty
+        model_obj = get_model_objs(drawable_obj)[0]
+        model_obj.vertex_groups.new(name="mask")
+        modifier = model_obj.modifiers.new("mask", "MASK")
+        modifier.vertex_group = "mask"
+
+    report = validate_export_objects([drawable_obj])
+
+    with use_logger(IssuesLogger()) as export_logger:
+        create_drawable_xml(drawable_obj)
+
+    validation_issues = sorted((issue.level, issue.message) for issue in report.issues)
+    assert validation_issues == sorted(export_logger.issues)
+    if use_mask_modifier:
+        assert any("has no Geometry" in message for _, message in validation_issues)
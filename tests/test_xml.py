@@ -1,6 +1,9 @@
 import pytest
+import numpy as np
+from xml.etree import ElementTree as ET
 from ..cwxml.element import get_str_type, ElementTree, ValueProperty
 from ..cwxml.ymap import HexColorProperty
+from ..cwxml.drawable import IndexBuffer
 
 
 @pytest.mark.parametrize("string, expected", (
@@ -52,3 +55,15 @@ def test_argb_hex_to_rgba(argb_hex, expected_rgba):
 ))
 def test_rgba_to_argb_hex(rgba, expected_argb_hex):
     assert HexColorProperty.rgba_to_argb_hex(rgba) == expected_argb_hex
+
+
+def test_index_buffer_data_decoded_on_access():
+    element = ET.fromstring("<IndexBuffer><Data>0 1 2 2 3 0</Data></IndexBuffer>")
+    index_buffer = IndexBuffer.from_xml(element)
+
+    assert index_buffer._data is None
+    assert np.array_equal(index_buffer.data, [0, 1, 2, 2, 3, 0])
+    assert index_buffer.data.dtype == np.uint32
+
+    index_buffer.data = np.array([4, 5, 6], dtype=np.uint32)
+    assert np.array_equal(index_buffer.data, [4, 5, 6])
@@ -0,0 +1,158 @@
+import numpy as np
+from numpy.testing import assert_array_equal, assert_allclose
+from mathutils import Vector
+from ..cwxml.bound import (
+    BoundGeometryBVH, PolyBox, PolySphere, PolyCapsule, PolyCylinder, PolyTriangleArray, Material as ColMaterial
+)
+from ..sollumz_properties import SollumzGame, set_import_export_current_game
+from ..sollumz_preferences import get_import_settings
+from ..ybn.ybnexport import BoundPolysBuilder, create_bound_xml_poly_shape
+from ..ybn.ybnimport import create_bvh_obj
+
+
+def test_bound_polys_builder_welds_vertices_in_order():
+    set_import_export_current_game(SollumzGame.GTA)
+    geom_xml = BoundGeometryBVH()
+    polys = BoundPolysBuilder(geom_xml)
+
+    vert_inds = polys.add_vertices(np.array([
+        [1.0, 0.0, 0.0],
+        [-0.0, 0.0, 0.0],
+        [1.0, 0.0, 0.0],
+        [0.0, 0.0, 0.0],
+        [0.0, 1.0, 0.0],
+        [0.0, 0.0, 0.0],
+    ], dtype=np.float32)).reshape((2, 3))
+    polys.add_polygon(PolyTriangleArray(np.zeros(2, dtype=np.uint32), vert_inds))
+
+    box = PolyBox()
+    box.v1 = polys.get_vert_index((0.0, 1.0, 0.0))
+    box.v2 = polys.get_vert_index((2.0, 0.0, 0.0))
+    box.v3 = polys.get_vert_index((1.0, 0.0, 0.0))
+    box.v4 = polys.get_vert_index((2.0, 0.0, 0.0))
+    polys.add_polygon(box)
+
+    vertices = polys.build()
+
+    assert_array_equal(vertices, [
+        [1.0, 0.0, 0.0],
+        [0.0, 0.0, 0.0],
+        [0.0, 1.0, 0.0],
+        [2.0, 0.0, 0.0],
+    ])
+    assert_array_equal(geom_xml.polygons[0].vert_inds, [[0, 1, 0], [1, 2, 1]])
+    assert (box.v1, box.v2, box.v3, box.v4) == (2, 3, 0, 3)
+    assert geom_xml.vertex_colors == []
+
+    polygons_xml = geom_xml.get_element("polygons").to_xml()
+    assert [e.tag for e in polygons_xml] == ["Triangle", "Triangle", "Box"]
+    assert polygons_xml[1].attrib == {"m": "0", "v1": "1", "v2": "2", "v3": "1", "f1": "0", "f2": "0", "f3": "0"}
+
+
+def test_bound_polys_builder_vertex_colors():
+    set_import_export_current_game(SollumzGame.GTA)
+    geom_xml = BoundGeometryBVH()
+    polys = BoundPolysBuilder(geom_xml)
+
+    polys.get_vert_index((0.0, 0.0, 0.0))
+    polys.add_vertices(
+        np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]], dtype=np.float32),
+        np.array([[255, 255, 255, 255], [255, 0, 0, 255]], dtype=np.uint8),
+    )
+
+    vertices = polys.build()
+
+    assert len(vertices) == 2
+    assert geom_xml.vertex_colors == [(255, 255, 255, 255), (255, 0, 0, 255)]
+
+
+def test_merged_primitive_polys_export_unchanged():
+    set_import_export_current_game(SollumzGame.GTA)
+    bvh_xml = BoundGeometryBVH()
+    bvh_xml.materials = [ColMaterial()]
+    bvh_xml.vertices = [
+        Vector((0.0, 0.0, 0.0)), Vector((1.0, 2.0, 0.0)), Vector((0.0, 2.0, 3.0)), Vector((1.0, 0.0, 3.0)),
+        Vector((5.0, 5.0, 5.0)), Vector((-3.0, 1.0, 0.5)), Vector((-3.0, 1.0, 2.5)), Vector((2.0, -4.0, 1.0)),
+    ]
+
+    def _poly(poly_type, radius=None, **vert_inds):
+        poly = poly_type()
+        for name, vert_ind in vert_inds.items():
+            setattr(poly, name, vert_ind)
+        if radius is not None:
+            poly.radius = radius
+        return poly
+
+    input_polys = [
+        _poly(PolyBox, v1=0, v2=1, v3=2, v4=3),
+        _poly(PolySphere, v=4, radius=0.3),
+        _poly(PolySphere, v=0, radius=1.25),
+        _poly(PolyCapsule, v1=5, v2=6, radius=0.4),
+        _poly(PolyCylinder, v1=6, v2=7, radius=0.75),
+    ]
+    bvh_xml.polygons = input_polys
+
+    settings = get_import_settings()
+    settings.ybn_merge_primitive_polys = True
+    try:
+        bvh_obj = create_bvh_obj(bvh_xml)
+    finally:
+        settings.ybn_merge_primitive_polys = False
+
+    # One object per primitive type
+    assert len(bvh_obj.children) == 4
+
+    geom_xml = BoundGeometryBVH()
+    polys = BoundPolysBuilder(geom_xml)
+    for child in bvh_obj.children:
+        create_bound_xml_poly_shape(child, geom_xml, polys)
+    vertices = polys.build()
+
+    def _poly_values(poly, poly_vertices):
+        vert_attrs = BoundPolysBuilder.PRIMITIVE_VERT_ATTRS[type(poly)]
+        verts = [tuple(poly_vertices[getattr(poly, attr)]) for attr in vert_attrs]
+        return type(poly).__name__, verts, getattr(poly, "radius", None)
+
+    expected = sorted(_poly_values(poly, np.array(bvh_xml.vertices)) for poly in input_polys)
+    actual = sorted(_poly_values(poly, vertices) for poly in geom_xml.polygons)
+    assert [(t, r) for t, _, r in actual] == [(t, r) for t, _, r in expected]
+    for (_, actual_verts, _), (_, expected_verts, _) in zip(actual, expected):
+        assert_allclose(actual_verts, expected_verts, atol=1e-6)
+
+
+def test_bound_polys_builder_spatial_sort():
+    set_import_export_current_game(SollumzGame.GTA)
+    geom_xml = BoundGeometryBVH()
+    polys = BoundPolysBuilder(geom_xml)
+
+    # Triangles far apart from each other added in alternating order
+    tri_positions = np.array([
+        [0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0],
+        [9.0, 9.0, 9.0], [10.0, 9.0, 9.0], [9.0, 10.0, 9.0],
+        [1.0, 0.0, 0.0], [1.0, 1.0, 0.0], [0.0, 1.0, 0.0],
+        [10.0, 9.0, 9.0], [10.0, 10.0, 9.0], [9.0, 10.0, 9.0],
+    ], dtype=np.float32)
+    vert_inds = polys.add_vertices(tri_positions).reshape((4, 3))
+    polys.add_polygon(PolyTriangleArray(np.array([0, 1, 2, 3], dtype=np.uint32), vert_inds))
+
+    sphere = PolySphere()
+    sphere.v = polys.get_vert_index((10.0, 0.0, 0.0))
+    sphere.radius = 0.5
+    polys.add_polygon(sphere)
+
+    vertices = polys.build(spatial_sort=True)
+
+    assert [type(poly) for poly in geom_xml.polygons] == [PolyTriangleArray, PolySphere, PolyTriangleArray]
+    near_tris, _, far_tris = geom_xml.polygons
+    assert_array_equal(near_tris.material_inds, [0, 2])
+    assert_array_equal(far_tris.material_inds, [1, 3])
+    assert_array_equal(vertices[sphere.v], [10.0, 0.0, 0.0])
+
+    # Vertices are numbered in the order they are first used
+    assert_array_equal(near_tris.vert_inds, [[0, 1, 2], [1, 3, 2]])
+    assert sphere.v == 4
+    assert_array_equal(far_tris.vert_inds, [[5, 6, 7], [6, 8, 7]])
+    assert_array_equal(vertices[far_tris.vert_inds[1]], tri_positions[9:12])
+
+    span_before, span_after = polys.index_spans
+    assert span_after < span_before
@@ -0,0 +1,142 @@
+import bpy
+import math
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+from ..cwxml.clipdictionary import ChannelsList, ClipsList, ClipAnimationsList
+from ..tools.animationhelper import Track
+from ..ycd.properties import calculate_final_uv_transform_matrix
+from ..ycd.ycdexport import (
+    build_values_channel,
+    build_error_bounded_values_channel,
+    estimate_sequence_data_size,
+    get_action_export_frames,
+    remap_clip_animation_hashes,
+    sequence_data_from_frames_data,
+    sequence_items_from_action,
+)
+from .shared import new_fcurve
+
+
+def test_build_values_channel():
+    static = build_values_channel(np.full(20, 1.5, dtype=np.float32))
+    assert isinstance(static, ChannelsList.StaticFloat)
+    assert static.value == 1.5
+
+    values = np.tile(np.array([0.5, -1.0], dtype=np.float32), 10)
+    indirect = build_values_channel(values)
+    assert isinstance(indirect, ChannelsList.IndirectQuantizeFloat)
+    assert indirect.values == [-1.0, 0.5]
+    assert_array_equal([indirect.values[f] for f in indirect.frames], values)
+    assert indirect.offset == -1.0
+    assert indirect.quantum == 1.0
+
+    values = np.linspace(0.0, 1.0, 20, dtype=np.float32)
+    quantize = build_values_channel(values)
+    assert isinstance(quantize, ChannelsList.QuantizeFloat)
+    assert quantize.values == values.tolist()
+    assert quantize.offset == 0.0
+
+
+def test_sequence_data_from_frames_data_quaternion():
+    frames_data = np.tile(np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32), (10, 1))
+    sequence_data = sequence_data_from_frames_data(Track.BoneRotation, frames_data)
+    assert len(sequence_data.channels) == 1
+    assert isinstance(sequence_data.channels[0], ChannelsList.StaticQuaternion)
+    assert tuple(sequence_data.channels[0].value) == (1.0, 0.0, 0.0, 0.0)
+
+    frames_data[:, 1] = np.linspace(0.0, 0.5, 10)
+    sequence_data = sequence_data_from_frames_data(Track.BoneRotation, frames_data)
+    # Channels in (x, y, z, w) order
+    assert [type(c) for c in sequence_data.channels] == [
+        ChannelsList.QuantizeFloat, ChannelsList.StaticFloat, ChannelsList.StaticFloat, ChannelsList.StaticFloat
+    ]
+    assert sequence_data.channels[3].value == 1.0
+
+
+def test_build_error_bounded_values_channel():
+    values = np.float32(1.0) + np.linspace(0.0, 0.001, 20, dtype=np.float32)
+    static, _ = build_error_bounded_values_channel(values, 0.001)
+    assert isinstance(static, ChannelsList.StaticFloat)
+
+    values = np.repeat(np.array([0.0, 1.0, 0.5, 2.0], dtype=np.float32), 30)
+    values += np.tile(np.array([0.0, 0.0001], dtype=np.float32), 60)
+    indirect, decoded = build_error_bounded_values_channel(values, 0.001)
+    assert isinstance(indirect, ChannelsList.IndirectQuantizeFloat)
+    assert len(indirect.values) == 4
+    for decoded_values in decoded:
+        assert np.abs(decoded_values - values).max() <= 0.001 + 1e-6
+
+
+def test_error_bounded_quaternion_track():
+    angles = np.sin(np.linspace(0.0, 6.0, 200)) * 1.2
+    axis = np.array([0.3, 0.8, 0.5]) / np.linalg.norm([0.3, 0.8, 0.5])
+    frames_data = np.concatenate((np.cos(angles / 2)[:, None], np.sin(angles / 2)[:, None] * axis), axis=1)
+    frames_data = frames_data.astype(np.float32)
+
+    default = sequence_data_from_frames_data(Track.BoneRotation, frames_data)
+    compressed = sequence_data_from_frames_data(Track.BoneRotation, frames_data, math.radians(0.05))
+    assert isinstance(compressed.channels[-1], ChannelsList.CachedQuaternion1)
+    assert compressed.channels[-1].quat_index == 3
+    assert estimate_sequence_data_size(compressed) < estimate_sequence_data_size(default)
+
+
+def test_remap_clip_animation_hashes():
+    shared_hashes = {"anim_copy": "anim"}
+
+    clip = ClipsList.ClipAnimation()
+    clip.animation_hash = "anim_copy"
+    remap_clip_animation_hashes(clip, shared_hashes)
+    assert clip.animation_hash == "anim"
+
+    clip_list = ClipsList.ClipAnimationList()
+    for animation_hash in ("anim_copy", "other"):
+        clip_animation = ClipAnimationsList.ClipAnimation()
+        clip_animation.animation_hash = animation_hash
+        clip_list.animations.append(clip_animation)
+    remap_clip_animation_hashes(clip_list, shared_hashes)
+    assert [a.animation_hash for a in clip_list.animations] == ["anim", "other"]
+
+
+def test_sequence_items_from_action_uv_transforms():
+    material = bpy.data.materials.new("test_export_uv_transforms")
+    action = bpy.data.actions.new("test_export_uv_transforms")
+    try:
+        uv_transforms = material.animation_tracks.uv_transforms
+        for mode in ("TRANSLATE", "SCALE", "ROTATE"):
+            uv_transform = uv_transforms.add()
+            uv_transform.update_uv_transform_matrix_on_change = False
+            uv_transform.mode = mode
+        uv_transforms[2].rotation = 0.5
+
+        for data_path, index, values in (
+            ("animation_tracks.uv_transforms[0].translation", 0, (0.0, 1.0)),
+            ("animation_tracks.uv_transforms[0].translation", 1, (-0.5, 0.25)),
+            ("animation_tracks.uv_transforms[1].scale", 0, (1.0, 2.0)),
+        ):
+            fcurve = new_fcurve(action, data_path, index)
+            for frame, value in zip((0.0, 10.0), values):
+                fcurve.keyframe_points.insert(frame, value).interpolation = "LINEAR"
+            fcurve.update()
+
+        sequence_items = sequence_items_from_action(action, material)
+
+        # The UV transforms defined by the user are left untouched
+        assert [t.mode for t in uv_transforms] == ["TRANSLATE", "SCALE", "ROTATE"]
+        assert tuple(uv_transforms[0].translation) == (0.0, 0.0)
+        assert tuple(uv_transforms[1].scale) == (1.0, 1.0)
+        assert uv_transforms[2].rotation == 0.5
+
+        expected_uv0, expected_uv1 = [], []
+        for frame in get_action_export_frames(action).tolist():
+            uv_transforms[0].translation = (0.0 + frame / 10.0, -0.5 + 0.75 * frame / 10.0)
+            uv_transforms[1].scale = (1.0 + frame / 10.0, 1.0)
+            mat = calculate_final_uv_transform_matrix(uv_transforms)
+            expected_uv0.append(mat[0])
+            expected_uv1.append(mat[1])
+
+        assert list(sequence_items.keys()) == [0]
+        assert_allclose(sequence_items[0][Track.UV0], expected_uv0, atol=1e-5)
+        assert_allclose(sequence_items[0][Track.UV1], expected_uv1, atol=1e-5)
+    finally:
+        bpy.data.actions.remove(action)
+        bpy.data.materials.remove(material)
@@ -0,0 +1,57 @@
+import numpy as np
+from numpy.testing import assert_array_equal
+from ..cwxml.clipdictionary import Animation
+from ..tools.animationhelper import Track, TrackFormatMap
+from ..ycd.ycdexport import sequence_data_from_frames_data
+from ..ycd.ycdimport import combine_sequences_and_build_action_data, reduce_keyframes
+
+
+def test_combine_sequences_and_build_action_data():
+    num_frames = 25
+    angles = np.linspace(0.0, 2.0, num_frames)
+    tracks = {
+        Track.BonePosition: np.stack((angles, np.zeros(num_frames), angles * 2.0), axis=1).astype(np.float32),
+        Track.BoneRotation: np.stack(
+            (np.cos(angles / 2), np.sin(angles / 2), np.zeros(num_frames), np.zeros(num_frames)), axis=1
+        ).astype(np.float32),
+    }
+
+    animation = Animation()
+    animation.frame_count = num_frames
+    animation.sequence_frame_limit = 10
+    for track in tracks:
+        bone_id = Animation.BoneIdList.BoneId()
+        bone_id.bone_id = 1
+        bone_id.track = track.value
+        bone_id.format = TrackFormatMap[track].value
+        animation.bone_ids.append(bone_id)
+    for start in range(0, num_frames, animation.sequence_frame_limit):
+        sequence = Animation.SequenceList.Sequence()
+        for track, frames_data in tracks.items():
+            sequence.sequence_data.append(
+                sequence_data_from_frames_data(track, frames_data[start:start + animation.sequence_frame_limit])
+            )
+        animation.sequences.append(sequence)
+
+    action_data = combine_sequences_and_build_action_data(animation)
+
+    assert list(action_data.keys()) == [1]
+    assert list(action_data[1].keys()) == list(tracks.keys())
+    for track, frames_data in tracks.items():
+        assert_array_equal(action_data[1][track], frames_data)
+
+
+def test_reduce_keyframes():
+    values = np.array([
+        [0.0, 1.0, 2.0, 3.0, 4.0, 5.0],
+        [0.0, 0.0, 1.0, 0.0, 0.0, 0.0],
+        [0.0, 0.05, 0.0, 0.05, 0.0, 0.05],
+    ], dtype=np.float32)
+
+    keep = reduce_keyframes(values, 0.1)
+
+    assert_array_equal(keep, [
+        [True, False, False, False, False, True],
+        [True, True, True, True, False, True],
+        [True, False, False, False, False, True],
+    ])
@@ -0,0 +1,33 @@
+import bpy
+import numpy as np
+from numpy.testing import assert_allclose
+from ..ycd.properties import (
+    UVTransformModes,
+    calculate_final_uv_transform_matrix,
+    calculate_final_uv_transform_matrices,
+)
+
+
+def test_calculate_final_uv_transform_matrices():
+    rng = np.random.default_rng(0)
+    material = bpy.data.materials.new("test_uv_transforms")
+    try:
+        uv_transforms = material.animation_tracks.uv_transforms
+        for mode, *_ in UVTransformModes:
+            uv_transform = uv_transforms.add()
+            uv_transform.update_uv_transform_matrix_on_change = False
+            uv_transform.mode = mode
+
+        values = rng.normal(size=(len(uv_transforms), 10, 9))
+        values[:, 0, 7:9] = 0.0  # reflect with zero-length axis
+
+        mats = calculate_final_uv_transform_matrices([t.mode for t in uv_transforms], values)
+
+        for frame in range(values.shape[1]):
+            for uv_transform, transform_values in zip(uv_transforms, values[:, frame]):
+                uv_transform_values = uv_transform.values_array()
+                for i, value in enumerate(transform_values.tolist()):
+                    uv_transform_values[i] = value
+            assert_allclose(mats[frame], calculate_final_uv_transform_matrix(uv_transforms), atol=1e-5)
+    finally:
+        bpy.data.materials.remove(material)
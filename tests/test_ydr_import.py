@@ -0,0 +1,35 @@
+from xml.etree import ElementTree as ET
+from ..cwxml.drawable import Shader, ShaderGroup
+from ..sollumz_properties import SollumzGame, set_import_export_current_game
+from ..ydr.ydrimport import get_shader_material_key
+
+RDR_SHADER_XML = """
+<Item>
+  <Name>default</Name>
+  <DrawBucket value="0" />
+  <DrawBucketFlag value="false" />
+  <Parameters>
+    <BufferSizes>16</BufferSizes>
+    <Items>
+      <Item name="tint" type="CBuffer" buffer="0" offset="0" length="16" x="1" y="{y}" z="{z}" w="{w}" />
+    </Items>
+  </Parameters>
+</Item>
+"""
+
+
+def test_get_shader_material_key_rdr_cbuffer_values():
+    set_import_export_current_game(SollumzGame.RDR)
+    try:
+        shader_group = ShaderGroup()
+        shader = Shader.from_xml(ET.fromstring(RDR_SHADER_XML.format(y=2, z=3, w=4)))
+        key = get_shader_material_key(0, shader, shader_group)
+
+        same_shader = Shader.from_xml(ET.fromstring(RDR_SHADER_XML.format(y=2, z=3, w=4)))
+        assert get_shader_material_key(0, same_shader, shader_group) == key
+
+        for y, z, w in ((5, 3, 4), (2, 5, 4), (2, 3, 5)):
+            other_shader = Shader.from_xml(ET.fromstring(RDR_SHADER_XML.format(y=y, z=z, w=w)))
+            assert get_shader_material_key(0, other_shader, shader_group) != key
+    finally:
+        set_import_export_current_game(SollumzGame.GTA)
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import bpy
+from bpy.app.handlers import persistent
 import math
+import numpy as np
+from numpy.typing import NDArray
 from sys import float_info
 from mathutils import Quaternion, Vector, Euler, Matrix
 from enum import IntFlag, IntEnum
@@ -9,8 +12,9 @@ from ..sollumz_properties import MaterialType, SollumType
 from ..tools import jenkhash
 from .blenderhelper import build_name_bone_map, build_bone_map, get_data_obj
 from .meshhelper import get_uv_map_name
-from typing import Tuple
-from collections.abc import Iterator
+from .fcurvehelper import Keyframes, read_keyframes, write_keyframes_points
+from typing import Tuple, NamedTuple, Optional
+from collections.abc import Iterator, Iterable
 from ..cwxml.shader import ShaderManager
 
 from .. import logger
@@ -171,29 +175,26 @@ TrackToPropertyNameMap = {
 PropertyNameToTrackMap = {v: k for k, v in TrackToPropertyNameMap.items()}
 
 
-def get_quantum_and_min_val(nums):
-    min_val = float_info.max
-    max_val = float_info.min
-    min_delta = float_info.max
-    last_val = 0
-
-    for value in nums:
-        min_val = min(min_val, value)
-        max_val = max(max_val, value)
-
-        if value != last_val:
-            min_delta = min(min_delta, abs(value - last_val))
+def get_quantum_and_min_val(nums: NDArray) -> tuple[float, float]:
+    """Gets the min value and the quantum used to quantize ``nums``. The quantum is the smallest change between
+    consecutive values, starting from 0, but at least the range of values over 2^20.
+    """
+    nums = np.asarray(nums, dtype=np.float64)
+    if len(nums) == 0:
+        return float_info.max, 0.0
 
-        last_val = value
+    min_val = nums.min()
+    max_val = max(nums.max(), float_info.min)
 
-    if min_delta == float_info.max:
-        min_delta = 0
+    deltas = np.abs(np.diff(nums, prepend=0.0))
+    deltas = deltas[deltas != 0.0]
+    min_delta = deltas.min() if len(deltas) > 0 else 0.0
 
     range_value = max_val - min_val
     min_quant = range_value / 1048576
     quantum = max(min_delta, min_quant)
 
-    return min_val, quantum
+    return float(min_val), float(quantum)
 
 
 def decompose_uv_affine_matrix(
@@ -265,76 +266,127 @@ def calculate_bone_space_transform_matrix(old_pose_bone, new_pose_bone):
     return new_mat.inverted() @ old_mat
 
 
-def transform_bone_location_space(fcurves, old_pose_bone, new_pose_bone):
+def quaternions_multiply(a: NDArray, b: NDArray) -> NDArray:
+    """Multiply arrays of quaternions in (w, x, y, z) order, ``a @ b``. Either can be a single quaternion."""
+    aw, ax, ay, az = np.moveaxis(a, -1, 0)
+    bw, bx, by, bz = np.moveaxis(b, -1, 0)
+    return np.stack((
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ), axis=-1)
+
+
+def quaternions_rotate(quats: NDArray, rotation: NDArray, local: bool = False) -> NDArray:
+    """Rotate an array of quaternions in (w, x, y, z) order, like ``Quaternion.rotate`` does one at a time. The rotation
+    is applied in parent space, or in the space of each quaternion if ``local`` is set. As with ``Quaternion.rotate``,
+    the result has a non-negative W and keeps the length of the input quaternion.
+    """
+    lengths = np.linalg.norm(quats, axis=-1, keepdims=True)
+    unit_quats = np.divide(quats, lengths, out=np.tile((1.0, 0.0, 0.0, 0.0), (len(quats), 1)), where=lengths > 0)
+    rotated = quaternions_multiply(unit_quats, rotation) if local else quaternions_multiply(rotation, unit_quats)
+    rotated[rotated[:, 0] < 0.0] *= -1.0
+    return rotated * lengths
+
+
+def quaternions_make_continuous(quats: NDArray) -> NDArray:
+    """Flip the sign of quaternions in-place so the dot product of each quaternion with the previous one is never
+    negative. Same as negating frame by frame when ``prev.dot(quat) < 0``. Returns ``quats``.
+    """
+    if len(quats) < 2:
+        return quats
+
+    dots = np.sum(quats[:-1] * quats[1:], axis=1)
+    # A quaternion is flipped if its dot product with the, possibly flipped, previous one is negative. Flips accumulate
+    # along the sequence, except after a zero dot product, where the sign is never flipped and the sequence restarts
+    flips = np.concatenate(((False,), dots < 0.0))
+    restarts = np.concatenate(((True,), dots == 0.0))
+    num_flips = np.cumsum(flips)
+    num_flips -= num_flips[np.maximum.accumulate(np.where(restarts, np.arange(len(quats)), 0))]
+    quats[num_flips % 2 == 1] *= -1.0
+    return quats
+
+
+def _read_fcurves_keyframes(fcurves: list[bpy.types.FCurve]) -> tuple[list[Keyframes], NDArray[np.float64]]:
+    """Reads the keyframes of the F-curves of a vector or quaternion property. Returns them and their values as a
+    (3, K, C) array with the values of the keyframes, the left handles and the right handles."""
+    keyframes = [read_keyframes(fcurve) for fcurve in fcurves]
+    num_keyframes = len(keyframes[0].co)
+    assert all(len(k.co) == num_keyframes for k in keyframes), "TODO: Handle different number of keyframes for each axis"
+    assert all(np.array_equal(k.co[:, 0], keyframes[0].co[:, 0]) for k in keyframes), "TODO: Handle different keyframe times"
+
+    values = np.stack([
+        np.stack([k.co[:, 1] for k in keyframes], axis=1),
+        np.stack([k.handle_left[:, 1] for k in keyframes], axis=1),
+        np.stack([k.handle_right[:, 1] for k in keyframes], axis=1),
+    ]).astype(np.float64)
+    return keyframes, values
+
+
+def _write_fcurves_keyframes(fcurves: list[bpy.types.FCurve], keyframes: list[Keyframes], values: NDArray[np.float64]):
+    """Writes back the (3, K, C) values returned by ``_read_fcurves_keyframes``."""
+    co_values, handle_left_values, handle_right_values = values
+    for i, (fcurve, fcurve_keyframes) in enumerate(zip(fcurves, keyframes)):
+        fcurve_keyframes.co[:, 1] = co_values[:, i]
+        fcurve_keyframes.handle_left[:, 1] = handle_left_values[:, i]
+        fcurve_keyframes.handle_right[:, 1] = handle_right_values[:, i]
+        write_keyframes_points(fcurve, fcurve_keyframes)
+
+
+def _rotate_quaternion_fcurves(fcurves: list[bpy.types.FCurve], rotation: NDArray, local: bool = False):
+    """Rotates the quaternion F-curves, like ``Quaternion.rotate`` on each keyframe, and keeps consecutive keyframes in
+    the same hemisphere. Handles are rotated and flipped along with their keyframe."""
+    keyframes, values = _read_fcurves_keyframes(fcurves)
+
+    # Rotating is linear on the quaternion components, so the handles can be rotated the same way
+    values = quaternions_multiply(values, rotation) if local else quaternions_multiply(rotation, values)
+    values *= np.where(values[0, :, :1] < 0.0, -1.0, 1.0)  # non-negative W, same as Quaternion.rotate
+
+    # Blender interpolates quaternions linearly and component-wise which can cause flickering
+    # when there is a sign change. See longer rant in ycdexport.py
+    continuous = quaternions_make_continuous(values[0].copy())
+    values *= np.where(np.any(continuous != values[0], axis=1, keepdims=True), -1.0, 1.0)
+
+    _write_fcurves_keyframes(fcurves, keyframes, values)
+
+
+def transform_bone_location_space(fcurves, old_pose_bone, new_pose_bone, transform_mat: Matrix | None = None):
     """
     Converts the vector3 F-curves from the old pose bone's space to the new pose bone's space.
     Either bone can be None, meaning convert from/to the original local space (as stored in the animation channels).
+    ``transform_mat`` can be given to skip calculating the bone-space matrix.
     """
-    x = fcurves[0]
-    y = fcurves[1]
-    z = fcurves[2]
-
-    if x is None:
+    if any(fcurve is None for fcurve in fcurves):
         return
 
-    assert len(x.keyframe_points) == len(y.keyframe_points) and len(x.keyframe_points) == len(z.keyframe_points), "TODO: Handle different number of keyframes for each axis"
-
-    transform_mat = calculate_bone_space_transform_matrix(old_pose_bone, new_pose_bone)
+    if transform_mat is None:
+        transform_mat = calculate_bone_space_transform_matrix(old_pose_bone, new_pose_bone)
 
-    for x_kfp, y_kfp, z_kfp in zip(x.keyframe_points, y.keyframe_points, z.keyframe_points):
-        x_co, y_co, z_co = x_kfp.co, y_kfp.co, z_kfp.co
-        assert x_co[0] == y_co[0] and x_co[0] == z_co[0], "TODO: Handle different keyframe times"
+    keyframes, values = _read_fcurves_keyframes(fcurves)
 
-        old_vec = Vector((x_co[1], y_co[1], z_co[1]))
-        new_vec = transform_mat @ old_vec
-        x_co[1], y_co[1], z_co[1] = new_vec[0], new_vec[1], new_vec[2]
+    # All keyframes and handles at once. Same as `transform_mat @ Vector(...)` on each one
+    mat = np.array(transform_mat)
+    values = values @ mat[:3, :3].T + mat[:3, 3]
 
-        x_kfp.co, y_kfp.co, z_kfp.co = x_co, y_co, z_co
+    _write_fcurves_keyframes(fcurves, keyframes, values)
 
-    x.update()
-    y.update()
-    z.update()
 
-
-def transform_bone_rotation_quaternion_space(fcurves, old_pose_bone, new_pose_bone):
+def transform_bone_rotation_quaternion_space(
+    fcurves, old_pose_bone, new_pose_bone, transform_mat: Matrix | None = None
+):
     """
     Converts the quaternion F-curves from the old pose bone's space to the new pose bone's space.
     Either bone can be None, meaning convert from/to the original local space (as stored in the animation channels).
+    ``transform_mat`` can be given to skip calculating the bone-space matrix.
     """
-    w = fcurves[0]
-    x = fcurves[1]
-    y = fcurves[2]
-    z = fcurves[3]
-
-    if w is None:
+    if any(fcurve is None for fcurve in fcurves):
         return
 
-    assert len(x.keyframe_points) == len(y.keyframe_points) and len(x.keyframe_points) == len(z.keyframe_points) and len(x.keyframe_points) == len(w.keyframe_points), "TODO: Handle different number of keyframes for each axis"
-
-    transform_mat = calculate_bone_space_transform_matrix(old_pose_bone, new_pose_bone)
-
-    prev_quat = None
-    for w_kfp, x_kfp, y_kfp, z_kfp in zip(w.keyframe_points, x.keyframe_points, y.keyframe_points, z.keyframe_points):
-        w_co, x_co, y_co, z_co = w_kfp.co, x_kfp.co, y_kfp.co, z_kfp.co
-        assert x_co[0] == y_co[0] and x_co[0] == z_co[0] and x_co[0] == w_co[0], "TODO: Handle different keyframe times"
-
-        quat = Quaternion((w_co[1], x_co[1], y_co[1], z_co[1]))
-        quat.rotate(transform_mat)
-        if prev_quat is not None and prev_quat.dot(quat) < 0:
-            # Blender interpolates quaternions linearly and component-wise which can cause flickering
-            # when there is a sign change. See longer rant in ycdexport.py
-            quat *= -1
+    if transform_mat is None:
+        transform_mat = calculate_bone_space_transform_matrix(old_pose_bone, new_pose_bone)
 
-        w_co[1], x_co[1], y_co[1], z_co[1] = quat[0], quat[1], quat[2], quat[3]
-
-        w_kfp.co, x_kfp.co, y_kfp.co, z_kfp.co = w_co, x_co, y_co, z_co
-
-        prev_quat = quat
-
-    w.update()
-    x.update()
-    y.update()
-    z.update()
+    _rotate_quaternion_fcurves(fcurves, np.array(transform_mat.to_quaternion()))
 
 
 def transform_camera_rotation_quaternion(fcurves, old_camera, new_camera):
@@ -342,47 +394,17 @@ def transform_camera_rotation_quaternion(fcurves, old_camera, new_camera):
     Blender cameras aim down the -Z axis, but RAGE cameras aim down the +Y axis.
     Rotate the quaternion F-curves by 90 degrees around the X axis to compensate.
     """
-    w = fcurves[0]
-    x = fcurves[1]
-    y = fcurves[2]
-    z = fcurves[3]
-
-    if w is None:
+    if any(fcurve is None for fcurve in fcurves):
         return
 
     # changing between blender cameras or non-camera targets, doesn't need to be converted
     if (old_camera is not None and new_camera is not None) or (old_camera is None and new_camera is None):
         return
 
-    assert len(x.keyframe_points) == len(y.keyframe_points) and len(x.keyframe_points) == len(z.keyframe_points) and len(x.keyframe_points) == len(w.keyframe_points), "TODO: Handle different number of keyframes for each axis"
-
     # if new camera is None, we convert from Blender to RAGE; otherwise from RAGE to Blender
+    # Rotating around the local X axis of each keyframe
     angle_delta = math.radians(-90.0 if new_camera is None else 90.0)
-    x_axis = Vector((1.0, 0.0, 0.0))
-
-    prev_quat = None
-    for w_kfp, x_kfp, y_kfp, z_kfp in zip(w.keyframe_points, x.keyframe_points, y.keyframe_points, z.keyframe_points):
-        w_co, x_co, y_co, z_co = w_kfp.co, x_kfp.co, y_kfp.co, z_kfp.co
-        assert x_co[0] == y_co[0] and x_co[0] == z_co[0] and x_co[0] == w_co[0], "TODO: Handle different keyframe times"
-
-        quat = Quaternion((w_co[1], x_co[1], y_co[1], z_co[1]))
-        x_axis_local = quat @ x_axis
-        quat.rotate(Quaternion(x_axis_local, angle_delta))
-        if prev_quat is not None and prev_quat.dot(quat) < 0:
-            # Blender interpolates quaternions linearly and component-wise which can cause flickering
-            # when there is a sign change. See longer rant in ycdexport.py
-            quat *= -1
-
-        w_co[1], x_co[1], y_co[1], z_co[1] = quat[0], quat[1], quat[2], quat[3]
-
-        w_kfp.co, x_kfp.co, y_kfp.co, z_kfp.co = w_co, x_co, y_co, z_co
-
-        prev_quat = quat
-
-    w.update()
-    x.update()
-    y.update()
-    z.update()
+    _rotate_quaternion_fcurves(fcurves, np.array(Quaternion((1.0, 0.0, 0.0), angle_delta)), local=True)
 
 
 def add_driver_variable_obj_prop(fcurve, name, obj, obj_type, prop_data_path):
@@ -657,22 +679,79 @@ def get_id_and_track_from_track_data_path(
     return id, track
 
 
-def retarget_animation(animation_obj: bpy.types.Object, old_target_id: bpy.types.ID, new_target_id: bpy.types.ID):
-    if isinstance(old_target_id, bpy.types.Armature):
-        old_bone_map = build_bone_map(get_data_obj(old_target_id))
-        old_bone_name_map = build_name_bone_map(get_data_obj(old_target_id))
-    else:
-        old_bone_map = None
-        old_bone_name_map = None
-
-    new_is_armature = isinstance(new_target_id, bpy.types.Armature)
-    if new_is_armature:
-        new_bone_map = build_bone_map(get_data_obj(new_target_id))
-    else:
-        new_bone_map = None
+class RetargetCache:
+    """Data shared when retargeting many animations at once, so it is only computed once: the bone maps of each target,
+    the bone-space transform of each bone, and the retargeted data path of each F-curve data path."""
+
+    def __init__(self):
+        self._bone_maps = {}
+        self._transform_mats = {}
+        self._data_paths = {}
+
+    def get_bone_maps(self, target_id: bpy.types.ID) -> tuple[dict | None, dict | None]:
+        """Returns the bone ID -> pose bone and bone name -> bone ID maps of the target, if it is an armature."""
+        if target_id not in self._bone_maps:
+            if isinstance(target_id, bpy.types.Armature):
+                armature_obj = get_data_obj(target_id)
+                self._bone_maps[target_id] = (build_bone_map(armature_obj), build_name_bone_map(armature_obj))
+            else:
+                self._bone_maps[target_id] = (None, None)
+
+        return self._bone_maps[target_id]
+
+    def get_bone_space_transform_matrix(
+        self, bone_id: int, old_target_id: bpy.types.ID, new_target_id: bpy.types.ID
+    ) -> Matrix:
+        key = (bone_id, old_target_id, new_target_id)
+        transform_mat = self._transform_mats.get(key, None)
+        if transform_mat is None:
+            old_bone_map, _ = self.get_bone_maps(old_target_id)
+            new_bone_map, _ = self.get_bone_maps(new_target_id)
+            old_bone = old_bone_map.get(bone_id, None) if old_bone_map is not None else None
+            new_bone = new_bone_map.get(bone_id, None) if new_bone_map is not None else None
+            transform_mat = calculate_bone_space_transform_matrix(old_bone, new_bone)
+            self._transform_mats[key] = transform_mat
+
+        return transform_mat
+
+    def get_retargeted_data_path(
+        self, data_path: str, old_target_id: bpy.types.ID, new_target_id: bpy.types.ID
+    ) -> tuple[str, int | str, str]:
+        """Returns the data path in the new target form, and the bone ID and property path of the canonical form."""
+        key = (data_path, old_target_id, new_target_id)
+        result = self._data_paths.get(key, None)
+        if result is None:
+            _, old_bone_name_map = self.get_bone_maps(old_target_id)
+            new_bone_map, _ = self.get_bone_maps(new_target_id)
+            canon_data_path = track_data_path_to_canonical_form(data_path, old_target_id, old_bone_name_map)
+            new_data_path = track_data_path_to_target_form(canon_data_path, new_target_id, new_bone_map)
+
+            data_path_parts = canon_data_path.split('"')
+            bone_id = data_path_parts[1]
+            if bone_id.startswith("#"):
+                bone_id = int(bone_id[1:])
+            prop_path = data_path_parts[2]
+
+            result = (new_data_path, bone_id, prop_path)
+            self._data_paths[key] = result
+
+        return result
+
+
+def retarget_animation(
+    animation_obj: bpy.types.Object,
+    old_target_id: bpy.types.ID,
+    new_target_id: bpy.types.ID,
+    cache: RetargetCache | None = None,
+    setup_target: bool = True,
+):
+    """Changes the target of the animation action, converting its F-curves to the new target. When retargeting many
+    animations, pass the same ``cache`` to all of them and ``setup_target`` only once, or use ``retarget_animations``.
+    """
+    if cache is None:
+        cache = RetargetCache()
 
-    new_is_camera = isinstance(new_target_id, bpy.types.Camera)
-    new_is_material = isinstance(new_target_id, bpy.types.Material)
+    new_bone_map, _ = cache.get_bone_maps(new_target_id)
 
     # bone_id -> [fcurves]
     bone_locations_to_transform = {}
@@ -696,19 +775,9 @@ def retarget_animation(animation_obj: bpy.types.Object, old_target_id: bpy.types
             group.name = bone.name
 
     for fcurve in action_fcurves(action):
-        # TODO: can we somehow store the track ID in the F-Curve to avoid parsing the data paths?
-        data_path = fcurve.data_path
-
-        canon_data_path = track_data_path_to_canonical_form(data_path, old_target_id, old_bone_name_map)
-
-        data_path = track_data_path_to_target_form(canon_data_path, new_target_id, new_bone_map)
+        data_path, bone_id, prop_path = cache.get_retargeted_data_path(fcurve.data_path, old_target_id, new_target_id)
 
         # check if track needs to be transformed
-        data_path_parts = canon_data_path.split('"')
-        bone_id = data_path_parts[1]
-        if bone_id.startswith("#"):
-            bone_id = int(bone_id[1:])
-        prop_path = data_path_parts[2]
         if prop_path == "].location":
             if bone_id not in bone_locations_to_transform:
                 bone_locations_to_transform[bone_id] = [None, None, None]
@@ -723,32 +792,53 @@ def retarget_animation(animation_obj: bpy.types.Object, old_target_id: bpy.types
             camera_rotations_to_transform[bone_id][fcurve.array_index] = fcurve
 
         # print(f"<{fcurve.data_path}> -> <{data_path}>")
-        fcurve.data_path = data_path
+        if fcurve.data_path != data_path:
+            fcurve.data_path = data_path
 
     # perform required transformations
     for bone_id, fcurves in bone_locations_to_transform.items():
-        old_bone = old_bone_map.get(bone_id, None) if old_bone_map is not None else None
-        new_bone = new_bone_map.get(bone_id, None) if new_bone_map is not None else None
-        transform_bone_location_space(fcurves, old_bone, new_bone)
+        transform_mat = cache.get_bone_space_transform_matrix(bone_id, old_target_id, new_target_id)
+        transform_bone_location_space(fcurves, None, None, transform_mat)
 
     for bone_id, fcurves in bone_rotations_to_transform.items():
-        old_bone = old_bone_map.get(bone_id, None) if old_bone_map is not None else None
-        new_bone = new_bone_map.get(bone_id, None) if new_bone_map is not None else None
-        transform_bone_rotation_quaternion_space(fcurves, old_bone, new_bone)
+        transform_mat = cache.get_bone_space_transform_matrix(bone_id, old_target_id, new_target_id)
+        transform_bone_rotation_quaternion_space(fcurves, None, None, transform_mat)
 
     for bone_id, fcurves in camera_rotations_to_transform.items():
         old_camera = old_target_id if isinstance(old_target_id, bpy.types.Camera) else None
         new_camera = new_target_id if isinstance(new_target_id, bpy.types.Camera) else None
         transform_camera_rotation_quaternion(fcurves, old_camera, new_camera)
 
-    if new_is_armature:
-        setup_armature_for_animation(new_target_id)
+    if setup_target:
+        setup_target_for_animation(new_target_id)
+
+
+def retarget_animations(animations: Iterable[tuple[bpy.types.Object, bpy.types.ID]], new_target_id: bpy.types.ID):
+    """Retargets many animations, given as (animation object, old target) pairs, to the same new target in one pass.
+    The bone maps, bone-space transforms and data paths are computed once for all of them, and the new target is set
+    up only once."""
+    cache = RetargetCache()
+    any_retargeted = False
+    for animation_obj, old_target_id in animations:
+        if old_target_id == new_target_id or not animation_obj.animation_properties.action:
+            continue
+
+        retarget_animation(animation_obj, old_target_id, new_target_id, cache, setup_target=False)
+        any_retargeted = True
+
+    if any_retargeted:
+        setup_target_for_animation(new_target_id)
+
 
-    if new_is_camera:
-        setup_camera_for_animation(new_target_id)
+def setup_target_for_animation(target_id: bpy.types.ID):
+    if isinstance(target_id, bpy.types.Armature):
+        setup_armature_for_animation(target_id)
 
-    if new_is_material:
-        setup_material_for_animation(new_target_id)
+    if isinstance(target_id, bpy.types.Camera):
+        setup_camera_for_animation(target_id)
+
+    if isinstance(target_id, bpy.types.Material):
+        setup_material_for_animation(target_id)
 
 
 def get_target_from_id(target_id: bpy.types.ID) -> bpy.types.ID:
@@ -775,54 +865,192 @@ def is_any_sollumz_animation_obj(obj: bpy.types.Object) -> bool:
                                SollumType.CLIPS}
 
 
-def update_uv_clip_hash(clip_obj) -> bool:
+class UVClipHashSource(NamedTuple):
+    """The objects a UV clip hash is calculated from, and their values when it was last calculated."""
+    model_obj: bpy.types.Object
+    """Drawable or fragment whose name is hashed."""
+    material: bpy.types.Material
+    model_name: str
+    material_index: int
+
+
+class UVClipHashLookup:
+    """Maps materials to the drawable models that use them. Built once so the hash of many UV clips can be calculated
+    without going through all meshes and objects for each one."""
+
+    def __init__(self):
+        self.material_meshes: dict[bpy.types.Material, list[bpy.types.Mesh]] = {}
+        for mesh in bpy.data.meshes:
+            for material in set(mesh.materials):
+                if material is not None:
+                    self.material_meshes.setdefault(material, []).append(mesh)
+
+        self.mesh_drawable_models: dict[bpy.types.Mesh, list[bpy.types.Object]] = {}
+        for obj in bpy.data.objects:
+            if obj.sollum_type == SollumType.DRAWABLE_MODEL and obj.data is not None:
+                self.mesh_drawable_models.setdefault(obj.data, []).append(obj)
+
+    def find_source(self, target: bpy.types.Material, report: bool = True) -> Optional[UVClipHashSource]:
+        meshes = self.material_meshes.get(target, [])
+        if len(meshes) == 0:
+            if report:
+                logger.error(f"Material '{target.name}' is not used by any mesh.")
+            return None
+        elif len(meshes) > 1 and report:
+            logger.warning(f"Material is used by more than one mesh. '{meshes[0].name}' will be used.")
+
+        mesh = meshes[0]
+        drawable_models = self.mesh_drawable_models.get(mesh, [])
+        if len(drawable_models) == 0:
+            if report:
+                logger.error(f"Material '{target.name}' is not used by any drawable model.")
+            return None
+        elif len(drawable_models) > 1 and report:
+            logger.warning(
+                f"Material is used by more than one drawable model. '{drawable_models[0].name}' will be used.")
+
+        drawable_model = drawable_models[0]
+        if drawable_model.parent is None:
+            if report:
+                logger.error(f"Drawable model '{drawable_model.name}' has no parent.")
+            return None
+
+        parent = None
+        temp_parent_obj = drawable_model
+        while temp_parent_obj.parent:
+            temp_parent_obj = temp_parent_obj.parent
+            if temp_parent_obj.sollum_type == SollumType.DRAWABLE or temp_parent_obj.sollum_type == SollumType.FRAGMENT:
+                parent = temp_parent_obj
+            else:
+                break
+
+        if parent is None:
+            if report:
+                logger.error(f"Drawable model '{drawable_model.name}' is not part of a drawable or fragment.")
+            return None
+
+        return UVClipHashSource(parent, target, parent.name, target.shader_properties.index)
+
+
+# UV clips whose hash is kept up to date when the model is renamed or the material index changes
+_uv_clip_hash_sources: dict[bpy.types.Object, UVClipHashSource] = {}
+
+
+def calculate_uv_clip_hash(model_name_hash: int, material_index: int) -> str:
+    clip_hash = model_name_hash + (material_index + 1)
+    return f"hash_{clip_hash:08X}"
+
+
+def get_uv_clip_target(clip_obj: bpy.types.Object, report: bool = True) -> Optional[bpy.types.Material]:
     if len(clip_obj.clip_properties.animations) == 0:
-        logger.error(f"Clip '{clip_obj.name}' has no animations.")
-        return False
+        if report:
+            logger.error(f"Clip '{clip_obj.name}' has no animations.")
+        return None
 
     animation_obj = clip_obj.clip_properties.animations[0].animation
-    target = animation_obj.animation_properties.get_target()
+    target = animation_obj.animation_properties.get_target() if animation_obj is not None else None
     if not isinstance(target, bpy.types.Material):
-        logger.error(f"Animation target is not a material.")
-        return False
-
-    meshes = [obj for obj in bpy.data.meshes if obj.user_of_id(target)]
-    if len(meshes) == 0:
-        logger.error(f"Material '{target.name}' is not used by any mesh.")
-        return False
-    elif len(meshes) > 1:
-        logger.warning(f"Material is used by more than one mesh. '{meshes[0].name}' will be used.")
-
-    mesh = meshes[0]
-    drawable_models = [o for o in bpy.data.objects if o.sollum_type == SollumType.DRAWABLE_MODEL and o.data == mesh]
-    if len(drawable_models) == 0:
-        logger.error(f"Material '{target.name}' is not used by any drawable model.")
-        return False
-    elif len(drawable_models) > 1:
-        logger.warning(f"Material is used by more than one drawable model. '{drawable_models[0].name}' will be used.")
-
-    drawable_model = drawable_models[0]
-    if drawable_model.parent is None:
-        logger.error(f"Drawable model '{drawable_model.name}' has no parent.")
-        return False
-
-    parent = None
-    temp_parent_obj = drawable_model
-    while temp_parent_obj.parent:
-        temp_parent_obj = temp_parent_obj.parent
-        if temp_parent_obj.sollum_type == SollumType.DRAWABLE or temp_parent_obj.sollum_type == SollumType.FRAGMENT:
-            parent = temp_parent_obj
-        else:
-            break
+        if report:
+            logger.error(f"Animation target is not a material.")
+        return None
+
+    return target
+
+
+def update_uv_clip_hash(clip_obj, lookup: Optional[UVClipHashLookup] = None) -> bool:
+    return update_uv_clip_hashes([clip_obj], lookup) == 1
+
+
+def update_uv_clip_hashes(clip_objs: Iterable[bpy.types.Object], lookup: Optional[UVClipHashLookup] = None) -> int:
+    """Calculate the hash of the UV clips from their target material and model name. The clips are then tracked so
+    their hash is updated when any of these change. Returns the number of clips updated.
+    """
+    clip_sources = []
+    for clip_obj in clip_objs:
+        target = get_uv_clip_target(clip_obj)
+        if target is None:
+            continue
+
+        if lookup is None:
+            lookup = UVClipHashLookup()
+
+        source = lookup.find_source(target)
+        if source is not None:
+            clip_sources.append((clip_obj, source))
+
+    model_name_hashes = jenkhash.GenerateMany(source.model_name for _, source in clip_sources).tolist()
+    for (clip_obj, source), model_name_hash in zip(clip_sources, model_name_hashes):
+        clip_obj.clip_properties.hash = calculate_uv_clip_hash(model_name_hash, source.material_index)
+        _uv_clip_hash_sources[clip_obj] = source
+
+    return len(clip_sources)
+
+
+def track_uv_clip_hashes():
+    """Start tracking the sources of all UV clips in the file, without changing their current hash."""
+    _uv_clip_hash_sources.clear()
+    lookup = None
+    for obj in bpy.data.objects:
+        if obj.sollum_type != SollumType.CLIP:
+            continue
+
+        target = get_uv_clip_target(obj, report=False)
+        if target is None:
+            continue
+
+        if lookup is None:
+            lookup = UVClipHashLookup()
+
+        source = lookup.find_source(target, report=False)
+        if source is not None:
+            _uv_clip_hash_sources[obj] = source
+
+
+def refresh_uv_clip_hashes() -> int:
+    """Recalculate the hash of the tracked UV clips whose model name or material index changed since the last time.
+    Clips whose objects were removed, or that no longer animate the same material, stop being tracked. Returns the
+    number of clips updated.
+    """
+    changed = []
+    for clip_obj, source in list(_uv_clip_hash_sources.items()):
+        try:
+            model_name = source.model_obj.name
+            material_index = source.material.shader_properties.index
+            is_same_target = get_uv_clip_target(clip_obj, report=False) == source.material
+        except ReferenceError:
+            # Some of the objects were removed
+            is_same_target = False
+
+        if not is_same_target:
+            del _uv_clip_hash_sources[clip_obj]
+        elif model_name != source.model_name or material_index != source.material_index:
+            changed.append((clip_obj, source._replace(model_name=model_name, material_index=material_index)))
+
+    model_name_hashes = jenkhash.GenerateMany(source.model_name for _, source in changed).tolist()
+    for (clip_obj, source), model_name_hash in zip(changed, model_name_hashes):
+        clip_obj.clip_properties.hash = calculate_uv_clip_hash(model_name_hash, source.material_index)
+        _uv_clip_hash_sources[clip_obj] = source
+
+    return len(changed)
+
+
+@persistent
+def uv_clip_hashes_depsgraph_update_post_handler(scene: bpy.types.Scene, depsgraph: bpy.types.Depsgraph):
+    # Renaming objects and changing material properties tag them in the depsgraph. Only the clips that use them need
+    # to be checked, instead of looking up the model of every UV clip again
+    if not _uv_clip_hash_sources:
+        return
+
+    if not depsgraph.id_type_updated("OBJECT") and not depsgraph.id_type_updated("MATERIAL"):
+        return
 
-    model_name = parent.name
-    material_index = target.shader_properties.index
+    refresh_uv_clip_hashes()
 
-    clip_hash = jenkhash.Generate(model_name) + (material_index + 1)
-    clip_hash_str = f"hash_{clip_hash:08X}"
 
-    clip_obj.clip_properties.hash = clip_hash_str
-    return True
+@persistent
+def uv_clip_hashes_reset_handler(*args):
+    # References to the tracked objects are not valid anymore after loading a file or undoing
+    track_uv_clip_hashes()
 
 
 def is_uv_animation_supported(material: bpy.types.Material):
@@ -2,7 +2,7 @@ import bpy
 from mathutils import Vector
 from ..sollumz_properties import SollumType, LODLevel, SollumzGame
 from ..tools.blenderhelper import create_empty_object
-from ..cwxml.drawable import BonePropertiesManager, Drawable, DrawableModel
+from ..cwxml.drawable import BonePropertiesManager, Drawable, DrawableModel, LodList
 
 
 def set_recommended_bone_properties(bone):
@@ -91,3 +91,16 @@ def get_model_xmls_by_lod(drawable_xml: Drawable) -> dict[LODLevel, DrawableMode
         LODLevel.LOW: drawable_xml.drawable_models_low,
         LODLevel.VERYLOW: drawable_xml.drawable_models_vlow,
     }
+
+
+def remove_unselected_lods(drawable_xml: Drawable, lod_levels: set[str]):
+    """Remove the models of the LOD levels not in ``lod_levels`` from ``drawable_xml``. As vertex and index buffers are
+    decoded on first access, the geometry of the removed models is never parsed."""
+    for lod_level, models in get_model_xmls_by_lod(drawable_xml).items():
+        if lod_level in lod_levels:
+            continue
+
+        if isinstance(models, LodList):
+            models = models.models
+
+        models.clear()
@@ -0,0 +1,231 @@
+"""
+Evaluation of F-curves at many frames at once.
+
+``FCurve.evaluate`` has to be called from Python once per frame, which is slow when baking long actions with hundreds of
+F-curves. Here the keyframes are read in bulk and the constant, linear and Bezier segments are evaluated with NumPy,
+following the same rules as Blender. F-curves that use anything else (modifiers, easing interpolation modes, linear
+extrapolation outside the keyframes...) fall back to ``FCurve.evaluate``.
+"""
+import bpy
+import numpy as np
+from numpy.typing import NDArray
+from typing import Callable, NamedTuple, Sequence
+
+# Values of the `interpolation` enum of keyframes
+KEYFRAME_INTERPOLATION_CONSTANT = 0
+KEYFRAME_INTERPOLATION_LINEAR = 1
+KEYFRAME_INTERPOLATION_BEZIER = 2
+
+# Keyframes closer than this to the evaluation time return their value directly, same threshold as Blender
+KEYFRAME_EXACT_THRESHOLD = 0.0001
+
+# Iterations to find the Bezier curve parameter for the evaluation time. Converges well before this in practice
+_BEZIER_SOLVE_ITERATIONS = 30
+
+
+class Keyframes(NamedTuple):
+    co: NDArray[np.float32]
+    """(K, 2) frame and value of each keyframe."""
+    handle_left: NDArray[np.float32]
+    """(K, 2)"""
+    handle_right: NDArray[np.float32]
+    """(K, 2)"""
+    interpolation: NDArray[np.int32]
+    """(K,) interpolation mode of the segment starting at each keyframe."""
+
+
+def read_keyframes(fcurve: bpy.types.FCurve) -> Keyframes:
+    keyframe_points = fcurve.keyframe_points
+    num_keyframes = len(keyframe_points)
+    co = np.empty((num_keyframes, 2), dtype=np.float32)
+    handle_left = np.empty((num_keyframes, 2), dtype=np.float32)
+    handle_right = np.empty((num_keyframes, 2), dtype=np.float32)
+    interpolation = np.empty(num_keyframes, dtype=np.int32)
+    keyframe_points.foreach_get("co", co.ravel())
+    keyframe_points.foreach_get("handle_left", handle_left.ravel())
+    keyframe_points.foreach_get("handle_right", handle_right.ravel())
+    keyframe_points.foreach_get("interpolation", interpolation)
+    return Keyframes(co, handle_left, handle_right, interpolation)
+
+
+def write_keyframes_points(fcurve: bpy.types.FCurve, keyframes: Keyframes):
+    """Write back the keyframe and handle positions of ``keyframes`` to the existing keyframes of the F-curve."""
+    keyframe_points = fcurve.keyframe_points
+    keyframe_points.foreach_set("co", keyframes.co.ravel())
+    keyframe_points.foreach_set("handle_left", keyframes.handle_left.ravel())
+    keyframe_points.foreach_set("handle_right", keyframes.handle_right.ravel())
+    fcurve.update()
+
+
+def can_bake_keyframes(fcurve: bpy.types.FCurve, keyframes: Keyframes, frames: NDArray[np.float32]) -> bool:
+    """Check whether ``bake_fcurves`` can evaluate the F-curve by itself, otherwise ``FCurve.evaluate`` is needed."""
+    if len(keyframes.co) == 0 or len(fcurve.modifiers) > 0:
+        return False
+
+    if np.any(keyframes.interpolation[:-1] > KEYFRAME_INTERPOLATION_BEZIER):
+        # Easing modes (sine, elastic, bounce...)
+        return False
+
+    if fcurve.extrapolation != "CONSTANT" and len(frames) > 0:
+        keyframes_start, keyframes_end = keyframes.co[0, 0], keyframes.co[-1, 0]
+        if frames.min() < keyframes_start or frames.max() > keyframes_end:
+            return False
+
+    return True
+
+
+def bake_fcurves(fcurves: Sequence[bpy.types.FCurve], frames: NDArray) -> NDArray[np.float32]:
+    """Evaluate each F-curve at all ``frames``. Returns a (len(fcurves), len(frames)) array with the same values as
+    ``FCurve.evaluate`` would return, up to floating-point precision.
+    """
+    return prepare_bake_fcurves(fcurves, frames)()
+
+
+def prepare_bake_fcurves(
+    fcurves: Sequence[bpy.types.FCurve], frames: NDArray
+) -> Callable[[], NDArray[np.float32]]:
+    """Same as ``bake_fcurves`` in two steps. The F-curves are read now and the returned function does the evaluation.
+    It only uses NumPy, so unlike the Blender API it can be called from other threads.
+    """
+    frames = np.asarray(frames, dtype=np.float32)
+    num_frames = len(frames)
+    result = np.empty((len(fcurves), num_frames), dtype=np.float32)
+
+    keyframes_list = []
+    sample_curves = []
+    sample_segments = []
+    keyframe_offset = 0
+    for curve_index, fcurve in enumerate(fcurves):
+        keyframes = read_keyframes(fcurve)
+        if not can_bake_keyframes(fcurve, keyframes, frames):
+            result[curve_index] = [fcurve.evaluate(frame) for frame in frames.tolist()]
+            continue
+
+        # Index of the first keyframe after each frame, the segment that contains the frame ends there
+        segment_ends = np.searchsorted(keyframes.co[:, 0], frames, side="right")
+        keyframes_list.append(keyframes)
+        sample_curves.append(np.full(num_frames, curve_index, dtype=np.intp))
+        sample_segments.append(segment_ends + keyframe_offset)
+        keyframe_offset += len(keyframes.co)
+
+    def _bake() -> NDArray[np.float32]:
+        if not keyframes_list:
+            return result
+
+        keyframes = Keyframes(*(np.concatenate(k) for k in zip(*keyframes_list)))
+        num_keyframes = np.array([len(k.co) for k in keyframes_list])
+        first_keyframe = np.repeat(np.cumsum(num_keyframes) - num_keyframes, num_frames)
+        last_keyframe = first_keyframe + np.repeat(num_keyframes, num_frames) - 1
+        times = np.tile(frames, len(keyframes_list)).astype(np.float64)
+
+        result[np.concatenate(sample_curves), np.tile(np.arange(num_frames), len(keyframes_list))] = _eval_keyframes(
+            keyframes, times, first_keyframe, last_keyframe, np.concatenate(sample_segments)
+        )
+        return result
+
+    return _bake
+
+
+def _eval_keyframes(
+    keyframes: Keyframes,
+    times: NDArray[np.float64],
+    first_keyframe: NDArray[np.intp],
+    last_keyframe: NDArray[np.intp],
+    segment_ends: NDArray[np.intp],
+) -> NDArray[np.float64]:
+    """Evaluate each sample time on the keyframes of its F-curve, ``first_keyframe`` to ``last_keyframe``, within the
+    segment that ends at ``segment_ends``. Outside of the keyframes the value is extended constantly.
+    """
+    co = keyframes.co.astype(np.float64)
+    keyframe_frames = co[:, 0]
+    keyframe_values = co[:, 1]
+
+    prev_keyframe = np.clip(segment_ends - 1, first_keyframe, last_keyframe)
+    next_keyframe = np.clip(segment_ends, first_keyframe, last_keyframe)
+    values = np.where(segment_ends <= first_keyframe, keyframe_values[first_keyframe], keyframe_values[last_keyframe])
+
+    # Samples on top of a keyframe take its value
+    prev_dist = np.abs(keyframe_frames[prev_keyframe] - times)
+    next_dist = np.abs(keyframe_frames[next_keyframe] - times)
+    exact_keyframe = np.where(next_dist < prev_dist, next_keyframe, prev_keyframe)
+    is_exact = np.minimum(prev_dist, next_dist) < KEYFRAME_EXACT_THRESHOLD
+    values[is_exact] = keyframe_values[exact_keyframe[is_exact]]
+
+    inside = (segment_ends > first_keyframe) & (segment_ends <= last_keyframe) & ~is_exact
+    inside = np.flatnonzero(inside)
+    k0 = prev_keyframe[inside]
+    k1 = next_keyframe[inside]
+    t = times[inside]
+    interpolation = keyframes.interpolation[k0]
+    duration = keyframe_frames[k1] - keyframe_frames[k0]
+
+    inside_values = keyframe_values[k0].copy()
+
+    linear = (interpolation == KEYFRAME_INTERPOLATION_LINEAR) & (duration != 0)
+    change = keyframe_values[k1[linear]] - keyframe_values[k0[linear]]
+    time = t[linear] - keyframe_frames[k0[linear]]
+    inside_values[linear] = change * time / duration[linear] + inside_values[linear]
+
+    bezier = np.flatnonzero((interpolation == KEYFRAME_INTERPOLATION_BEZIER) & (duration != 0))
+    inside_values[bezier] = _eval_bezier_segments(
+        co[k0[bezier]],
+        keyframes.handle_right[k0[bezier]].astype(np.float64),
+        keyframes.handle_left[k1[bezier]].astype(np.float64),
+        co[k1[bezier]],
+        t[bezier],
+    )
+
+    values[inside] = inside_values
+    return values
+
+
+def _eval_bezier_segments(
+    v1: NDArray[np.float64],
+    v2: NDArray[np.float64],
+    v3: NDArray[np.float64],
+    v4: NDArray[np.float64],
+    times: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    """Evaluate the Bezier segments defined by the keyframes ``v1`` and ``v4`` and their handles ``v2`` and ``v3``."""
+    eps = np.finfo(np.float32).eps
+    is_flat = (
+        (np.abs(v1[:, 1] - v4[:, 1]) < eps) & (np.abs(v2[:, 1] - v3[:, 1]) < eps) & (np.abs(v3[:, 1] - v4[:, 1]) < eps)
+    )
+
+    # Scale down each handle that is longer than the segment, which would make the curve loop. Same as Blender's
+    # BKE_fcurve_correct_bezpart, each handle is corrected on its own
+    h1 = v1 - v2
+    h2 = v4 - v3
+    length = v4[:, 0] - v1[:, 0]
+    h1_length = np.abs(h1[:, 0])
+    h2_length = np.abs(h2[:, 0])
+    fac1 = np.ones_like(length)
+    fac2 = np.ones_like(length)
+    np.divide(length, h1_length, out=fac1, where=h1_length > length)
+    np.divide(length, h2_length, out=fac2, where=h2_length > length)
+    v2 = v1 - fac1[:, np.newaxis] * h1
+    v3 = v4 - fac2[:, np.newaxis] * h2
+
+    def _cubic_coefficients(p0, p1, p2, p3):
+        return p0, 3.0 * (p1 - p0), 3.0 * (p0 - 2.0 * p1 + p2), p3 - p0 + 3.0 * (p1 - p2)
+
+    # Find the curve parameter of each time. X is monotonic within the segment after the handle correction, so Newton
+    # iterations kept within a shrinking bracket always converge
+    c0, c1, c2, c3 = _cubic_coefficients(v1[:, 0], v2[:, 0], v3[:, 0], v4[:, 0])
+    c0 = c0 - times
+    lo = np.zeros_like(times)
+    hi = np.ones_like(times)
+    u = np.clip(-c0 / length, 0.0, 1.0)
+    for _ in range(_BEZIER_SOLVE_ITERATIONS):
+        x = c0 + u * (c1 + u * (c2 + u * c3))
+        dx = c1 + u * (2.0 * c2 + u * 3.0 * c3)
+        lo = np.where(x < 0.0, u, lo)
+        hi = np.where(x > 0.0, u, hi)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            u_next = u - x / dx
+        u_next = np.where((u_next > lo) & (u_next < hi), u_next, (lo + hi) * 0.5)
+        u = np.where(x == 0.0, u, u_next)
+
+    c0, c1, c2, c3 = _cubic_coefficients(v1[:, 1], v2[:, 1], v3[:, 1], v4[:, 1])
+    values = c0 + u * c1 + u * u * c2 + u * u * u * c3
+    return np.where(is_flat, v1[:, 1], values)
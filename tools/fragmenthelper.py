@@ -1,45 +1,89 @@
-from itertools import groupby
-
-
-def longest(lst, string):
-    lst = [[*g]
-           for k, g in groupby(enumerate(lst), key=lambda x: x[1]) if k == string]
-    if len(lst) > 0:
-        group = max(lst, key=len)
-        return group[0][0], 1 + group[-1][0]
-    else:
-        return [0, 0]
-
-
-def remove_ff(row):
-    target = longest(row, "FF")
-    start = target[0] + 1
-    end = target[1]
-    length = end - start
-    if length > 1:
-        row[start:end] = ["--"] * length
-    return row
-
-
-def image_to_shattermap(img):
-    width = img.size[0]
-    values = []
-    row = []
-    for idx in range(int(len(img.pixels) / 4) + 1):
-        if idx % width == 0:
-            row = remove_ff(row)
-            values.append(row)
-            row = []
-        try:
-            value = int(img.pixels[idx * 4] * 255)
-            if value == 0:
-                value = "##"
-            elif value <= 15:
-                value = "0{0:X}".format(value)
-            else:
-                value = "{0:X}".format(value)
-            row.append(value)
-        except:
-            continue
-
-    return reversed(values)
+import numpy as np
+from numpy.typing import NDArray
+
+# Hex digit value of each ASCII character, -1 for non-hex characters
+_HEX_DIGIT_VALUES = np.full(256, -1, dtype=np.int16)
+for _c in "0123456789abcdefABCDEF":
+    _HEX_DIGIT_VALUES[ord(_c)] = int(_c, 16)
+
+# Two-character token of each shattermap value, 0 is written as "##"
+_HEX_TOKENS = np.frombuffer(
+    b"##" + b"".join(b"%02X" % value for value in range(1, 256)), dtype=np.uint8
+).reshape((256, 2))
+
+_CHAR_BLACK = ord("#")
+_CHAR_WHITE = ord("-")
+_FF_RUN_MIN_LENGTH = 3
+
+
+def _repair_shattermap_row(row: str, width: int) -> str:
+    # Need to check for malformed shattermaps. ZModeler shattermaps seem to be missing a value of "--" when "--" appears
+    # in a row. We check for this specific case and insert a "--" to the row.
+    if len(row) != (width - 1) * 2:
+        return row
+
+    idx = row.find("--")
+    while idx != -1 and idx % 2 != 0:
+        idx = row.find("--", idx + 1)
+
+    if idx == -1:
+        return row
+
+    return row[:idx] + "--" + row[idx:]
+
+
+def decode_shattermap(shattermap: list[str]) -> NDArray[np.uint8]:
+    """Decode the hex rows of a shattermap into a (height, width) array of values. Rows are in the same order as
+    ``shattermap``, top row first. "##" decodes to 0 and "--" to 255. Raises ``ValueError`` if the data is malformed."""
+    height = len(shattermap)
+    width = len(shattermap[0]) // 2 if height > 0 else 0
+
+    rows = [_repair_shattermap_row(row, width) for row in shattermap]
+    if any(len(row) != width * 2 for row in rows):
+        raise ValueError("Shattermap rows have different lengths")
+
+    chars = np.frombuffer("".join(rows).encode("ascii"), dtype=np.uint8).reshape((height, width, 2))
+
+    is_black = (chars[..., 0] == _CHAR_BLACK) & (chars[..., 1] == _CHAR_BLACK)
+    is_white = (chars[..., 0] == _CHAR_WHITE) & (chars[..., 1] == _CHAR_WHITE)
+    digits = _HEX_DIGIT_VALUES[chars]
+    is_invalid = np.any(digits < 0, axis=2) & ~is_black & ~is_white
+    if np.any(is_invalid):
+        raise ValueError("Shattermap contains invalid values")
+
+    values = digits[..., 0] * 16 + digits[..., 1]
+    values[is_black] = 0
+    values[is_white] = 255
+
+    return values.astype(np.uint8)
+
+
+def encode_shattermap(values: NDArray[np.uint8]) -> list[str]:
+    """Encode a (height, width) array of shattermap values into hex rows, top row first. In each row, the longest run of
+    "FF" is written as "--" except for its first value."""
+    height, width = values.shape
+    tokens = _HEX_TOKENS[values]
+
+    is_ff = values == 255
+    for row_idx in np.flatnonzero(is_ff.any(axis=1)):
+        run_edges = np.diff(np.concatenate(([0], is_ff[row_idx].view(np.int8), [0])))
+        run_starts = np.flatnonzero(run_edges == 1)
+        run_ends = np.flatnonzero(run_edges == -1)
+        longest = np.argmax(run_ends - run_starts)
+        start, end = run_starts[longest], run_ends[longest]
+        if end - start >= _FF_RUN_MIN_LENGTH:
+            tokens[row_idx, start + 1:end] = _CHAR_WHITE
+
+    return [row.tobytes().decode("ascii") for row in tokens.reshape((height, width * 2))]
+
+
+def image_to_shattermap(img) -> list[str]:
+    width, height = img.size
+    pixels = np.empty(width * height * 4, dtype=np.float32)
+    img.pixels.foreach_get(pixels)
+
+    # Shattermaps are grayscale, only the red channel is used. Image rows are stored bottom to top
+    values = np.clip(pixels[0::4].astype(np.float64) * 255, 0, 255).astype(np.uint8)
+    values = values.reshape((height, width))[::-1]
+
+    return encode_shattermap(values)
@@ -1,3 +1,12 @@
+from functools import lru_cache
+from collections.abc import Iterable
+import numpy as np
+from numpy.typing import NDArray
+
+# Number of strings whose hash is remembered. The same names (bones, shader parameters, XML tags...) are hashed over
+# and over
+HASH_CACHE_SIZE = 16384
+
 
 def GenerateData(bts: bytes, seed=0):
     h = seed
@@ -20,16 +29,55 @@ def GenerateData(bts: bytes, seed=0):
     return h
 
 
+@lru_cache(maxsize=HASH_CACHE_SIZE)
 def Generate(text, encoding="utf-8", seed=0):
     bts = text.lower().encode(encoding)
     return GenerateData(bts, seed)
 
 
+def GenerateDataMany(bts_list: Iterable[bytes], seed=0) -> NDArray[np.uint32]:
+    """Same as ``GenerateData`` for many byte strings at once. The strings are processed together, one byte position
+    at a time, so the cost grows with the length of the longest one instead of the total length."""
+    bts_list = list(bts_list)
+    lengths = np.array([len(bts) for bts in bts_list], dtype=np.intp)
+    # Longest first, so the strings that still have bytes at each position are always the first ones
+    order = np.argsort(-lengths, kind="stable")
+    max_length = lengths[order[0]] if len(bts_list) > 0 else 0
+    data = np.zeros((len(bts_list), max_length), dtype=np.uint32)
+    for row, i in enumerate(order):
+        data[row, :lengths[i]] = np.frombuffer(bts_list[i], dtype=np.uint8)
+
+    # Number of strings with a byte at each position
+    num_active = len(bts_list) - np.searchsorted(np.sort(lengths), np.arange(max_length), side="right")
+
+    h = np.full(len(bts_list), seed & 0xFFFFFFFF, dtype=np.uint32)
+    for pos in range(max_length):
+        active = h[:num_active[pos]]
+        active += data[:num_active[pos], pos]
+        active += active << 10
+        active ^= active >> 6
+
+    h += h << 3
+    h ^= h >> 11
+    h += h << 15
+
+    hashes = np.empty_like(h)
+    hashes[order] = h
+    return hashes
+
+
+def GenerateMany(texts: Iterable[str], encoding="utf-8", seed=0) -> NDArray[np.uint32]:
+    """Same as ``Generate`` for many strings at once."""
+    return GenerateDataMany((text.lower().encode(encoding) for text in texts), seed)
+
+
+@lru_cache(maxsize=HASH_CACHE_SIZE)
 def GenerateCaseSensitive(text, encoding="utf-8", seed=0):
     bts = text.encode(encoding)
     return GenerateData(bts, seed)
 
 
+@lru_cache(maxsize=HASH_CACHE_SIZE)
 def name_to_hash(name: str) -> int:
     """Gets a hash from a string. If it starts with `hash_`, it parses the hexadecimal number afterwards;
     otherwise, it calculates the JOAAT hash of the string.
@@ -41,6 +89,17 @@ def name_to_hash(name: str) -> int:
         return Generate(name)
 
 
+def names_to_hashes(names: Iterable[str]) -> list[int]:
+    """Same as ``name_to_hash`` for many names at once."""
+    names = list(names)
+    hashes = [int(name[5:], 16) & 0xFFFFFFFF if name.startswith("hash_") else None for name in names]
+    text_indices = [i for i, h in enumerate(hashes) if h is None]
+    for i, h in zip(text_indices, GenerateMany(names[i] for i in text_indices).tolist()):
+        hashes[i] = h
+    return hashes
+
+
+@lru_cache(maxsize=HASH_CACHE_SIZE)
 def name_to_hash_literal(name: str) -> int:
     """Gets a hash from a string. If it starts with `hash_`, it parses the hexadecimal number afterwards;
     otherwise, it calculates the case-sensitive JOAAT hash of the string.
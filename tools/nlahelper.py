@@ -0,0 +1,382 @@
+"""
+Baking of the NLA stack into actions.
+
+Instead of stepping through every frame and letting Blender evaluate the NLA, the strips of each track are evaluated
+with ``fcurvehelper`` at all frames at once and blended together with NumPy, following the same rules as Blender:
+strip time mapping (scale, repeat, reversed), hold extrapolation, blend in/out or animated influence, and the replace,
+combine, add, subtract and multiply blend modes. Transition and meta strips are not supported and are skipped.
+
+Everything is read from Blender first, so when many IDs are baked at once the NumPy work is done in parallel threads.
+"""
+import bpy
+import numpy as np
+from numpy.typing import NDArray
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, NamedTuple, Optional, Sequence
+from .fcurvehelper import prepare_bake_fcurves, KEYFRAME_INTERPOLATION_LINEAR
+from .animationhelper import action_fcurves, quaternions_multiply
+
+from .. import logger
+
+# Baking this many IDs or more in one call evaluates them in parallel
+NLA_BAKE_PARALLEL_MIN_IDS = 4
+
+# Same threshold as Blender to consider two frames or values equal
+_FLOAT_EQUAL_THRESHOLD = np.finfo(np.float32).eps
+
+# How the values of a property are combined in the COMBINE blend mode, same as Blender
+MIX_MODE_ADD = 0
+MIX_MODE_MULTIPLY = 1
+MIX_MODE_QUATERNION = 2
+
+BakedChannels = dict[tuple[str, int], NDArray[np.float32]]
+"""Values at each baked frame of the F-curves animated in the NLA stack, by data path and array index."""
+
+
+class _ChannelInfo(NamedTuple):
+    default: NDArray[np.float64]
+    """(C,) default values of the property, the values before any strip is applied."""
+    mix_mode: int
+
+
+class _StripEval(NamedTuple):
+    frame_indices: NDArray[np.intp]
+    """Baked frames where the strip is evaluated."""
+    influence: NDArray[np.float64]
+    blend_type: str
+    channels: list[tuple[str, int]]
+    bake: Callable[[], NDArray[np.float32]]
+    """Returns the (len(channels), len(frame_indices)) values of the strip F-curves."""
+
+
+def nla_strip_action_frames(strip: bpy.types.NlaStrip, frames: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Maps the scene frames, within the strip range, to the action frames of the strip."""
+    action_start, action_end = strip.action_frame_start, strip.action_frame_end
+    action_length = action_end - action_start
+    if abs(action_length) < _FLOAT_EQUAL_THRESHOLD:
+        action_length = 1.0
+
+    scale = abs(strip.scale)
+    offset = np.fmod(frames - strip.frame_start, action_length * scale) / scale
+    # The last frame of the last repetition is the end of the action, instead of wrapping back to the start
+    at_end = np.abs(frames - strip.frame_end) < _FLOAT_EQUAL_THRESHOLD
+    at_end &= abs(strip.repeat - np.floor(strip.repeat)) < _FLOAT_EQUAL_THRESHOLD
+    if strip.use_reverse:
+        return np.where(at_end, action_start, action_end - offset)
+    else:
+        return np.where(at_end, action_end, action_start + offset)
+
+
+def nla_strip_influence(strip: bpy.types.NlaStrip, frames: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Influence of the strip at the scene frames."""
+    if strip.use_animated_influence:
+        influence_fcurve = strip.fcurves.find("influence")
+        if influence_fcurve is not None:
+            return prepare_bake_fcurves([influence_fcurve], frames)()[0].astype(np.float64)
+        return np.full(len(frames), strip.influence, dtype=np.float64)
+
+    influence = np.ones(len(frames), dtype=np.float64)
+    blend_in, blend_out = abs(strip.blend_in), abs(strip.blend_out)
+    if blend_out > 0.0:
+        blending_out = frames >= strip.frame_end - blend_out
+        influence[blending_out] = np.abs(strip.frame_end - frames[blending_out]) / blend_out
+    if blend_in > 0.0:
+        # Blending in takes priority over blending out, as in Blender
+        blending_in = frames <= strip.frame_start + blend_in
+        influence[blending_in] = np.abs(frames[blending_in] - strip.frame_start) / blend_in
+    return influence
+
+
+def get_nla_track_strips_frames(
+    strips: Sequence[bpy.types.NlaStrip], frames: NDArray[np.float64]
+) -> list[tuple[NDArray[np.intp], NDArray[np.float64]]]:
+    """For each strip of a track, gets the indices of the ``frames`` where it is evaluated and the frames clamped to
+    the strip range, which happens when the strip is held before or after its range. Same rules as Blender: within a
+    range the first strip is used, only the first strip can be held before the track, and strips are held until the
+    next one unless their extrapolation is NOTHING.
+    """
+    if len(strips) == 0:
+        return []
+
+    starts = np.array([strip.frame_start for strip in strips], dtype=np.float64)
+    ends = np.array([strip.frame_end for strip in strips], dtype=np.float64)
+
+    # First strip that ends after each frame
+    strip_indices = np.searchsorted(ends, frames, side="left")
+    within = strip_indices < len(strips)
+    within[within] = starts[strip_indices[within]] <= frames[within]
+
+    # Otherwise, the strip before the gap is held
+    strip_indices = np.where(within, strip_indices, strip_indices - 1)
+    before_first = strip_indices < 0
+    strip_indices[before_first] = 0
+    if strips[0].extrapolation != "HOLD":
+        strip_indices[before_first] = -1
+
+    held = ~within & ~before_first
+    for i, strip in enumerate(strips):
+        if strip.extrapolation == "NOTHING":
+            strip_indices[held & (strip_indices == i)] = -1
+
+    clamped_frames = np.clip(frames, starts[strip_indices], ends[strip_indices])
+    result = []
+    for i in range(len(strips)):
+        frame_indices = np.flatnonzero(strip_indices == i)
+        result.append((frame_indices, clamped_frames[frame_indices]))
+    return result
+
+
+def get_nla_channel_info(target: bpy.types.ID, data_path: str, array_length: int) -> _ChannelInfo:
+    """Gets the default value and COMBINE mix mode of the property animated by the data path."""
+    owner_path, _, prop_name = data_path.rpartition(".")
+    prop = None
+    try:
+        owner = target.path_resolve(owner_path) if owner_path else target
+        prop = owner.bl_rna.properties.get(prop_name, None)
+    except (ValueError, AttributeError):
+        pass
+
+    if prop is not None and prop.type == "FLOAT":
+        if prop.is_array:
+            default = np.array(prop.default_array, dtype=np.float64)
+        else:
+            default = np.array((prop.default,), dtype=np.float64)
+        subtype = prop.subtype
+    else:
+        # Not found in the target, assume the usual defaults of the transform properties
+        default = np.zeros(array_length, dtype=np.float64)
+        if prop_name == "scale":
+            default[:] = 1.0
+        elif prop_name == "rotation_quaternion":
+            default[0] = 1.0
+        subtype = "QUATERNION" if prop_name == "rotation_quaternion" else "NONE"
+
+    if len(default) < array_length:
+        default = np.concatenate((default, np.zeros(array_length - len(default))))
+
+    if subtype == "QUATERNION" and len(default) == 4:
+        mix_mode = MIX_MODE_QUATERNION
+    elif prop_name == "scale":
+        mix_mode = MIX_MODE_MULTIPLY
+    else:
+        mix_mode = MIX_MODE_ADD
+
+    return _ChannelInfo(default, mix_mode)
+
+
+def _quaternions_pow_normalized(quats: NDArray[np.float64], exponents: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Raise normalized quaternions in (w, x, y, z) order to the power of ``exponents``."""
+    angles = exponents * np.arccos(np.clip(quats[:, 0], -1.0, 1.0))
+    axes = quats[:, 1:]
+    axes_length = np.linalg.norm(axes, axis=1, keepdims=True)
+    axes = np.divide(axes, axes_length, out=np.zeros_like(axes), where=axes_length > 0.0)
+    return np.concatenate((np.cos(angles)[:, np.newaxis], axes * np.sin(angles)[:, np.newaxis]), axis=1)
+
+
+def _blend_values(
+    blend_type: str,
+    mix_mode: int,
+    lower: NDArray[np.float64],
+    upper: NDArray[np.float64],
+    default: float,
+    influence: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    match blend_type:
+        case "ADD":
+            return lower + upper * influence
+        case "SUBTRACT":
+            return lower - upper * influence
+        case "MULTIPLY":
+            return influence * (lower * upper) + (1.0 - influence) * lower
+        case "COMBINE" if mix_mode == MIX_MODE_MULTIPLY:
+            if abs(default) < _FLOAT_EQUAL_THRESHOLD:
+                default = 1.0
+            return lower * np.power(upper / default, influence)
+        case "COMBINE":
+            return lower + (upper - default) * influence
+        case _:  # REPLACE
+            return lower * (1.0 - influence) + upper * influence
+
+
+def _blend_strip(
+    values: dict[str, NDArray[np.float64]],
+    channels_info: dict[str, _ChannelInfo],
+    strip_eval: _StripEval,
+):
+    strip_values = strip_eval.bake().astype(np.float64)
+    frame_indices = strip_eval.frame_indices
+    influence = strip_eval.influence
+
+    data_path_rows: dict[str, list[tuple[int, int]]] = {}
+    for row, (data_path, index) in enumerate(strip_eval.channels):
+        data_path_rows.setdefault(data_path, []).append((row, index))
+
+    for data_path, rows in data_path_rows.items():
+        channel_values = values[data_path]
+        info = channels_info[data_path]
+        if strip_eval.blend_type == "COMBINE" and info.mix_mode == MIX_MODE_QUATERNION:
+            # Components not animated by the strip keep their default value
+            upper = np.repeat(info.default[:, np.newaxis], len(frame_indices), axis=1)
+            for row, index in rows:
+                upper[index] = strip_values[row]
+            upper = upper.T
+            upper_length = np.linalg.norm(upper, axis=1, keepdims=True)
+            upper = np.divide(upper, upper_length, out=np.tile(info.default, (len(upper), 1)), where=upper_length > 0)
+            lower = channel_values[:, frame_indices].T
+            lower_length = np.linalg.norm(lower, axis=1, keepdims=True)
+            lower = np.divide(lower, lower_length, out=np.tile(info.default, (len(lower), 1)), where=lower_length > 0)
+            channel_values[:, frame_indices] = quaternions_multiply(
+                lower, _quaternions_pow_normalized(upper, influence)
+            ).T
+        else:
+            for row, index in rows:
+                channel_values[index, frame_indices] = _blend_values(
+                    strip_eval.blend_type, info.mix_mode, channel_values[index, frame_indices], strip_values[row],
+                    info.default[index], influence
+                )
+
+
+def prepare_bake_nla(
+    target: bpy.types.ID,
+    frames: NDArray,
+    channel_filter: Optional[Callable[[str], bool]] = None,
+) -> Callable[[], BakedChannels]:
+    """Reads the NLA stack and active action of ``target`` to evaluate them at all ``frames``. Only the F-curves
+    accepted by ``channel_filter``, given their data path, are evaluated. The returned function does the evaluation
+    and, like ``fcurvehelper.prepare_bake_fcurves``, can be called from other threads.
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    anim_data = target.animation_data
+    strip_evals: list[_StripEval] = []
+    channels_array_length: dict[str, int] = {}
+
+    def _add_strip_eval(action, blend_type, frame_indices, action_frames, influence):
+        fcurves = [
+            fcurve for fcurve in action_fcurves(action)
+            if not fcurve.mute and (channel_filter is None or channel_filter(fcurve.data_path))
+        ]
+        if len(fcurves) == 0 or len(frame_indices) == 0:
+            return
+
+        channels = [(fcurve.data_path, fcurve.array_index) for fcurve in fcurves]
+        for data_path, index in channels:
+            channels_array_length[data_path] = max(channels_array_length.get(data_path, 0), index + 1)
+
+        strip_evals.append(_StripEval(
+            frame_indices, influence, blend_type, channels, prepare_bake_fcurves(fcurves, action_frames)
+        ))
+
+    if anim_data is not None and anim_data.use_nla:
+        tracks = list(anim_data.nla_tracks)
+        if any(track.is_solo for track in tracks):
+            tracks = [track for track in tracks if track.is_solo]
+
+        for track in tracks:
+            if track.mute:
+                continue
+
+            strips = list(track.strips)
+            for strip, (frame_indices, strip_frames) in zip(strips, get_nla_track_strips_frames(strips, frames)):
+                if strip.mute or len(frame_indices) == 0:
+                    continue
+
+                if strip.type != "CLIP":
+                    logger.warning(
+                        f"NLA strip '{strip.name}' in track '{track.name}' is a {strip.type.lower()} strip, which is "
+                        "not supported for baking. Skipping..."
+                    )
+                    continue
+
+                if strip.action is None:
+                    continue
+
+                _add_strip_eval(
+                    strip.action, strip.blend_type, frame_indices,
+                    nla_strip_action_frames(strip, strip_frames), nla_strip_influence(strip, strip_frames)
+                )
+
+    if anim_data is not None and anim_data.action is not None:
+        # The active action is evaluated on top of the NLA
+        if anim_data.action_extrapolation == "NOTHING":
+            action_frame_range = anim_data.action.frame_range
+            frame_indices = np.flatnonzero((frames >= action_frame_range[0]) & (frames <= action_frame_range[1]))
+        else:
+            frame_indices = np.arange(len(frames))
+
+        _add_strip_eval(
+            anim_data.action, anim_data.action_blend_type, frame_indices, frames[frame_indices],
+            np.full(len(frame_indices), anim_data.action_influence, dtype=np.float64)
+        )
+
+    channels_info = {
+        data_path: get_nla_channel_info(target, data_path, array_length)
+        for data_path, array_length in channels_array_length.items()
+    }
+
+    def _bake() -> BakedChannels:
+        values = {
+            data_path: np.repeat(info.default[:, np.newaxis], len(frames), axis=1)
+            for data_path, info in channels_info.items()
+        }
+        for strip_eval in strip_evals:
+            _blend_strip(values, channels_info, strip_eval)
+
+        baked_channels = {}
+        for strip_eval in strip_evals:
+            for data_path, index in strip_eval.channels:
+                if (data_path, index) not in baked_channels:
+                    baked_channels[(data_path, index)] = values[data_path][index].astype(np.float32)
+        return baked_channels
+
+    return _bake
+
+
+def bake_nla(
+    targets: Sequence[bpy.types.ID],
+    frames: NDArray,
+    channel_filters: Optional[Sequence[Callable[[str], bool]]] = None,
+) -> list[BakedChannels]:
+    """Evaluates the NLA stack of each target at all ``frames``, optionally with a channel filter for each target. See
+    ``prepare_bake_nla``.
+    """
+    if channel_filters is None:
+        channel_filters = [None] * len(targets)
+
+    bakes = [prepare_bake_nla(target, frames, channel_filter)
+             for target, channel_filter in zip(targets, channel_filters)]
+    return run_nla_bakes(bakes)
+
+
+def run_nla_bakes(bakes: Sequence[Callable[[], BakedChannels]]) -> list[BakedChannels]:
+    """Runs the functions returned by ``prepare_bake_nla``, in parallel if there are many."""
+    if len(bakes) >= NLA_BAKE_PARALLEL_MIN_IDS:
+        with ThreadPoolExecutor() as executor:
+            return list(executor.map(lambda bake: bake(), bakes))
+    else:
+        return [bake() for bake in bakes]
+
+
+def write_baked_channels_to_action(
+    baked_channels: BakedChannels,
+    action: bpy.types.Action,
+    frames: NDArray,
+    id_type: str = "OBJECT",
+):
+    """Creates the F-curves of the action from the baked channels, with a linear keyframe per frame."""
+    if bpy.app.version >= (5, 0, 0):
+        from bpy_extras import anim_utils
+
+        action_slot = action.slots.new(id_type, "Slot")
+        channelbag = anim_utils.action_ensure_channelbag_for_slot(action, action_slot)
+        new_fcurve = channelbag.fcurves.new
+    else:
+        new_fcurve = action.fcurves.new
+
+    frames = np.asarray(frames, dtype=np.float32)
+    interpolation = np.full(len(frames), KEYFRAME_INTERPOLATION_LINEAR, dtype=np.int32)
+    for (data_path, index), values in baked_channels.items():
+        fcurve = new_fcurve(data_path, index=index)
+        fcurve.keyframe_points.add(len(frames))
+        fcurve.keyframe_points.foreach_set("co", np.stack((frames, values), axis=1).ravel())
+        fcurve.keyframe_points.foreach_set("interpolation", interpolation)
+        fcurve.update()
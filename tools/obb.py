@@ -16,34 +16,38 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from functools import cache
-from typing import Iterable
-import bpy
+from typing import Iterable, Iterator, NamedTuple
+from enum import Enum
 import bmesh
-import math
-import time
 from mathutils import Vector, Matrix
 import numpy as np
+from numpy.typing import NDArray
 
+# Max number of (rotation, hull point) pairs projected at once
+_PROJECTION_CHUNK_SIZE = 1 << 20
+# Extents below this are clamped when computing volumes, so flat boxes can still be compared
+_MIN_EXTENT = 0.0001
 
-def bbox_orient(bme_verts, mx):
-    """
-    takes a lsit of BMverts ora  list of vectors
-    """
-    if hasattr(bme_verts[0], "co"):
-        verts = [mx @ v.co for v in bme_verts]
-    else:
-        verts = [mx @ v for v in bme_verts]
 
-    xs = [v[0] for v in verts]
-    ys = [v[1] for v in verts]
-    zs = [v[2] for v in verts]
+class ObbMethod(str, Enum):
+    SAMPLED = "SAMPLED"
+    MIN_VOLUME = "MIN_VOLUME"
+
 
-    return (min(xs), max(xs), min(ys), max(ys), min(zs), max(zs))
+class ConvexHull(NamedTuple):
+    points: NDArray[np.float64]
+    """(N, 3) hull vertices."""
+    face_normals: NDArray[np.float64]
+    """(F, 3) outward unit normals of the hull faces."""
+    edges: NDArray[np.int64]
+    """(E, 2) indices into ``points`` of the hull edges."""
+    edge_faces: NDArray[np.int64]
+    """(E, 2) indices into ``face_normals`` of the two faces adjacent to each edge."""
 
 
 def bbox_vol(box: tuple[float, float, float, float, float, float]) -> float:
 
-    V = max(box[1] - box[0], 0.0001) * max(box[3] - box[2], 0.0001) * max(box[5] - box[4], 0.0001)
+    V = max(box[1] - box[0], _MIN_EXTENT) * max(box[3] - box[2], _MIN_EXTENT) * max(box[5] - box[4], _MIN_EXTENT)
 
     return V
 
@@ -70,9 +74,10 @@ def get_obb_extents(obb):
     np_obb = np.array(obb, dtype=Vector)
     return Vector(np_obb.min(axis=0)), Vector(np_obb.max(axis=0))
 
+
 @cache
-def generate_vectors_structured(num_samples: int):
-    """Generates vectors around the sphere, at regular intervals."""
+def generate_vectors_structured(num_samples: int) -> NDArray[np.float64]:
+    """Generates vectors around the sphere, at regular intervals. Returns a read-only (num_samples, 3) array."""
     # Uses the Fibonnaci lattice to generate evenly distributed points on a sphere
     # https://arxiv.org/pdf/0912.4540.pdf
     # https://extremelearning.com.au/how-to-evenly-distribute-points-on-a-sphere-more-effectively-than-the-canonical-fibonacci-lattice/
@@ -85,61 +90,237 @@ def generate_vectors_structured(num_samples: int):
     vectors[:, 0] = np.sin(theta) * np.cos(phi)
     vectors[:, 1] = np.cos(theta)
     vectors[:, 2] = np.sin(theta) * np.sin(phi)
-    return [Vector(vector[:]).freeze() for vector in vectors]
-
-
-def get_obb(verts: Iterable[Vector], num_samples: int, angle_step: int) -> tuple[list[Vector], Matrix]:
-    already_found = set[Matrix]()
-    world_mx = Matrix.Identity(4)
-    scale = world_mx.to_scale()
-    trans = world_mx.to_translation()
-
-    tr_mx = Matrix.Identity(4)
-    sc_mx = Matrix.Identity(4)
+    vectors.setflags(write=False)
+    return vectors
 
-    tr_mx[0][3], tr_mx[1][3], tr_mx[2][3] = trans[0], trans[1], trans[2]
-    sc_mx[0][0], sc_mx[1][1], sc_mx[2][2] = scale[0], scale[1], scale[2]
-    r_mx = world_mx.to_quaternion().to_matrix().to_4x4()
 
+def get_convex_hull(verts: Iterable[Vector]) -> ConvexHull:
     bme = bmesh.new()
 
     for vert in verts:
         bme.verts.new(vert)
 
+    all_points = np.array([v.co for v in bme.verts], dtype=np.float64).reshape((-1, 3))
+
     convex_hull = bmesh.ops.convex_hull(
         bme, input=bme.verts, use_existing_faces=True, )
     total_hull = convex_hull["geom"]
 
-    hull_verts = [item.co for item in total_hull if hasattr(item, "co")]
+    bme.verts.index_update()
+    bme.faces.index_update()
+    hull_verts = [item.index for item in total_hull if isinstance(item, bmesh.types.BMVert)]
+    hull_faces = [item for item in total_hull if isinstance(item, bmesh.types.BMFace)]
+    hull_face_indices = [item.index for item in hull_faces]
+    hull_face_verts = [[v.index for v in item.verts] for item in hull_faces]
+    hull_edges = [
+        ([v.index for v in item.verts], [f.index for f in item.link_faces])
+        for item in total_hull if isinstance(item, bmesh.types.BMEdge) and len(item.link_faces) == 2
+    ]
 
     bme.free()
 
-    min_mx = Matrix.Identity(4)
-    min_box = bbox_orient(hull_verts, min_mx)
-    min_V = bbox_vol(min_box)
-    # Iterate through all degrees to obtain a more predictable result
-
-    axes = generate_vectors_structured(num_samples)
-
-    for axis in axes:
-        for n in range(0, 720, angle_step):
-            angle = math.pi * n / 360
-            rot_mx = Matrix.Rotation(angle, 4, axis)
-            rot_mx.freeze()
-            if rot_mx in already_found:
-                continue
-            already_found.add(rot_mx)
+    if not hull_verts:
+        # Degenerate input (e.g. all points on a line), there is no hull to work with
+        return ConvexHull(all_points, np.empty((0, 3)), np.empty((0, 2), dtype=np.int64), np.empty((0, 2), dtype=np.int64))
+
+    # Hull faces are triangles, compute their normals here rather than relying on bmesh having updated them
+    centroid = all_points[hull_verts].mean(axis=0)
+    face_normals = np.empty((len(hull_face_verts), 3))
+    for i, face in enumerate(hull_face_verts):
+        v0, v1, v2 = all_points[face[:3]]
+        normal = np.cross(v1 - v0, v2 - v0)
+        face_normals[i] = -normal if np.dot(normal, v0 - centroid) < 0 else normal
+    lengths = np.linalg.norm(face_normals, axis=1, keepdims=True)
+    face_normals = np.divide(face_normals, lengths, out=np.zeros_like(face_normals), where=lengths > 0)
+
+    # Remap edge vertex and face indices from mesh indices to hull indices
+    vert_remap = np.full(len(all_points), -1, dtype=np.int64)
+    vert_remap[hull_verts] = np.arange(len(hull_verts))
+    face_remap = np.full(max(hull_face_indices, default=-1) + 1, -1, dtype=np.int64)
+    face_remap[hull_face_indices] = np.arange(len(hull_face_indices))
+    edges = vert_remap[np.array([e[0] for e in hull_edges], dtype=np.int64).reshape((-1, 2))]
+    edge_faces = face_remap[np.array([e[1] for e in hull_edges], dtype=np.int64).reshape((-1, 2))]
+
+    return ConvexHull(all_points[hull_verts], face_normals, edges, edge_faces)
+
+
+def get_obb(
+    verts: Iterable[Vector],
+    num_samples: int,
+    angle_step: int,
+    method: ObbMethod = ObbMethod.SAMPLED
+) -> tuple[list[Vector], Matrix]:
+    """Find an oriented bounding box of ``verts``. Returns the 8 box corners in the box local space and the
+    box-to-world rotation matrix.
+
+    ``ObbMethod.SAMPLED`` tries ``num_samples`` axes rotated in steps of ``angle_step`` half-degrees.
+    ``ObbMethod.MIN_VOLUME`` fits the box against the convex hull faces and edges and ignores the sampling parameters.
+    """
+    hull = get_convex_hull(verts)
 
-            box = bbox_orient(hull_verts, rot_mx)
-            test_V = bbox_vol(box)
+    if method == ObbMethod.MIN_VOLUME:
+        rotation, box_min, box_max = find_min_volume_obb(hull)
+    else:
+        rotation, box_min, box_max = find_sampled_obb(hull.points, num_samples, angle_step)
 
-            if test_V < min_V:
-                min_V = test_V
-                min_box = box
-                min_mx = rot_mx
+    box = (box_min[0], box_max[0], box_min[1], box_max[1], box_min[2], box_max[2])
+    box_verts = box_coords(tuple(float(c) for c in box))
 
-    fmx = tr_mx @ r_mx @ min_mx.inverted_safe() @ sc_mx
+    # Rotations are orthonormal, so the inverse is the transpose
+    return box_verts, Matrix(rotation.T.tolist()).to_4x4()
 
-    box_verts = box_coords(min_box)
 
-    return box_verts, fmx
+def find_sampled_obb(
+    points: NDArray[np.float64],
+    num_samples: int,
+    angle_step: int
+) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+    """Find the smallest box among the rotations of ``num_samples`` evenly distributed axes, from 0 to 360 degrees in
+    steps of ``angle_step`` half-degrees. The identity rotation is tried first and kept on ties. Returns the
+    world-to-box rotation matrix and the box min and max corners."""
+    axes = generate_vectors_structured(num_samples)
+    angles = np.pi * np.arange(0, 720, angle_step) / 360
+
+    def _iter_rotations() -> Iterator[tuple[NDArray[np.float64], NDArray[np.float64]]]:
+        yield np.identity(3)[np.newaxis], points
+
+        axes_per_chunk = max(1, _PROJECTION_CHUNK_SIZE // (len(angles) * max(len(points), 1)))
+        for start in range(0, len(axes), axes_per_chunk):
+            yield _axis_angle_rotations(axes[start:start + axes_per_chunk], angles), points
+
+    return _find_smallest_box(_iter_rotations())
+
+
+def find_min_volume_obb(hull: ConvexHull) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+    """Find the smallest box that has a face flush with a face of ``hull`` or is aligned to one of the principal axes
+    of the hull points. For each of these axes, the other two box axes are found with rotating calipers: the smallest
+    rectangle around the projected hull has a side collinear with one of its edges. Returns the world-to-box rotation
+    matrix and the box min and max corners."""
+    points = hull.points
+
+    def _iter_rotations() -> Iterator[tuple[NDArray[np.float64], NDArray[np.float64]]]:
+        # PCA seed, plus calipers around each principal axis
+        centered = points - points.mean(axis=0)
+        _, eigenvectors = np.linalg.eigh(centered.T @ centered)
+        principal_axes = eigenvectors.T[::-1]
+        yield _orthonormal_frames(principal_axes[np.newaxis, 2], principal_axes[np.newaxis, 0]), points
+
+        for i in range(3):
+            up = principal_axes[i]
+            plane_basis = np.delete(principal_axes, i, axis=0)
+            directions = _convex_hull_2d_edge_directions(points @ plane_basis.T) @ plane_basis
+            yield _orthonormal_frames(np.broadcast_to(up, directions.shape), directions), points
+
+        if len(hull.face_normals) == 0 or len(hull.edges) == 0:
+            return
+
+        # Coplanar faces give the same axis, and so do opposite faces
+        normals = hull.face_normals[np.linalg.norm(hull.face_normals, axis=1) > 0]
+        flip = np.take_along_axis(normals, np.argmax(np.abs(normals), axis=1)[:, np.newaxis], axis=1) < 0
+        normals = np.where(flip, -normals, normals)
+        normals = np.unique(np.round(normals, 6), axis=0)
+        normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+
+        # The outline of the hull seen along an axis is made of the edges between a face facing the axis and a face
+        # facing away from it. Only those edges are needed for the calipers, and only their vertices plus the two
+        # extreme points along the axis are needed to get the box extents
+        edge_vectors = points[hull.edges[:, 1]] - points[hull.edges[:, 0]]
+        normals0 = hull.face_normals[hull.edge_faces[:, 0]]
+        normals1 = hull.face_normals[hull.edge_faces[:, 1]]
+        normals_per_chunk = max(1, _PROJECTION_CHUNK_SIZE // max(len(edge_vectors), len(points)))
+        for start in range(0, len(normals), normals_per_chunk):
+            chunk = normals[start:start + normals_per_chunk]
+            is_outline = (chunk @ normals0.T) * (chunk @ normals1.T) <= 0
+            heights = chunk @ points.T
+            lowest = np.argmin(heights, axis=1)
+            highest = np.argmax(heights, axis=1)
+            for i, normal in enumerate(chunk):
+                edge_idx = np.flatnonzero(is_outline[i])
+                if len(edge_idx) == 0:
+                    continue
+
+                point_idx = np.unique(np.append(hull.edges[edge_idx], (lowest[i], highest[i])))
+                rotations = _orthonormal_frames(np.broadcast_to(normal, (len(edge_idx), 3)), edge_vectors[edge_idx])
+                yield rotations, points[point_idx]
+
+    return _find_smallest_box(_iter_rotations())
+
+
+def _find_smallest_box(
+    candidates: Iterable[tuple[NDArray[np.float64], NDArray[np.float64]]]
+) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+    """Project each (N, 3) points array of ``candidates`` with its (K, 3, 3) rotations and return the first rotation
+    that gives the smallest volume, along with the box min and max corners."""
+    best_volume = np.inf
+    best = (np.identity(3), np.zeros(3), np.zeros(3))
+    for rotations, points in candidates:
+        points_t = np.ascontiguousarray(points.T)
+        rotations_per_chunk = max(1, _PROJECTION_CHUNK_SIZE // max(len(points), 1))
+        for start in range(0, len(rotations), rotations_per_chunk):
+            chunk = rotations[start:start + rotations_per_chunk]
+            projected = chunk @ points_t
+            mins = projected.min(axis=2)
+            maxs = projected.max(axis=2)
+            volumes = np.prod(np.maximum(maxs - mins, _MIN_EXTENT), axis=1)
+
+            i = np.argmin(volumes)
+            if volumes[i] < best_volume:
+                best_volume = volumes[i]
+                best = (chunk[i], mins[i], maxs[i])
+
+    return best
+
+
+def _axis_angle_rotations(axes: NDArray[np.float64], angles: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Rotation matrices of each angle around each unit axis, same as ``Matrix.Rotation``. Returns an
+    (len(axes) * len(angles), 3, 3) array, ordered by axis then angle."""
+    cos = np.cos(angles)[np.newaxis, :, np.newaxis, np.newaxis]
+    sin = np.sin(angles)[np.newaxis, :, np.newaxis, np.newaxis]
+
+    x, y, z = axes[:, 0], axes[:, 1], axes[:, 2]
+    zeros = np.zeros_like(x)
+    cross_matrices = np.stack((
+        np.stack((zeros, -z, y), axis=1),
+        np.stack((z, zeros, -x), axis=1),
+        np.stack((-y, x, zeros), axis=1),
+    ), axis=1)[:, np.newaxis]
+    outer = (axes[:, :, np.newaxis] * axes[:, np.newaxis, :])[:, np.newaxis]
+
+    rotations = cos * np.identity(3) + sin * cross_matrices + (1 - cos) * outer
+    return rotations.reshape((-1, 3, 3))
+
+
+def _orthonormal_frames(up: NDArray[np.float64], directions: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Build (K, 3, 3) rotation matrices whose rows are ``directions`` made perpendicular to ``up``, the cross product
+    of both, and ``up``. ``up`` must be normalized. Directions parallel to ``up`` are dropped."""
+    x_axes = directions - np.sum(directions * up, axis=1, keepdims=True) * up
+    lengths = np.linalg.norm(x_axes, axis=1)
+    valid = lengths > 1e-9
+    x_axes = x_axes[valid] / lengths[valid, np.newaxis]
+    up = up[valid]
+    y_axes = np.cross(up, x_axes)
+    return np.stack((x_axes, y_axes, up), axis=1)
+
+
+def _convex_hull_2d_edge_directions(points: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Edge vectors of the 2D convex hull of ``points``, using Andrew's monotone chain."""
+    points = np.unique(points, axis=0)
+    if len(points) < 2:
+        return np.empty((0, 2))
+
+    def _half_hull(pts: NDArray[np.float64]) -> list[int]:
+        hull = []
+        for i, (px, py) in enumerate(pts):
+            while len(hull) >= 2:
+                ax, ay = pts[hull[-2]]
+                bx, by = pts[hull[-1]]
+                if (bx - ax) * (py - ay) - (by - ay) * (px - ax) > 0:
+                    break
+                hull.pop()
+            hull.append(i)
+        return hull
+
+    lower = points[_half_hull(points)]
+    upper = points[::-1][_half_hull(points[::-1])]
+    hull = np.concatenate((lower[:-1], upper[:-1]))
+    return np.roll(hull, -1, axis=0) - hull
@@ -11,7 +11,7 @@ from ..shared.shader_expr import (
     compile_to_material,
 )
 from ..sollumz_properties import MaterialType, SollumzGame
-from typing import NamedTuple
+from typing import NamedTuple, Optional
 from .. import logger
 
 
@@ -482,3 +482,56 @@ def create_collision_material_from_name(name: str, game: SollumzGame):
 
     return create_collision_material_from_index(matinfo_index, game)
 
+
+def collision_material_snapshot(mat: Material) -> tuple:
+    """Get the collision properties and flags of ``mat`` as a tuple, to detect changes to a material."""
+    from .properties import CollisionMatFlags
+
+    props = mat.collision_properties
+    flags = mat.collision_flags
+    return (
+        mat.sollum_type,
+        mat.sollum_game_type,
+        tuple(mat.diffuse_color),
+        props.collision_index,
+        props.procedural_id,
+        props.room_id,
+        props.ped_density,
+        props.material_color_index,
+        props.unk,
+        tuple(getattr(flags, flag_name) for flag_name in CollisionMatFlags.__annotations__.keys()),
+    )
+
+
+class CollisionMaterialPool:
+    """Collision materials created on import, so bounds that use the same collision material with the same properties
+    share a single material instead of compiling a new one each time.
+
+    Materials are looked up by name and only reused if their properties still match the ones they had when added, so
+    the pool stays valid across imports even if the user renames, edits or deletes the materials in between.
+    """
+
+    def __init__(self):
+        self._materials: dict[tuple, tuple[str, tuple]] = {}
+
+    def get(self, key: tuple) -> Optional[Material]:
+        entry = self._materials.get(key)
+        if entry is None:
+            return None
+
+        mat_name, snapshot = entry
+        mat = bpy.data.materials.get(mat_name)
+        if mat is None or mat.library is not None or collision_material_snapshot(mat) != snapshot:
+            del self._materials[key]
+            return None
+
+        return mat
+
+    def add(self, key: tuple, mat: Material):
+        self._materials[key] = (mat.name, collision_material_snapshot(mat))
+
+    def clear(self):
+        self._materials.clear()
+
+
+collision_material_pool = CollisionMaterialPool()
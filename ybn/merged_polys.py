@@ -0,0 +1,195 @@
+"""
+Primitive bound polygons of a BVH merged into a single mesh object per polygon type.
+
+Importing each box, sphere, capsule and cylinder polygon of a BVH as its own object is slow and clutters the scene on
+bounds with thousands of them. A merged object holds the geometry of all the polygons of one type instead, and the
+original polygon values are stored in face attributes so they are exported back unchanged.
+"""
+import bpy
+import numpy as np
+from numpy.typing import NDArray
+from functools import cache
+from typing import NamedTuple, Optional
+from ..sollumz_properties import SollumType
+from ..tools.meshhelper import create_box, create_sphere, create_capsule, create_cylinder
+
+POLY_INDEX_ATTR = ".sollumz.poly_index"
+POLY_VERTEX_ATTRS = (".sollumz.poly_v1", ".sollumz.poly_v2", ".sollumz.poly_v3", ".sollumz.poly_v4")
+POLY_RADIUS_ATTR = ".sollumz.poly_radius"
+
+POLY_NUM_VERTICES = {
+    SollumType.BOUND_POLY_BOX: 4,
+    SollumType.BOUND_POLY_SPHERE: 1,
+    SollumType.BOUND_POLY_CAPSULE: 2,
+    SollumType.BOUND_POLY_CYLINDER: 2,
+}
+
+
+class MergedPolys(NamedTuple):
+    vertices: NDArray[np.float32]
+    """(P, K, 3) vertices of each polygon, K depends on the polygon type."""
+    radii: NDArray[np.float32]
+    """(P,) radius of each polygon, unused by boxes."""
+    material_slots: NDArray[np.int32]
+    """(P,) material slot of each polygon."""
+
+
+class _Template(NamedTuple):
+    vertices: NDArray[np.float64]
+    loop_starts: NDArray[np.int32]
+    loop_verts: NDArray[np.int32]
+
+
+def is_merged_poly_mesh(mesh: Optional[bpy.types.ID]) -> bool:
+    return isinstance(mesh, bpy.types.Mesh) and POLY_INDEX_ATTR in mesh.attributes
+
+
+def create_merged_poly_mesh(
+    name: str,
+    sollum_type: SollumType,
+    polys: MergedPolys,
+    materials: list[bpy.types.Material],
+    box_matrices: Optional[NDArray[np.float64]] = None,
+) -> bpy.types.Mesh:
+    """Create a mesh with the geometry of all ``polys`` of ``sollum_type``. Boxes are placed with ``box_matrices``, a
+    (P, 3, 4) array of the box axes and center, since the box shape cannot be recovered from the 4 vertices alone."""
+    template = _get_template(sollum_type)
+    num_polys = len(polys.radii)
+    num_template_verts = len(template.vertices)
+    num_template_faces = len(template.loop_starts)
+    num_template_loops = len(template.loop_verts)
+
+    verts = _place_template(sollum_type, template.vertices, polys, box_matrices)
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(num_polys * num_template_verts)
+    mesh.vertices.foreach_set("co", verts.astype(np.float32).ravel())
+    mesh.loops.add(num_polys * num_template_loops)
+    loop_verts = template.loop_verts + (np.arange(num_polys, dtype=np.int32) * num_template_verts)[:, np.newaxis]
+    mesh.loops.foreach_set("vertex_index", loop_verts.ravel())
+    mesh.polygons.add(num_polys * num_template_faces)
+    loop_starts = template.loop_starts + (np.arange(num_polys, dtype=np.int32) * num_template_loops)[:, np.newaxis]
+    mesh.polygons.foreach_set("loop_start", loop_starts.ravel())
+    mesh.update()
+
+    for mat in materials:
+        mesh.materials.append(mat)
+    mesh.polygons.foreach_set("material_index", np.repeat(polys.material_slots.astype(np.int32), num_template_faces))
+
+    def _add_face_attr(attr_name: str, data_type: str, prop_name: str, values: NDArray):
+        attr = mesh.attributes.new(attr_name, data_type, "FACE")
+        attr.data.foreach_set(prop_name, np.repeat(values, num_template_faces, axis=0).ravel())
+
+    _add_face_attr(POLY_INDEX_ATTR, "INT", "value", np.arange(num_polys, dtype=np.int32))
+    for i in range(POLY_NUM_VERTICES[sollum_type]):
+        _add_face_attr(POLY_VERTEX_ATTRS[i], "FLOAT_VECTOR", "vector", polys.vertices[:, i].astype(np.float32))
+    if sollum_type != SollumType.BOUND_POLY_BOX:
+        _add_face_attr(POLY_RADIUS_ATTR, "FLOAT", "value", polys.radii.astype(np.float32))
+
+    mesh.validate()
+    return mesh
+
+
+def get_merged_polys(mesh: bpy.types.Mesh, sollum_type: SollumType) -> MergedPolys:
+    """Read back the polygons stored in a mesh created by ``create_merged_poly_mesh``, in their original order."""
+    num_faces = len(mesh.polygons)
+
+    poly_inds = np.empty(num_faces, dtype=np.int32)
+    mesh.attributes[POLY_INDEX_ATTR].data.foreach_get("value", poly_inds)
+    # Any face of a polygon has its values, use the first one
+    _, first_faces = np.unique(poly_inds, return_index=True)
+    num_polys = len(first_faces)
+
+    num_verts = POLY_NUM_VERTICES[sollum_type]
+    vertices = np.zeros((num_polys, num_verts, 3), dtype=np.float32)
+    face_vectors = np.empty((num_faces, 3), dtype=np.float32)
+    for i in range(num_verts):
+        attr = mesh.attributes.get(POLY_VERTEX_ATTRS[i], None)
+        if attr is None:
+            continue
+
+        attr.data.foreach_get("vector", face_vectors.ravel())
+        vertices[:, i] = face_vectors[first_faces]
+
+    radii = np.zeros(num_polys, dtype=np.float32)
+    radius_attr = mesh.attributes.get(POLY_RADIUS_ATTR, None)
+    if radius_attr is not None:
+        face_radii = np.empty(num_faces, dtype=np.float32)
+        radius_attr.data.foreach_get("value", face_radii)
+        radii = face_radii[first_faces]
+
+    face_slots = np.empty(num_faces, dtype=np.int32)
+    mesh.polygons.foreach_get("material_index", face_slots)
+
+    return MergedPolys(vertices, radii, face_slots[first_faces])
+
+
+@cache
+def _get_template(sollum_type: SollumType) -> _Template:
+    """Geometry of a single polygon of ``sollum_type``, created with the same functions used for standalone bound poly
+    objects. Boxes are a unit cube, spheres a unit sphere, cylinders have radius 1 and length 1 along Z, and capsules
+    radius 1 with the hemisphere centers at Z=-1 and Z=1."""
+    mesh = bpy.data.meshes.new("sz_merged_poly_template")
+    match sollum_type:
+        case SollumType.BOUND_POLY_BOX:
+            create_box(mesh, size=1)
+        case SollumType.BOUND_POLY_SPHERE:
+            create_sphere(mesh, radius=1)
+        case SollumType.BOUND_POLY_CAPSULE:
+            create_capsule(mesh, radius=1, length=2, axis="Z")
+        case SollumType.BOUND_POLY_CYLINDER:
+            create_cylinder(mesh, radius=1, length=1, axis="Z")
+
+    vertices = np.empty((len(mesh.vertices), 3), dtype=np.float32)
+    mesh.vertices.foreach_get("co", vertices.ravel())
+    loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    loop_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+
+    bpy.data.meshes.remove(mesh)
+
+    return _Template(vertices.astype(np.float64), loop_starts, loop_verts)
+
+
+def _place_template(
+    sollum_type: SollumType,
+    template_verts: NDArray[np.float64],
+    polys: MergedPolys,
+    box_matrices: Optional[NDArray[np.float64]],
+) -> NDArray[np.float64]:
+    """Transform the template geometry to each polygon. Returns a (P, T, 3) array."""
+    vertices = polys.vertices.astype(np.float64)
+    radii = polys.radii.astype(np.float64)[:, np.newaxis, np.newaxis]
+
+    match sollum_type:
+        case SollumType.BOUND_POLY_BOX:
+            return template_verts @ box_matrices[:, :, :3].transpose((0, 2, 1)) + box_matrices[:, np.newaxis, :, 3]
+        case SollumType.BOUND_POLY_SPHERE:
+            return template_verts * radii + vertices[:, 0:1]
+
+    v1 = vertices[:, 0]
+    v2 = vertices[:, 1]
+    lengths = np.linalg.norm(v2 - v1, axis=1)[:, np.newaxis, np.newaxis]
+    if sollum_type == SollumType.BOUND_POLY_CAPSULE:
+        # Move the hemispheres of the template from Z=+-1 to Z=+-length/2, keeping the radius around them
+        z_sign = np.sign(template_verts[:, 2:3])
+        hemisphere_verts = template_verts - z_sign * (0.0, 0.0, 1.0)
+        local_verts = hemisphere_verts * radii + z_sign * (0.0, 0.0, 0.5) * lengths
+    else:
+        local_verts = template_verts * np.concatenate((radii, radii, lengths), axis=2)
+
+    return local_verts @ _get_axis_frames(v2 - v1).transpose((0, 2, 1)) + ((v1 + v2) * 0.5)[:, np.newaxis]
+
+
+def _get_axis_frames(directions: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Rotation matrices that map the Z axis to each of ``directions``."""
+    lengths = np.linalg.norm(directions, axis=1, keepdims=True)
+    z_axes = np.divide(directions, lengths, out=np.tile((0.0, 0.0, 1.0), (len(directions), 1)), where=lengths > 0)
+
+    helpers = np.where(np.abs(z_axes[:, 0:1]) < 0.9, (1.0, 0.0, 0.0), (0.0, 1.0, 0.0))
+    x_axes = np.cross(helpers, z_axes)
+    x_axes /= np.linalg.norm(x_axes, axis=1, keepdims=True)
+    y_axes = np.cross(z_axes, x_axes)
+
+    return np.stack((x_axes, y_axes, z_axes), axis=2)
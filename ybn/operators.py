@@ -1,5 +1,6 @@
 from math import ceil
-from ..tools.obb import get_obb, get_obb_extents
+import time
+from ..tools.obb import ObbMethod, get_obb, get_obb_extents
 import traceback
 from ..cwxml.flag_preset import FlagPreset
 from ..ybn.properties import BoundFlags, RDRBoundFlags, load_flag_presets, flag_presets, get_flag_presets_path
@@ -49,6 +50,17 @@ class SOLLUMZ_OT_create_polygon_box_from_verts(bpy.types.Operator):
         name="Parent",
         description="Parent for the new box object. If not set, the parent of the active object is used."
     )
+    method: bpy.props.EnumProperty(
+        items=[
+            (ObbMethod.SAMPLED.value, "Sampled",
+             "Try rotations around evenly distributed axes, controlled by Number of Samples and Range Precision"),
+            (ObbMethod.MIN_VOLUME.value, "Minimum Volume",
+             "Fit the box against the faces and edges of the convex hull of the selection. Usually finds a smaller "
+             "box and is faster on dense selections"),
+        ],
+        name="Method",
+        default=ObbMethod.SAMPLED.value
+    )
     num_samples: bpy.props.IntProperty(
         name="Number of Samples",
         description="Number of samples to use to find the best orientation for the bounding box",
@@ -99,8 +111,11 @@ class SOLLUMZ_OT_create_polygon_box_from_verts(bpy.types.Operator):
 
         pobj = create_blender_object(self.sollum_type)
 
-        obb, world_matrix = get_obb(verts, self.num_samples, self.angle_step)
+        start = time.time()
+        obb, world_matrix = get_obb(verts, self.num_samples, self.angle_step, ObbMethod(self.method))
         bbmin, bbmax = get_obb_extents(obb)
+        size = bbmax - bbmin
+        self.report({"INFO"}, f"Found box with volume {size.x * size.y * size.z:.4f} in {time.time() - start:.3f} seconds.")
 
         center = world_matrix @ (bbmin + bbmax) / 2
         local_center = (bbmin + bbmax) / 2
@@ -6,6 +6,7 @@ import os
 from .properties import BoundFlags, RDRBoundFlags, CollisionMatFlags, ProceduralIdEnumItems
 from ..sollumz_properties import MaterialType, SollumType, SollumzGame, BOUND_TYPES, BOUND_POLYGON_TYPES
 from .collision_materials import collisionmats, rdr_collisionmats
+from .merged_polys import is_merged_poly_mesh
 from ..sollumz_ui import SOLLUMZ_PT_OBJECT_PANEL, SOLLUMZ_PT_MAT_PANEL
 from . import operators as ybn_ops
 
@@ -103,7 +104,11 @@ class SOLLUMZ_PT_BOUND_SHAPE_PANEL(bpy.types.Panel):
     @classmethod
     def poll(self, context):
         obj = context.active_object
-        return obj and (obj.sollum_type != SollumType.BOUND_COMPOSITE and obj.sollum_type != SollumType.BOUND_GEOMETRY and obj.sollum_type != SollumType.BOUND_GEOMETRYBVH and obj.sollum_type != SollumType.BOUND_PLANE and obj.sollum_type != SollumType.BOUND_POLY_TRIANGLE)
+        return obj and (
+            obj.sollum_type != SollumType.BOUND_COMPOSITE and obj.sollum_type != SollumType.BOUND_GEOMETRY and
+            obj.sollum_type != SollumType.BOUND_GEOMETRYBVH and obj.sollum_type != SollumType.BOUND_PLANE and
+            obj.sollum_type != SollumType.BOUND_POLY_TRIANGLE and not is_merged_poly_mesh(obj.data)
+        )
 
     def draw(self, context):
         obj = context.active_object
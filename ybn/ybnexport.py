@@ -2,6 +2,7 @@ import bpy
 from mathutils import Vector, Matrix
 from typing import Optional, TypeVar, Callable, Type
 import numpy as np
+from numpy.typing import NDArray
 
 from ..sollumz_helper import get_parent_inverse
 from ..tools.blenderhelper import get_pose_inverse, get_evaluated_obj, remove_number_suffix
@@ -23,6 +24,7 @@ from ..cwxml.bound import (
     PolySphere,
     PolyCapsule,
     PolyCylinder,
+    PolyTriangleArray,
     Material,
     RDRBoundFile
 )
@@ -36,8 +38,10 @@ from ..tools.meshhelper import (
     get_color_attr_name,
 )
 from ..sollumz_properties import MaterialType, SOLLUMZ_UI_NAMES, SollumType, BOUND_POLYGON_TYPES, SollumzGame, import_export_current_game as current_game, set_import_export_current_game
+from ..sollumz_preferences import get_export_settings
 from .. import logger
 from .properties import CollisionMatFlags, RDRBoundFlags, get_collision_mat_raw_flags, BoundFlags
+from .merged_polys import is_merged_poly_mesh, get_merged_polys
 from ..cwxml import bound
 
 T_Bound = TypeVar("T_Bound", bound=Bound)
@@ -45,6 +49,8 @@ T_BoundChild = TypeVar("T_BoundChild", bound=BoundChild)
 T_PolyCylCap = TypeVar("T_PolyCylCap", bound=PolyCylinder | PolyCapsule)
 
 MAX_VERTICES = 32767
+# Avoids dividing by zero when quantizing points of flat geometry to Morton codes
+MORTON_MIN_EXTENT = 1e-6
 
 
 def export_ybn(obj: bpy.types.Object, filepath: str) -> bool:
@@ -267,21 +273,11 @@ def create_bound_xml(obj: bpy.types.Object, is_root: bool = False, allow_planes:
             if bound_xml.vertices and bound_xml.polygons:
 
                 if current_game() == SollumzGame.GTA:
-                    mesh_vertices = np.array([(v + bound_xml.geometry_center) for v in bound_xml.vertices])
-                    mesh_faces = []
-                    for poly in bound_xml.polygons:
-                        mesh_faces.append([poly.v1, poly.v2, poly.v3])
-                    mesh_faces = np.array(mesh_faces)
+                    geom_center = bound_xml.geometry_center
                 elif current_game() == SollumzGame.RDR:
                     geom_center = get_bound_center_from_bounds(bound_xml.box_min, bound_xml.box_max)
-                    mesh_vertices = np.array([(v + geom_center) for v in bound_xml.vertices])
-                    mesh_faces = []
-                    for poly in bound_xml.polygons:
-                        parts = poly.split()
-                        v1 = int(parts[2])
-                        v2 = int(parts[3])
-                        v3 = int(parts[4])
-                        mesh_faces.append([v1, v2, v3])
+                mesh_vertices = np.array(bound_xml.vertices, dtype=np.float64) + np.array(geom_center)
+                mesh_faces, _ = split_bound_poly_triangles(bound_xml.polygons)
 
                 centroid, radius_around_centroid = get_centroid_of_mesh(mesh_vertices)
                 volume, cg, inertia = get_mass_properties_of_mesh(mesh_vertices, mesh_faces)
@@ -309,32 +305,15 @@ def create_bound_xml(obj: bpy.types.Object, is_root: bool = False, allow_planes:
             primitives = []
             if bound_xml.vertices and bound_xml.polygons:
                 if current_game() == SollumzGame.GTA:
-                    mesh_vertices = np.array([(v + bound_xml.geometry_center) for v in bound_xml.vertices])
-                    mesh_faces = []
-                    for poly in bound_xml.polygons:
-                        if not isinstance(poly, PolyTriangle):
-                            primitives.append(poly)
-                            continue
-                        mesh_faces.append([poly.v1, poly.v2, poly.v3])
+                    geom_center = bound_xml.geometry_center
                 elif current_game() == SollumzGame.RDR:
                     geom_center = get_bound_center_from_bounds(bound_xml.box_min, bound_xml.box_max)
-                    mesh_vertices = np.array([(v + geom_center) for v in bound_xml.vertices])
-                    mesh_faces = []
-                    for poly in bound_xml.polygons:
-                        if not poly.startswith("Tri"):
-                            primitives.append(poly)
-                            continue
-
-                        parts = poly.split()
-                        v1 = int(parts[2])
-                        v2 = int(parts[3])
-                        v3 = int(parts[4])
-                        mesh_faces.append([v1, v2, v3])
+                mesh_vertices = np.array(bound_xml.vertices, dtype=np.float64) + np.array(geom_center)
+                mesh_faces, primitives = split_bound_poly_triangles(bound_xml.polygons)
 
                 centroid, radius_around_centroid = get_centroid_of_mesh(mesh_vertices)
                 if len(mesh_faces) > 0:
                     # If we have a mesh, calculate the center of gravity from the mesh
-                    mesh_faces = np.array(mesh_faces)
                     _, cg, _ = get_mass_properties_of_mesh(mesh_vertices, mesh_faces)
                 else:
                     # Otherwise, approximate with the centroid
@@ -414,6 +393,50 @@ def create_bound_xml(obj: bpy.types.Object, is_root: bool = False, allow_planes:
     return bound_xml
 
 
+def split_bound_poly_triangles(polygons: list) -> tuple[NDArray[np.uint32], list]:
+    """Get the vertex indices of all triangles in ``polygons`` as a (N, 3) array, and a list with the remaining
+    primitive polygons."""
+    tri_chunks = []
+    primitives = []
+    for poly in polygons:
+        if isinstance(poly, PolyTriangleArray):
+            tri_chunks.append(poly.vert_inds)
+        elif isinstance(poly, PolyTriangle):
+            tri_chunks.append(np.array([[poly.v1, poly.v2, poly.v3]], dtype=np.uint32))
+        else:
+            primitives.append(poly)
+
+    if not tri_chunks:
+        return np.empty((0, 3), dtype=np.uint32), primitives
+
+    return np.concatenate(tri_chunks).astype(np.uint32), primitives
+
+
+def get_morton_codes(points: NDArray[np.float32], bbmin: NDArray[np.float32], bbmax: NDArray[np.float32]) -> NDArray[np.uint32]:
+    """Get the 30-bit Morton code of each point, quantized to 10 bits per axis within ``bbmin`` and ``bbmax``."""
+    extents = np.maximum(np.asarray(bbmax, dtype=np.float64) - bbmin, MORTON_MIN_EXTENT)
+    cells = np.clip((points - np.asarray(bbmin, dtype=np.float64)) / extents * 1024, 0, 1023).astype(np.uint32)
+
+    # Spread the 10 bits of each axis so there are two zero bits between each of them
+    cells = (cells | (cells << 16)) & 0x030000FF
+    cells = (cells | (cells << 8)) & 0x0300F00F
+    cells = (cells | (cells << 4)) & 0x030C30C3
+    cells = (cells | (cells << 2)) & 0x09249249
+
+    return (cells[:, 0] << 2) | (cells[:, 1] << 1) | cells[:, 2]
+
+
+def get_average_vertex_index_span(poly_verts: NDArray[np.int64]) -> float:
+    """Get the average distance between the lowest and highest vertex index of each polygon, a measure of how local
+    the vertex accesses of the polygons are. ``poly_verts`` is a (N, K) array of vertex indices padded with -1."""
+    if len(poly_verts) == 0:
+        return 0.0
+
+    highest = poly_verts.max(axis=1)
+    lowest = np.where(poly_verts >= 0, poly_verts, highest[:, np.newaxis]).min(axis=1)
+    return float(np.mean(highest - lowest))
+
+
 def validate_collision_materials(obj: bpy.types.Object, verbose: bool = False) -> bool:
     assert obj.type == "MESH", "Expected bound mesh object"
     mesh = obj.data
@@ -434,7 +457,9 @@ def validate_collision_materials(obj: bpy.types.Object, verbose: bool = False) -
             )
         return False
 
-    supports_multiple_materials = obj.sollum_type in {SollumType.BOUND_GEOMETRY, SollumType.BOUND_POLY_TRIANGLE}
+    supports_multiple_materials = (
+        obj.sollum_type in {SollumType.BOUND_GEOMETRY, SollumType.BOUND_POLY_TRIANGLE} or is_merged_poly_mesh(mesh)
+    )
     if not col_mats:
         if verbose:
             logger.warning(f"Bound '{obj.name}' has no collision materials! Please, add a collision material.")
@@ -511,83 +536,229 @@ def create_bvh_xml(obj: bpy.types.Object):
 
 def create_bound_geom_xml_data(geom_xml: BoundGeometry | BoundGeometryBVH, obj: bpy.types.Object):
     """Create the vertices, polygons, and vertex colors of a ``BoundGeometry`` or ``BoundGeometryBVH`` from ``obj``."""
-    create_bound_xml_polys(geom_xml, obj)
-    geometry_center = center_verts_to_geometry(geom_xml)
+    vertices = create_bound_xml_polys(geom_xml, obj)
+    geometry_center = center_verts_to_geometry(geom_xml, vertices)
     if current_game() == SollumzGame.GTA:
         geom_xml.geometry_center = geometry_center
 
-    num_vertices = len(geom_xml.vertices)
+    validate_bound_vertex_count(obj, len(geom_xml.vertices))
+
 
+def validate_bound_vertex_count(obj: bpy.types.Object, num_vertices: int) -> bool:
     if num_vertices == 0:
         logger.warning(f"{SOLLUMZ_UI_NAMES[obj.sollum_type]} '{obj.name}' has no geometry!")
+        return False
 
     if num_vertices > MAX_VERTICES:
         logger.warning(
             f"{SOLLUMZ_UI_NAMES[obj.sollum_type]} '{obj.name}' exceeds maximum vertex limit of {MAX_VERTICES} "
             f"(has {num_vertices})!"
         )
+        return False
+
+    return True
 
 
-def center_verts_to_geometry(geom_xml: BoundGeometry | BoundGeometryBVH):
+def center_verts_to_geometry(geom_xml: BoundGeometry | BoundGeometryBVH, vertices: NDArray[np.float32]):
     """Position verts such that the origin is at their center of geometry. Returns the center of geometry."""
     geom_center = get_bound_center_from_bounds(geom_xml.box_min, geom_xml.box_max)
-    geom_xml.vertices = [Vector(vert) - geom_center for vert in geom_xml.vertices]
+    centered_vertices = vertices - np.array(geom_center, dtype=np.float32)
+    geom_xml.vertices = [Vector(vert) for vert in centered_vertices]
     return Vector(geom_center)
 
 
-def create_bound_xml_polys(geom_xml: BoundGeometry | BoundGeometryBVH, obj: bpy.types.Object):
-    # Create mappings of vertices and materials by index to build the new geom_xml vertices
-    ind_by_vert: dict[tuple, int] = {}
-    ind_by_mat: dict[bpy.types.Material, int] = {}
+class BoundPolysBuilder:
+    """Collects the vertices, polygons and materials of a ``BoundGeometry`` or ``BoundGeometryBVH``. Vertices are added
+    to a pool without removing duplicates, and polygons index into this pool. All vertices are welded at once in
+    ``build``, keeping the order in which they were first added."""
+
+    DEFAULT_VERTEX_COLOR = (255, 255, 255, 255)
+
+    # Attributes with vertex indices of each primitive polygon type
+    PRIMITIVE_VERT_ATTRS = {
+        PolyBox: ("v1", "v2", "v3", "v4"),
+        PolySphere: ("v",),
+        PolyCapsule: ("v1", "v2"),
+        PolyCylinder: ("v1", "v2"),
+    }
+    # Number of vertex indices of each RDR primitive polygon type, stored after the type and material index
+    RDR_PRIMITIVE_NUM_VERTS = {
+        "Box": 4,
+        "Sph": 1,
+        "Cap": 2,
+        "Cyl": 2,
+    }
+
+    def __init__(self, geom_xml: BoundGeometry | BoundGeometryBVH):
+        self.geom_xml = geom_xml
+        self.positions: list[NDArray[np.float32]] = []
+        self.colors: list[Optional[NDArray[np.uint8]]] = []
+        self.num_vertices = 0
+        self.polygons: list = []
+        self.ind_by_mat: dict[bpy.types.Material, int] = {}
+        # Average vertex index span of the polygons before and after sorting them spatially in ``build``
+        self.index_spans: Optional[tuple[float, float]] = None
+
+    def add_vertices(self, positions: NDArray[np.float32], colors: Optional[NDArray[np.uint8]] = None) -> NDArray[np.uint32]:
+        """Add vertices to the pool. Returns their indices in the pool."""
+        start = self.num_vertices
+        self.positions.append(positions)
+        self.colors.append(colors)
+        self.num_vertices += len(positions)
+        return np.arange(start, self.num_vertices, dtype=np.uint32)
+
+    def get_vert_index(self, vert: Vector) -> int:
+        """Add a single vertex to the pool. Returns its index in the pool."""
+        return int(self.add_vertices(np.array([vert], dtype=np.float32))[0])
+
+    def get_mat_index(self, mat: bpy.types.Material) -> int:
+        if mat in self.ind_by_mat:
+            return self.ind_by_mat[mat]
 
-    def get_vert_index(vert: Vector, vert_color: Optional[tuple[int, int, int, int]] = None):
-        default_vert_color = (255, 255, 255, 255)
+        mat_xml = create_col_mat_xml(mat)
+        mat_ind = len(self.geom_xml.materials)
+        self.geom_xml.materials.append(mat_xml)
 
-        if current_game() == SollumzGame.GTA:
-            # These are safety checks in case the user mixed poly primitives and poly meshes with color attributes
-            # This doesn't occur in original .ybns, if they have vertex colors, only poly triangles (meshes) are used.
-            if vert_color is not None and len(geom_xml.vertex_colors) != len(geom_xml.vertices):
-                # This vertex has color but previous ones didn't, assign a default color to all previous vertices
-                for _ in range(len(geom_xml.vertex_colors), len(geom_xml.vertices)):
-                    geom_xml.vertex_colors.append(default_vert_color)
-
-            if vert_color is None and len(geom_xml.vertex_colors) != 0:
-                # There are already vertex colors in this geometry, assign a default color
-                vert_color = default_vert_color
-
-            # Tuple to uniquely identify this vertex and remove duplicates
-            # Must be tuple since Vector is not hashable
-            vertex_id = (*vert, *(vert_color or default_vert_color))
-        elif current_game() == SollumzGame.RDR:
-            vertex_id = vert.to_tuple()
+        self.ind_by_mat[mat] = mat_ind
+
+        return mat_ind
 
-        if vertex_id in ind_by_vert:
-            return ind_by_vert[vertex_id]
+    def add_polygon(self, poly):
+        self.polygons.append(poly)
+
+    def build(self, spatial_sort: bool = False) -> NDArray[np.float32]:
+        """Weld the vertices and set the polygons and vertex colors of the geometry. Returns the welded vertices.
+
+        With ``spatial_sort``, polygons are sorted along a Morton curve and the vertices renumbered in the order they are
+        first used, so polygons close in space are also close in the polygon and vertex arrays."""
+        geom_xml = self.geom_xml
+        if self.num_vertices == 0:
+            geom_xml.polygons = self.polygons
+            return np.empty((0, 3), dtype=np.float32)
+
+        # Adding 0.0 turns -0.0 into 0.0, so both are welded together
+        positions = np.concatenate(self.positions).astype(np.float32) + np.float32(0.0)
+        has_colors = any(colors is not None for colors in self.colors)
+        colors = np.concatenate([
+            colors if colors is not None else np.full((len(pos), 4), self.DEFAULT_VERTEX_COLOR, dtype=np.uint8)
+            for pos, colors in zip(self.positions, self.colors)
+        ])
+
+        # Vertices without color are welded with white vertices, same as when a default color is assigned to them
+        keys = np.ascontiguousarray(np.hstack((positions.view(np.uint8), colors)))
+        keys = keys.view(np.dtype((np.void, keys.shape[1]))).ravel()
+        _, first_inds, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+        # Unique vertices sorted by first appearance
+        order = np.argsort(first_inds, kind="stable")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        vert_remap = rank[inverse.ravel()].astype(np.uint32)
+        unique_inds = first_inds[order]
+
+        for poly in self.polygons:
+            self._remap_polygon_vertices(poly, vert_remap)
+
+        positions = positions[unique_inds]
+        colors = colors[unique_inds]
+        if spatial_sort:
+            vert_order = self._sort_polygons_spatially(positions)
+            positions = positions[vert_order]
+            colors = colors[vert_order]
+
+        geom_xml.polygons = self.polygons
+        if has_colors and current_game() == SollumzGame.GTA:
+            geom_xml.vertex_colors = list(map(tuple, colors.tolist()))
+
+        return positions
+
+    def _sort_polygons_spatially(self, positions: NDArray[np.float32]) -> NDArray[np.intp]:
+        """Sort the polygons by the Morton code of their centroid and renumber the vertices in first-use order. Triangle
+        runs that end up next to each other are merged into a single ``PolyTriangleArray``. Returns the new order of
+        ``positions``."""
+        tri_arrays = [poly for poly in self.polygons if isinstance(poly, PolyTriangleArray)]
+        primitives = [poly for poly in self.polygons if not isinstance(poly, PolyTriangleArray)]
+        num_tris = sum(len(tris) for tris in tri_arrays)
+        num_polys = num_tris + len(primitives)
+
+        # Vertex indices of every polygon, padded with -1. Triangles come first, then primitives
+        poly_verts = np.full((num_polys, 4), -1, dtype=np.int64)
+        tri_mats = np.zeros(num_tris, dtype=np.uint32)
+        if tri_arrays:
+            poly_verts[:num_tris, :3] = np.concatenate([tris.vert_inds for tris in tri_arrays])
+            tri_mats = np.concatenate([tris.material_inds for tris in tri_arrays]).astype(np.uint32)
+        for i, poly in enumerate(primitives, start=num_tris):
+            verts = self._get_polygon_vertices(poly)
+            poly_verts[i, :len(verts)] = verts
+
+        if num_polys == 0:
+            self.index_spans = (0.0, 0.0)
+            return np.arange(len(positions))
+
+        span_before = get_average_vertex_index_span(poly_verts)
+
+        is_used = poly_verts >= 0
+        num_used = is_used.sum(axis=1, keepdims=True)
+        centroids = np.where(is_used[..., np.newaxis], positions[poly_verts], 0.0).sum(axis=1) / num_used
+        order = np.argsort(get_morton_codes(centroids, positions.min(axis=0), positions.max(axis=0)), kind="stable")
+        poly_verts = poly_verts[order]
+
+        # Vertices in the order they are first used, followed by any vertex not used by a polygon
+        flat_verts = poly_verts[poly_verts >= 0]
+        used_verts, first_inds = np.unique(flat_verts, return_index=True)
+        vert_order = np.concatenate((
+            used_verts[np.argsort(first_inds, kind="stable")],
+            np.setdiff1d(np.arange(len(positions)), used_verts, assume_unique=True),
+        ))
+        vert_remap = np.empty(len(positions), dtype=np.int64)
+        vert_remap[vert_order] = np.arange(len(positions))
+
+        poly_verts = np.where(poly_verts >= 0, vert_remap[np.maximum(poly_verts, 0)], -1)
+        self.index_spans = (span_before, get_average_vertex_index_span(poly_verts))
+
+        # Rebuild the polygon list, one PolyTriangleArray per run of consecutive triangles
+        polygons = []
+        is_tri = order < num_tris
+        run_edges = np.flatnonzero(np.diff(is_tri.view(np.int8), prepend=-1, append=-1))
+        for start, end in zip(run_edges[:-1], run_edges[1:]):
+            if is_tri[start]:
+                polygons.append(PolyTriangleArray(
+                    tri_mats[order[start:end]], poly_verts[start:end, :3].astype(np.uint32)
+                ))
+                continue
 
-        vert_ind = len(ind_by_vert)
-        ind_by_vert[vertex_id] = vert_ind
-        geom_xml.vertices.append(Vector(vert))
-        if vert_color is not None and current_game() == SollumzGame.GTA:
-            geom_xml.vertex_colors.append(vert_color)
+            for poly in (primitives[i - num_tris] for i in order[start:end]):
+                self._remap_polygon_vertices(poly, vert_remap)
+                polygons.append(poly)
 
-        return vert_ind
+        self.polygons = polygons
+        return vert_order
 
-    def get_mat_index(mat: bpy.types.Material):
-        if mat in ind_by_mat:
-            return ind_by_mat[mat]
+    def _get_polygon_vertices(self, poly) -> list[int]:
+        if isinstance(poly, list):
+            return poly[2:2 + self.RDR_PRIMITIVE_NUM_VERTS[poly[0]]]
 
-        mat_xml = create_col_mat_xml(mat)
-        mat_ind = len(geom_xml.materials)
-        geom_xml.materials.append(mat_xml)
+        return [getattr(poly, attr) for attr in self.PRIMITIVE_VERT_ATTRS[type(poly)]]
 
-        ind_by_mat[mat] = mat_ind
+    def _remap_polygon_vertices(self, poly, vert_remap: NDArray[np.uint32]):
+        if isinstance(poly, PolyTriangleArray):
+            poly.vert_inds = vert_remap[poly.vert_inds]
+        elif isinstance(poly, list):
+            num_verts = self.RDR_PRIMITIVE_NUM_VERTS[poly[0]]
+            poly[2:2 + num_verts] = (int(vert_remap[v]) for v in poly[2:2 + num_verts])
+        else:
+            for attr in self.PRIMITIVE_VERT_ATTRS[type(poly)]:
+                setattr(poly, attr, int(vert_remap[getattr(poly, attr)]))
 
-        return mat_ind
+
+def create_bound_xml_polys(geom_xml: BoundGeometry | BoundGeometryBVH, obj: bpy.types.Object) -> NDArray[np.float32]:
+    """Create the polygons and materials of ``geom_xml``. Returns the welded vertices."""
+    polys = BoundPolysBuilder(geom_xml)
 
     # If the bound object is a mesh, just convert its mesh data into triangles
     if not isinstance(geom_xml, BoundGeometryBVH):
-        create_bound_geom_xml_triangles(obj, geom_xml, get_vert_index, get_mat_index)
-        return
+        create_bound_geom_xml_triangles(obj, geom_xml, polys)
+        return build_bound_polys(polys, obj)
 
     # For empty bound objects with children, create the bound polygons from its children
     for child in obj.children_recursive:
@@ -598,52 +769,123 @@ def create_bound_xml_polys(geom_xml: BoundGeometry | BoundGeometryBVH, obj: bpy.
             )
             continue
 
-        create_bound_xml_poly_shape(child, geom_xml, get_vert_index, get_mat_index)
+        create_bound_xml_poly_shape(child, geom_xml, polys)
 
+    return build_bound_polys(polys, obj)
 
-def create_bound_geom_xml_triangles(obj: bpy.types.Object, geom_xml: BoundGeometry, get_vert_index: Callable[[Vector], int], get_mat_index: Callable[[bpy.types.Material], int]):
+
+def build_bound_polys(polys: BoundPolysBuilder, obj: bpy.types.Object) -> NDArray[np.float32]:
+    """Build ``polys``, sorting them spatially if enabled in the export settings. Returns the welded vertices."""
+    spatial_sort = get_export_settings().ybn_spatial_sort_polys
+    vertices = polys.build(spatial_sort=spatial_sort)
+    if spatial_sort and polys.index_spans is not None:
+        span_before, span_after = polys.index_spans
+        logger.info(
+            f"Sorted polygons of '{obj.name}' spatially. Average vertex index span per polygon went from "
+            f"{span_before:.1f} to {span_after:.1f}."
+        )
+
+    return vertices
+
+
+def create_bound_geom_xml_triangles(obj: bpy.types.Object, geom_xml: BoundGeometry, polys: BoundPolysBuilder):
     """Create all bound poly triangles and vertices for a ``BoundGeometry`` object."""
     obj_eval, mesh = create_export_mesh(obj)
 
     transforms = get_bound_poly_transforms_to_apply(obj, geom_xml.composite_transform)
-    triangles = create_poly_xml_triangles(mesh, transforms, get_vert_index, get_mat_index)
-    geom_xml.polygons = triangles
+    polys.add_polygon(create_poly_xml_triangles(mesh, transforms, polys))
 
     obj_eval.to_mesh_clear()
 
 
-def create_bound_xml_poly_shape(obj: bpy.types.Object, geom_xml: BoundGeometryBVH, get_vert_index: Callable[[Vector], int], get_mat_index: Callable[[bpy.types.Material], int]):
+def create_bound_xml_poly_shape(obj: bpy.types.Object, geom_xml: BoundGeometryBVH, polys: BoundPolysBuilder):
+    transforms = get_bound_poly_transforms_to_apply(obj, geom_xml.composite_transform)
+
+    if is_merged_poly_mesh(obj.data):
+        create_merged_polys_xml(obj, transforms, polys)
+        return
+
     obj_eval, mesh = create_export_mesh(obj)
 
-    transforms = get_bound_poly_transforms_to_apply(obj, geom_xml.composite_transform)
+    get_vert_index = polys.get_vert_index
+    get_mat_index = polys.get_mat_index
 
     match obj.sollum_type:
         case SollumType.BOUND_POLY_TRIANGLE:
-            triangles = create_poly_xml_triangles(mesh, transforms, get_vert_index, get_mat_index)
-            geom_xml.polygons.extend(triangles)
+            triangles = create_poly_xml_triangles(mesh, transforms, polys)
+            polys.add_polygon(triangles)
         case SollumType.BOUND_POLY_BOX:
             box_xml = create_poly_box_xml(obj, transforms, get_vert_index, get_mat_index)
-            geom_xml.polygons.append(box_xml)
+            polys.add_polygon(box_xml)
         case SollumType.BOUND_POLY_SPHERE:
             sphere_xml = create_poly_sphere_xml(obj, transforms, get_vert_index, get_mat_index)
-            geom_xml.polygons.append(sphere_xml)
+            polys.add_polygon(sphere_xml)
         case SollumType.BOUND_POLY_CYLINDER:
             poly_type = PolyCylinder
             if current_game() == SollumzGame.RDR:
                 poly_type = "Cyl"
             cylinder_xml = create_poly_cylinder_capsule_xml(
                 poly_type, obj, transforms, get_vert_index, get_mat_index)
-            geom_xml.polygons.append(cylinder_xml)
+            polys.add_polygon(cylinder_xml)
         case SollumType.BOUND_POLY_CAPSULE:
             poly_type = PolyCapsule
             if current_game() == SollumzGame.RDR:
                 poly_type = "Cap"
             capsule_xml = create_poly_cylinder_capsule_xml(poly_type, obj, transforms, get_vert_index, get_mat_index)
-            geom_xml.polygons.append(capsule_xml)
+            polys.add_polygon(capsule_xml)
 
     obj_eval.to_mesh_clear()
 
 
+def create_merged_polys_xml(obj: bpy.types.Object, transforms: Matrix, polys: BoundPolysBuilder):
+    """Create the bound polygons stored in an object of merged primitive polygons, see ``ybn.merged_polys``."""
+    merged_polys = get_merged_polys(obj.data, obj.sollum_type)
+    num_polys, num_poly_verts, _ = merged_polys.vertices.shape
+
+    matrix = np.array(transforms, dtype=np.float64)
+    positions = merged_polys.vertices.reshape((-1, 3)) @ matrix[:3, :3].T + matrix[:3, 3]
+    vert_inds = polys.add_vertices(positions.astype(np.float32)).reshape((num_polys, num_poly_verts)).tolist()
+
+    # Radii are stored as float32, write the shortest value that reads back the same so unchanged radii are written
+    # as they were imported
+    radii = [float(np.format_float_positional(r)) for r in merged_polys.radii]
+
+    materials = obj.data.materials
+    for poly_vert_inds, radius, slot in zip(vert_inds, radii, merged_polys.material_slots.tolist()):
+        mat_ind = polys.get_mat_index(materials[slot] if slot < len(materials) else obj.active_material)
+
+        if current_game() == SollumzGame.GTA:
+            match obj.sollum_type:
+                case SollumType.BOUND_POLY_BOX:
+                    poly_xml = PolyBox()
+                    poly_xml.v1, poly_xml.v2, poly_xml.v3, poly_xml.v4 = poly_vert_inds
+                case SollumType.BOUND_POLY_SPHERE:
+                    poly_xml = PolySphere()
+                    poly_xml.v = poly_vert_inds[0]
+                case SollumType.BOUND_POLY_CAPSULE:
+                    poly_xml = PolyCapsule()
+                    poly_xml.v1, poly_xml.v2 = poly_vert_inds
+                case SollumType.BOUND_POLY_CYLINDER:
+                    poly_xml = PolyCylinder()
+                    poly_xml.v1, poly_xml.v2 = poly_vert_inds
+
+            poly_xml.material_index = mat_ind
+            if obj.sollum_type != SollumType.BOUND_POLY_BOX:
+                poly_xml.radius = radius
+        elif current_game() == SollumzGame.RDR:
+            match obj.sollum_type:
+                case SollumType.BOUND_POLY_BOX:
+                    poly_xml = ["Box", mat_ind, *poly_vert_inds]
+                case SollumType.BOUND_POLY_SPHERE:
+                    poly_xml = ["Sph", mat_ind, poly_vert_inds[0], radius]
+                case SollumType.BOUND_POLY_CAPSULE:
+                    poly_xml = ["Cap", mat_ind, *poly_vert_inds, radius]
+                case SollumType.BOUND_POLY_CYLINDER:
+                    poly_xml = ["Cyl", mat_ind, *poly_vert_inds, radius]
+
+        polys.add_polygon(poly_xml)
+
+
 def get_bound_poly_transforms_to_apply(obj: bpy.types.Object, composite_transform: Matrix):
     """Get the transforms to apply directly to BoundGeometry vertices."""
     composite_transform = composite_transform.transposed()
@@ -675,55 +917,42 @@ def create_export_mesh(obj: bpy.types.Object):
     return obj_eval, mesh
 
 
-def create_poly_xml_triangles(mesh: bpy.types.Mesh, transforms: Matrix, get_vert_index: Callable[[Vector], int], get_mat_index: Callable[[bpy.types.Material], int]):
-    """Create all bound polygon triangle XML objects for this BoundGeometry/BVH."""
-    triangles: list[PolyTriangle] = []
+def create_poly_xml_triangles(mesh: bpy.types.Mesh, transforms: Matrix, polys: BoundPolysBuilder) -> PolyTriangleArray:
+    """Create all bound polygon triangles for this BoundGeometry/BVH. Vertices are added to ``polys`` and the returned
+    triangles index into its vertex pool."""
+    num_tris = len(mesh.loop_triangles)
+    tri_loops = np.empty(num_tris * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("loops", tri_loops)
+    tri_slots = np.empty(num_tris, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("material_index", tri_slots)
 
+    loop_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+    vert_positions = np.empty((len(mesh.vertices), 3), dtype=np.float32)
+    mesh.vertices.foreach_get("co", vert_positions.ravel())
+
+    matrix = np.array(transforms, dtype=np.float64)
+    vert_positions = (vert_positions @ matrix[:3, :3].T + matrix[:3, 3]).astype(np.float32)
+
+    corner_positions = vert_positions[loop_verts[tri_loops]]
+    corner_colors = None
     if current_game() == SollumzGame.GTA:
         color_attr_name = get_color_attr_name(0)
         color_attr = mesh.color_attributes.get(color_attr_name, None)
-        if color_attr is not None and (color_attr.domain != "CORNER" or color_attr.data_type != "BYTE_COLOR"):
-            color_attr = None
-
-        for tri in mesh.loop_triangles:
-            triangle = PolyTriangle()
-            mat = mesh.materials[tri.material_index]
-            triangle.material_index = get_mat_index(mat)
+        if color_attr is not None and color_attr.domain == "CORNER" and color_attr.data_type == "BYTE_COLOR":
+            loop_colors = np.empty((len(mesh.loops), 4), dtype=np.float32)
+            color_attr.data.foreach_get("color_srgb", loop_colors.ravel())
+            corner_colors = np.round(loop_colors[tri_loops] * 255).astype(np.uint8)
 
-            tri_indices: list[int] = []
-
-            for loop_idx in tri.loops:
-                loop = mesh.loops[loop_idx]
-
-                vert_pos = transforms @ mesh.vertices[loop.vertex_index].co
-                vert_color = color_attr.data[loop_idx].color_srgb if color_attr is not None else None
-                if vert_color is not None:
-                    vert_color = (vert_color[0] * 255, vert_color[1] * 255, vert_color[2] * 255, vert_color[3] * 255)
-                vert_ind = get_vert_index(vert_pos, vert_color=vert_color)
-
-                tri_indices.append(vert_ind)
-
-            triangle.v1 = tri_indices[0]
-            triangle.v2 = tri_indices[1]
-            triangle.v3 = tri_indices[2]
-
-            triangles.append(triangle)
-
-    elif current_game() == SollumzGame.RDR:
-        for tri in mesh.loop_triangles:
-            mat = mesh.materials[tri.material_index]
-            tri_indices: list[int] = []
+    vert_inds = polys.add_vertices(corner_positions, corner_colors).reshape((num_tris, 3))
 
-            for loop_idx in tri.loops:
-                loop = mesh.loops[loop_idx]
-                vert_pos = transforms @ mesh.vertices[loop.vertex_index].co
-                vert_ind = get_vert_index(vert_pos)
-                tri_indices.append(vert_ind)
+    # Material indices are assigned in the order the materials are first used
+    used_slots, first_tri_inds = np.unique(tri_slots, return_index=True)
+    mat_inds_by_slot = np.zeros(max(len(mesh.materials), 1), dtype=np.uint32)
+    for slot in used_slots[np.argsort(first_tri_inds)]:
+        mat_inds_by_slot[slot] = polys.get_mat_index(mesh.materials[slot])
 
-            tri_poly_string = f"Tri {get_mat_index(mat)} {tri_indices[0]} {tri_indices[1]} {tri_indices[2]}"
-            triangles.append(tri_poly_string)
-   
-    return triangles
+    return PolyTriangleArray(mat_inds_by_slot[tri_slots], vert_inds)
 
 
 def create_poly_box_xml(obj: bpy.types.Object, transforms: Matrix, get_vert_index: Callable[[Vector], int], get_mat_index: Callable[[bpy.types.Material], int]):
@@ -748,7 +977,7 @@ def create_poly_box_xml(obj: bpy.types.Object, transforms: Matrix, get_vert_inde
         corners = [bound_box[0], bound_box[5], bound_box[2], bound_box[7]]
         for vert in corners:
             indices.append(get_vert_index(vert))
-        return f"Box {get_mat_index(obj.active_material)} {indices[0]} {indices[1]} {indices[2]} {indices[3]}"
+        return ["Box", get_mat_index(obj.active_material), indices[0], indices[1], indices[2], indices[3]]
 
 def create_poly_sphere_xml(obj: bpy.types.Object, transforms: Matrix, get_vert_index: Callable[[Vector], int], get_mat_index: Callable[[bpy.types.Material], int]):
     if current_game() == SollumzGame.GTA:
@@ -772,7 +1001,7 @@ def create_poly_sphere_xml(obj: bpy.types.Object, transforms: Matrix, get_vert_i
         bbmin = get_min_vector_list(obj.bound_box)
         bbmax = get_max_vector_list(obj.bound_box)
         radius = (bbmax.x - bbmin.x) / 2
-        return f"Sph {get_mat_index(obj.active_material)} {vert_ind} {radius}"
+        return ["Sph", get_mat_index(obj.active_material), vert_ind, radius]
 
 
 def create_poly_cylinder_capsule_xml(poly_type: Type[T_PolyCylCap], obj: bpy.types.Object, transforms: Matrix, get_vert_index: Callable[[Vector], int], get_mat_index: Callable[[bpy.types.Material], int]):
@@ -823,7 +1052,7 @@ def create_poly_cylinder_capsule_xml(poly_type: Type[T_PolyCylCap], obj: bpy.typ
         v1 = position - vertical
         v2 = position + vertical
 
-        return f"{poly_type} {get_mat_index(obj.active_material)} {get_vert_index(v1)} {get_vert_index(v2)} {radius}"
+        return [poly_type, get_mat_index(obj.active_material), get_vert_index(v1), get_vert_index(v2), radius]
 
 
 def create_col_mat_xml(mat: bpy.types.Material):
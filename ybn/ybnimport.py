@@ -1,6 +1,7 @@
 import os
+import time
 import bpy
-from typing import Optional
+from typing import Callable, Optional
 import numpy as np
 from numpy.typing import NDArray
 from .properties import CollisionMatFlags, set_collision_mat_raw_flags
@@ -23,7 +24,13 @@ from ..cwxml.bound import (
     Material as ColMaterial
 )
 from ..sollumz_properties import SollumType, SOLLUMZ_UI_NAMES, SollumzGame, import_export_current_game as current_game, set_import_export_current_game
-from .collision_materials import create_collision_material_from_index, create_collision_material_from_name
+from ..sollumz_preferences import get_import_settings
+from .collision_materials import (
+    create_collision_material_from_index,
+    create_collision_material_from_name,
+    collision_material_pool,
+)
+from .merged_polys import MergedPolys, create_merged_poly_mesh
 from ..tools.meshhelper import (
     create_box,
     create_sphere,
@@ -38,6 +45,7 @@ from ..tools.utils import get_direction_of_vectors, get_distance_of_vectors, abs
 from ..tools.blenderhelper import create_blender_object, create_empty_object
 from mathutils import Matrix, Vector
 from math import radians
+from .. import logger
 
 
 def import_ybn(filepath):
@@ -118,11 +126,23 @@ def create_bound_child_mesh(bound_xml: BoundChild, sollum_type: SollumType, mesh
 
     mat = None
     if current_game() == SollumzGame.GTA:
-        mat = create_collision_material_from_index(bound_xml.material_index, SollumzGame.GTA)
+        key = (
+            "bound", bound_xml.material_index, bound_xml.procedural_id, bound_xml.room_id, bound_xml.ped_density,
+            bound_xml.material_color_index, bound_xml.unk_flags, bound_xml.poly_flags
+        )
+        mat = get_pooled_collision_material(
+            key,
+            lambda: create_collision_material_from_index(bound_xml.material_index, SollumzGame.GTA),
+            lambda mat: set_bound_col_material_properties(bound_xml, mat)
+        )
     elif current_game() == SollumzGame.RDR:
-        mat = create_collision_material_from_name(bound_xml.material_name, SollumzGame.RDR)
+        key = ("bound", bound_xml.material_name.lower(), tuple(bound_xml.material_flags))
+        mat = get_pooled_collision_material(
+            key,
+            lambda: create_collision_material_from_name(bound_xml.material_name, SollumzGame.RDR),
+            lambda mat: set_bound_col_material_properties(bound_xml, mat)
+        )
 
-    set_bound_col_material_properties(bound_xml, mat)
     obj.data.materials.append(mat)
     if current_game() == SollumzGame.RDR:
         obj.bound_properties.unk_11h = bound_xml.unk_11h
@@ -246,19 +266,54 @@ def create_geometry_materials(geometry: BoundGeometryBVH):
     mat_xml: ColMaterial
     for mat_xml in geometry.materials:
         mat = None
+        key = (mat_xml.procedural_id, mat_xml.unk, mat_xml.room_id, tuple(mat_xml.flags))
         if current_game() == SollumzGame.GTA:
-            mat = create_collision_material_from_index(mat_xml.type, SollumzGame.GTA)
+            key = ("geometry", mat_xml.type, mat_xml.ped_density, mat_xml.material_color_index, *key)
+            mat = get_pooled_collision_material(
+                key,
+                lambda: create_collision_material_from_index(mat_xml.type, SollumzGame.GTA),
+                lambda mat: set_col_material_properties(mat_xml, mat)
+            )
         elif current_game() == SollumzGame.RDR:
-            mat = create_collision_material_from_name(mat_xml.name, SollumzGame.RDR)
+            key = ("geometry", mat_xml.name.lower(), *key)
+            mat = get_pooled_collision_material(
+                key,
+                lambda: create_collision_material_from_name(mat_xml.name, SollumzGame.RDR),
+                lambda mat: set_col_material_properties(mat_xml, mat)
+            )
 
         if mat is None:
             raise Exception("Unable to create a valid collision material...")
-        set_col_material_properties(mat_xml, mat)        
         materials.append(mat)
 
     return materials
 
 
+def get_pooled_collision_material(
+    key: tuple,
+    create_material: Callable[[], bpy.types.Material],
+    set_material_properties: Callable[[bpy.types.Material], None],
+) -> bpy.types.Material:
+    """Get the collision material identified by ``key`` from the collision material pool, or create it if it is not
+    pooled yet. ``key`` must include everything ``create_material`` and ``set_material_properties`` read from the XML.
+    With the "Force Unique Materials" import setting enabled, a new material is always created.
+    """
+    if get_import_settings().ybn_force_unique_materials:
+        mat = create_material()
+        set_material_properties(mat)
+        return mat
+
+    # The material created also depends on the scene collision material game type
+    key = (bpy.context.scene.sollum_collision_material_game_type, *key)
+    mat = collision_material_pool.get(key)
+    if mat is None:
+        mat = create_material()
+        set_material_properties(mat)
+        collision_material_pool.add(key, mat)
+
+    return mat
+
+
 def set_col_material_flags(mat, material_flags):
     for flag_name in CollisionMatFlags.__annotations__.keys():
         if f"FLAG_{flag_name.upper()}" not in material_flags:
@@ -290,23 +345,92 @@ def set_bound_col_material_properties(bound_xml: Bound, mat: bpy.types.Material)
 
 
 def create_bvh_polys(bvh: BoundGeometryBVH, materials: list[bpy.types.Material], bvh_obj: bpy.types.Object):
-    if current_game() == SollumzGame.GTA:
-        for poly in bvh.polygons:
-            if type(poly) is PolyTriangle:
-                continue
+    start = time.time()
 
-            poly_obj = poly_to_obj(poly, materials, bvh.vertices)
-            poly_obj.location += bvh.geometry_center
-            poly_obj.parent = bvh_obj
+    if current_game() == SollumzGame.GTA:
+        polys = [poly for poly in bvh.polygons if type(poly) is not PolyTriangle]
+        geom_center = bvh.geometry_center
     elif current_game() == SollumzGame.RDR:
-        for poly in bvh.polygons:
-            if poly[0] == 'Tri':
-                continue
-
-            poly_obj = poly_to_obj(poly, materials, bvh.vertices)
-            geom_center = get_bound_center_from_bounds(bvh.box_min, bvh.box_max)
-            poly_obj.location += geom_center
-            poly_obj.parent = bvh_obj
+        polys = [poly for poly in bvh.polygons if poly[0] != "Tri"]
+        geom_center = get_bound_center_from_bounds(bvh.box_min, bvh.box_max)
+
+    if not polys:
+        return
+
+    if get_import_settings().ybn_merge_primitive_polys:
+        poly_objs = create_merged_poly_objs(polys, materials, bvh.vertices)
+    else:
+        poly_objs = [poly_to_obj(poly, materials, bvh.vertices) for poly in polys]
+
+    for poly_obj in poly_objs:
+        poly_obj.location += geom_center
+        poly_obj.parent = bvh_obj
+
+    logger.info(
+        f"Created {len(poly_objs)} objects for {len(polys)} primitive polygons of '{bvh_obj.name}' in "
+        f"{round(time.time() - start, 3)} seconds."
+    )
+
+
+def create_merged_poly_objs(
+    polys: list, materials: list[bpy.types.Material], vertices: list[Vector]
+) -> list[bpy.types.Object]:
+    """Create a single object per primitive polygon type, with the geometry of all the polygons of that type."""
+    poly_verts_by_type: dict[SollumType, list[tuple]] = {}
+    radii_by_type: dict[SollumType, list[float]] = {}
+    mat_inds_by_type: dict[SollumType, list[int]] = {}
+    for poly in polys:
+        if current_game() == SollumzGame.GTA:
+            sollum_type = POLY_TO_SOLLUM_TYPE_MAP[type(poly)]
+            mat_index = poly.material_index
+            match poly:
+                case PolyBox():
+                    vert_inds, radius = (poly.v1, poly.v2, poly.v3, poly.v4), 0.0
+                case PolySphere():
+                    vert_inds, radius = (poly.v,), poly.radius
+                case _:
+                    vert_inds, radius = (poly.v1, poly.v2), poly.radius
+        elif current_game() == SollumzGame.RDR:
+            sollum_type = RDR_POLY_TO_SOLLUM_TYPE_MAP[poly[0]]
+            mat_index = poly[1]
+            match poly[0]:
+                case "Box":
+                    vert_inds, radius = tuple(poly[2:6]), 0.0
+                case "Sph":
+                    vert_inds, radius = (poly[2],), poly[3]
+                case _:
+                    vert_inds, radius = tuple(poly[2:4]), poly[4]
+
+        poly_verts_by_type.setdefault(sollum_type, []).append(vert_inds)
+        radii_by_type.setdefault(sollum_type, []).append(radius)
+        mat_inds_by_type.setdefault(sollum_type, []).append(mat_index)
+
+    vertices_arr = np.array(vertices, dtype=np.float64).reshape((-1, 3))
+    objs = []
+    for sollum_type, poly_verts in poly_verts_by_type.items():
+        poly_verts = np.array(poly_verts, dtype=np.int64)
+        # Polygons with an invalid material index get no material, same as in init_poly_obj. Their slot is left past
+        # the last material
+        material_slots = np.array(mat_inds_by_type[sollum_type], dtype=np.int32)
+        material_slots[(material_slots < 0) | (material_slots >= len(materials))] = len(materials)
+        merged_polys = MergedPolys(
+            vertices_arr[poly_verts].astype(np.float32),
+            np.array(radii_by_type[sollum_type], dtype=np.float32),
+            material_slots,
+        )
+
+        box_matrices = None
+        if sollum_type == SollumType.BOUND_POLY_BOX:
+            box_matrices = np.array([
+                np.array(get_poly_box_matrix(*(vertices[i] for i in box_verts)))[:3]
+                for box_verts in poly_verts
+            ])
+
+        name = SOLLUMZ_UI_NAMES[sollum_type]
+        mesh = create_merged_poly_mesh(name, sollum_type, merged_polys, materials, box_matrices)
+        objs.append(create_blender_object(sollum_type, name, mesh, current_game()))
+
+    return objs
 
 
 def init_poly_obj(poly, sollum_type, materials):
@@ -336,6 +460,16 @@ def create_poly_box(poly, materials, vertices):
         v2 = vertices[poly[3]]
         v3 = vertices[poly[4]]
         v4 = vertices[poly[5]]
+
+    create_box(obj.data, size=1)
+    obj.matrix_basis = get_poly_box_matrix(v1, v2, v3, v4)
+
+    return obj
+
+
+def get_poly_box_matrix(v1: Vector, v2: Vector, v3: Vector, v4: Vector) -> Matrix:
+    """Get the matrix that transforms a unit cube into the box with opposing corners ``v1``, ``v2``, ``v3`` and
+    ``v4``."""
     center = (v1 + v2 + v3 + v4) * 0.25
 
     # Get edges from the 4 opposing corners of the box
@@ -396,10 +530,7 @@ def create_poly_box(poly, materials, vertices):
     mat[1] = edge1.y, edge2.y, edge3.y, center.y
     mat[2] = edge1.z, edge2.z, edge3.z, center.z
 
-    create_box(obj.data, size=1)
-    obj.matrix_basis = mat
-
-    return obj
+    return mat
 
 
 def create_poly_sphere(poly, materials, vertices):
@@ -476,6 +607,20 @@ RDR_POLY_TO_OBJ_MAP = {
     "Cyl": create_poly_cylinder,
 }
 
+POLY_TO_SOLLUM_TYPE_MAP = {
+    PolyBox: SollumType.BOUND_POLY_BOX,
+    PolySphere: SollumType.BOUND_POLY_SPHERE,
+    PolyCapsule: SollumType.BOUND_POLY_CAPSULE,
+    PolyCylinder: SollumType.BOUND_POLY_CYLINDER,
+}
+
+RDR_POLY_TO_SOLLUM_TYPE_MAP = {
+    "Box": SollumType.BOUND_POLY_BOX,
+    "Sph": SollumType.BOUND_POLY_SPHERE,
+    "Cap": SollumType.BOUND_POLY_CAPSULE,
+    "Cyl": SollumType.BOUND_POLY_CYLINDER,
+}
+
 def poly_to_obj(poly, materials, vertices) -> bpy.types.Object:
     if current_game() == SollumzGame.GTA:
         return POLY_TO_OBJ_MAP[type(poly)](poly, materials, vertices)
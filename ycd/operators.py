@@ -1,10 +1,20 @@
 import bpy
+import math
+import numpy as np
+from typing import Optional
 from ..sollumz_helper import SOLLUMZ_OT_base
 from ..sollumz_properties import SollumType
-from ..tools.blenderhelper import find_child_by_type
+from ..tools.blenderhelper import find_child_by_type, build_name_bone_map
 from ..tools.meshhelper import flip_uv
 from ..tools.utils import color_hash
-from ..tools.animationhelper import is_any_sollumz_animation_obj, update_uv_clip_hash, get_scene_fps
+from ..tools.animationhelper import (
+    is_any_sollumz_animation_obj,
+    update_uv_clip_hashes,
+    get_scene_fps,
+    retarget_animations,
+    get_id_and_track_from_track_data_path,
+)
+from ..tools.nlahelper import prepare_bake_nla, run_nla_bakes, write_baked_channels_to_action
 from .ycdimport import create_clip_dictionary_template, create_anim_obj
 from .. import logger
 
@@ -26,13 +36,24 @@ class SOLLUMZ_OT_animations_set_target(SOLLUMZ_OT_base, bpy.types.Operator):
         target_id = scene.sollumz_animations_target_id
         target_id_type = scene.sollumz_animations_target_id_type
 
-        for animations_obj in animations_objects:
-            for animation_obj in animations_obj.children:
-                if animation_obj.sollum_type != SollumType.ANIMATION:
-                    continue
-
-                animation_obj.animation_properties.target_id_type = target_id_type
-                animation_obj.animation_properties.target_id = target_id
+        animation_objs = [
+            animation_obj
+            for animations_obj in animations_objects
+            for animation_obj in animations_obj.children
+            if animation_obj.sollum_type == SollumType.ANIMATION
+        ]
+
+        # Retarget all animations in one pass, sharing the bone maps and transforms, instead of one at a time when the
+        # target property is updated
+        retarget_animations(
+            ((animation_obj, animation_obj.animation_properties.target_id_prev) for animation_obj in animation_objs),
+            target_id
+        )
+
+        for animation_obj in animation_objs:
+            animation_obj.animation_properties.target_id_type = target_id_type
+            animation_obj.animation_properties.target_id_prev = target_id  # already retargeted
+            animation_obj.animation_properties.target_id = target_id
 
         scene.sollumz_animations_target_id = None
         return {"FINISHED"}
@@ -62,23 +83,94 @@ class SOLLUMZ_OT_clip_apply_nla(SOLLUMZ_OT_base, bpy.types.Operator):
     bl_label = "Apply NLA"
     bl_description = "Applies clip as a Nonlinear Animation for a quick preview"
 
+    bake: bpy.props.BoolProperty(
+        name="Bake",
+        description="Bake the NLA of each selected clip into a new animation with a single action",
+        default=False,
+    )
+
     def run(self, context):
         if len(bpy.context.selected_objects) <= 0:
             return {"FINISHED"}
 
-        clip_obj = bpy.context.selected_objects[0]
+        if not self.bake:
+            self.apply_clip_to_nla(bpy.context.selected_objects[0])
+            return {"FINISHED"}
 
-        if clip_obj.sollum_type != SollumType.CLIP:
+        with logger.use_operator_logger(self):
+            clip_objs = [obj for obj in bpy.context.selected_objects if obj.sollum_type == SollumType.CLIP]
+            num_baked = self.bake_clips_nla(clip_objs)
+            if num_baked == 0:
+                return {"CANCELLED"}
+
+            logger.info(f"Baked {num_baked} clip(s).")
             return {"FINISHED"}
 
+    def bake_clips_nla(self, clip_objs: list[bpy.types.Object]) -> int:
+        """Bake the NLA of each clip into a new animation object, next to the other animations of its clip
+        dictionary. The NLA strips are read right after being applied, so clips with the same target can be baked
+        together, and the NumPy evaluation is done at the end for all clips at once.
+        """
+        bakes = []
+        baked_clips = []
+        for clip_obj in clip_objs:
+            target = self.apply_clip_to_nla(clip_obj)
+            if target is None:
+                logger.warning(f"Clip '{clip_obj.name}' has no animation target, skipping...")
+                continue
+
+            animation_properties = clip_obj.clip_properties.animations[0].animation.animation_properties
+            target_id = animation_properties.target_id
+            bone_name_map = build_name_bone_map(target) if isinstance(target_id, bpy.types.Armature) else None
+
+            def _is_sollumz_channel(data_path: str, target_id=target_id, bone_name_map=bone_name_map) -> bool:
+                return get_id_and_track_from_track_data_path(data_path, target_id, bone_name_map) is not None
+
+            clip_frame_duration = clip_obj.clip_properties.get_duration_in_frames()
+            frames = np.arange(math.floor(clip_frame_duration) + 1, dtype=np.float64)
+            if frames[-1] < clip_frame_duration:
+                frames = np.append(frames, clip_frame_duration)
+
+            bakes.append(prepare_bake_nla(target, frames, _is_sollumz_channel))
+            baked_clips.append((clip_obj, animation_properties, target, frames))
+
+        for (clip_obj, animation_properties, target, frames), baked_channels in zip(baked_clips, run_nla_bakes(bakes)):
+            name = f"{clip_obj.name}_baked"
+            action = bpy.data.actions.new(f"{name}_action")
+            write_baked_channels_to_action(baked_channels, action, frames, target.id_type)
+
+            animation_obj = create_anim_obj(SollumType.ANIMATION)
+            animation_obj.name = name
+            clip_dictionary_obj = clip_obj.parent.parent if clip_obj.parent is not None else None
+            if clip_dictionary_obj is not None:
+                animation_obj.parent = find_child_by_type(clip_dictionary_obj, SollumType.ANIMATIONS)
+
+            baked_properties = animation_obj.animation_properties
+            baked_properties.hash = name
+            baked_properties.action = action
+            baked_properties.target_id_type = animation_properties.target_id_type
+            # Set the previous target first, the baked action is already for this target and must not be retargeted
+            baked_properties.target_id_prev = animation_properties.target_id
+            baked_properties.target_id = animation_properties.target_id
+
+        return len(baked_clips)
+
+    def apply_clip_to_nla(self, clip_obj: bpy.types.Object) -> Optional[bpy.types.ID]:
+        """Replace the NLA tracks of the clip target with the animations of the clip. Returns the target."""
+        if clip_obj.sollum_type != SollumType.CLIP:
+            return None
+
         clip_properties = clip_obj.clip_properties
         if len(clip_properties.animations) <= 0:
-            return {"FINISHED"}
+            return None
 
         # TODO: animation may be None, or not all animations have the same target/are filled in
+        if clip_properties.animations[0].animation is None:
+            return None
+
         target = clip_properties.animations[0].animation.animation_properties.get_target()
         if target is None:
-            return {"FINISHED"}
+            return None
 
         clip_frame_duration = clip_properties.get_duration_in_frames()
 
@@ -134,13 +226,13 @@ class SOLLUMZ_OT_clip_apply_nla(SOLLUMZ_OT_base, bpy.types.Operator):
                 nla_strip.action_frame_start = clip["start_frame"]
                 nla_strip.action_frame_end = clip["end_frame"]
 
-        return {"FINISHED"}
+        return target
 
 
 class SOLLUMZ_OT_clip_recalculate_uv_hash(SOLLUMZ_OT_base, bpy.types.Operator):
     bl_idname = "sollumz.clip_recalculate_uv_hash"
     bl_label = "Recalculate UV Clip Hash"
-    bl_description = "Recalculate hash based on the target material and model name"
+    bl_description = "Recalculate hash of the active and selected clips based on the target material and model name"
 
     @classmethod
     def poll(cls, context):
@@ -148,8 +240,12 @@ class SOLLUMZ_OT_clip_recalculate_uv_hash(SOLLUMZ_OT_base, bpy.types.Operator):
 
     def run(self, context):
         with logger.use_operator_logger(self):
-            clip_obj = context.active_object
-            if update_uv_clip_hash(clip_obj):
+            clip_objs = [context.active_object]
+            clip_objs.extend(
+                obj for obj in context.selected_objects
+                if obj.sollum_type == SollumType.CLIP and obj != context.active_object
+            )
+            if update_uv_clip_hashes(clip_objs) > 0:
                 return {"FINISHED"}
             else:
                 return {"CANCELLED"}
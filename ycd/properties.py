@@ -1,10 +1,19 @@
-from typing import Iterable
+from typing import Iterable, Sequence
 
 import bpy
 import math
+import numpy as np
+from numpy.typing import NDArray
 from mathutils import Matrix, Vector
 from ..sollumz_properties import SollumType
-from ..tools.animationhelper import retarget_animation, get_target_from_id, update_uv_clip_hash, get_scene_fps
+from ..tools.animationhelper import (
+    retarget_animation,
+    get_target_from_id,
+    update_uv_clip_hash,
+    get_scene_fps,
+    uv_clip_hashes_depsgraph_update_post_handler,
+    uv_clip_hashes_reset_handler,
+)
 
 
 def animations_filter(self, object):
@@ -373,6 +382,65 @@ def calculate_final_uv_transform_matrix(uv_transforms: Iterable[UVTransform]) ->
     return mat
 
 
+# Index in `UVTransform.values_array()` of the first component of each property
+UVTransformValueIndices = {
+    "translation": 0,
+    "rotation": 2,
+    "scale": 3,
+    "shear": 5,
+    "reflect": 7,
+}
+
+
+def calculate_uv_transform_matrices(mode: str, values: NDArray) -> NDArray[np.float64]:
+    """
+    Returns the affine matrices for many values of a transform, same as ``UVTransform.get_matrix``. ``values`` is a
+    (N, 9) array in the same layout as ``UVTransform.values_array()``. Returns a (N, 3, 3) array.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    mats = np.tile(np.identity(3), (len(values), 1, 1))
+    if mode == "TRANSLATE":
+        mats[:, 0, 2] = values[:, 0]
+        mats[:, 1, 2] = values[:, 1]
+    elif mode == "ROTATE":
+        cos = np.cos(values[:, 2])
+        sin = np.sin(values[:, 2])
+        mats[:, 0, 0] = cos
+        mats[:, 0, 1] = -sin
+        mats[:, 1, 0] = sin
+        mats[:, 1, 1] = cos
+    elif mode == "SCALE":
+        mats[:, 0, 0] = values[:, 3]
+        mats[:, 1, 1] = values[:, 4]
+    elif mode == "SHEAR":
+        mats[:, 0, 1] = values[:, 5]
+        mats[:, 1, 0] = values[:, 6]
+    elif mode == "REFLECT":
+        axes = values[:, 7:9]
+        lengths = np.linalg.norm(axes, axis=1)
+        non_zero = lengths != 0.0
+        x = axes[non_zero, 0] / lengths[non_zero]
+        y = axes[non_zero, 1] / lengths[non_zero]
+        mats[non_zero, 0, 0] = x ** 2 - y ** 2
+        mats[non_zero, 0, 1] = 2 * x * y
+        mats[non_zero, 1, 0] = 2 * x * y
+        mats[non_zero, 1, 1] = y ** 2 - x ** 2
+    return mats
+
+
+def calculate_final_uv_transform_matrices(modes: Sequence[str], values: NDArray) -> NDArray[np.float64]:
+    """
+    Same as ``calculate_final_uv_transform_matrix`` for many values of the transforms at once, without going through
+    the RNA properties. ``modes`` is the mode of each transform and ``values`` a (T, N, 9) array with N values of each
+    transform, in the same layout as ``UVTransform.values_array()``. Returns a (N, 3, 3) array.
+    """
+    num_values = values.shape[1]
+    mats = np.tile(np.identity(3), (num_values, 1, 1))
+    for mode, transform_values in zip(modes, values):
+        mats = calculate_uv_transform_matrices(mode, transform_values) @ mats
+    return mats
+
+
 def register_tracks(cls, inline=False):
     if inline:
         # Workaround for https://projects.blender.org/blender/blender/issues/48975
@@ -402,16 +470,17 @@ def register():
     register_tracks(bpy.types.Object)
     register_tracks(bpy.types.Material)
 
-    # used during export to temporarily store UV transforms
-    bpy.types.ID.export_uv_transforms = bpy.props.CollectionProperty(
-        type=UVTransform, options={"HIDDEN", "SKIP_SAVE"})
-
     # used with operator SOLLUMZ_OT_animations_set_target
     bpy.types.Scene.sollumz_animations_target_id = bpy.props.PointerProperty(
         name="Target", type=bpy.types.ID, options={"HIDDEN", "SKIP_SAVE"})
     bpy.types.Scene.sollumz_animations_target_id_type = bpy.props.EnumProperty(
         name="Target Type", items=AnimationTargetIDTypes, default="ARMATURE", options={"HIDDEN", "SKIP_SAVE"})
 
+    bpy.app.handlers.depsgraph_update_post.append(uv_clip_hashes_depsgraph_update_post_handler)
+    bpy.app.handlers.load_post.append(uv_clip_hashes_reset_handler)
+    bpy.app.handlers.undo_post.append(uv_clip_hashes_reset_handler)
+    bpy.app.handlers.redo_post.append(uv_clip_hashes_reset_handler)
+
 
 def unregister():
     del bpy.types.Object.clip_properties
@@ -420,3 +489,8 @@ def unregister():
     unregister_tracks(bpy.types.PoseBone, inline=True)
     unregister_tracks(bpy.types.Object)
     unregister_tracks(bpy.types.Material)
+
+    bpy.app.handlers.depsgraph_update_post.remove(uv_clip_hashes_depsgraph_update_post_handler)
+    bpy.app.handlers.load_post.remove(uv_clip_hashes_reset_handler)
+    bpy.app.handlers.undo_post.remove(uv_clip_hashes_reset_handler)
+    bpy.app.handlers.redo_post.remove(uv_clip_hashes_reset_handler)
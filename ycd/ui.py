@@ -34,6 +34,8 @@ def draw_clip_properties(self, context):
 
         layout.operator(ycd_ops.SOLLUMZ_OT_clip_apply_nla.bl_idname,
                         text="Apply Clip to NLA")
+        layout.operator(ycd_ops.SOLLUMZ_OT_clip_apply_nla.bl_idname,
+                        text="Bake Clip NLA").bake = True
 
 
 animation_target_id_type_to_collection_name = {
@@ -2,9 +2,13 @@ import bpy
 from mathutils import Vector, Quaternion
 import math
 import struct
-from typing import Optional
+import time
+import numpy as np
+from numpy.typing import NDArray
+from typing import Optional, NamedTuple
 from ..cwxml import clipdictionary as ycdxml
 from ..sollumz_properties import SollumType
+from ..sollumz_preferences import get_export_settings
 from ..tools import jenkhash
 from ..tools.blenderhelper import build_name_bone_map, build_bone_map
 from ..tools.animationhelper import (
@@ -15,13 +19,16 @@ from ..tools.animationhelper import (
     get_quantum_and_min_val,
     get_id_and_track_from_track_data_path,
     calculate_bone_space_transform_matrix,
+    quaternions_rotate,
+    quaternions_make_continuous,
     get_target_from_id,
     get_action_duration_frames,
     get_action_duration_secs,
     get_action_export_frame_count,
     action_fcurves,
 )
-from .properties import ClipAttribute, ClipTag, calculate_final_uv_transform_matrix
+from ..tools.fcurvehelper import bake_fcurves
+from .properties import ClipAttribute, ClipTag, UVTransformValueIndices, calculate_final_uv_transform_matrices
 
 from .. import logger
 
@@ -44,19 +51,88 @@ def parse_uv_transform_data_path(data_path: str) -> tuple[int, str]:
     return index, prop
 
 
-TrackFramesData = list[Vector] | list[Quaternion] | list[float]
+TrackFramesData = NDArray[np.float32]
+"""(F, C) values of a track at each frame. Vectors are (x, y, z), quaternions (w, x, y, z) and floats have a single
+column."""
 SequenceItems = dict[int, dict[Track, TrackFramesData]]
 
+TrackFormatNumComponents = {
+    TrackFormat.Vector3: 3,
+    TrackFormat.Quaternion: 4,
+    TrackFormat.Float: 1,
+}
+
+
+TranslationTracks = {Track.BonePosition, Track.MoverPosition, Track.CameraPosition}
+
+# Approximate sizes in bytes of the channels in the binary format. Only used to compare encodings and report sizes
+CHANNEL_HEADER_SIZE = 4
+QUANTIZE_FLOAT_HEADER_SIZE = 12  # quantum, offset and value bits/count
+
+
+class AnimationCompression(NamedTuple):
+    """Max error allowed on each type of track by the error-bounded compression."""
+    max_translation_error: float
+    """In metres."""
+    max_rotation_error: float
+    """In radians."""
+    max_value_error: float
+    """For any other track (scale, UVs, camera properties...)."""
+
+    def get_track_max_error(self, track: Track) -> float:
+        if TrackFormatMap[track] == TrackFormat.Quaternion:
+            return self.max_rotation_error
+        elif track in TranslationTracks:
+            return self.max_translation_error
+        else:
+            return self.max_value_error
+
+
+def get_animation_compression_from_settings() -> Optional[AnimationCompression]:
+    settings = get_export_settings()
+    if not settings.ycd_error_bounded_compression:
+        return None
+
+    return AnimationCompression(
+        settings.ycd_max_translation_error,
+        settings.ycd_max_rotation_error,
+        settings.ycd_max_value_error,
+    )
+
+
+def get_track_default_value(track: Track) -> tuple[float, ...]:
+    # TODO: defaults should be kept in-sync with the properties defaults in AnimationTracks, refactor this
+    #  once we add more defaults to avoid duplication
+    match TrackFormatMap[track]:
+        case TrackFormat.Vector3:
+            if track == Track.UV0:
+                return (1.0, 0.0, 0.0)
+            elif track == Track.UV1:
+                return (0.0, 1.0, 0.0)
+            else:
+                return (0.0, 0.0, 0.0)
+        case TrackFormat.Quaternion:
+            return (1.0, 0.0, 0.0, 0.0)
+        case TrackFormat.Float:
+            return (0.0,)
+
+
+def get_action_export_frames(action: bpy.types.Action) -> NDArray[np.float64]:
+    """Gets the action frames sampled on export, evenly spaced along the action frame range."""
+    action_frame_range = action.frame_range
+    export_frame_count = get_action_export_frame_count(action)
+    export_last_frame_index = export_frame_count - 1
+    frame_ids = np.arange(export_frame_count, dtype=np.float64)
+    action_frame_start, action_frame_end = action_frame_range[0], action_frame_range[1]
+    return action_frame_start + (frame_ids / export_last_frame_index) * (action_frame_end - action_frame_start)
+
 
 def sequence_items_from_action(
         action: bpy.types.Action,
         target_id: bpy.types.ID
 ) -> SequenceItems:
-    action_frame_range = action.frame_range
-    export_frame_count = get_action_export_frame_count(action)
-    def _export_frame_to_action_frame(frame_index: int) -> float:
-        export_last_frame_index = export_frame_count - 1
-        return action_frame_range[0] + (frame_index / export_last_frame_index) * (action_frame_range[1] - action_frame_range[0])
+    export_frames = get_action_export_frames(action)
+    export_frame_count = len(export_frames)
 
     target = get_target_from_id(target_id)
     target_is_armature = isinstance(target_id, bpy.types.Armature)
@@ -70,7 +146,9 @@ def sequence_items_from_action(
 
     uv_transforms_fcurves = {}
 
-    sequence_items: SequenceItems = {}
+    # F-curves are gathered first and then evaluated all at once
+    track_fcurves = []
+    track_fcurves_targets = []
     for fcurve in action_fcurves(action):
         data_path = fcurve.data_path
         bone_id_track_pair = get_id_and_track_from_track_data_path(data_path, target_id, bone_name_map)
@@ -85,37 +163,25 @@ def sequence_items_from_action(
             uv_transforms_fcurves[bone_id].append(fcurve)
             continue  # UV transforms are handled later
 
-        comp_index = fcurve.array_index
-        track_format = TrackFormatMap[track]
+        track_fcurves.append(fcurve)
+        track_fcurves_targets.append((bone_id, track, fcurve.array_index))
 
+    sequence_items: SequenceItems = {}
+    for (bone_id, track, comp_index), values in zip(track_fcurves_targets, bake_fcurves(track_fcurves, export_frames)):
         if bone_id not in sequence_items:
             sequence_items[bone_id] = {}
 
         bone_sequences = sequence_items[bone_id]
 
         if track not in bone_sequences:
-            if track_format == TrackFormat.Vector3:
-                # TODO: defaults should be kept in-sync with the properties defaults in AnimationTracks, refactor this
-                #  once we add more defaults to avoid duplication
-                if track == Track.UV0:
-                    default_vec = (1.0, 0.0, 0.0)
-                elif track == Track.UV1:
-                    default_vec = (0.0, 1.0, 0.0)
-                else:
-                    default_vec = (0.0, 0.0, 0.0)
-                bone_sequences[track] = [Vector(default_vec) for _ in range(export_frame_count)]
-            elif track_format == TrackFormat.Quaternion:
-                bone_sequences[track] = [Quaternion((1.0, 0.0, 0.0, 0.0)) for _ in range(export_frame_count)]
-            elif track_format == TrackFormat.Float:
-                bone_sequences[track] = [0.0] * export_frame_count
+            bone_sequences[track] = np.tile(np.array(get_track_default_value(track), dtype=np.float32),
+                                            (export_frame_count, 1))
 
         track_sequence = bone_sequences[track]
-        for frame_id in range(export_frame_count):
-            value = fcurve.evaluate(_export_frame_to_action_frame(frame_id))
-            if track_format == TrackFormat.Float:
-                track_sequence[frame_id] = value
-            else:
-                track_sequence[frame_id][comp_index] = value
+        if TrackFormatMap[track] == TrackFormat.Float:
+            track_sequence[:, 0] = values
+        else:
+            track_sequence[:, comp_index] = values
 
     if target_is_armature:
         # transform bones from pose space to local space
@@ -124,33 +190,28 @@ def sequence_items_from_action(
 
             if Track.BonePosition in bone_sequences:
                 vecs = bone_sequences[Track.BonePosition]
-                for i in range(export_frame_count):
-                    vecs[i] = transform_mat @ vecs[i]
+                mat = np.array(transform_mat)
+                vecs[:] = vecs @ mat[:3, :3].T + mat[:3, 3]
 
             if Track.BoneRotation in bone_sequences:
                 quats = bone_sequences[Track.BoneRotation]
-                for i in range(export_frame_count):
-                    quats[i].rotate(transform_mat)
+                quats[:] = quaternions_rotate(quats.astype(np.float64), np.array(transform_mat.to_quaternion()))
 
     if target_is_camera:
         # see animationhelper.transform_camera_rotation_quaternion
-        angle_delta = math.radians(-90.0)
-        x_axis = Vector((1.0, 0.0, 0.0))
+        # rotating around the local X axis of each quaternion
+        x_axis_rotation = np.array(Quaternion((1.0, 0.0, 0.0), math.radians(-90.0)))
         for bone_id, bone_sequences in sequence_items.items():
             if Track.CameraRotation in bone_sequences:
                 quats = bone_sequences[Track.CameraRotation]
-                for i in range(export_frame_count):
-                    x_axis_local = quats[i] @ x_axis
-                    quats[i].rotate(Quaternion(x_axis_local, angle_delta))
+                quats[:] = quaternions_rotate(quats.astype(np.float64), x_axis_rotation, local=True)
 
     if target_id is not None and len(uv_transforms_fcurves) > 0:
-        # copy the UV transforms defined by the user to apply f-curves on them without modifying the original ones
-        uv_transforms = target.export_uv_transforms
-        uv_transforms.clear()
-        for uv_transform in target.animation_tracks.uv_transforms:
-            uv_transform_copy = uv_transforms.add()
-            uv_transform_copy.update_uv_transform_matrix_on_change = False
-            uv_transform_copy.copy_from(uv_transform)
+        # apply the f-curves on the values of the UV transforms defined by the user, for all frames at once
+        uv_transforms = target.animation_tracks.uv_transforms
+        uv_transforms_modes = [uv_transform.mode for uv_transform in uv_transforms]
+        uv_transforms_values = np.array([uv_transform.values_array() for uv_transform in uv_transforms],
+                                        dtype=np.float64).reshape((len(uv_transforms), 1, -1))
 
         for bone_id, fcurves in uv_transforms_fcurves.items():
             if bone_id not in sequence_items:
@@ -158,33 +219,21 @@ def sequence_items_from_action(
 
             bone_sequences = sequence_items[bone_id]
 
+            values = np.repeat(uv_transforms_values, export_frame_count, axis=1)
+            for fcurve, fcurve_values in zip(fcurves, bake_fcurves(fcurves, export_frames)):
+                transform_index, prop_name = parse_uv_transform_data_path(fcurve.data_path)
+                if transform_index >= len(uv_transforms) or prop_name not in UVTransformValueIndices:
+                    logger.warning(
+                        f"Channel '{fcurve.data_path}' in action '{action.name}' is unsupported, skipping..."
+                    )
+                    continue
+
+                values[transform_index, :, UVTransformValueIndices[prop_name] + fcurve.array_index] = fcurve_values
+
             # compute uv0/uv1 from uv_transform
-            bone_sequences[Track.UV0] = [Vector((0.0, 0.0, 0.0)) for _ in range(export_frame_count)]
-            bone_sequences[Track.UV1] = [Vector((0.0, 0.0, 0.0)) for _ in range(export_frame_count)]
-            uv0_sequence = bone_sequences[Track.UV0]
-            uv1_sequence = bone_sequences[Track.UV1]
-            for frame_id in range(export_frame_count):
-                # apply f-curves to UV transforms
-                for fcurve in fcurves:
-                    value = fcurve.evaluate(_export_frame_to_action_frame(frame_id))
-                    transform_index, prop_name = parse_uv_transform_data_path(fcurve.data_path)
-
-                    prop = getattr(uv_transforms[transform_index], prop_name)
-                    if isinstance(prop, float):
-                        setattr(uv_transforms[transform_index], prop_name, value)
-                    else:  # Vector
-                        comp_index = fcurve.array_index
-                        prop[comp_index] = value
-
-                mat = calculate_final_uv_transform_matrix(uv_transforms)
-                uv0_sequence[frame_id][0] = mat[0][0]
-                uv0_sequence[frame_id][1] = mat[0][1]
-                uv0_sequence[frame_id][2] = mat[0][2]
-                uv1_sequence[frame_id][0] = mat[1][0]
-                uv1_sequence[frame_id][1] = mat[1][1]
-                uv1_sequence[frame_id][2] = mat[1][2]
-
-        uv_transforms.clear()
+            mats = calculate_final_uv_transform_matrices(uv_transforms_modes, values)
+            bone_sequences[Track.UV0] = mats[:, 0].astype(np.float32)
+            bone_sequences[Track.UV1] = mats[:, 1].astype(np.float32)
 
     # "Flickering bug" fix - killso:
     # This bug is caused by interpolation algorithm used in GTA
@@ -215,42 +264,39 @@ def sequence_items_from_action(
             if quats is None:
                 continue
 
-            for i in range(1, export_frame_count):
-                if quats[i - 1].dot(quats[i]) < 0:
-                    quats[i] *= -1
+            quaternions_make_continuous(quats)
     # WARNING: ANY OPERATION WITH ROTATION WILL CAUSE SIGN CHANGE. PROCEED ANYTHING BEFORE FIX.
 
     return sequence_items
 
 
 def build_values_channel(
-    values: list[float],
-    uniq_values: list[float],
+    values: NDArray[np.float32],
     indirect_percentage: float = 0.1
 ) -> ycdxml.ChannelsList.Channel:
+    """Builds the channel that stores the ``values`` of a single component at each frame."""
+    uniq_values, uniq_inverse = np.unique(values, return_inverse=True)
     values_len_percentage = len(uniq_values) / len(values)
 
     if len(uniq_values) == 1:
         channel = ycdxml.ChannelsList.StaticFloat()
 
-        channel.value = uniq_values[0]
+        channel.value = float(uniq_values[0])
     elif values_len_percentage <= indirect_percentage:
         channel = ycdxml.ChannelsList.IndirectQuantizeFloat()
 
         min_value, quantum = get_quantum_and_min_val(uniq_values)
 
-        channel.values = uniq_values
+        channel.values = uniq_values.tolist()
         channel.offset = min_value
         channel.quantum = quantum
-
-        for value in values:
-            channel.frames.append(uniq_values.index(value))
+        channel.frames = uniq_inverse.ravel().tolist()
     else:
         channel = ycdxml.ChannelsList.QuantizeFloat()
 
         min_value, quantum = get_quantum_and_min_val(values)
 
-        channel.values = values
+        channel.values = values.tolist()
         channel.offset = min_value
         channel.quantum = quantum
 
@@ -264,83 +310,237 @@ def build_values_channel(
 
 def sequence_data_from_frames_data(
     track: Track,
-    frames_data: TrackFramesData
+    frames_data: TrackFramesData,
+    max_error: Optional[float] = None
 ) -> ycdxml.Animation.SequenceDataList.SequenceData:
+    """Builds the channels of a track. If ``max_error`` is given, uses the smallest encoding of each channel that keeps
+    the track within that error instead of the default encoding."""
+    if max_error is not None:
+        return error_bounded_sequence_data_from_frames_data(track, frames_data, max_error)
+
     sequence_data = ycdxml.Animation.SequenceDataList.SequenceData()
 
     track_format = TrackFormatMap[track]
 
-    if track_format == TrackFormat.Vector3:
-        values_x = []
-        values_y = []
-        values_z = []
-
-        for vector in frames_data:
-            values_x.append(vector.x)
-            values_y.append(vector.y)
-            values_z.append(vector.z)
-
-        uniq_x = list(set(values_x))
-        len_uniq_x = len(uniq_x)
+    if track_format == TrackFormat.Quaternion:
+        # channels are stored in (x, y, z, w) order
+        frames_data = frames_data[:, (1, 2, 3, 0)]
 
-        uniq_y = list(set(values_y))
-        len_uniq_y = len(uniq_y)
+    is_static = np.all(frames_data == frames_data[0], axis=0)
+    if np.all(is_static) and track_format == TrackFormat.Vector3:
+        channel = ycdxml.ChannelsList.StaticVector3()
+        channel.value = Vector(frames_data[0])
 
-        uniq_z = list(set(values_z))
-        len_uniq_z = len(uniq_z)
-
-        if len_uniq_x == 1 and len_uniq_y == 1 and len_uniq_z == 1:
-            channel = ycdxml.ChannelsList.StaticVector3()
-            channel.value = frames_data[0]
-
-            sequence_data.channels.append(channel)
-        else:
-            sequence_data.channels.append(build_values_channel(values_x, uniq_x))
-            sequence_data.channels.append(build_values_channel(values_y, uniq_y))
-            sequence_data.channels.append(build_values_channel(values_z, uniq_z))
-    elif track_format == TrackFormat.Quaternion:
-        values_x = []
-        values_y = []
-        values_z = []
-        values_w = []
+        sequence_data.channels.append(channel)
+    elif np.all(is_static) and track_format == TrackFormat.Quaternion:
+        channel = ycdxml.ChannelsList.StaticQuaternion()
+        x, y, z, w = frames_data[0]
+        channel.value = Quaternion((w, x, y, z))
 
-        for quat in frames_data:
-            values_x.append(quat.x)
-            values_y.append(quat.y)
-            values_z.append(quat.z)
-            values_w.append(quat.w)
-
-        uniq_x = list(set(values_x))
-        len_uniq_x = len(uniq_x)
-
-        uniq_y = list(set(values_y))
-        len_uniq_y = len(uniq_y)
+        sequence_data.channels.append(channel)
+    else:
+        for values in frames_data.T:
+            sequence_data.channels.append(build_values_channel(values))
 
-        uniq_z = list(set(values_z))
-        len_uniq_z = len(uniq_z)
+    return sequence_data
 
-        uniq_w = list(set(values_w))
-        len_uniq_w = len(uniq_w)
 
-        if len_uniq_x == 1 and len_uniq_y == 1 and len_uniq_z == 1 and len_uniq_w == 1:
-            channel = ycdxml.ChannelsList.StaticQuaternion()
-            channel.value = frames_data[0]
+def estimate_channel_size(channel: ycdxml.ChannelsList.Channel) -> int:
+    """Estimates the size in bytes of the channel in the binary format."""
+    def _num_bits(max_int: int) -> int:
+        return min(max(int(max_int).bit_length(), 1), 32)
+
+    def _quantized_bits(values: list[float], offset: float, quantum: float) -> int:
+        if quantum <= 0.0:
+            return 32
+        return _num_bits(math.ceil((max(values) - offset) / quantum))
+
+    match channel:
+        case ycdxml.ChannelsList.StaticFloat():
+            size = 4
+        case ycdxml.ChannelsList.StaticVector3():
+            size = 12
+        case ycdxml.ChannelsList.StaticQuaternion():
+            size = 16
+        case ycdxml.ChannelsList.RawFloat():
+            size = 4 * len(channel.values)
+        case ycdxml.ChannelsList.IndirectQuantizeFloat():
+            value_bits = _quantized_bits(channel.values, channel.offset, channel.quantum)
+            frame_bits = _num_bits(len(channel.values) - 1)
+            size = QUANTIZE_FLOAT_HEADER_SIZE + 4 + math.ceil(
+                (len(channel.values) * value_bits + len(channel.frames) * frame_bits) / 8
+            )
+        case ycdxml.ChannelsList.QuantizeFloat():
+            value_bits = _quantized_bits(channel.values, channel.offset, channel.quantum)
+            size = QUANTIZE_FLOAT_HEADER_SIZE + math.ceil(len(channel.values) * value_bits / 8)
+        case _:
+            size = 0
+
+    return CHANNEL_HEADER_SIZE + size
+
+
+def estimate_sequence_data_size(sequence_data: ycdxml.Animation.SequenceDataList.SequenceData) -> int:
+    return sum(estimate_channel_size(channel) for channel in sequence_data.channels)
+
+
+def build_error_bounded_values_channel(
+    values: NDArray[np.float32],
+    max_error: float
+) -> tuple[ycdxml.ChannelsList.Channel, tuple[NDArray[np.float64], NDArray[np.float64]]]:
+    """Builds the smallest channel that stores the ``values`` of a single component within ``max_error``. Returns the
+    channel and the values read back from it, both if values are rounded or truncated when quantized.
+
+    Quantized channels use ``max_error`` as quantum, so the error stays within bounds in either case.
+    """
+    values = values.astype(np.float64)
+    num_frames = len(values)
+    min_value = values.min()
+    max_value = values.max()
+
+    if max_value - min_value <= 2.0 * max_error:
+        channel = ycdxml.ChannelsList.StaticFloat()
+        channel.value = float(np.float32((min_value + max_value) * 0.5))
+        decoded = np.full(num_frames, channel.value)
+        return channel, (decoded, decoded)
+
+    raw_values = values.astype(np.float32)
+    raw_channel = ycdxml.ChannelsList.RawFloat()
+    raw_channel.values = raw_values.tolist()
+    decoded = raw_values.astype(np.float64)
+    candidates = [(raw_channel, (decoded, decoded))]
+
+    if max_error > 0.0:
+        quantum = max_error
+
+        def _decode(stored_values: NDArray[np.float64]) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+            steps = (stored_values - min_value) / quantum
+            return min_value + np.round(steps) * quantum, min_value + np.floor(steps) * quantum
+
+        quantize_channel = ycdxml.ChannelsList.QuantizeFloat()
+        quantize_channel.values = raw_channel.values
+        quantize_channel.offset = float(min_value)
+        quantize_channel.quantum = quantum
+        candidates.append((quantize_channel, _decode(values)))
+
+        # Values within the same quantum step are stored once, at the center of the step
+        steps, frames = np.unique(np.floor((values - min_value) / quantum), return_inverse=True)
+        if len(steps) < num_frames:
+            uniq_values = min_value + (steps + 0.5) * quantum
+            indirect_channel = ycdxml.ChannelsList.IndirectQuantizeFloat()
+            indirect_channel.values = uniq_values.tolist()
+            indirect_channel.frames = frames.ravel().tolist()
+            indirect_channel.offset = float(min_value)
+            indirect_channel.quantum = quantum
+            decoded_round, decoded_floor = _decode(uniq_values)
+            candidates.append((indirect_channel, (decoded_round[frames.ravel()], decoded_floor[frames.ravel()])))
+
+    return min(candidates, key=lambda c: estimate_channel_size(c[0]))
+
+
+def error_bounded_sequence_data_from_frames_data(
+    track: Track,
+    frames_data: TrackFramesData,
+    max_error: float
+) -> ycdxml.Animation.SequenceDataList.SequenceData:
+    """Builds the smallest channels that keep the track within ``max_error``. Vectors are bounded by the distance to
+    the original vector, quaternions by the angle to the original rotation and floats by the absolute difference.
+    """
+    sequence_data = ycdxml.Animation.SequenceDataList.SequenceData()
 
+    track_format = TrackFormatMap[track]
+    frames_data = frames_data.astype(np.float64)
+    if track_format == TrackFormat.Vector3:
+        component_max_error = max_error / math.sqrt(3.0)
+        frames_min = frames_data.min(axis=0)
+        frames_max = frames_data.max(axis=0)
+        if np.all(frames_max - frames_min <= 2.0 * component_max_error):
+            channel = ycdxml.ChannelsList.StaticVector3()
+            channel.value = Vector((frames_min + frames_max) * 0.5)
             sequence_data.channels.append(channel)
         else:
-            sequence_data.channels.append(build_values_channel(values_x, uniq_x))
-            sequence_data.channels.append(build_values_channel(values_y, uniq_y))
-            sequence_data.channels.append(build_values_channel(values_z, uniq_z))
-            sequence_data.channels.append(build_values_channel(values_w, uniq_w))
+            for values in frames_data.T:
+                sequence_data.channels.append(build_error_bounded_values_channel(values, component_max_error)[0])
+    elif track_format == TrackFormat.Quaternion:
+        sequence_data.channels.extend(_build_error_bounded_quaternion_channels(frames_data, max_error))
     elif track_format == TrackFormat.Float:
-        values = frames_data
-        uniq = list(set(values))
-        sequence_data.channels.append(build_values_channel(values, uniq))
+        sequence_data.channels.append(build_error_bounded_values_channel(frames_data[:, 0], max_error)[0])
 
     return sequence_data
 
 
-def animation_from_object(animation_obj: bpy.types.Object) -> Optional[ycdxml.Animation]:
+def _build_error_bounded_quaternion_channels(
+    quats: NDArray[np.float64],
+    max_angle: float
+) -> list[ycdxml.ChannelsList.Channel]:
+    """Builds the smallest channels for a quaternion track in (w, x, y, z) order that keep every rotation within
+    ``max_angle`` of the original. Tries with a CachedQuaternion1 channel, which computes one of the components from
+    the other three, and with four separate channels."""
+    # Only the rotation matters, normalized quaternions are needed to compute a component from the other three
+    lengths = np.linalg.norm(quats, axis=1, keepdims=True)
+    quats = np.divide(quats, lengths, out=np.tile((1.0, 0.0, 0.0, 0.0), (len(quats), 1)), where=lengths > 0)
+    quats = quats[:, (1, 2, 3, 0)]  # channels are stored in (x, y, z, w) order
+
+    # Each component can be off by up to a quarter of the angle: the angle between two close unit quaternions is about
+    # twice the length of their difference
+    component_max_error = max_angle / 4.0
+    quats_min = quats.min(axis=0)
+    quats_max = quats.max(axis=0)
+    if np.all(quats_max - quats_min <= 2.0 * component_max_error):
+        channel = ycdxml.ChannelsList.StaticQuaternion()
+        x, y, z, w = (quats_min + quats_max) * 0.5
+        channel.value = Quaternion((w, x, y, z))
+        return [channel]
+
+    def _max_angle_error(decoded_quats: NDArray[np.float64]) -> float:
+        decoded_lengths = np.linalg.norm(decoded_quats, axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dots = np.abs(np.sum(quats * decoded_quats, axis=1)) / decoded_lengths
+        return float(np.max(2.0 * np.arccos(np.clip(np.nan_to_num(dots), 0.0, 1.0))))
+
+    best_channels = [build_error_bounded_values_channel(values, component_max_error)[0] for values in quats.T]
+    best_size = sum(estimate_channel_size(c) for c in best_channels)
+
+    # The cached component is always positive, so only components that keep the same sign in every frame can be cached,
+    # flipping the whole track if needed. Prefer the one furthest from zero, where computing it is more accurate
+    abs_min = np.min(np.abs(quats), axis=0)
+    same_sign = np.all(quats >= 0.0, axis=0) | np.all(quats <= 0.0, axis=0)
+    for cached_index in sorted(np.flatnonzero(same_sign), key=lambda i: -abs_min[i])[:1]:
+        signed_quats = -quats if np.all(quats[:, cached_index] <= 0.0) else quats
+        stored_indices = [i for i in range(4) if i != cached_index]
+        for stored_max_error in (component_max_error, component_max_error / 4.0):
+            stored = [build_error_bounded_values_channel(signed_quats[:, i], stored_max_error) for i in stored_indices]
+            channels = [channel for channel, _ in stored]
+            cached_channel = ycdxml.ChannelsList.CachedQuaternion1()
+            cached_channel.quat_index = int(cached_index)
+            channels.append(cached_channel)
+
+            size = sum(estimate_channel_size(c) for c in channels)
+            if size >= best_size:
+                break
+
+            within_bounds = True
+            for variant in range(2):
+                decoded = np.empty_like(quats)
+                decoded[:, stored_indices] = np.stack([decoded_values[variant] for _, decoded_values in stored], axis=1)
+                stored_sq_length = np.sum(decoded[:, stored_indices] ** 2, axis=1)
+                decoded[:, cached_index] = np.sqrt(np.maximum(1.0 - stored_sq_length, 0.0))
+                within_bounds = within_bounds and _max_angle_error(decoded) <= max_angle
+
+            if within_bounds:
+                best_channels = channels
+                best_size = size
+                break
+
+    return best_channels
+
+
+def animation_from_object(
+    animation_obj: bpy.types.Object,
+    compression: Optional[AnimationCompression] = None,
+    sizes: Optional[dict[str, tuple[int, int]]] = None,
+) -> Optional[ycdxml.Animation]:
+    """Builds the animation XML. With ``compression``, channels are encoded with the error-bounded compression and, if
+    ``sizes`` is given, the estimated sizes of the animation without and with compression are stored in it."""
     animation_properties = animation_obj.animation_properties
     action = animation_properties.action
     export_frame_count = get_action_export_frame_count(action)
@@ -370,11 +570,19 @@ def animation_from_object(animation_obj: bpy.types.Object) -> Optional[ycdxml.An
                       for bone_id, bones_data in sequence_items.items()
                       for track, frames_data in bones_data.items()]
     sequence_datas.sort(key=lambda x: x[0] | (x[1].value << 16))
+    default_size = 0
+    compressed_size = 0
     for bone_id, track, frames_data in sequence_datas:
         if track == Track.MoverPosition or track == Track.MoverRotation:
             animation.unknown10 |= AnimationFlag.RootMotion
 
-        sequence_data = sequence_data_from_frames_data(track, frames_data)
+        if compression is None:
+            sequence_data = sequence_data_from_frames_data(track, frames_data)
+        else:
+            sequence_data = sequence_data_from_frames_data(track, frames_data, compression.get_track_max_error(track))
+            if sizes is not None:
+                default_size += estimate_sequence_data_size(sequence_data_from_frames_data(track, frames_data))
+                compressed_size += estimate_sequence_data_size(sequence_data)
 
         seq_bone_id = ycdxml.Animation.BoneIdList.BoneId()
         seq_bone_id.bone_id = bone_id
@@ -386,6 +594,9 @@ def animation_from_object(animation_obj: bpy.types.Object) -> Optional[ycdxml.An
 
     animation.sequences.append(sequence)
 
+    if compression is not None and sizes is not None:
+        sizes[animation.hash] = (default_size, compressed_size)
+
     # Get int value from enum, a bit junky...
     animation.unknown10 = animation.unknown10.value
 
@@ -545,13 +756,38 @@ def clip_dictionary_from_object(obj: bpy.types.Object) -> Optional[ycdxml.ClipDi
         elif child_obj.sollum_type == SollumType.CLIPS:
             clips_obj = child_obj
 
+    compression = get_animation_compression_from_settings()
+    animation_sizes = {}
+
+    deduplicate = get_export_settings().ycd_deduplicate_animations
+    # fingerprint -> (exported animation, seconds it took to build)
+    unique_animations = {}
+    # hash of duplicated animation -> hash of the exported animation with the same data
+    shared_animation_hashes = {}
+    num_shared_animations = 0
+    shared_bytes_saved = 0
+    shared_secs_saved = 0.0
+
     any_animation_export_failed = False
     for animation_obj in animations_obj.children:
-        animation = animation_from_object(animation_obj)
+        fingerprint = get_animation_fingerprint(animation_obj) if deduplicate else None
+        if fingerprint is not None and fingerprint in unique_animations:
+            shared_animation, build_secs = unique_animations[fingerprint]
+            shared_animation_hashes[animation_obj.animation_properties.hash] = shared_animation.hash
+            num_shared_animations += 1
+            shared_bytes_saved += estimate_animation_size(shared_animation)
+            shared_secs_saved += build_secs
+            continue
+
+        build_start_time = time.perf_counter()
+        animation = animation_from_object(animation_obj, compression, animation_sizes)
         if animation is None:
             any_animation_export_failed = True
             continue
 
+        if fingerprint is not None:
+            unique_animations[fingerprint] = (animation, time.perf_counter() - build_start_time)
+
         clip_dictionary.animations.append(animation)
 
     if any_animation_export_failed:
@@ -560,12 +796,70 @@ def clip_dictionary_from_object(obj: bpy.types.Object) -> Optional[ycdxml.ClipDi
 
     for clip_obj in clips_obj.children:
         clip = clip_from_object(clip_obj)
+        if shared_animation_hashes:
+            remap_clip_animation_hashes(clip, shared_animation_hashes)
 
         clip_dictionary.clips.append(clip)
 
+    if num_shared_animations > 0:
+        logger.info(
+            f"{num_shared_animations} animation(s) share the same data with another animation and were exported only "
+            f"once, ~{shared_bytes_saved} bytes and {shared_secs_saved:.2f} seconds saved."
+        )
+
+    if compression is not None:
+        log_clips_compression_sizes(clip_dictionary.clips, animation_sizes)
+
     return clip_dictionary
 
 
+def get_animation_fingerprint(animation_obj: bpy.types.Object) -> Optional[tuple]:
+    """Gets a key that identifies the data exported for the animation. Animations with the same fingerprint bake the
+    same action on the same target at the same frames, so they export identical sequences. Returns ``None`` if the
+    animation cannot be exported."""
+    animation_properties = animation_obj.animation_properties
+    action = animation_properties.action
+    if action is None:
+        return None
+
+    frame_start, frame_end = action.frame_range
+    return (action, animation_properties.target_id, frame_start, frame_end, get_action_export_frame_count(action))
+
+
+def estimate_animation_size(animation: ycdxml.Animation) -> int:
+    """Estimates the size in bytes of the sequences of the animation in the binary format."""
+    return sum(
+        estimate_sequence_data_size(sequence_data)
+        for sequence in animation.sequences
+        for sequence_data in sequence.sequence_data
+    )
+
+
+def remap_clip_animation_hashes(clip: ycdxml.Clip, animation_hashes: dict[str, str]):
+    """Points the clip to other animations, replacing the animation hashes that appear in ``animation_hashes``."""
+    if isinstance(clip, ycdxml.ClipsList.ClipAnimation):
+        clip.animation_hash = animation_hashes.get(clip.animation_hash, clip.animation_hash)
+    else:
+        for clip_animation in clip.animations:
+            clip_animation.animation_hash = animation_hashes.get(clip_animation.animation_hash,
+                                                                 clip_animation.animation_hash)
+
+
+def log_clips_compression_sizes(clips: list[ycdxml.Clip], animation_sizes: dict[str, tuple[int, int]]):
+    for clip in clips:
+        if isinstance(clip, ycdxml.ClipsList.ClipAnimation):
+            animation_hashes = [clip.animation_hash]
+        else:
+            animation_hashes = [clip_animation.animation_hash for clip_animation in clip.animations]
+
+        default_size = sum(animation_sizes.get(h, (0, 0))[0] for h in animation_hashes)
+        compressed_size = sum(animation_sizes.get(h, (0, 0))[1] for h in animation_hashes)
+        logger.info(
+            f"Clip '{clip.name.removeprefix('pack:/')}' compressed animation data from ~{default_size} to "
+            f"~{compressed_size} bytes, {default_size - compressed_size} bytes saved."
+        )
+
+
 def export_ycd(obj: bpy.types.Object, filepath: str) -> bool:
     clip_dict = clip_dictionary_from_object(obj)
     if clip_dict is None:
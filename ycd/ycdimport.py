@@ -1,8 +1,11 @@
 import os
 import bpy
-from mathutils import Vector, Quaternion
+import numpy as np
+from numpy.typing import NDArray
+from typing import Optional
 from ..cwxml import clipdictionary as ycdxml
 from ..sollumz_properties import SOLLUMZ_UI_NAMES, SollumType
+from ..sollumz_preferences import get_import_settings
 from ..tools.animationhelper import (
     Track,
     TrackFormat,
@@ -11,6 +14,7 @@ from ..tools.animationhelper import (
     get_action_duration_frames,
     get_scene_fps
 )
+from ..tools.fcurvehelper import KEYFRAME_INTERPOLATION_LINEAR
 from ..tools.utils import color_hash
 
 
@@ -22,90 +26,76 @@ def create_anim_obj(sollum_type: SollumType) -> bpy.types.Object:
     return anim_obj
 
 
-ActionData = dict[int, dict[Track, list]]
-
-
-def insert_action_data(action_data: ActionData, bone_id: int, track: Track, data):
-    if bone_id not in action_data:
-        action_data[bone_id] = {}
-
-    if track not in action_data[bone_id]:
-        action_data[bone_id][track] = []
-
-    action_data[bone_id][track].append(data)
-
-
-def get_values_from_sequence_data(sequence_data: ycdxml.Animation.SequenceDataList.SequenceData, frame_id: int) -> list:
-    channel_values = []
-
-    for i in range(len(sequence_data.channels)):
-        while len(channel_values) <= i:
-            channel_values.append(None)
-
-        channel = sequence_data.channels[i]
-
-        if channel is not None:
-            channel_values[i] = channel.get_value(frame_id, channel_values)
-
-    return channel_values
-
-
-def get_vector3_from_sequence_data(
+ActionData = dict[int, dict[Track, NDArray[np.float32]]]
+"""Frames data of each track of each bone, in the same format as ``ycdexport.TrackFramesData``. (F, C) arrays, with
+quaternions in (w, x, y, z) order."""
+
+
+def get_channel_values(
+    channel: ycdxml.ChannelsList.Channel,
+    frame_ids: NDArray[np.intp],
+    channel_values: list[NDArray[np.float32]]
+) -> NDArray[np.float32]:
+    """Decodes the channel at all ``frame_ids`` at once. Returns a (N,) array, or (N, 3)/(N, 4) for static vectors and
+    quaternions (in the mathutils component order). ``channel_values`` are the values of the previous channels in the
+    sequence data, needed by cached quaternion channels."""
+    num_frames = len(frame_ids)
+    match channel:
+        case ycdxml.ChannelsList.StaticQuaternion() | ycdxml.ChannelsList.StaticVector3():
+            return np.tile(np.array(channel.value, dtype=np.float32), (num_frames, 1))
+        case ycdxml.ChannelsList.StaticFloat():
+            return np.full(num_frames, channel.value, dtype=np.float32)
+        case ycdxml.ChannelsList.IndirectQuantizeFloat():
+            values = np.array(channel.values, dtype=np.float32)
+            frames = np.array(channel.frames, dtype=np.intp)
+            return values[frames[frame_ids % len(frames)] % len(values)]
+        case ycdxml.ChannelsList.RawFloat() | ycdxml.ChannelsList.QuantizeFloat():
+            values = np.array(channel.values, dtype=np.float32)
+            return values[frame_ids % len(values)]
+        case ycdxml.ChannelsList.CachedQuaternion1():
+            vec = np.stack(channel_values[:3], axis=1).astype(np.float64)
+            vec_len = np.sqrt(np.einsum("ij,ij->i", vec, vec))
+            return np.sqrt(np.maximum(1.0 - vec_len * vec_len, 0.0)).astype(np.float32)
+        case _:
+            return channel.get_value(frame_ids, channel_values)
+
+
+def get_frames_data_from_sequence_data(
     sequence_data: ycdxml.Animation.SequenceDataList.SequenceData,
-    frame_id: int
-) -> Vector:
-    channel_values = get_values_from_sequence_data(sequence_data, frame_id)
-
-    if len(channel_values) == 1:
-        location = channel_values[0]
-    else:
-        location = Vector([
-            channel_values[0],
-            channel_values[1],
-            channel_values[2],
-        ])
-
-    return location
-
-
-def get_quaternion_from_sequence_data(
-    sequence_data: ycdxml.Animation.SequenceDataList.SequenceData,
-    frame_id: int
-) -> Quaternion:
-    channel_values = get_values_from_sequence_data(sequence_data, frame_id)
+    track_format: TrackFormat,
+    frame_ids: NDArray[np.intp]
+) -> NDArray[np.float32]:
+    """Decodes the track stored in the sequence data at all ``frame_ids``. Returns a (N, C) array, with quaternions in
+    (w, x, y, z) order."""
+    channel_values = []
+    for channel in sequence_data.channels:
+        channel_values.append(get_channel_values(channel, frame_ids, channel_values))
 
     if len(channel_values) == 1:
-        rotation = channel_values[0]
-    else:
-        if len(sequence_data.channels) <= 4:
-            for channel in sequence_data.channels:
-                if channel.type == "CachedQuaternion1" or channel.type == "CachedQuaternion2":
-                    cached_value = channel.get_value(frame_id, channel_values)
-
-                    if channel.quat_index == 0:
-                        channel_values = [
-                            cached_value, channel_values[0], channel_values[1], channel_values[2]]
-                    elif channel.quat_index == 1:
-                        channel_values = [
-                            channel_values[0], cached_value, channel_values[1], channel_values[2]]
-                    elif channel.quat_index == 2:
-                        channel_values = [
-                            channel_values[0], channel_values[1], cached_value, channel_values[2]]
-                    elif channel.quat_index == 3:
-                        channel_values = [
-                            channel_values[0], channel_values[1], channel_values[2], cached_value]
-
-            if channel.type == "CachedQuaternion2":
-                rotation = Quaternion(
-                    (channel_values[0], channel_values[1], channel_values[2], channel_values[3]))
-            else:
-                rotation = Quaternion(
-                    (channel_values[3], channel_values[0], channel_values[1], channel_values[2]))
+        # Static vector or quaternion, or a single float
+        values = channel_values[0]
+        return values.reshape((len(frame_ids), -1))
+
+    if track_format == TrackFormat.Vector3:
+        return np.stack(channel_values[:3], axis=1)
+    elif track_format == TrackFormat.Quaternion:
+        # Channels are stored in (x, y, z, w) order, and the cached component, if any, goes in the position given by
+        # its quat_index. CachedQuaternion2 channels are stored in (w, x, y, z) order instead
+        last_channel = sequence_data.channels[-1]
+        if len(channel_values) <= 4:
+            for channel_index, channel in enumerate(sequence_data.channels):
+                if isinstance(channel, ycdxml.ChannelsList.CachedQuaternion1):
+                    cached_value = channel_values[channel_index]
+                    stored_values = channel_values[:3]
+                    stored_values.insert(channel.quat_index, cached_value)
+                    channel_values = stored_values
+
+        if isinstance(last_channel, ycdxml.ChannelsList.CachedQuaternion2) and len(channel_values) <= 4:
+            return np.stack(channel_values[:4], axis=1)
         else:
-            rotation = Quaternion(
-                (channel_values[3], channel_values[0], channel_values[1], channel_values[2]))
-
-    return rotation
+            return np.stack([channel_values[3], channel_values[0], channel_values[1], channel_values[2]], axis=1)
+    else:
+        return channel_values[0].reshape((len(frame_ids), 1))
 
 
 def combine_sequences_and_build_action_data(animation: ycdxml.Animation) -> ActionData:
@@ -114,52 +104,104 @@ def combine_sequences_and_build_action_data(animation: ycdxml.Animation) -> Acti
     if len(animation.sequences) <= 1:
         sequence_frame_limit = animation.frame_count + 30
 
-    action_data = {}
-
-    for frame_id in range(0, animation.frame_count):
-        sequence_index = int(frame_id / (sequence_frame_limit))
-        sequence_frame = frame_id % (sequence_frame_limit)
+    frame_ids = np.arange(animation.frame_count)
+    sequence_indices = np.minimum(frame_ids // sequence_frame_limit, len(animation.sequences) - 1)
+    sequence_frames = frame_ids % sequence_frame_limit
 
-        if sequence_index >= len(animation.sequences):
-            sequence_index = len(animation.sequences) - 1
-
-        sequence = animation.sequences[sequence_index]
+    action_data = {}
+    for sequence_index, sequence in enumerate(animation.sequences):
+        # Frames are sorted, so each sequence covers a contiguous range of them
+        start, end = np.searchsorted(sequence_indices, (sequence_index, sequence_index + 1))
+        if start == end:
+            continue
 
         for sequence_data_index, sequence_data in enumerate(sequence.sequence_data):
             bone_data = animation.bone_ids[sequence_data_index]
-            bone_id = bone_data.bone_id
-
             if bone_data is None:
                 continue
 
+            bone_id = bone_data.bone_id
             track = bone_data.track
             format = bone_data.format
             assert TrackFormatMap[track] == format, f"Track format mismatch: {TrackFormatMap[track]} != {format}"
 
-            if format == TrackFormat.Vector3:
-                vec = get_vector3_from_sequence_data(sequence_data, sequence_frame)
-                insert_action_data(action_data, bone_id, track, vec)
-            elif format == TrackFormat.Quaternion:
-                quat = get_quaternion_from_sequence_data(sequence_data, sequence_frame)
-                insert_action_data(action_data, bone_id, track, quat)
-            elif format == TrackFormat.Float:
-                value = get_values_from_sequence_data(sequence_data, sequence_frame)[0]
-                insert_action_data(action_data, bone_id, track, value)
+            frames_data = get_frames_data_from_sequence_data(
+                sequence_data, TrackFormat(format), sequence_frames[start:end]
+            )
+
+            bone_action_data = action_data.setdefault(bone_id, {})
+            if track not in bone_action_data:
+                bone_action_data[track] = np.empty((animation.frame_count, frames_data.shape[1]), dtype=np.float32)
+            bone_action_data[track][start:end] = frames_data
 
     return action_data
 
 
-def apply_action_data_to_action(action_data: ActionData, action: bpy.types.Action, frame_count: int, duration_secs: float):
+def reduce_keyframes(values: NDArray[np.float32], max_error: float) -> NDArray[np.bool_]:
+    """Selects the keyframes to keep from (C, F) values sampled at every frame, so that linear interpolation between
+    the kept keyframes of each curve stays within ``max_error`` of the values. The first and last keyframes are always
+    kept. Returns a (C, F) mask of the kept keyframes.
+
+    Same as the Ramer-Douglas-Peucker algorithm: segments over the error are split at the frame with the largest error
+    until none is. All segments of all curves are split at once, only looking at the frames of segments not done yet.
+    """
+    num_curves, num_frames = values.shape
+    keep = np.zeros((num_curves, num_frames), dtype=bool)
+    if num_frames <= 2:
+        keep[:] = True
+        return keep
+
+    keep[:, 0] = True
+    keep[:, -1] = True
+
+    # Work on the flattened curves, with the frames still to check and the kept keyframes around each of them
+    values = values.astype(np.float64).ravel()
+    keep_flat = keep.ravel()
+    curve_starts = np.arange(num_curves)[:, np.newaxis] * num_frames
+    frames = (curve_starts + np.arange(1, num_frames - 1)).ravel()
+    prev_keys = np.repeat(curve_starts.ravel(), num_frames - 2)
+    next_keys = prev_keys + (num_frames - 1)
+    while len(frames) > 0:
+        factors = (frames - prev_keys) / (next_keys - prev_keys)
+        errors = np.abs(values[frames] - (values[prev_keys] + (values[next_keys] - values[prev_keys]) * factors))
+
+        # Frames are sorted, so the frames of each segment are contiguous
+        segment_starts = np.flatnonzero(np.diff(prev_keys, prepend=-1))
+        segment_max_errors = np.maximum.reduceat(errors, segment_starts)
+        segment_ids = np.repeat(np.arange(len(segment_starts)), np.diff(segment_starts, append=len(frames)))
+
+        # Split at the first frame with the max error of each segment
+        max_error_frames = np.flatnonzero(errors == segment_max_errors[segment_ids])
+        first_max_error_frames = max_error_frames[np.flatnonzero(np.diff(segment_ids[max_error_frames], prepend=-1))]
+        split_frames = frames[first_max_error_frames]
+        is_split = segment_max_errors > max_error
+        keep_flat[split_frames[is_split]] = True
+
+        # Drop the frames of segments within the error, the others now belong to one of the two halves
+        frames_split = split_frames[segment_ids]
+        is_open = is_split[segment_ids] & (frames != frames_split)
+        frames = frames[is_open]
+        frames_split = frames_split[is_open]
+        prev_keys = np.where(frames > frames_split, frames_split, prev_keys[is_open])
+        next_keys = np.where(frames < frames_split, frames_split, next_keys[is_open])
+
+    return keep
+
+
+def apply_action_data_to_action(
+    action_data: ActionData,
+    action: bpy.types.Action,
+    frame_count: int,
+    duration_secs: float,
+    max_keyframe_error: Optional[float] = None
+):
+    """Creates the F-curves of the action from the action data, with a keyframe per frame. If ``max_keyframe_error``
+    is given, only the keyframes needed to stay within that error with linear interpolation are created."""
     # Scale frame IDs to match the animation duration specified in the XML in Blender
     # -1 because the anim finishes when it reaches the last frame
     unscaled_duration_secs = (frame_count - 1) / get_scene_fps()
     scale_factor = duration_secs / unscaled_duration_secs
-    scaled_frame_ids = [frame_id * scale_factor for frame_id in range(frame_count)]
-
-    def _interleave_frame_ids(track_data: list[float]) -> list[float]:
-        """Converts [data0, data1, ..., dataN] to [frameId0, data0, frameId1, data1, ..., frameIdN, dataN]"""
-        assert len(track_data) == len(scaled_frame_ids)
-        return [value for co in zip(scaled_frame_ids, track_data) for value in co]
+    scaled_frame_ids = np.arange(frame_count, dtype=np.float32) * np.float32(scale_factor)
 
     if bpy.app.version >= (5, 0, 0):
         from bpy_extras import anim_utils
@@ -179,69 +221,53 @@ def apply_action_data_to_action(action_data: ActionData, action: bpy.types.Actio
         group_name = f"#{bone_id}"
 
         for track, frames_data in bones_data.items():
-            track_format = TrackFormatMap[track]
             data_path = get_canonical_track_data_path(track, bone_id)
-            if track_format == TrackFormat.Vector3:
-                vec_tracks_x = list(map(lambda vec: vec.x, frames_data))
-                vec_tracks_y = list(map(lambda vec: vec.y, frames_data))
-                vec_tracks_z = list(map(lambda vec: vec.z, frames_data))
-
-                vec_curve_x = _new_fcurve(data_path, 0, group_name)
-                vec_curve_y = _new_fcurve(data_path, 1, group_name)
-                vec_curve_z = _new_fcurve(data_path, 2, group_name)
-
-                vec_curve_x.keyframe_points.add(len(frames_data))
-                vec_curve_y.keyframe_points.add(len(frames_data))
-                vec_curve_z.keyframe_points.add(len(frames_data))
-
-                vec_curve_x.keyframe_points.foreach_set("co", _interleave_frame_ids(vec_tracks_x))
-                vec_curve_y.keyframe_points.foreach_set("co", _interleave_frame_ids(vec_tracks_y))
-                vec_curve_z.keyframe_points.foreach_set("co", _interleave_frame_ids(vec_tracks_z))
-
-                vec_curve_x.update()
-                vec_curve_y.update()
-                vec_curve_z.update()
-            elif track_format == TrackFormat.Quaternion:
-                quat_tracks_x = list(map(lambda rotation: rotation.x, frames_data))
-                quat_tracks_y = list(map(lambda rotation: rotation.y, frames_data))
-                quat_tracks_z = list(map(lambda rotation: rotation.z, frames_data))
-                quat_tracks_w = list(map(lambda rotation: rotation.w, frames_data))
-
-                quat_curve_w = _new_fcurve(data_path, 0, group_name)
-                quat_curve_x = _new_fcurve(data_path, 1, group_name)
-                quat_curve_y = _new_fcurve(data_path, 2, group_name)
-                quat_curve_z = _new_fcurve(data_path, 3, group_name)
-
-                quat_curve_w.keyframe_points.add(len(frames_data))
-                quat_curve_x.keyframe_points.add(len(frames_data))
-                quat_curve_y.keyframe_points.add(len(frames_data))
-                quat_curve_z.keyframe_points.add(len(frames_data))
-
-                quat_curve_w.keyframe_points.foreach_set("co", _interleave_frame_ids(quat_tracks_w))
-                quat_curve_x.keyframe_points.foreach_set("co", _interleave_frame_ids(quat_tracks_x))
-                quat_curve_y.keyframe_points.foreach_set("co", _interleave_frame_ids(quat_tracks_y))
-                quat_curve_z.keyframe_points.foreach_set("co", _interleave_frame_ids(quat_tracks_z))
-
-                quat_curve_w.update()
-                quat_curve_x.update()
-                quat_curve_y.update()
-                quat_curve_z.update()
-            elif track_format == TrackFormat.Float:
-                value_curve = _new_fcurve(data_path, 0, group_name)
-
-                value_curve.keyframe_points.add(len(frames_data))
-                value_curve.keyframe_points.foreach_set("co", _interleave_frame_ids(frames_data))
-
-                value_curve.update()
-
-
-def action_data_to_action(action_name: str, action_data, frame_count: int, duration_secs: float) -> bpy.types.Action:
+            # (C, F) values of each F-curve. Vectors in (x, y, z) and quaternions in (w, x, y, z) order, same as the
+            # array index of the F-curves
+            curves_values = frames_data.T
+            if max_keyframe_error is not None:
+                keep = reduce_keyframes(curves_values, max_keyframe_error)
+            else:
+                keep = None
+
+            for index, values in enumerate(curves_values):
+                if keep is not None:
+                    co = np.stack((scaled_frame_ids[keep[index]], values[keep[index]]), axis=1)
+                else:
+                    co = np.stack((scaled_frame_ids, values), axis=1)
+
+                fcurve = _new_fcurve(data_path, index, group_name)
+                fcurve.keyframe_points.add(len(co))
+                fcurve.keyframe_points.foreach_set("co", co.ravel())
+                if keep is not None:
+                    # The kept keyframes are only within the error when linearly interpolated
+                    fcurve.keyframe_points.foreach_set(
+                        "interpolation", np.full(len(co), KEYFRAME_INTERPOLATION_LINEAR, dtype=np.int32)
+                    )
+                fcurve.update()
+
+
+def get_max_keyframe_error_from_settings() -> Optional[float]:
+    settings = get_import_settings()
+    if not settings.ycd_reduce_keyframes:
+        return None
+
+    return settings.ycd_max_keyframe_error
+
+
+def action_data_to_action(
+    action_name: str,
+    action_data: ActionData,
+    frame_count: int,
+    duration_secs: float,
+    max_keyframe_error: Optional[float] = None
+) -> bpy.types.Action:
     action = bpy.data.actions.new(f"{action_name}_action")
-    apply_action_data_to_action(action_data, action, frame_count, duration_secs)
+    apply_action_data_to_action(action_data, action, frame_count, duration_secs, max_keyframe_error)
     return action
 
 
-def animation_to_obj(animation: ycdxml.Animation) -> bpy.types.Object:
+def animation_to_obj(animation: ycdxml.Animation, max_keyframe_error: Optional[float] = None) -> bpy.types.Object:
     animation_obj = create_anim_obj(SollumType.ANIMATION)
 
     animation_obj.name = animation.hash
@@ -249,7 +275,8 @@ def animation_to_obj(animation: ycdxml.Animation) -> bpy.types.Object:
 
     action_data = combine_sequences_and_build_action_data(animation)
     animation_obj.animation_properties.action = action_data_to_action(animation.hash, action_data,
-                                                                      animation.frame_count, animation.duration)
+                                                                      animation.frame_count, animation.duration,
+                                                                      max_keyframe_error)
 
     return animation_obj
 
@@ -352,11 +379,12 @@ def clip_dictionary_to_obj(clip_dictionary: ycdxml.ClipDictionary, name: str) ->
 
     animations_map = {}
     animations_obj_map = {}
+    max_keyframe_error = get_max_keyframe_error_from_settings()
 
     for animation in clip_dictionary.animations:
         animations_map[animation.hash] = animation
 
-        animation_obj = animation_to_obj(animation)
+        animation_obj = animation_to_obj(animation, max_keyframe_error)
         animation_obj.parent = animations_obj
 
         animations_obj_map[animation.hash] = animation_obj
@@ -5,10 +5,18 @@ from bpy.types import (
 import os
 import numpy as np
 from typing import Optional
-from ..cwxml.drawable import YDD, DrawableDictionary, Skeleton, Bone
+from xml.etree import ElementTree as ET
+from ..cwxml.drawable import YDD, DrawableDictionary, Drawable, Skeleton, Bone
 from ..cwxml.fragment import YFT, Fragment
 from ..cwxml.cloth import YLD, ClothDictionary, CharacterCloth
-from ..ydr.ydrimport import create_drawable_obj, create_drawable_skel, apply_rotation_limits, set_bone_properties, create_bpy_bone
+from ..ydr.ydrimport import (
+    create_drawable_obj,
+    create_drawable_skel,
+    apply_rotation_limits,
+    set_bone_properties,
+    create_bpy_bone,
+    shadergroup_to_materials,
+)
 from ..ybn.ybnimport import create_bound_composite
 from ..sollumz_properties import SollumType, SollumzGame, import_export_current_game as current_game, set_import_export_current_game
 from ..sollumz_preferences import get_import_settings
@@ -19,14 +27,65 @@ from mathutils import Matrix
 from .. import logger
 
 
+class YddSharedDatablocks:
+    """Materials and armatures shared between the drawables of a dictionary.
+
+    Ped component dictionaries usually have dozens of drawables with the same skeleton and the same shaders, so each
+    unique material and armature is created once and linked to all drawables that use it. With ``enabled`` set to
+    ``False``, every drawable gets its own copies as before.
+    """
+
+    def __init__(self, filepath: str, enabled: bool):
+        self.filepath = filepath
+        self.enabled = enabled
+        self.materials: dict[tuple, bpy.types.Material] = {}
+        self.armatures: dict[bytes, bpy.types.Armature] = {}
+        self.num_materials_requested = 0
+        self.num_armatures_requested = 0
+
+    def get_materials(self, drawable_xml: Drawable) -> list[bpy.types.Material]:
+        materials = shadergroup_to_materials(
+            drawable_xml.shader_group, self.filepath, self.materials if self.enabled else None
+        )
+        self.num_materials_requested += len(materials)
+        return materials
+
+    def get_skeleton_key(self, drawable_xml: Drawable) -> Optional[bytes]:
+        """Get the key of the drawable skeleton, or ``None`` if its armature should not be shared."""
+        if not self.enabled or not drawable_xml.skeleton.bones:
+            return None
+
+        self.num_armatures_requested += 1
+        return ET.tostring(drawable_xml.skeleton.to_xml())
+
+    def add_armature(self, skeleton_key: Optional[bytes], drawable_obj: Object):
+        if skeleton_key is None or skeleton_key in self.armatures or drawable_obj.type != "ARMATURE":
+            return
+
+        self.armatures[skeleton_key] = drawable_obj.data
+
+    def log_summary(self):
+        if not self.enabled:
+            return
+
+        num_materials_saved = self.num_materials_requested - len(self.materials)
+        num_armatures_saved = self.num_armatures_requested - len(self.armatures)
+        logger.info(
+            f"Shared data-blocks between drawables: {len(self.materials)} materials created for "
+            f"{self.num_materials_requested} shaders ({num_materials_saved} saved), {len(self.armatures)} armatures "
+            f"created for {self.num_armatures_requested} skeletons ({num_armatures_saved} saved)."
+        )
+
+
 def import_ydd(filepath: str):
     import_settings = get_import_settings()
 
-    ydd_xml = YDD.from_xml_file(filepath)
+    with Drawable.skip_bounds(not import_settings.import_embedded_bounds):
+        ydd_xml = YDD.from_xml_file(filepath)
     set_import_export_current_game(ydd_xml.game)
 
     # Import the cloth .yld.xml if it exists
-    if current_game() == SollumzGame.GTA:
+    if current_game() == SollumzGame.GTA and import_settings.import_cloth:
         yld_filepath = make_yld_filepath(filepath)
         yld_xml = YLD.from_xml_file(yld_filepath) if os.path.exists(yld_filepath) else None
     else:
@@ -108,6 +167,7 @@ def RDR_create_ydd_obj_ext_skel(ydd_xml: DrawableDictionary, filepath: str, exte
     external_armature = create_merged_armature(name, all_armatures)
     skeletons_collection_empty.parent = external_armature
 
+    shared_datablocks = YddSharedDatablocks(filepath, get_import_settings().ydd_share_datablocks)
     for drawable_xml in ydd_xml:
         external_bones = None
 
@@ -115,9 +175,12 @@ def RDR_create_ydd_obj_ext_skel(ydd_xml: DrawableDictionary, filepath: str, exte
             external_bones = external_skel.drawable.skeleton.bones
 
         drawable_obj = create_drawable_obj(
-            drawable_xml, filepath, name=drawable_xml.hash, external_armature=external_armature, external_bones=external_bones, game=current_game())
+            drawable_xml, filepath, name=drawable_xml.hash, external_armature=external_armature,
+            external_bones=external_bones, materials=shared_datablocks.get_materials(drawable_xml), game=current_game())
         drawable_obj.parent = external_armature
 
+    shared_datablocks.log_summary()
+
     return external_armature
 
 
@@ -383,6 +446,7 @@ def create_ydd_obj(ydd_xml: DrawableDictionary, filepath: str, yld_xml: Optional
 
     ydd_skel = find_first_skel(ydd_xml_list)
 
+    shared_datablocks = YddSharedDatablocks(filepath, get_import_settings().ydd_share_datablocks)
     for drawable_xml in ydd_xml_list:
         external_armature = None
         external_bones = None
@@ -396,15 +460,19 @@ def create_ydd_obj(ydd_xml: DrawableDictionary, filepath: str, yld_xml: Optional
             if not drawable_xml.skeleton.bones and ydd_skel is not None:
                 external_bones = ydd_skel.bones
 
+        skeleton_key = shared_datablocks.get_skeleton_key(drawable_xml)
         drawable_obj = create_drawable_obj(
             drawable_xml,
             filepath,
             external_armature=external_armature,
             external_bones=external_bones,
             name=drawable_xml.hash,
+            materials=shared_datablocks.get_materials(drawable_xml),
             game=current_game(),
+            armature=shared_datablocks.armatures.get(skeleton_key, None),
         )
         drawable_obj.parent = dict_obj
+        shared_datablocks.add_armature(skeleton_key, drawable_obj)
 
         if yld_xml is not None:
             cloth = next((c for c in yld_xml if c.name == drawable_xml.name), None)
@@ -414,6 +482,8 @@ def create_ydd_obj(ydd_xml: DrawableDictionary, filepath: str, yld_xml: Optional
                 bounds_obj.parent = cloth_obj
                 cloth_obj.parent = drawable_obj
 
+    shared_datablocks.log_summary()
+
     return dict_obj
 
 
@@ -25,7 +25,7 @@ from ..shared.geometry import (
     tris_normals,
     tris_areas,
     tris_areas_from_verts,
-    distance_signed_point_to_planes,
+    iter_overlapping_aabb_pairs,
 )
 from ..sollumz_properties import (
     SollumType,
@@ -46,6 +46,10 @@ from .cloth_diagnostics import (
 from .. import logger
 
 CLOTH_CHAR_MAX_VERTICES = 254
+# Extra padding of the cloth triangle bounds when looking for triangles to bind mesh vertices to, covers rounding errors
+BINDING_PADDING_EPSILON = 1e-4
+# Max number of vertex-triangle pairs checked at once when binding mesh vertices against every cloth triangle
+BINDING_CHUNK_SIZE = 1 << 18
 CLOTH_CHAR_VERTEX_GROUP_NAME = "CLOTH"
 
 
@@ -441,78 +445,149 @@ def cloth_char_get_mesh_to_cloth_bindings(
     mesh_binded_dot_product = np.sum(mesh_binded_verts_normals[:,:2] * -mesh_binded_verts[:,:2], axis=1)
     mesh_binded_verts_facing_inside = mesh_binded_dot_product > 0.0
 
-    ind_arr = np.empty((num_binded_verts, 4), dtype=np.uint32)
-    weights_arr = np.empty((num_binded_verts, 4), dtype=np.float32)
+    def _distances_to_tris(vert_inds: NDArray[np.intp], tri_inds: NDArray[np.intp]):
+        """Signed distances from the mesh vertex to the cloth triangle plane of each pair."""
+        verts = mesh_binded_verts[vert_inds]
+        facing_inside = mesh_binded_verts_facing_inside[vert_inds, np.newaxis]
+
+        # Flip winding order for the vertices facing inside
+        normals = np.where(facing_inside, cloth_tris_normals_neg[tri_inds], cloth_tris_normals[tri_inds])
+        v0 = np.where(facing_inside, cloth_tris_v1[tri_inds], cloth_tris_v0[tri_inds])
+        v1 = np.where(facing_inside, cloth_tris_v0[tri_inds], cloth_tris_v1[tri_inds])
+
+        distances = np.sum(normals * verts, axis=1) - np.sum(normals * v0, axis=1)
+        return distances, verts, normals, v0, v1
+
+    def _project_to_tris(vert_inds: NDArray[np.intp], tri_inds: NDArray[np.intp]):
+        """Project the mesh vertex onto the cloth triangle plane of each pair. Returns the signed distances to the
+        planes, the barycentric coordinates of the projected vertices and the squared distances to them as error."""
+        distances, verts, normals, v0, v1 = _distances_to_tris(vert_inds, tri_inds)
+        v2 = cloth_tris_v2[tri_inds]
+        projected = verts - normals * distances[:, np.newaxis]
+
+        areas = cloth_tris_areas[tri_inds]
+        weights = np.stack((
+            tris_areas_from_verts(v1, v2, projected) / areas,
+            tris_areas_from_verts(v2, v0, projected) / areas,
+            tris_areas_from_verts(v0, v1, projected) / areas,
+        ), axis=1)
+
+        sq_errors = np.sum((verts - projected) ** 2, axis=1)
+        return distances, weights, sq_errors
+
+    # Triangles are considered valid if:
+    #  1. Projected vertex falls within the triangle, i.e. the barycentric coordinates sum 1 (with some leeway)
+    #  2. They are not too far away from the mesh vertex
+    def _condition_projection(weights: NDArray) -> NDArray[np.bool_]:
+        return np.sum(weights, axis=1) < 1.05
+
+    def _condition_distance(distances: NDArray) -> NDArray[np.bool_]:
+        return np.abs(distances) <= MAX_DISTANCE_THRESHOLD
+
+    # Valid (vertex, triangle) pairs with their projection
+    valid_verts = [np.empty(0, dtype=np.intp)]
+    valid_tris = [np.empty(0, dtype=np.intp)]
+    valid_distances = [np.empty(0, dtype=np.float64)]
+    valid_weights = [np.empty((0, 3), dtype=np.float64)]
+    valid_sq_errors = [np.empty(0, dtype=np.float64)]
+
+    def _add_valid_pairs(vert_inds: NDArray[np.intp], tri_inds: NDArray[np.intp]):
+        distances, weights, sq_errors = _project_to_tris(vert_inds, tri_inds)
+        condition_projection = _condition_projection(weights)
+        condition_distance = _condition_distance(distances)
+        valid = condition_projection & condition_distance
+        valid_verts.append(vert_inds[valid])
+        valid_tris.append(tri_inds[valid])
+        valid_distances.append(distances[valid])
+        valid_weights.append(weights[valid])
+        valid_sq_errors.append(sq_errors[valid])
+        return condition_projection, condition_distance, valid
+
+    # A projected vertex with barycentric coordinates summing less than 1.05 is at most 5% of the longest triangle edge
+    # outside the triangle, so only the triangles whose bounds padded by that and the max distance contain the vertex
+    # need to be checked
+    cloth_tris_max_edge = np.linalg.norm(cloth_tris_verts - np.roll(cloth_tris_verts, 1, axis=1), axis=2).max(axis=1)
+    cloth_tris_padding = (MAX_DISTANCE_THRESHOLD + 0.05 * cloth_tris_max_edge + BINDING_PADDING_EPSILON)[:, np.newaxis]
+    cloth_tris_min = cloth_tris_verts.min(axis=1) - cloth_tris_padding
+    cloth_tris_max = cloth_tris_verts.max(axis=1) + cloth_tris_padding
+    for vert_inds, tri_inds in iter_overlapping_aabb_pairs(
+        mesh_binded_verts, mesh_binded_verts, cloth_tris_min, cloth_tris_max
+    ):
+        _add_valid_pairs(vert_inds, tri_inds)
+
+    # Vertices without any valid triangle are checked against every triangle to report why they couldn't be bound.
+    # Distances to the triangle planes and to the triangle centroids within those planes are cheap to compute for all
+    # pairs at once, and only the pairs that can pass a condition are checked exactly: the plane must be within the max
+    # distance and the projection close enough to the centroid to fall within the padded triangle
+    cloth_origin = cloth_verts.mean(axis=0) if len(cloth_verts) > 0 else np.zeros(3)
+    cloth_tris_centroids = cloth_tris_verts.mean(axis=1) - cloth_origin
+    cloth_tris_centroids_sq_norms = np.sum(cloth_tris_centroids ** 2, axis=1)
+    cloth_tris_centroids_planes = np.sum(cloth_tris_normals * cloth_tris_centroids, axis=1)
+    cloth_tris_radii = (
+        np.linalg.norm(cloth_tris_verts - cloth_origin - cloth_tris_centroids[:, np.newaxis], axis=2).max(axis=1) +
+        cloth_tris_padding[:, 0] - MAX_DISTANCE_THRESHOLD + BINDING_PADDING_EPSILON
+    )
+    num_cloth_tris = len(cloth_tris)
+    is_bound = np.zeros(num_binded_verts, dtype=bool)
+    is_bound[np.concatenate(valid_verts)] = True
+    unbound_verts = np.flatnonzero(~is_bound)
+    chunk_size = max(BINDING_CHUNK_SIZE // max(num_cloth_tris, 1), 1)
+    for chunk_start in range(0, len(unbound_verts), chunk_size):
+        chunk_verts = unbound_verts[chunk_start:chunk_start + chunk_size]
+        verts = mesh_binded_verts[chunk_verts] - cloth_origin
+
+        plane_distances = verts @ cloth_tris_normals.T - cloth_tris_centroids_planes
+        in_plane_sq_distances = (
+            np.sum(verts ** 2, axis=1)[:, np.newaxis] - 2.0 * (verts @ cloth_tris_centroids.T) +
+            cloth_tris_centroids_sq_norms - plane_distances ** 2
+        )
 
-    # Bind each mesh vertex to a cloth triangle
-    for mesh_vert_idx in range(num_binded_verts):
-        mesh_vert = mesh_binded_verts[mesh_vert_idx]
-        mesh_vert_facing_inside = mesh_binded_verts_facing_inside[mesh_vert_idx]
+        def _check_candidates(candidates: NDArray[np.bool_], condition):
+            cand_verts, cand_tris = np.nonzero(candidates)
+            passed = condition(chunk_verts[cand_verts], cand_tris)
+            return np.bincount(cand_verts[passed], minlength=len(chunk_verts)) > 0
 
-        if mesh_vert_facing_inside:
-            # Flip winding order
-            this_cloth_tris_normals = cloth_tris_normals_neg
-            this_cloth_tris_v0 = cloth_tris_v1
-            this_cloth_tris_v1 = cloth_tris_v0
-        else:
-            this_cloth_tris_normals = cloth_tris_normals
-            this_cloth_tris_v0 = cloth_tris_v0
-            this_cloth_tris_v1 = cloth_tris_v1
-
-        # Calculate the distance from the mesh vertex to every cloth triangle plane
-        distance_to_tris = distance_signed_point_to_planes(mesh_vert, this_cloth_tris_v0, this_cloth_tris_normals)
-
-        # Project the mesh vertex onto every cloth triangle plane
-        projected_to_tris = mesh_vert - this_cloth_tris_normals * distance_to_tris[:, np.newaxis]
-
-        # Calculate the barycentric coordinates of each projected vertex
-        tris_areas0 = tris_areas_from_verts(this_cloth_tris_v1, cloth_tris_v2, projected_to_tris)
-        tris_areas1 = tris_areas_from_verts(cloth_tris_v2, this_cloth_tris_v0, projected_to_tris)
-        tris_areas2 = tris_areas_from_verts(this_cloth_tris_v0, this_cloth_tris_v1, projected_to_tris)
-
-        tris_w0 = tris_areas0 / cloth_tris_areas
-        tris_w1 = tris_areas1 / cloth_tris_areas
-        tris_w2 = tris_areas2 / cloth_tris_areas
-
-        # Use the squared distance between mesh vertex and projected vertex as error measure
-        err_to_tris = np.sum((mesh_vert - projected_to_tris) ** 2, axis=1)
-
-        # Triangles are considered valid if:
-        #  1. Projected vertex falls within the triangle, i.e. the barycentric coordinates sum 1 (with some leeway)
-        #  2. They are not too far away from the mesh vertex
-        condition_projection = (tris_w0 + tris_w1 + tris_w2) < 1.05
-        condition_distance = np.abs(distance_to_tris) <= MAX_DISTANCE_THRESHOLD
-        valid_tris_mask = condition_projection & condition_distance
-        valid_tris_indices = np.where(valid_tris_mask)[0]
-        if not valid_tris_mask.any():
+        any_distance = _check_candidates(
+            np.abs(plane_distances) <= MAX_DISTANCE_THRESHOLD + BINDING_PADDING_EPSILON,
+            lambda v, t: _condition_distance(_distances_to_tris(v, t)[0])
+        )
+        any_projection = _check_candidates(
+            in_plane_sq_distances <= cloth_tris_radii ** 2,
+            lambda v, t: _condition_projection(_project_to_tris(v, t)[1])
+        )
+        for i, vert_ind in enumerate(chunk_verts):
             errors.append(ClothDiagMeshBindingError(
-                Vector(mesh_vert),
-                error_projection=not condition_projection.any(),
-                error_distance=not condition_distance.any(),
+                Vector(mesh_binded_verts[vert_ind]),
+                error_projection=not any_projection[i],
+                error_distance=not any_distance[i],
                 error_multiple_matches=False,
             ))
-            continue
 
-        # Find the triangle to bind this vertex to, the valid triangle with the least error
-        bind_tri_index = valid_tris_indices[np.argmin(err_to_tris[valid_tris_mask])]
+    # Bind each mesh vertex to the valid triangle with the least error, the first one in case of ties
+    valid_verts = np.concatenate(valid_verts)
+    valid_tris = np.concatenate(valid_tris)
+    order = np.lexsort((valid_tris, np.concatenate(valid_sq_errors), valid_verts))
+    order = order[np.diff(valid_verts[order], prepend=-1) != 0]
+    bind_verts = valid_verts[order]
+    bind_tris = valid_tris[order]
+    bind_weights = np.concatenate(valid_weights)[order]
+    bind_distances = np.concatenate(valid_distances)[order]
 
-        b0, b1, b2 = cloth_tris[bind_tri_index]
-        w0, w1, w2 = tris_w0[bind_tri_index], tris_w1[bind_tri_index], tris_w2[bind_tri_index]
-        d = distance_to_tris[bind_tri_index]
+    ind_arr = np.empty((num_binded_verts, 4), dtype=np.uint32)
+    weights_arr = np.empty((num_binded_verts, 4), dtype=np.float32)
 
-        if mesh_vert_facing_inside:
-            # Flip winding order
-            b1, b0 = b0, b1
+    b0, b1, b2 = cloth_tris[bind_tris].T
+    # Flip winding order
+    bind_facing_inside = mesh_binded_verts_facing_inside[bind_verts]
+    b0, b1 = np.where(bind_facing_inside, b1, b0), np.where(bind_facing_inside, b0, b1)
 
-        ind_arr[mesh_vert_idx, 0] = b1
-        ind_arr[mesh_vert_idx, 1] = b0
-        ind_arr[mesh_vert_idx, 2] = 255
-        ind_arr[mesh_vert_idx, 3] = b2
+    ind_arr[bind_verts, 0] = b1
+    ind_arr[bind_verts, 1] = b0
+    ind_arr[bind_verts, 2] = 255
+    ind_arr[bind_verts, 3] = b2
 
-        weights_arr[mesh_vert_idx, 0] = w0
-        weights_arr[mesh_vert_idx, 1] = w1
-        weights_arr[mesh_vert_idx, 2] = w2
-        weights_arr[mesh_vert_idx, 3] = d * 10.0 + 0.5
+    weights_arr[bind_verts, :3] = bind_weights
+    weights_arr[bind_verts, 3] = bind_distances * 10.0 + 0.5
 
     # Make sure weights stay in the [0, 1] range
     weights_arr.clip(0.0, 1.0, out=weights_arr)
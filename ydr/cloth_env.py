@@ -4,6 +4,7 @@ from bpy.types import (
     Material,
 )
 from typing import Optional
+from collections import Counter, defaultdict
 from mathutils import (
     Vector,
     Matrix,
@@ -95,37 +96,16 @@ def cloth_env_find_mesh_objects(frag_obj: Object, silent: bool = False) -> list[
 
 def _cloth_sort_verlet_edges(edges: list[VerletClothEdge]) -> list[VerletClothEdge]:
     """Sort edges such that no vertex is repeated within chunks of 8 edges. Required due to how the cloth physics code
-    is vectorized.
+    is vectorized. Chunks that can't be filled are padded with dummy edges.
     """
-    # fairly inefficient algorithm ahead, works for now
-    edge_buckets: list[list[VerletClothEdge]] = []
     MAX_EDGES_IN_BUCKET = 8
-    for e in edges:
-        for bucket in edge_buckets:
-            if len(bucket) >= MAX_EDGES_IN_BUCKET:
-                continue
-
-            can_add_to_bucket = True
-            for edge_in_bucket in bucket:
-                if (
-                    e.vertex0 == edge_in_bucket.vertex0 or e.vertex0 == edge_in_bucket.vertex1 or
-                    e.vertex1 == edge_in_bucket.vertex0 or e.vertex1 == edge_in_bucket.vertex1
-                ):
-                    can_add_to_bucket = False
-                    break
-
-            if can_add_to_bucket:
-                bucket.append(e)
-                break
-        else:
-            # Could not be added to any existing bucket, create a new bucket
-            edge_buckets.append([e])
+    edge_buckets = cloth_schedule_edge_buckets([(e.vertex0, e.vertex1) for e in edges], MAX_EDGES_IN_BUCKET)
 
     new_edges = []
     for bucket in edge_buckets:
         for i in range(MAX_EDGES_IN_BUCKET):
             if i < len(bucket):
-                new_edges.append(bucket[i])
+                new_edges.append(edges[bucket[i]])
             else:
                 # insert dummy edge
                 verlet_edge = VerletClothEdge()
@@ -139,6 +119,83 @@ def _cloth_sort_verlet_edges(edges: list[VerletClothEdge]) -> list[VerletClothEd
     return new_edges
 
 
+def cloth_schedule_edge_buckets(edge_vertices: list[tuple[int, int]], bucket_size: int) -> list[list[int]]:
+    """Distribute edges into buckets of up to ``bucket_size`` edges such that no vertex is repeated within a bucket,
+    using as few buckets as possible. Returns the indices into ``edge_vertices`` of the edges in each bucket.
+
+    Edges are placed greedily in the first bucket without any of their vertices. The buckets used by each vertex are
+    tracked as a bitmask, so finding that bucket doesn't require looking at the edges already placed. Afterwards, the
+    least filled buckets are emptied where possible by moving their edges into other buckets.
+    """
+    num_edges = len(edge_vertices)
+    if num_edges == 0:
+        return []
+
+    buckets: list[list[int]] = []
+    vertex_buckets: dict[int, int] = defaultdict(int)  # bitmask of the buckets with an edge using the vertex
+    full_buckets = 0  # bitmask of the buckets with no space left
+
+    def _find_bucket(v0: int, v1: int, exclude: int = 0) -> int:
+        taken = vertex_buckets[v0] | vertex_buckets[v1] | full_buckets | exclude
+        return (~taken & (taken + 1)).bit_length() - 1
+
+    def _add_to_bucket(edge: int, bucket_idx: int):
+        nonlocal full_buckets
+        v0, v1 = edge_vertices[edge]
+        bit = 1 << bucket_idx
+        vertex_buckets[v0] |= bit
+        vertex_buckets[v1] |= bit
+        bucket = buckets[bucket_idx]
+        bucket.append(edge)
+        if len(bucket) >= bucket_size:
+            full_buckets |= bit
+
+    def _remove_from_bucket(edge: int, bucket_idx: int):
+        nonlocal full_buckets
+        v0, v1 = edge_vertices[edge]
+        bit = 1 << bucket_idx
+        # A vertex appears at most once per bucket, so no other edge in the bucket uses these vertices
+        vertex_buckets[v0] &= ~bit
+        vertex_buckets[v1] &= ~bit
+        buckets[bucket_idx].remove(edge)
+        full_buckets &= ~bit
+
+    for edge, (v0, v1) in enumerate(edge_vertices):
+        bucket_idx = _find_bucket(v0, v1)
+        if bucket_idx == len(buckets):
+            buckets.append([])
+        _add_to_bucket(edge, bucket_idx)
+
+    # Can't do better than every bucket full, or as many buckets as edges on the busiest vertex. A bucket also can't
+    # hold more edges than half the number of vertices
+    vertex_degrees = Counter(v for edge in edge_vertices for v in set(edge))
+    max_bucket_size = max(min(bucket_size, len(vertex_degrees) // 2), 1)
+    min_num_buckets = max(-(-num_edges // max_bucket_size), max(vertex_degrees.values()))
+
+    improved = True
+    while improved and len(buckets) > min_num_buckets:
+        improved = False
+        for bucket_idx in sorted(range(len(buckets)), key=lambda b: len(buckets[b])):
+            for edge in list(buckets[bucket_idx]):
+                other_bucket_idx = _find_bucket(*edge_vertices[edge], exclude=1 << bucket_idx)
+                if other_bucket_idx < len(buckets):
+                    _remove_from_bucket(edge, bucket_idx)
+                    _add_to_bucket(edge, other_bucket_idx)
+
+            if not buckets[bucket_idx]:
+                # Fill the gap with the last bucket
+                last_idx = len(buckets) - 1
+                if bucket_idx != last_idx:
+                    for edge in list(buckets[last_idx]):
+                        _remove_from_bucket(edge, last_idx)
+                        _add_to_bucket(edge, bucket_idx)
+                buckets.pop()
+                improved = True
+                break
+
+    return buckets
+
+
 def cloth_env_export(frag_obj: Object, drawable_xml: Drawable, materials: list[Material]) -> Optional[EnvironmentCloth]:
     cloth_objs = cloth_env_find_mesh_objects(frag_obj)
     if not cloth_objs:
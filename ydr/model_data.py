@@ -2,7 +2,7 @@
 from collections import defaultdict
 import numpy as np
 from numpy.typing import NDArray
-from typing import NamedTuple, Tuple
+from typing import NamedTuple, Optional, Tuple
 
 from ..tools.drawablehelper import get_model_xmls_by_lod
 from ..sollumz_properties import LODLevel, SollumzGame, import_export_current_game as current_game, set_import_export_current_game
@@ -95,8 +95,6 @@ def split_model_by_group(model_data: ModelData, bones: list[Bone]) -> list[Model
 def get_group_face_inds(mesh_data: MeshData, bones: list[Bone]):
     """Get face indices split by vertex group. Overlapping vertex groups are merged
     based on bone parenting."""
-    group_inds: dict[int, set] = defaultdict(list)
-
     blend_inds = mesh_data.vert_arr["BlendIndices"]
     weights = mesh_data.vert_arr["BlendWeights"]
 
@@ -115,34 +113,65 @@ def get_group_face_inds(mesh_data: MeshData, bones: list[Bone]):
     # Maps group indices to the group index of the object they should be parented to
     parent_map = get_group_parent_map(face_blend_inds, bones)
 
-    for i, all_blend_inds in enumerate(face_blend_inds):
-        # Valid BlendIndices are those where either the index or weight is not 0
-        valid_blend_inds = all_blend_inds[blend_inds_mask[i]]
+    # Group of each face is the parent of its first valid BlendIndex, or 0 if none are valid
+    first_valid = np.argmax(blend_inds_mask, axis=1)
+    has_valid = blend_inds_mask[np.arange(num_tris), first_valid]
+    first_blend_inds = face_blend_inds[np.arange(num_tris), first_valid]
 
-        if valid_blend_inds.size == 0:
-            group_ind = 0
-        else:
-            group_ind = parent_map[valid_blend_inds[0]]
+    map_keys = np.array(list(parent_map.keys()), dtype=face_blend_inds.dtype)
+    map_values = np.array([int(v) for v in parent_map.values()], dtype=np.int64)
+    key_order = np.argsort(map_keys)
+    map_keys = map_keys[key_order]
+    map_values = map_values[key_order]
+    face_groups = np.where(has_valid, map_values[np.searchsorted(map_keys, first_blend_inds)], 0)
 
-        group_inds[group_ind].append(i)
+    # Partition the faces by group with a stable sort, so face indices stay ascending within each group
+    sorted_face_inds = np.argsort(face_groups, kind="stable").astype(np.uint32)
+    groups, group_starts = np.unique(face_groups[sorted_face_inds], return_index=True)
+    group_ends = np.append(group_starts[1:], num_tris)
+    # Groups are returned in order of first appearance
+    group_first_face = sorted_face_inds[group_starts]
 
-    return {i: np.array(face_inds, dtype=np.uint32) for i, face_inds in group_inds.items()}
+    return {
+        int(groups[i]): sorted_face_inds[group_starts[i]:group_ends[i]]
+        for i in np.argsort(group_first_face, kind="stable")
+    }
 
 
 def get_group_parent_map(face_blend_inds: NDArray[np.uint32], bones: list[Bone]) -> dict[int, set]:
     """Get a mapping of each blend index to the blend index of the object they should be parented to."""
     # Mapping of each blend index to blend indices with overlapping faces
-    group_relations: dict[int, set[int]] = defaultdict(set)
+    group_relations: dict[int, list[int]] = {}
     parent_map: dict[int, int] = {}
-    group_inds = np.unique(face_blend_inds)
-
-    for group_ind in group_inds:
-        occurences = np.any(face_blend_inds == group_ind, axis=1)
-        related_groups = np.unique(face_blend_inds[occurences].flatten())
-        # Ignore 0 group because all vertex groups are a part of group 0
-        group_relations[group_ind] = [
-            i for i in related_groups if i != 0 and i != group_ind]
-
+    # Unique blend indices and the group index of each face entry, using a lookup table instead of sorting
+    is_used = np.zeros(int(face_blend_inds.max(initial=0)) + 1, dtype=bool)
+    is_used[face_blend_inds] = True
+    group_inds = np.flatnonzero(is_used).astype(face_blend_inds.dtype)
+    num_groups = len(group_inds)
+    group_lookup = np.zeros(len(is_used), dtype=np.int64)
+    group_lookup[group_inds] = np.arange(num_groups)
+    # (12 x faces), each row contiguous
+    face_group_inds = group_lookup[np.ascontiguousarray(face_blend_inds.T)]
+
+    # Build the group co-occurrence relation as a dense boolean matrix, marking every pair of groups that appear in
+    # the same face
+    group_cooccurrence = np.zeros(num_groups * num_groups, dtype=bool)
+    for i in range(len(face_group_inds)):
+        a = face_group_inds[i] * num_groups
+        for j in range(i + 1, len(face_group_inds)):
+            b = face_group_inds[j]
+            group_cooccurrence[a + b] = True
+    group_cooccurrence = group_cooccurrence.reshape((num_groups, num_groups))
+    group_cooccurrence |= group_cooccurrence.T
+
+    # Ignore 0 group because all vertex groups are a part of group 0
+    group_cooccurrence[:, group_inds == 0] = False
+    np.fill_diagonal(group_cooccurrence, False)
+
+    for i, group_ind in enumerate(group_inds):
+        group_relations[group_ind] = list(group_inds[group_cooccurrence[i]])
+
+    bone_parents_cache: dict[int, set[int]] = {}
     for blend_ind, blend_inds in group_relations.items():
         # blend_ind does not overlap with any other vertex groups, so it can be created as its own object
         if not blend_inds:
@@ -151,28 +180,35 @@ def get_group_parent_map(face_blend_inds: NDArray[np.uint32], bones: list[Bone])
 
         # Find a parent bone that is shared between all blend_inds. All faces with blend_inds vertex groups will be
         # created as a single object
-        parent_map[blend_ind] = find_common_bone_parent(blend_inds, bones)
+        parent_map[blend_ind] = find_common_bone_parent(blend_inds, bones, bone_parents_cache)
 
     return parent_map
 
 
-def find_common_bone_parent(bone_inds: list[int], bones: list[Bone]) -> int:
-    bone_parents = [get_all_bone_parents(
-        i, bones) for i in bone_inds if bones[i].parent_index > 0]
+def find_common_bone_parent(
+    bone_inds: list[int], bones: list[Bone], bone_parents_cache: Optional[dict[int, set[int]]] = None
+) -> int:
+    if bone_parents_cache is None:
+        bone_parents_cache = {}
 
-    if not bone_parents:
-        return 0
+    common_bones = None
+    for i in bone_inds:
+        if bones[i].parent_index <= 0:
+            continue
 
-    common_bones = bone_parents[0]
+        bone_parents = bone_parents_cache.get(i, None)
+        if bone_parents is None:
+            bone_parents = bone_parents_cache[i] = set(get_all_bone_parents(i, bones))
 
-    for array in bone_parents[1:]:
-        common_bones = np.intersect1d(common_bones, array)
+        common_bones = set(bone_parents) if common_bones is None else common_bones & bone_parents
+        if not common_bones:
+            return 0
 
-    if len(common_bones) == 0:
+    if not common_bones:
         return 0
 
     # Get the parent thats highest in the bone hierarchy
-    return np.min(common_bones)
+    return min(common_bones)
 
 
 def get_all_bone_parents(bone_ind: int, bones: list[Bone]):
@@ -194,23 +230,14 @@ def get_faces_subset(vert_arr: NDArray, ind_arr: NDArray[np.uint32], face_inds:
 
     subset_inds = faces[face_inds].flatten()
 
-    # Map old vert inds to new vert inds
-    # TODO: Remap inds using numpy?
-    vert_inds_map: dict[int, int] = {}
-    vert_inds = []
-    new_inds = []
-
-    for vert_ind in subset_inds:
-        if vert_ind in vert_inds_map:
-            new_inds.append(vert_inds_map[vert_ind])
-        else:
-            new_vert_ind = len(vert_inds_map)
-            new_inds.append(new_vert_ind)
-            vert_inds_map[vert_ind] = new_vert_ind
-            vert_inds.append(vert_ind)
+    # Map old vert inds to new vert inds, numbered in order of first use
+    vert_inds, first_use, inverse = np.unique(subset_inds, return_index=True, return_inverse=True)
+    first_use_order = np.argsort(first_use)
+    new_vert_inds = np.empty(len(vert_inds), dtype=np.uint32)
+    new_vert_inds[first_use_order] = np.arange(len(vert_inds), dtype=np.uint32)
 
-    new_vert_arr = vert_arr[vert_inds]
-    new_ind_arr = np.array(new_inds, dtype=np.uint32)
+    new_vert_arr = vert_arr[vert_inds[first_use_order]]
+    new_ind_arr = new_vert_inds[inverse.reshape(-1)]
 
     return new_vert_arr, new_ind_arr
 
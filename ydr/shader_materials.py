@@ -24,19 +24,19 @@ class ShaderMaterial(NamedTuple):
 
 shadermats = []
 
-for shader in ShaderManager._shaders.values():
-    name = shader.filename.replace(".sps", "").upper()
+for preset_name in ShaderManager.preset_names(SollumzGame.GTA):
+    name = preset_name.replace(".sps", "").upper()
 
-    shadermats.append(ShaderMaterial(name, name.replace("_", " "), shader.filename))
+    shadermats.append(ShaderMaterial(name, name.replace("_", " "), preset_name))
 
 shadermats_by_filename = {s.value: s for s in shadermats}
 
 rdr_shadermats = []
 
-for shader in ShaderManager._rdr_shaders.values():
-    name = shader.filename.replace(".sps", "").upper()
+for preset_name in ShaderManager.preset_names(SollumzGame.RDR):
+    name = preset_name.replace(".sps", "").upper()
 
-    rdr_shadermats.append(ShaderMaterial(name, name.replace("_", " "), shader.filename))
+    rdr_shadermats.append(ShaderMaterial(name, name.replace("_", " "), preset_name))
 
 rdr_shadermats_by_filename = {s.value: s for s in rdr_shadermats}
 
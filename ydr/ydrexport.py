@@ -326,17 +326,10 @@ def create_geometries_xml(
     mesh_domain_override: Optional[VBBuilderDomain],
     parent_obj: Optional[bpy.types.Object],
 ) -> list[Geometry]:
-    is_cable = is_cable_mesh(mesh_eval)
-    if len(mesh_eval.loops) == 0 and not is_cable:  # cable mesh don't have faces, so no loops either
-        logger.warning(f"Drawable Model '{mesh_eval.original.name}' has no Geometry! Skipping...")
-        return []
-
-    if not mesh_eval.materials:
-        logger.warning(
-            f"Could not create geometries for Drawable Model '{mesh_eval.original.name}': Mesh has no Sollumz materials!")
+    if not validate_model_mesh(mesh_eval):
         return []
 
-    if is_cable:
+    if is_cable_mesh(mesh_eval):
         cable_total_vert_buffer, cable_vert_materials = CableVertexBufferBuilder(mesh_eval).build()
         cable_geometries = []
         for cable_material_index in range(len(mesh_eval.materials)):
@@ -355,42 +348,7 @@ def create_geometries_xml(
 
         return cable_geometries
 
-    # Validate UV maps and color attributes
-    texcoords = [(t, get_uv_map_name(t)) for t in get_mesh_used_texcoords_indices(mesh_eval)]
-    texcoords_missing = [(t, name) for t, name in texcoords if name not in mesh_eval.uv_layers]
-    if texcoords_missing:
-        texcoords_missing_str = ", ".join(name for _, name in texcoords_missing)
-        logger.warning(
-            f"Mesh '{mesh_eval.name}' is missing UV maps used by Sollumz shaders: {texcoords_missing_str}. "
-            "Please add them to avoid rendering issues in-game."
-        )
-
-    colors = [(c, get_color_attr_name(c)) for c in get_mesh_used_colors_indices(mesh_eval)]
-    colors_missing = [(c, name) for c, name in colors if name not in mesh_eval.color_attributes]
-    if colors_missing:
-        colors_missing_str = ", ".join(c[1] for c in colors_missing)
-        logger.warning(
-            f"Mesh '{mesh_eval.name}' is missing color attributes used by Sollumz shaders: {colors_missing_str}. "
-            "Please add them to avoid rendering issues in-game."
-        )
-
-    colors_incorrect_format = [
-        (c, name) for c, name in colors
-        if (attr := mesh_eval.color_attributes.get(name, None)) and
-           (attr.domain != "CORNER" or attr.data_type != "BYTE_COLOR")
-    ]
-    if colors_incorrect_format:
-        colors_incorrect_format_str = ", ".join(name for _, name in colors_incorrect_format)
-        logger.warning(
-            f"Mesh '{mesh_eval.name}' has color attributes with the incorrect format: {colors_incorrect_format_str}. "
-            "Their format must be 'Face Corner ▶ Byte Color'. Please convert them to avoid rendering issues in-game."
-        )
-
-    del texcoords
-    del texcoords_missing
-    del colors
-    del colors_missing
-    del colors_incorrect_format
+    validate_mesh_attributes(mesh_eval)
 
     loop_inds_by_mat = get_loop_inds_by_material(mesh_eval, materials)
 
@@ -502,6 +460,54 @@ def create_geometries_xml(
     return geometries
 
 
+def validate_model_mesh(mesh_eval: bpy.types.Mesh) -> bool:
+    """Check that the evaluated mesh of a Drawable Model has geometry and materials. Returns ``False`` if no
+    geometries can be created from it."""
+    if len(mesh_eval.loops) == 0 and not is_cable_mesh(mesh_eval):  # cable mesh don't have faces, so no loops either
+        logger.warning(f"Drawable Model '{mesh_eval.original.name}' has no Geometry! Skipping...")
+        return False
+
+    if not mesh_eval.materials:
+        logger.warning(
+            f"Could not create geometries for Drawable Model '{mesh_eval.original.name}': Mesh has no Sollumz materials!")
+        return False
+
+    return True
+
+
+def validate_mesh_attributes(mesh: bpy.types.Mesh):
+    """Warn about UV maps and color attributes used by the mesh materials that are missing or have the wrong format."""
+    texcoords = [(t, get_uv_map_name(t)) for t in get_mesh_used_texcoords_indices(mesh)]
+    texcoords_missing = [(t, name) for t, name in texcoords if name not in mesh.uv_layers]
+    if texcoords_missing:
+        texcoords_missing_str = ", ".join(name for _, name in texcoords_missing)
+        logger.warning(
+            f"Mesh '{mesh.name}' is missing UV maps used by Sollumz shaders: {texcoords_missing_str}. "
+            "Please add them to avoid rendering issues in-game."
+        )
+
+    colors = [(c, get_color_attr_name(c)) for c in get_mesh_used_colors_indices(mesh)]
+    colors_missing = [(c, name) for c, name in colors if name not in mesh.color_attributes]
+    if colors_missing:
+        colors_missing_str = ", ".join(c[1] for c in colors_missing)
+        logger.warning(
+            f"Mesh '{mesh.name}' is missing color attributes used by Sollumz shaders: {colors_missing_str}. "
+            "Please add them to avoid rendering issues in-game."
+        )
+
+    colors_incorrect_format = [
+        (c, name) for c, name in colors
+        if (attr := mesh.color_attributes.get(name, None)) and
+           (attr.domain != "CORNER" or attr.data_type != "BYTE_COLOR")
+    ]
+    if colors_incorrect_format:
+        colors_incorrect_format_str = ", ".join(name for _, name in colors_incorrect_format)
+        logger.warning(
+            f"Mesh '{mesh.name}' has color attributes with the incorrect format: {colors_incorrect_format_str}. "
+            "Their format must be 'Face Corner ▶ Byte Color'. Please convert them to avoid rendering issues in-game."
+        )
+
+
 def sort_geoms_by_shader(geometries: list[Geometry]):
     return sorted(geometries, key=lambda g: g.shader_index)
 
@@ -1,10 +1,11 @@
 import os
 import traceback
 import bpy
+from xml.etree import ElementTree as ET
 from typing import Optional
 from mathutils import Matrix
 from pathlib import Path
-from ..tools.drawablehelper import get_model_xmls_by_lod
+from ..tools.drawablehelper import get_model_xmls_by_lod, remove_unselected_lods
 from .shader_materials import create_shader, get_detail_extra_sampler, create_tinted_shader_graph
 from ..ybn.ybnimport import create_bound_composite, create_bound_object, create_rdr_bound
 from ..sollumz_properties import SollumzGame, SollumType, SOLLUMZ_UI_NAMES, import_export_current_game as current_game, set_import_export_current_game
@@ -31,7 +32,8 @@ def import_ydr(filepath: str):
     import_settings = get_import_settings()
 
     name = get_filename(filepath)
-    ydr_xml = YDR.from_xml_file(filepath)
+    with Drawable.skip_bounds(not import_settings.import_embedded_bounds):
+        ydr_xml = YDR.from_xml_file(filepath)
     
     if import_settings.import_as_asset:
         return create_drawable_as_asset(ydr_xml, name, filepath)
@@ -39,23 +41,39 @@ def import_ydr(filepath: str):
     return create_drawable_obj(ydr_xml, filepath, name, game=ydr_xml.game)
 
 
-def create_drawable_obj(drawable_xml: Drawable, filepath: str, name: Optional[str] = None, split_by_group: bool = False, external_armature: Optional[bpy.types.Object] = None, external_bones: Optional[list[Bone]] = None, materials: Optional[list[bpy.types.Material]] = None, game: SollumzGame = SollumzGame.GTA):
-    """Create a drawable object. ``split_by_group`` will split each Drawable Model by vertex group. ``external_armature`` allows for bones to be rigged to an armature object that is not the parent drawable."""
+def create_drawable_obj(
+    drawable_xml: Drawable,
+    filepath: str,
+    name: Optional[str] = None,
+    split_by_group: bool = False,
+    external_armature: Optional[bpy.types.Object] = None,
+    external_bones: Optional[list[Bone]] = None,
+    materials: Optional[list[bpy.types.Material]] = None,
+    game: SollumzGame = SollumzGame.GTA,
+    armature: Optional[bpy.types.Armature] = None,
+):
+    """Create a drawable object. ``split_by_group`` will split each Drawable Model by vertex group.
+    ``external_armature`` allows for bones to be rigged to an armature object that is not the parent drawable.
+    ``armature`` allows to reuse an existing armature data-block with the same skeleton instead of creating a new one.
+    """
     set_import_export_current_game(game)
+    import_settings = get_import_settings()
     name = name or drawable_xml.name
     materials = materials or shadergroup_to_materials(drawable_xml.shader_group, filepath)
 
+    remove_unselected_lods(drawable_xml, import_settings.import_lods)
+
     has_skeleton = len(drawable_xml.skeleton.bones) > 0
 
     if external_bones:
         drawable_xml.skeleton.bones = external_bones
 
     if has_skeleton and external_armature is None:
-        drawable_obj = create_drawable_armature(drawable_xml, name)
+        drawable_obj = create_drawable_armature(drawable_xml, name, armature)
     else:
         drawable_obj = create_drawable_empty(name, drawable_xml)
 
-    if drawable_xml.bounds is not None:
+    if drawable_xml.bounds is not None and import_settings.import_embedded_bounds:
         create_embedded_collisions(drawable_xml.bounds, drawable_obj)
 
     armature_obj = drawable_obj if drawable_obj.type == "ARMATURE" else external_armature
@@ -68,7 +86,7 @@ def create_drawable_obj(drawable_xml: Drawable, filepath: str, name: Optional[st
 
     parent_objs(model_objs, drawable_obj)
 
-    if drawable_xml.lights:
+    if drawable_xml.lights and import_settings.import_lights:
         create_drawable_lights(drawable_xml, drawable_obj, armature_obj)
 
     return drawable_obj
@@ -199,8 +217,8 @@ def set_drawable_model_properties(model_props: DrawableModelProperties, model_xm
         model_props.render_mask = model_xml.render_mask
 
 
-def create_drawable_armature(drawable_xml: Drawable, name: str):
-    drawable_obj = create_armature_obj_from_skel(drawable_xml.skeleton, name, SollumType.DRAWABLE)
+def create_drawable_armature(drawable_xml: Drawable, name: str, armature: Optional[bpy.types.Armature] = None):
+    drawable_obj = create_armature_obj_from_skel(drawable_xml.skeleton, name, SollumType.DRAWABLE, armature)
     create_joint_constraints(drawable_obj, drawable_xml.joints)
 
     set_drawable_properties(drawable_obj, drawable_xml, True)
@@ -208,7 +226,14 @@ def create_drawable_armature(drawable_xml: Drawable, name: str):
     return drawable_obj
 
 
-def create_armature_obj_from_skel(skeleton: Skeleton, name: str, sollum_type: SollumType):
+def create_armature_obj_from_skel(
+    skeleton: Skeleton, name: str, sollum_type: SollumType, armature: Optional[bpy.types.Armature] = None
+):
+    """Create an armature object for ``skeleton``. If ``armature`` is given, it is assumed to already contain the
+    bones of ``skeleton`` and is linked to the new object as is."""
+    if armature is not None:
+        return create_blender_object(sollum_type, name, armature, current_game())
+
     armature = bpy.data.armatures.new(f"{name}.skel")
     obj = create_blender_object(sollum_type, name, armature, current_game())
 
@@ -232,17 +257,59 @@ def create_drawable_empty(name: str, drawable_xml: Drawable):
     return drawable_obj
 
 
-def shadergroup_to_materials(shader_group: ShaderGroup, filepath: str):
+def shadergroup_to_materials(
+    shader_group: ShaderGroup, filepath: str, shared_materials: Optional[dict[tuple, bpy.types.Material]] = None
+):
+    """Create a material for each shader in ``shader_group``. If ``shared_materials`` is given, shaders that create
+    identical materials (see ``get_shader_material_key``) reuse the materials in it, and new materials are added to it.
+    """
     materials = []
 
     for i, shader in enumerate(shader_group.shaders):
+        material_key = None
+        if shared_materials is not None:
+            material_key = get_shader_material_key(i, shader, shader_group)
+            material = shared_materials.get(material_key, None)
+            if material is not None:
+                materials.append(material)
+                continue
+
         material = shader_item_to_material(shader, shader_group, filepath)
         material.shader_properties.index = i
         materials.append(material)
 
+        if material_key is not None:
+            shared_materials[material_key] = material
+
     return materials
 
 
+def get_shader_material_key(shader_index: int, shader: Shader, shader_group: ShaderGroup) -> tuple:
+    """Get a key identifying the material created from ``shader``. Shaders with the same key create identical
+    materials. Includes the shader index so export keeps the original shader order."""
+    parameters = shader.parameters
+    if current_game() == SollumzGame.RDR:
+        parameters = parameters.items
+
+    texture_dictionary = shader_group.texture_dictionary
+    if current_game() == SollumzGame.RDR:
+        texture_dictionary = texture_dictionary.textures
+
+    embedded_textures = ()
+    if texture_dictionary:
+        texture_names = {param.texture_name for param in parameters if param.type == "Texture"}
+        embedded_textures = tuple(sorted(
+            (
+                (texture.name, texture.extra_flags if current_game() == SollumzGame.GTA else texture.flags)
+                for texture in texture_dictionary if texture.name in texture_names
+            ),
+            key=lambda t: t[0]
+        ))
+
+    # Compare the serialized shader, the ``__hash__`` of the shader parameters doesn't include all their values
+    return (shader_index, ET.tostring(shader.to_xml()), embedded_textures)
+
+
 def lookup_texture_file(texture_name: str, model_textures_directory: Optional[Path]) -> Optional[Path]:
     """Searches for a DDS file with the given ``texture_name``.
     The search order is as follows:
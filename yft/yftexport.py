@@ -1017,21 +1017,25 @@ def set_veh_window_xml_properties(window_xml: Window, window_obj: bpy.types.Obje
 def calculate_shattermap_projection(obj: bpy.types.Object, img: bpy.types.Image):
     mesh = obj.data
 
-    v1 = Vector()
-    v2 = Vector()
-    v3 = Vector()
+    num_loops = len(mesh.loops)
+    loop_uvs = np.empty((num_loops, 2), dtype=np.float32)
+    mesh.uv_layers[0].data.foreach_get("uv", loop_uvs.ravel())
+    loop_vert_inds = np.empty(num_loops, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vert_inds)
+    vert_positions = np.empty((len(mesh.vertices), 3), dtype=np.float32)
+    mesh.vertices.foreach_get("co", vert_positions.ravel())
+
+    def _corner_position(u: float, v: float) -> Vector:
+        loop_inds = np.flatnonzero((loop_uvs[:, 0] == u) & (loop_uvs[:, 1] == v))
+        if len(loop_inds) == 0:
+            return Vector()
+
+        return Vector(vert_positions[loop_vert_inds[loop_inds[-1]]])
 
     # Get three corner vectors
-    for loop in mesh.loops:
-        uv = mesh.uv_layers[0].data[loop.index].uv
-        vert_pos = mesh.vertices[loop.vertex_index].co
-
-        if uv.x == 0 and uv.y == 1:
-            v1 = vert_pos
-        elif uv.x == 1 and uv.y == 1:
-            v2 = vert_pos
-        elif uv.x == 0 and uv.y == 0:
-            v3 = vert_pos
+    v1 = _corner_position(0, 1)
+    v2 = _corner_position(1, 1)
+    v3 = _corner_position(0, 0)
 
     resx = img.size[0]
     resy = img.size[1]
@@ -10,12 +10,14 @@ from ..tools.blenderhelper import add_child_of_bone_constraint, create_empty_obj
 from ..tools.meshhelper import create_uv_attr
 from ..tools.utils import multiply_homogeneous, get_filename
 from ..shared.shader_nodes import SzShaderNodeParameter
-from ..sollumz_properties import BOUND_TYPES, SollumType, MaterialType, SollumzGame, import_export_current_game as current_game, set_import_export_current_game
+from ..sollumz_properties import BOUND_TYPES, SollumType, MaterialType, SollumzGame, LODLevel, import_export_current_game as current_game, set_import_export_current_game
 from ..sollumz_preferences import get_import_settings
 from ..cwxml.fragment import YFT, Fragment, PhysicsLOD, PhysicsGroup, PhysicsChild, Window, Archetype, GlassWindow
 from ..cwxml.drawable import Drawable, Bone
 from ..ydr.ydrimport import apply_translation_limits, create_armature_obj_from_skel, create_drawable_skel, apply_rotation_limits, create_joint_constraints, create_light_objs, create_drawable_obj, create_drawable_as_asset, shadergroup_to_materials, create_drawable_models
 from ..ybn.ybnimport import create_bound_object, create_bound_composite
+from ..tools.drawablehelper import remove_unselected_lods
+from ..tools.fragmenthelper import decode_shattermap
 from .. import logger
 from .properties import LODProperties, FragArchetypeProperties, GlassTypes, FragmentTemplateAsset
 from ..tools.blenderhelper import get_child_of_bone
@@ -39,13 +41,15 @@ def import_yft(filepath: str):
         non_hi_filepath = filepath
         hi_filepath = make_hi_yft_filepath(filepath)
     name = get_filename(non_hi_filepath)
-    yft_xml = YFT.from_xml_file(non_hi_filepath)
+    with Drawable.skip_bounds(not import_settings.import_embedded_bounds):
+        yft_xml = YFT.from_xml_file(non_hi_filepath)
 
-    if isinstance(yft_xml, RDRFragment):
-        set_import_export_current_game(SollumzGame.RDR)
+        if isinstance(yft_xml, RDRFragment):
+            set_import_export_current_game(SollumzGame.RDR)
 
-    # Import the _hi.yft.xml if it exists
-    hi_xml = YFT.from_xml_file(hi_filepath) if os.path.exists(hi_filepath) else None
+        # Import the _hi.yft.xml if it exists, unless the Very High LODs are not going to be imported
+        import_hi = LODLevel.VERYHIGH in import_settings.import_lods and os.path.exists(hi_filepath)
+        hi_xml = YFT.from_xml_file(hi_filepath) if import_hi else None
 
     if import_settings.import_as_asset:
         return create_fragment_as_asset(yft_xml, hi_xml, name, non_hi_filepath)
@@ -80,6 +84,8 @@ def make_non_hi_yft_filepath(yft_filepath: str) -> str:
 
 
 def create_fragment_obj(frag_xml: Fragment, filepath: str, name: Optional[str] = None, split_by_group: bool = False, hi_xml: Optional[Fragment] = None):
+    import_settings = get_import_settings()
+
     if hi_xml is not None:
         frag_xml = merge_hi_fragment(frag_xml, hi_xml)
 
@@ -113,8 +119,20 @@ def create_fragment_obj(frag_xml: Fragment, filepath: str, name: Optional[str] =
 
     frag_obj = create_frag_armature(frag_xml, name)
 
+    # Windows reference geometries of the high LOD models, which are removed when creating the drawable if the high
+    # LOD is not imported, so look up their materials first
+    vehicle_window_materials = None
+    if current_game() == SollumzGame.GTA and frag_xml.vehicle_glass_windows:
+        vehicle_window_materials = [
+            get_veh_window_material(window_xml, drawable_xml, materials)
+            for window_xml in frag_xml.vehicle_glass_windows
+        ]
+
     drawable_obj = create_fragment_drawable(frag_xml, frag_obj, filepath, materials, split_by_group)
-    damaged_drawable_obj = create_fragment_drawable(frag_xml, frag_obj, filepath, materials, split_by_group, damaged=True)
+    damaged_drawable_obj = None
+    if import_settings.import_damaged:
+        damaged_drawable_obj = create_fragment_drawable(
+            frag_xml, frag_obj, filepath, materials, split_by_group, damaged=True)
 
     create_frag_collisions(frag_xml, frag_obj)
     if damaged_drawable_obj is not None:
@@ -126,16 +144,17 @@ def create_fragment_obj(frag_xml: Fragment, filepath: str, name: Optional[str] =
     create_phys_child_meshes(frag_xml, frag_obj, drawable_obj, materials)
 
     if current_game() == SollumzGame.GTA:
-        create_env_cloth_meshes(frag_xml, frag_obj, drawable_obj, materials)
+        if import_settings.import_cloth:
+            create_env_cloth_meshes(frag_xml, frag_obj, drawable_obj, materials)
 
         if frag_xml.vehicle_glass_windows:
-            create_vehicle_windows(frag_xml, frag_obj, materials)
+            create_vehicle_windows(frag_xml, frag_obj, vehicle_window_materials)
 
     if frag_xml.glass_windows:
         set_all_glass_window_properties(frag_xml, frag_obj)
 
     if current_game() == SollumzGame.GTA:
-        if frag_xml.lights:
+        if frag_xml.lights and import_settings.import_lights:
             create_frag_lights(frag_xml, frag_obj)
 
     return frag_obj
@@ -297,7 +316,10 @@ def create_phys_child_meshes(frag_xml: Fragment, frag_obj: bpy.types.Object, dra
     bone_name_by_tag: dict[str, Bone] = {
         bone.tag: bone.name for bone in bones}
 
+    lod_levels = get_import_settings().import_lods
+
     for child_xml in children_xml:
+        remove_unselected_lods(child_xml.drawable, lod_levels)
         if child_xml.drawable.is_empty:
             continue
 
@@ -466,12 +488,16 @@ def create_env_cloth_meshes(frag_xml: Fragment, frag_obj: bpy.types.Object, draw
         cloth_props.world_bounds = cloth_bounds
 
 
-def create_vehicle_windows(frag_xml: Fragment, frag_obj: bpy.types.Object, materials: list[bpy.types.Material]):
+def create_vehicle_windows(
+    frag_xml: Fragment, frag_obj: bpy.types.Object, window_materials: list[Optional[bpy.types.Material]]
+):
+    """Create the vehicle windows. ``window_materials`` has the material of each window, from
+    ``get_veh_window_material``."""
     if current_game() == SollumzGame.RDR:
         # TODO: RDR2 vehicle windows
         return
 
-    for window_xml in frag_xml.vehicle_glass_windows:
+    for window_xml, window_mat in zip(frag_xml.vehicle_glass_windows, window_materials):
         window_bone = get_window_bone(window_xml, frag_xml, frag_obj.data.bones)
         col_obj = get_window_col(frag_obj, window_bone.name)
 
@@ -484,8 +510,6 @@ def create_vehicle_windows(frag_xml: Fragment, frag_obj: bpy.types.Object, mater
 
         col_obj.child_properties.is_veh_window = True
 
-        window_mat = get_veh_window_material(window_xml, frag_xml.drawable, materials)
-
         if window_mat is not None:
             col_obj.child_properties.window_mat = window_mat
 
@@ -587,44 +611,22 @@ def get_window_projection_matrix(window_xml: Window):
     return proj_mat.transposed().inverted_safe()
 
 
-def get_rgb(value):
-    if value == "##":
-        return [0, 0, 0, 1]
-    elif value == "--":
-        return [1, 1, 1, 1]
-    else:
-        value = int(value, 16)
-        return [value / 255, value / 255, value / 255, 1]
-
-
 def shattermap_to_image(shattermap, name):
     width = int(len(shattermap[0]) / 2)
     height = int(len(shattermap))
 
     img = bpy.data.images.new(name, width, height)
 
-    pixels = []
-    i = 0
-    for row in reversed(shattermap):
-        frow = [row[x:x + 2] for x in range(0, len(row), 2)]
-        # Need to check for malformed shattermaps. ZModeler shattermaps seem to be missing a value of "--" when "--" appears in a row. We check for this specific case and insert a "--" to the row.
-        # We don't handle other malformed data, an error will be logged in the try/except below.
-        if len(frow) == (width - 1):
-            try:
-                idx = frow.index("--")
-            except ValueError:
-                idx = None
-            if idx is not None:
-                frow.insert(idx, "--")
-        for value in frow:
-            pixels.append(get_rgb(value))
-            i += 1
-
-    pixels = [chan for px in pixels for chan in px]
     try:
-        img.pixels = pixels
+        values = decode_shattermap(shattermap)
     except ValueError:
         logger.error("Cannot create shattermap, shattermap data is malformed")
+        return img
+
+    # Image rows are stored bottom to top
+    pixels = np.ones((height, width, 4), dtype=np.float32)
+    pixels[..., :3] = values[::-1, :, np.newaxis] / 255
+    img.pixels.foreach_set(pixels.ravel())
 
     return img
 
@@ -641,13 +643,13 @@ def get_geometry_material(drawable_xml: Drawable, materials: list[bpy.types.Mate
     for dmodel in drawable_xml.drawable_models_high:
         geometries = dmodel.geometries
 
-        if geometry_index > len(geometries):
+        if geometry_index >= len(geometries):
             return None
 
         geometry = geometries[geometry_index]
         shader_index = geometry.shader_index
 
-        if shader_index > len(materials):
+        if shader_index >= len(materials):
             return None
 
         return materials[shader_index]
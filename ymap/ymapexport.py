@@ -13,6 +13,9 @@ from ..sollumz_preferences import get_export_settings
 from .. import logger
 from ..tools.ymaphelper import generate_ymap_extents
 
+# Vertex indices of model occluders are stored as 8-bit integers
+MAX_MODEL_OCCLUDER_VERTICES = 256
+
 
 def box_from_obj(obj):
     box = BoxOccluder()
@@ -135,6 +138,16 @@ def calculate_cargen_orient(obj):
     return 5 * math.sin(angle), 5 * math.cos(angle)
 
 
+def validate_model_occluder(model_obj) -> bool:
+    if len(model_obj.data.vertices) > MAX_MODEL_OCCLUDER_VERTICES:
+        logger.warning(
+            f"Object {model_obj.name} has too many vertices and will be skipped. It can not have more than "
+            f"{MAX_MODEL_OCCLUDER_VERTICES} vertices.")
+        return False
+
+    return True
+
+
 def ymap_from_object(obj):
     ymap = CMapData()
 
@@ -169,9 +182,7 @@ def ymap_from_object(obj):
 
             for model_obj in child.children:
                 if model_obj.sollum_type == SollumType.YMAP_MODEL_OCCLUDER:
-                    if len(model_obj.data.vertices) > 256:
-                        logger.warning(
-                            f"Object {model_obj.name} has too many vertices and will be skipped. It can not have more than 256 vertices.")
+                    if not validate_model_occluder(model_obj):
                         continue
 
                     ymap.occlude_models.append(